@@ -0,0 +1,34 @@
+"""Add prompt-cache accounting columns to cost_log.
+
+Records how many input tokens were served from the provider prefix
+cache and the router intent of each LLM call, so cache effectiveness
+can be grouped by workspace, model and intent.
+
+Revision ID: d5e6f7a8b9c0
+Revises: c4d5e6f7a8b9
+Create Date: 2026-10-18 10:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "d5e6f7a8b9c0"
+down_revision = "c4d5e6f7a8b9"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("cost_log", sa.Column(
+        "cached_input_tokens", sa.Integer(), nullable=False, server_default="0",
+        comment="Portion of input_tokens served from the provider prefix cache",
+    ))
+    op.add_column("cost_log", sa.Column(
+        "intent", sa.String(32), nullable=True,
+        comment="Router intent for LLM calls (chat|tool_use|code|...)",
+    ))
+
+
+def downgrade() -> None:
+    op.drop_column("cost_log", "intent")
+    op.drop_column("cost_log", "cached_input_tokens")
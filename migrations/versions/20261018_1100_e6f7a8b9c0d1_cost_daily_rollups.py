@@ -0,0 +1,40 @@
+"""Add cost_daily_rollups table.
+
+Per-workspace, per-day, per-component cost totals, upserted by the
+batched cost recorder so budget checks avoid summing cost_log.
+
+Revision ID: e6f7a8b9c0d1
+Revises: d5e6f7a8b9c0
+Create Date: 2026-10-18 11:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+revision = "e6f7a8b9c0d1"
+down_revision = "d5e6f7a8b9c0"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "cost_daily_rollups",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True, server_default=sa.text("gen_random_uuid()")),
+        sa.Column("workspace_id", UUID(as_uuid=True), sa.ForeignKey("workspaces.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False, comment="UTC day"),
+        sa.Column("component", sa.String(50), nullable=False, comment="llm_call|tool_execution|integration_api|sandbox"),
+        sa.Column("calls", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("input_tokens", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("cached_input_tokens", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("output_tokens", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("cost_usd", sa.Numeric(14, 6), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.UniqueConstraint("workspace_id", "day", "component", name="uix_cost_rollup_day"),
+        comment="Per-workspace daily cost totals (incremental upserts)",
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("cost_daily_rollups")
@@ -0,0 +1,38 @@
+"""Add heartbeats.next_check_at with a partial due-time index.
+
+Lets the heartbeat loop select only monitors that are due instead of
+loading every active row and filtering in Python. Existing rows are
+backfilled from last_check_at + check_interval_seconds.
+
+Revision ID: f7a8b9c0d1e2
+Revises: e6f7a8b9c0d1
+Create Date: 2026-10-18 12:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "f7a8b9c0d1e2"
+down_revision = "e6f7a8b9c0d1"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("heartbeats", sa.Column(
+        "next_check_at", sa.DateTime(timezone=True), nullable=True,
+        comment="When the evaluation loop should next check this monitor",
+    ))
+    op.execute(
+        "UPDATE heartbeats SET next_check_at = COALESCE("
+        "last_check_at + make_interval(secs => check_interval_seconds), now())"
+    )
+    op.create_index(
+        "ix_heartbeats_due", "heartbeats", ["next_check_at"],
+        postgresql_where=sa.text("is_active"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_heartbeats_due", table_name="heartbeats")
+    op.drop_column("heartbeats", "next_check_at")
@@ -0,0 +1,72 @@
+"""Turn background_tasks into a leased work queue.
+
+Adds retry scheduling (available_at, attempts, max_attempts), leasing
+(leased_by, lease_expires_at, heartbeat_at), resumable progress, the
+final result and a cancellation flag, plus a partial index over the
+rows workers poll.
+
+Revision ID: a8b9c0d1e2f3
+Revises: f7a8b9c0d1e2
+Create Date: 2026-10-18 13:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "a8b9c0d1e2f3"
+down_revision = "f7a8b9c0d1e2"
+branch_labels = None
+depends_on = None
+
+_COLUMNS = (
+    "available_at", "attempts", "max_attempts", "leased_by", "lease_expires_at",
+    "heartbeat_at", "progress", "result", "cancel_requested",
+)
+
+
+def upgrade() -> None:
+    op.add_column("background_tasks", sa.Column(
+        "available_at", sa.DateTime(timezone=True), server_default=sa.text("now()"),
+        nullable=False,
+        comment="Earliest time a worker may lease this task (retry backoff)",
+    ))
+    op.add_column("background_tasks", sa.Column(
+        "attempts", sa.Integer(), server_default="0", nullable=False,
+    ))
+    op.add_column("background_tasks", sa.Column(
+        "max_attempts", sa.Integer(), server_default="3", nullable=False,
+    ))
+    op.add_column("background_tasks", sa.Column("leased_by", sa.String(100), nullable=True))
+    op.add_column("background_tasks", sa.Column(
+        "lease_expires_at", sa.DateTime(timezone=True), nullable=True,
+    ))
+    op.add_column("background_tasks", sa.Column(
+        "heartbeat_at", sa.DateTime(timezone=True), nullable=True,
+    ))
+    op.add_column("background_tasks", sa.Column(
+        "progress", postgresql.JSONB(), server_default="{}", nullable=False,
+        comment="Checkpoint written by the handler; passed back on resume",
+    ))
+    op.add_column("background_tasks", sa.Column("result", sa.Text(), nullable=True))
+    op.add_column("background_tasks", sa.Column(
+        "cancel_requested", sa.Boolean(), server_default=sa.false(), nullable=False,
+    ))
+    op.alter_column(
+        "background_tasks", "status",
+        comment="queued|running|completed|interrupted|failed|cancelled",
+    )
+    op.create_index(
+        "ix_bg_tasks_queue", "background_tasks", ["status", "available_at"],
+        postgresql_where=sa.text("status IN ('queued', 'running')"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_bg_tasks_queue", table_name="background_tasks")
+    op.alter_column(
+        "background_tasks", "status",
+        comment="running|completed|interrupted|failed",
+    )
+    for column in reversed(_COLUMNS):
+        op.drop_column("background_tasks", column)
@@ -0,0 +1,32 @@
+"""Add coordination_leases for cross-replica event dedup and thread leases.
+
+Revision ID: b9c0d1e2f3a4
+Revises: a8b9c0d1e2f3
+Create Date: 2026-10-18 14:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "b9c0d1e2f3a4"
+down_revision = "a8b9c0d1e2f3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "coordination_leases",
+        sa.Column("key", sa.String(255), primary_key=True),
+        sa.Column("owner", sa.String(100), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        comment="Cross-replica event claims and locks",
+    )
+    op.create_index(
+        "ix_coordination_leases_expires", "coordination_leases", ["expires_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_coordination_leases_expires", table_name="coordination_leases")
+    op.drop_table("coordination_leases")
@@ -0,0 +1,31 @@
+"""Add schedules.shard_key so the cron index sweep filters by shard in SQL.
+
+Without it the sweep took the globally oldest due rows and dropped other
+shards' rows in Python, so a stalled shard's backlog could fill every
+page. The key is a hash computed in Python (lucy.crons.index.shard_key);
+existing rows get it when their scheduler next syncs the workspace,
+which happens at startup.
+
+Revision ID: d1e2f3a4b5c6
+Revises: c0d1e2f3a4b5
+Create Date: 2026-10-18 16:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "d1e2f3a4b5c6"
+down_revision = "c0d1e2f3a4b5"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("schedules", sa.Column(
+        "shard_key", sa.BigInteger(), nullable=True,
+        comment="Hash of workspace_id; the cron index sweep filters on shard_key % shard count",
+    ))
+
+
+def downgrade() -> None:
+    op.drop_column("schedules", "shard_key")
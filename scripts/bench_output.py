@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Time the Slack output pipeline over the fixture corpus.
+
+Runs ``process_output_sync`` and each regex layer over every response in
+tests/fixtures/output_corpus (or --corpus), and compares each layer's
+``RuleSet`` against the plain one-``re.sub``-per-rule chain it replaced.
+Both must produce identical text; the script exits non-zero if not.
+
+Usage:
+    python scripts/bench_output.py                  # Default corpus, 200 rounds
+    python scripts/bench_output.py --rounds 1000    # More rounds, steadier numbers
+    python scripts/bench_output.py --corpus ./msgs  # Any directory of *.md / *.txt
+"""
+
+import argparse
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from lucy.pipeline import content_classifier, output  # noqa: E402
+from lucy.pipeline.rules import RuleSet  # noqa: E402
+
+_DEFAULT_CORPUS = Path(__file__).parent.parent / "tests" / "fixtures" / "output_corpus"
+
+_LAYERS: dict[str, RuleSet] = {
+    "sanitize": output._SANITIZE_RULES,
+    "broken_urls": output._BROKEN_URL_RULES,
+    "markdown": output._MARKDOWN_RULES,
+    "tone": output._TONE_RULES,
+    "regex_deai": output._DEAI_RULES,
+}
+
+
+def _sequential(rules: RuleSet, text: str) -> str:
+    for pattern, repl in rules.rules:
+        text = pattern.sub(repl, text)
+    return text
+
+
+def _sequential_tells(text: str) -> list[tuple[str, int, str]]:
+    return [
+        (m.group(0), weight, category)
+        for pattern, weight, category in output._AI_TELL_PATTERNS
+        for m in pattern.finditer(text)
+    ]
+
+
+def _time(fn: Callable[[str], object], texts: list[str], rounds: int) -> float:
+    """Mean milliseconds per pass over ``texts``."""
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        for text in texts:
+            fn(text)
+    return (time.perf_counter() - t0) * 1000 / rounds
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", type=Path, default=_DEFAULT_CORPUS)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    files = sorted(p for p in args.corpus.iterdir() if p.suffix in (".md", ".txt"))
+    texts = [p.read_text() for p in files]
+    if not texts:
+        print(f"No *.md or *.txt files in {args.corpus}")
+        return 1
+    print(f"{len(texts)} responses, {sum(map(len, texts)):,} chars, {args.rounds} rounds\n")
+
+    mismatches = 0
+    print(f"{'layer':<14}{'sequential ms':>15}{'ruleset ms':>13}{'speedup':>10}")
+    rows: list[tuple[str, Callable[[str], object], Callable[[str], object]]] = [
+        (name, lambda t, r=rules: _sequential(r, t), rules.sub) for name, rules in _LAYERS.items()
+    ]
+    rows.append(("ai_tells", _sequential_tells, output._detect_ai_tells))
+    for name, before, after in rows:
+        mismatches += sum(before(t) != after(t) for t in texts)
+        slow, fast = _time(before, texts, args.rounds), _time(after, texts, args.rounds)
+        print(f"{name:<14}{slow:>15.3f}{fast:>13.3f}{slow / fast:>9.1f}x")
+
+    print()
+    strip_ms = _time(content_classifier.strip_internal_content, texts, args.rounds)
+    total_ms = _time(output.process_output_sync, texts, args.rounds)
+    print(f"strip_internal_content  {strip_ms:8.3f} ms")
+    print(f"process_output_sync     {total_ms:8.3f} ms")
+
+    if mismatches:
+        print(f"\n{mismatches} outputs differ from the sequential chain")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""Check and time message classification over the labelled corpus.
+
+Runs the router, fast path, reaction picker, skill detection and
+``should_persist_memory`` over every message in
+tests/fixtures/message_corpus.jsonl (or --corpus) and compares each
+result with its label. The script also times ``extract_features``
+against running every pattern on its own, and reports the cost per
+message of all five classifiers together. It exits non-zero if any
+label or feature differs.
+
+Usage:
+    python scripts/bench_routing.py                    # Default corpus, 200 rounds
+    python scripts/bench_routing.py --rounds 1000      # More rounds, steadier numbers
+    python scripts/bench_routing.py --corpus c.jsonl   # Any corpus with the same fields
+"""
+
+import argparse
+import json
+import logging
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import structlog  # noqa: E402
+
+from lucy.pipeline import features  # noqa: E402
+from lucy.pipeline.fast_path import evaluate_fast_path  # noqa: E402
+from lucy.pipeline.router import classify_and_route  # noqa: E402
+from lucy.slack.reactions import classify_reaction  # noqa: E402
+from lucy.workspace.memory import should_persist_memory  # noqa: E402
+from lucy.workspace.skills import detect_relevant_skills  # noqa: E402
+
+_DEFAULT_CORPUS = (
+    Path(__file__).parent.parent / "tests" / "fixtures" / "message_corpus.jsonl"
+)
+
+
+def classify(case: dict[str, Any]) -> dict[str, Any]:
+    """Every labelled field for one corpus row."""
+    text = case["text"]
+    depth = case.get("thread_depth", 0)
+    choice = classify_and_route(text, depth, case.get("prev_had_tool_calls", False))
+    fast = evaluate_fast_path(text, depth, depth > 0)
+    reaction = classify_reaction(text)
+    return {
+        "intent": choice.intent,
+        "tier": choice.tier,
+        "fast_path": fast.reason if fast.is_fast else None,
+        "reaction": reaction.emoji,
+        "react_only": reaction.react_only,
+        "persist": should_persist_memory(text),
+        "skills": detect_relevant_skills(text),
+    }
+
+
+def _each_pattern(text: str) -> int:
+    """The feature bits, one search per pattern with no literal prefilter."""
+    text = text.strip()
+    bits = 0
+    for i, (pattern, bit) in enumerate(features._RULES):
+        if (pattern.match if features._ANCHORED[i] else pattern.search)(text):
+            bits |= bit
+    return bits
+
+
+def _time(fn: Callable[[], object], rounds: int, count: int) -> float:
+    """Mean microseconds per message."""
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - t0) * 1e6 / rounds / count
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", type=Path, default=_DEFAULT_CORPUS)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    # The fast path and skill detection log every match.
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+    cases = [json.loads(line) for line in args.corpus.read_text().splitlines() if line.strip()]
+    if not cases:
+        print(f"No messages in {args.corpus}")
+        return 1
+    texts = [case["text"] for case in cases]
+    print(f"{len(cases)} messages, {args.rounds} rounds\n")
+
+    wrong: dict[str, int] = {}
+    for case in cases:
+        for field, value in classify(case).items():
+            if case[field] != value:
+                wrong[field] = wrong.get(field, 0) + 1
+                print(f"  {field}: {case['text']!r} -> {value!r}, expected {case[field]!r}")
+    for field in ("intent", "tier", "fast_path", "reaction", "react_only", "persist", "skills"):
+        correct = len(cases) - wrong.get(field, 0)
+        print(f"{field:<12}{correct:>5}/{len(cases)}  {100 * correct / len(cases):5.1f}%")
+
+    extract = features._extract.__wrapped__
+    mismatches = sum(_each_pattern(t) != extract(t.strip()).bits for t in texts)
+
+    def _cold() -> None:
+        features._extract.cache_clear()
+        for case in cases:
+            classify(case)
+
+    each_us = _time(lambda: [_each_pattern(t) for t in texts], args.rounds, len(texts))
+    extract_us = _time(lambda: [extract(t.strip()) for t in texts], args.rounds, len(texts))
+    cold_us = _time(_cold, args.rounds, len(cases))
+    warm_us = _time(lambda: [classify(case) for case in cases], args.rounds, len(cases))
+    print()
+    print(f"each pattern on its own     {each_us:8.1f} us/msg")
+    print(f"extract_features            {extract_us:8.1f} us/msg  ({each_us / extract_us:.1f}x)")
+    print(f"all five classifiers, cold  {cold_us:8.1f} us/msg")
+    print(f"all five classifiers, warm  {warm_us:8.1f} us/msg")
+
+    if wrong or mismatches:
+        print(f"\n{sum(wrong.values())} labels and {mismatches} feature sets differ")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -71,63 +71,18 @@ logger = structlog.get_logger()
 
 
 def run_socket_mode() -> None:
-    """Run Lucy with Socket Mode (WebSocket to Slack)."""
+    """Run Lucy with Socket Mode (WebSocket to Slack).
+
+    Uses the same Bolt app and startup as ``lucy.app`` — coordination,
+    cron scheduler (if ``cron_run_in_process``), task worker and email
+    listener — so the two entry points cannot drift apart.
+    """
     import asyncio
-    from slack_bolt.async_app import AsyncApp
-    from slack_bolt.adapter.socket_mode.async_handler import AsyncSocketModeHandler
-    
-    from lucy.slack.middleware import (
-        resolve_workspace_middleware,
-        resolve_user_middleware,
-        resolve_channel_middleware,
-    )
-    from lucy.slack.handlers import register_handlers
-    
+
+    from lucy.app import run_socket_mode as _run_socket_mode
+
     logger.info("starting_lucy", mode="socket_mode")
-    
-    async def _run():
-        import ssl
-        import certifi
-        from slack_sdk.web.async_client import AsyncWebClient
-
-        # Build an SSL context that uses certifi's CA bundle so aiohttp
-        # can verify Slack's TLS certificate on macOS Homebrew Python.
-        ssl_ctx = ssl.create_default_context(cafile=certifi.where())
-
-        # Create Bolt app with a custom web client that uses our SSL context.
-        web_client = AsyncWebClient(
-            token=settings.slack_bot_token,
-            ssl=ssl_ctx,
-        )
-        bolt = AsyncApp(
-            client=web_client,
-            signing_secret=settings.slack_signing_secret,
-            process_before_response=False,
-        )
-        
-        # Register async middleware
-        bolt.middleware(resolve_workspace_middleware)
-        bolt.middleware(resolve_user_middleware)
-        bolt.middleware(resolve_channel_middleware)
-        
-        # Register handlers
-        register_handlers(bolt)
-        
-        logger.info("bolt_app_created", middlewares=3)
-
-        # Pre-warm LLM message pools (non-blocking background task)
-        from lucy.pipeline.humanize import initialize_pools
-        asyncio.create_task(initialize_pools())
-
-        # Start cron scheduler — discovers and schedules all workspace crons
-        from lucy.crons.scheduler import get_scheduler
-        scheduler = get_scheduler(slack_client=web_client)
-        await scheduler.start()
-
-        handler = AsyncSocketModeHandler(bolt, settings.slack_app_token)
-        await handler.start_async()
-    
-    asyncio.run(_run())
+    asyncio.run(_run_socket_mode())
 
 
 def run_http_mode(port: int = 3000) -> None:
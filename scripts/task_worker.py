@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Run background task queue workers outside the Slack process.
+
+Leases tasks from the durable queue (``background_tasks``) and runs them,
+so long research tasks do not compete with Slack event latency. Start
+the Slack process with ``LUCY_TASK_QUEUE_ENABLED=true`` (and
+``LUCY_TASK_WORKER_IN_PROCESS=false`` to keep all task work here), then
+run any number of these, on any number of hosts:
+
+Usage:
+    python scripts/task_worker.py                    # All registered task types
+    python scripts/task_worker.py --concurrency 4    # Tasks run at once
+    python scripts/task_worker.py --types agent_run  # Only these task types
+"""
+
+import argparse
+import asyncio
+import signal
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import structlog  # noqa: E402
+
+from lucy.config import settings  # noqa: E402
+
+logger = structlog.get_logger()
+
+
+async def run_worker(concurrency: int | None, task_types: list[str] | None) -> None:
+    """Lease and run tasks until SIGTERM/SIGINT, then drain."""
+    import lucy.slack.handlers  # noqa: F401  (registers the agent_run handler)
+    from lucy.core.task_queue import build_task_worker
+    from lucy.db.session import close_db
+    from lucy.infra.budgets import get_budget_engine
+    from lucy.infra.costs import get_cost_recorder
+    from lucy.slack.transport import get_slack_transport
+
+    ssl_ctx = None
+    try:
+        import ssl
+
+        import certifi
+
+        ssl_ctx = ssl.create_default_context(cafile=certifi.where())
+    except ImportError:
+        pass
+
+    transport = get_slack_transport()
+    slack_client = transport.client(settings.slack_bot_token, ssl=ssl_ctx)
+    worker = build_task_worker(slack_client, concurrency=concurrency, task_types=task_types)
+    worker.start()
+
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stopping.set)
+
+    try:
+        await stopping.wait()
+    finally:
+        logger.info("task_worker_stopping", **worker.get_stats())
+        await worker.stop()
+        await get_budget_engine().stop()
+        await get_cost_recorder().stop()
+        await transport.close()
+        await close_db()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run Lucy background task workers")
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="Tasks to run at once (default: task_worker_concurrency)")
+    parser.add_argument("--types", nargs="+", default=None,
+                        help="Task types to lease (default: every registered type)")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(run_worker(args.concurrency, args.types))
+        return 0
+    except Exception as e:
+        logger.error("fatal_error", error=str(e))
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -22,7 +22,9 @@ except ImportError:
 
 import asyncio
 import signal
+from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
+from typing import Any
 
 import structlog
 from fastapi import FastAPI, Request
@@ -34,10 +36,12 @@ from lucy.config import settings
 from lucy.db.session import close_db
 from lucy.slack.handlers import register_handlers
 from lucy.slack.middleware import (
+    pooled_client_middleware,
     resolve_channel_middleware,
     resolve_user_middleware,
     resolve_workspace_middleware,
 )
+from lucy.slack.transport import PooledSlackClient, get_slack_transport
 
 logger = structlog.get_logger()
 
@@ -84,6 +88,7 @@ else:
     )
     logger.info("bolt_init_single_tenant")
 
+bolt.middleware(pooled_client_middleware)
 bolt.middleware(resolve_workspace_middleware)
 bolt.middleware(resolve_user_middleware)
 bolt.middleware(resolve_channel_middleware)
@@ -116,42 +121,29 @@ async def lifespan(app: FastAPI):
     """Application lifespan manager with graceful shutdown."""
     logger.info("app_starting", env=settings.env)
 
-    from lucy.pipeline.humanize import initialize_pools
-
-    asyncio.create_task(initialize_pools())
-
-    from lucy.crons.scheduler import get_scheduler
-
-    scheduler = get_scheduler(slack_client=bolt.client)
-    await scheduler.start()
-
-    email_listener = await _start_email_listener(bolt.client)
+    async with background_services():
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, lambda: shutting_down.set())
 
-    loop = asyncio.get_running_loop()
-    for sig in (signal.SIGTERM, signal.SIGINT):
-        loop.add_signal_handler(sig, lambda: shutting_down.set())
+        yield
 
-    yield
+        logger.info("app_shutting_down", active_agents=len(_active_agents))
 
-    logger.info("app_shutting_down", active_agents=len(_active_agents))
-
-    if _active_agents:
-        logger.info("draining_agents", count=len(_active_agents))
-        done, pending = await asyncio.wait(
-            _active_agents, timeout=_DRAIN_TIMEOUT,
-        )
-        if pending:
-            logger.warning(
-                "drain_timeout_forcing_cancel",
-                cancelled=len(pending),
-                completed=len(done),
+        if _active_agents:
+            logger.info("draining_agents", count=len(_active_agents))
+            done, pending = await asyncio.wait(
+                _active_agents, timeout=_DRAIN_TIMEOUT,
             )
-            for task in pending:
-                task.cancel()
+            if pending:
+                logger.warning(
+                    "drain_timeout_forcing_cancel",
+                    cancelled=len(pending),
+                    completed=len(done),
+                )
+                for task in pending:
+                    task.cancel()
 
-    if email_listener:
-        await email_listener.stop()
-    await scheduler.stop()
     await close_db()
     logger.info("app_shutdown_complete")
 
@@ -186,6 +178,14 @@ async def health_db() -> dict[str, str]:
         return {"status": "error", "database": "disconnected"}
 
 
+@api.get("/health/admission")
+async def health_admission() -> dict[str, Any]:
+    """Agent slot usage and per-priority queue depth."""
+    from lucy.infra.admission import get_admission_controller
+
+    return get_admission_controller().get_stats()
+
+
 @api.post("/slack/events")
 async def slack_events(req: Request) -> object:
     """Slack events endpoint for HTTP mode (Events API + interactivity)."""
@@ -202,11 +202,105 @@ if settings.spaces_enabled:
     api.include_router(_spaces_router)
 
 
+# ═══════════════════════════════════════════════════════════════════════════
+# BACKGROUND SERVICES
+# ═══════════════════════════════════════════════════════════════════════════
+
+
+@asynccontextmanager
+async def background_services() -> AsyncIterator[None]:
+    """Run everything besides the Slack event handlers for the block's duration.
+
+    Shared by the HTTP lifespan and Socket Mode so both start the same
+    coordination backend, cron scheduler, task worker and email listener,
+    and shut them down in the same order, along with the local Python
+    worker pool and sessions. A failing stop step is logged
+    and the rest still run.
+    """
+    from lucy.crons.scheduler import get_scheduler
+    from lucy.infra.coordination import get_coordination
+    from lucy.pipeline.humanize import initialize_pools
+    from lucy.tools.code_validator import warm_module_table
+
+    asyncio.create_task(initialize_pools())
+    asyncio.create_task(asyncio.to_thread(warm_module_table))
+    await get_coordination().start()
+
+    scheduler = get_scheduler(slack_client=_pooled_client(background=True))
+    if settings.cron_run_in_process:
+        await scheduler.start()
+    else:
+        logger.info("cron_scheduler_external")
+
+    task_worker = _start_task_worker(_pooled_client())
+    email_listener = await _start_email_listener(_pooled_client())
+    try:
+        yield
+    finally:
+        from lucy.infra.budgets import get_budget_engine
+        from lucy.infra.costs import get_cost_recorder
+        from lucy.workspace.python_pool import get_python_pool
+        from lucy.workspace.python_sessions import get_python_sessions
+
+        steps: list[tuple[str, Any]] = []
+        if email_listener:
+            steps.append(("email_listener", email_listener.stop))
+        if task_worker:
+            steps.append(("task_worker", task_worker.stop))
+        steps += [
+            ("scheduler", scheduler.stop),
+        ]
+        if pool := get_python_pool():
+            steps.append(("python_pool", pool.close))
+        if sessions := get_python_sessions():
+            steps.append(("python_sessions", sessions.close))
+        steps += [
+            ("budget_engine", get_budget_engine().stop),
+            ("cost_recorder", get_cost_recorder().stop),
+            ("coordination", get_coordination().stop),
+            ("slack_transport", get_slack_transport().close),
+        ]
+        for name, stop in steps:
+            try:
+                await stop()
+            except Exception as e:
+                logger.warning("service_stop_failed", service=name, error=str(e))
+
+
+async def run_socket_mode() -> None:
+    """Serve Slack over Socket Mode until the connection closes."""
+    try:
+        async with background_services():
+            sm_handler = AsyncSocketModeHandler(bolt, settings.slack_app_token)
+            await sm_handler.start_async()
+    finally:
+        await close_db()
+
+
 # ═══════════════════════════════════════════════════════════════════════════
 # EMAIL LISTENER STARTUP
 # ═══════════════════════════════════════════════════════════════════════════
 
 
+def _pooled_client(*, background: bool = False) -> PooledSlackClient:
+    """Bolt's client token and TLS settings, on the shared Slack transport."""
+    return get_slack_transport().client(
+        bolt.client.token, background=background, ssl=bolt.client.ssl,
+    )
+
+
+def _start_task_worker(slack_client: object) -> object | None:
+    """Run a task queue worker in this process if the queue is enabled."""
+    if not (settings.task_queue_enabled and settings.task_worker_in_process):
+        return None
+
+    from lucy.core.task_queue import build_task_worker
+
+    worker = build_task_worker(slack_client)
+    worker.start()
+    return worker
+
+
 async def _start_email_listener(slack_client: object) -> object | None:
     """Start the AgentMail WebSocket listener if configured."""
     if not settings.agentmail_enabled or not settings.agentmail_api_key:
@@ -322,39 +416,15 @@ def main() -> None:
         signal.signal(signal.SIGTERM, _cleanup)
         signal.signal(signal.SIGINT, _cleanup)
 
-    _check_singleton()
-    logger.info("starting_lucy", mode="socket_mode", pid=_os.getpid())
+    from lucy.infra.coordination import get_coordination
 
-    async def _run() -> None:
-        from lucy.crons.scheduler import get_scheduler
-
-        scheduler = get_scheduler(slack_client=bolt.client)
-        await scheduler.start()
-
-        email_listener = await _start_email_listener(bolt.client)
-
-        sm_handler = AsyncSocketModeHandler(bolt, settings.slack_app_token)
-        try:
-            await sm_handler.start_async()
-        finally:
-            # Mirror the HTTP-mode lifespan shutdown: clean up all resources
-            # even in Socket Mode so logs are flushed and connections released.
-            if email_listener:
-                try:
-                    await email_listener.stop()
-                except Exception:
-                    pass
-            try:
-                scheduler.stop()
-            except Exception:
-                pass
-            try:
-                from lucy.db import close_db
-                await close_db()
-            except Exception:
-                pass
+    # Replicas sharing a coordination backend are expected to run side
+    # by side; only a process-local deployment must be the only one.
+    if not get_coordination().shared:
+        _check_singleton()
+    logger.info("starting_lucy", mode="socket_mode", pid=_os.getpid())
 
-    asyncio.run(_run())
+    asyncio.run(run_socket_mode())
 
 
 if __name__ == "__main__":
@@ -134,6 +134,21 @@ class Settings(BaseSettings):
     approved_action_timeout: int = 300
     max_concurrent_agents: int = 10
     event_dedup_ttl: float = 30.0
+    thread_lock_idle_ttl_s: float = 300.0
+    thread_lock_shards: int = 16
+    # "memory": dedup, thread locks, HITL actions, cooldowns and cache
+    # invalidation are per process. "postgres": shared through the
+    # coordination_leases table and LISTEN/NOTIFY, so several replicas can
+    # serve one Slack app (see lucy.infra.coordination).
+    coordination_backend: str = "memory"
+
+    # ── Agent admission ───────────────────────────────────────
+    # Of max_concurrent_agents, this many slots only go to interactive
+    # runs (chat, tool use, connection resumes), never to heavy, background
+    # or cron work. A cron that waits admission_cron_shed_s for a slot is
+    # skipped until its next fire (0 = wait indefinitely).
+    admission_reserved_slots: int = 2
+    admission_cron_shed_s: float = 1800.0
 
     # ── Sub-agent limits ──────────────────────────────────────
     subagent_max_turns: int = 20
@@ -145,6 +160,137 @@ class Settings(BaseSettings):
     supervisor_check_interval_turns: int = 3
     supervisor_check_interval_s: float = 60.0
 
+    # ── Prompt caching ────────────────────────────────────────
+    # How long providers keep a prefix warm; a prefix hash change inside
+    # this window is flagged as an unexpected cache break.
+    prompt_cache_ttl_s: float = 300.0
+
+    # ── Cost accounting ───────────────────────────────────────
+    # Events beyond cost_queue_max are dropped (and counted), never awaited.
+    cost_recording_enabled: bool = True
+    cost_queue_max: int = 10_000
+    cost_flush_rows: int = 200
+    cost_flush_interval_ms: int = 500
+
+    # ── LLM spend budgets (per UTC day, 0 = unlimited) ───────
+    # Past budget_soft_ratio premium tiers drop to default; past the
+    # limit everything runs on the fast tier. Requests are never refused.
+    budget_workspace_daily_usd: float = 0.0
+    budget_workspace_daily_tokens: int = 0
+    budget_user_daily_usd: float = 0.0
+    budget_user_daily_tokens: int = 0
+    budget_soft_ratio: float = 0.8
+    budget_reconcile_interval_s: float = 60.0
+
+    # ── Heartbeat monitors ────────────────────────────────────
+    # Due monitors are evaluated concurrently; each evaluation is capped at
+    # heartbeat_eval_timeout_s and counts as triggered when it overruns.
+    heartbeat_max_concurrency: int = 50
+    heartbeat_batch_size: int = 2000
+    heartbeat_eval_timeout_s: float = 45.0
+    heartbeat_http_max_connections: int = 100
+
+    # ── Cron dispatch ─────────────────────────────────────────
+    # Each in-flight interactive request takes a cron slot, down to
+    # cron_min_workers. Crons that fire in the same minute are spread over
+    # cron_start_spread_s. With cron_run_in_process=false the Slack front
+    # end leaves crons to `python -m lucy.crons.worker` and hands manual
+    # triggers to it through the task queue.
+    cron_workers: int = 4
+    cron_workers_per_workspace: int = 1
+    cron_min_workers: int = 1
+    cron_start_spread_s: float = 30.0
+    cron_run_in_process: bool = True
+    cron_worker_rescan_s: float = 60.0
+    # Cron instruction context: files are revalidated by stat on every run;
+    # these bound how stale the non-file fragments may get. At most
+    # cron_context_max_workspaces workspaces are cached (least recent out).
+    cron_context_integrations_ttl_s: float = 300.0
+    cron_context_channel_summary_ttl_s: float = 60.0
+    cron_context_max_workspaces: int = 256
+    # Indexed mode: crons are mirrored into the schedules table and fired by
+    # one sweep job instead of one APScheduler job each. Workspaces are
+    # split across cron_shard_count scheduler processes by hash.
+    cron_index_enabled: bool = False
+    cron_index_sweep_s: float = 15.0
+    cron_shard_count: int = 1
+    cron_shard_index: int = 0
+    cron_discovery_concurrency: int = 32
+
+    # ── Background task queue ─────────────────────────────────
+    # With task_queue_enabled, long background tasks are persisted to
+    # background_tasks and run by leasing workers. The Slack process runs
+    # one unless task_worker_in_process is false, in which case
+    # `python scripts/task_worker.py` does.
+    task_queue_enabled: bool = False
+    task_worker_in_process: bool = True
+    task_worker_concurrency: int = 2
+    task_lease_s: float = 120.0
+    task_heartbeat_s: float = 30.0
+    task_poll_s: float = 2.0
+    task_max_attempts: int = 3
+
+    # ── Local Python workers ──────────────────────────────────
+    # Warm interpreters for local code execution. Each job runs in a fresh
+    # fork of a worker that already imported python_pool_preload; workers
+    # are replaced after python_pool_max_jobs jobs or python_pool_max_age_s.
+    python_pool_enabled: bool = True
+    python_pool_size: int = 2
+    python_pool_max_jobs: int = 200
+    python_pool_max_age_s: float = 900.0
+    python_pool_preload: str = "json,csv,datetime,re,math,numpy,pandas,openpyxl,httpx,requests"
+
+    # ── Python sessions ───────────────────────────────────────
+    # Opt-in stateful kernels per (workspace, thread) for lucy_execute_python
+    # calls with session=true. See workspace/python_sessions.py.
+    python_sessions_enabled: bool = False
+    python_session_max: int = 8
+    python_session_idle_s: float = 900.0
+    python_session_memory_mb: int = 2048
+
+    # ── Execution routing ─────────────────────────────────────
+    # Per-backend breakers for code execution (gateway / local / composio).
+    # exec_race_readonly runs side-effect-free Python on gateway and local
+    # at once and keeps whichever answers first.
+    exec_breaker_failures: int = 3
+    exec_breaker_cooldown_s: float = 30.0
+    exec_race_readonly: bool = False
+
+    # ── Execution output ──────────────────────────────────────
+    # Local runs stream their output (workspace/output_stream.py). A run
+    # whose stderr shows the same fatal error this many times, with no
+    # stdout in between, is killed instead of running out its timeout.
+    # 0 (default) disables early stops: a handled, logged exception can't
+    # be told apart from a fatal one.
+    exec_early_stop_repeats: int = 0
+
+    # ── Progressive replies ───────────────────────────────────
+    # Stream the final answer into Slack as paragraphs complete
+    # (rich_output.ProgressiveReply). Nothing is posted until this many
+    # processed characters exist, so short replies and pre-tool narration
+    # arrive as one message; updates are at least the interval apart.
+    slack_stream_replies: bool = True
+    slack_stream_min_chars: int = 400
+    slack_stream_update_interval_s: float = 1.5
+
+    # ── Slack transport ───────────────────────────────────────
+    # All Web API calls go through slack/transport.py: one HTTP session
+    # per team, token buckets per method tier, Retry-After pauses and
+    # coalesced duplicate reads. Cron/background callers may not take the
+    # last ``slack_foreground_reserve`` share of a bucket.
+    slack_pool_connections: int = 20
+    slack_max_retries: int = 3
+    slack_foreground_reserve: float = 0.3
+    slack_queue_timeout_s: float = 10.0
+    slack_background_queue_timeout_s: float = 60.0
+    slack_reaction_memo_s: float = 60.0
+
+    # ── Thread history cache ──────────────────────────────────
+    # conversations.replies results shared by the handler, router and
+    # history builder (slack/thread_cache.py), kept current from events.
+    slack_thread_cache_ttl_s: float = 120.0
+    slack_thread_cache_max_threads: int = 500
+
     # ── Connection watcher ────────────────────────────────────
     connection_poll_interval_s: int = 5
     connection_poll_max_duration_s: int = 600
@@ -35,11 +35,14 @@ import structlog
 from lucy.config import settings
 from lucy.core.openclaw import (
     ChatConfig,
+    ContentSink,
     OpenClawClient,
     OpenClawError,
     get_openclaw_client,
 )
 from lucy.core.escalation import escalate_response as _escalate_response_fn
+from lucy.core.payload import PayloadEncoder
+from lucy.core.prompt_cache import bind_usage_owner, get_prompt_cache_tracker, prefix_hash
 from lucy.core.quality import (
     assess_response_quality as _assess_response_quality,
     detect_stuck_state as _detect_stuck_state,
@@ -72,32 +75,6 @@ _AUTH_URL_RE = re.compile(
     r"https?://(?:connect|auth|app)\.composio\.dev/[^\s\"',}\]]+",
 )
 
-_DELEGATION_DESCRIPTIONS: dict[str, str] = {
-    "research": (
-        "Delegate research, analysis, or information gathering to a "
-        "specialist. Use for web research, competitive analysis, market "
-        "research, or deep dives that require multiple searches. Returns "
-        "structured findings."
-    ),
-    "code": (
-        "Delegate code writing, debugging, or modification to a code "
-        "specialist. Use for writing scripts, fixing bugs, creating "
-        "applications, or any programming task. Returns working code."
-    ),
-    "integrations": (
-        "Delegate service connection tasks to an integrations specialist. "
-        "Use when a user needs to connect a new service, troubleshoot "
-        "connections, or build custom integrations. Returns connection "
-        "status."
-    ),
-    "document": (
-        "Delegate document creation to a specialist for professional, "
-        "client-facing content. Use for PDFs, reports, spreadsheets, "
-        "presentations, or any formatted document. Returns the completed "
-        "document."
-    ),
-}
-
 _NARRATION_RE = re.compile(
     r"(?:I'll (?:start|begin|proceed|go ahead|check|look|search|get|fetch|compile|find|now)"
     r"|I will (?:start|begin|proceed|check|look|search|get|fetch|compile|find|now)"
@@ -168,6 +145,9 @@ class AgentContext:
     # This prevents a single Approve click from silently authorizing cascading
     # follow-up actions the user never saw.
     approved_tool_name: str = ""
+    # Receives streamed answer text for progressive display in Slack
+    # (rich_output.ProgressiveReply). Only main-loop calls feed it.
+    reply_stream: ContentSink | None = None
 
 
 def _check_budget(ctx: AgentContext) -> float:
@@ -288,20 +268,20 @@ class LucyAgent:
 
         trace = Trace.start()
         trace.user_message = message
+        bind_usage_owner(ctx.workspace_id, ctx.user_slack_id)
 
         # 1. Classify intent and select model
-        from lucy.pipeline.router import classify_and_route
+        from lucy.pipeline.router import apply_budget, budget_model, classify_and_route
 
         thread_depth = 0
         prev_had_tool_calls = False
         if ctx.thread_ts and ctx.channel_id and slack_client:
+            from lucy.slack.thread_cache import get_thread_cache
+
             try:
-                result = await slack_client.conversations_replies(
-                    channel=ctx.channel_id,
-                    ts=ctx.thread_ts,
-                    limit=50,
+                thread_msgs = await get_thread_cache().messages(
+                    slack_client, ctx.channel_id, ctx.thread_ts, limit=50,
                 )
-                thread_msgs = result.get("messages", [])
                 thread_depth = len(thread_msgs)
                 for msg in reversed(thread_msgs):
                     if msg.get("bot_id") and msg.get("text", ""):
@@ -327,11 +307,13 @@ class LucyAgent:
 
         async with trace.span("classify_route"):
             route = classify_and_route(message, thread_depth, prev_had_tool_calls)
+            route = apply_budget(route, ctx.workspace_id, ctx.user_slack_id)
             model = model_override or route.model
             # Resolve tier aliases ("frontier", "fast", etc.) to actual model IDs.
             # error_strategy.py returns tier names; OpenRouter requires full model IDs.
             from lucy.pipeline.router import MODEL_TIERS
             model = MODEL_TIERS.get(model, model)
+            model = budget_model(model, ctx.workspace_id, ctx.user_slack_id)
             trace.model_used = model
             trace.intent = route.intent
 
@@ -434,7 +416,7 @@ class LucyAgent:
                 logger.debug("eager_extract_failed", error=str(_eager_exc))
 
         # 3. Fetch connected services + meta-tools in parallel
-        from lucy.pipeline.prompt import build_lightweight_prompt, build_system_prompt
+        from lucy.pipeline.prompt import build_lightweight_prompt, build_system_prompt_parts
 
         connected_services: list[str] = []
         tools: list[dict[str, Any]] = []
@@ -446,451 +428,22 @@ class LucyAgent:
                 tools_coro,
                 connections_coro,
             )
-            tools = list(cached_tools)  # copy — never mutate the cache
-
-            # Inject internal tools (Slack history search + file generation)
-            from lucy.workspace.history_search import get_history_tool_definitions
-
-            tools.extend(get_history_tool_definitions())
-
-            from lucy.tools.file_generator import get_file_tool_definitions
-
-            tools.extend(get_file_tool_definitions())
-
-            from lucy.tools.email_tools import get_email_tool_definitions
-
-            if settings.agentmail_enabled and settings.agentmail_api_key:
-                tools.extend(get_email_tool_definitions())
-
-            from lucy.tools.spaces import get_spaces_tool_definitions
-
-            if settings.spaces_enabled:
-                tools.extend(get_spaces_tool_definitions())
-
-            from lucy.tools.web_search import get_web_search_tool_definitions
-
-            tools.extend(get_web_search_tool_definitions())
-
-            from lucy.tools.code_executor import get_code_tool_definitions
+            # Static schemas come from the process-wide registry: built once,
+            # already filtered to this intent, and placed first so the
+            # serialized tool prefix is identical across requests.
+            from lucy.tools.registry import get_tool_registry
 
-            tools.extend(get_code_tool_definitions())
-
-            from lucy.tools.services import get_services_tool_definitions
-
-            if settings.openclaw_base_url and settings.openclaw_api_key:
-                tools.extend(get_services_tool_definitions())
-
-            # Gateway execution tools (direct VPS commands — preferred over Composio bash)
-            from lucy.tools.gateway import get_gateway_tool_definitions
+            tool_registry = get_tool_registry()
+            tools = list(tool_registry.tool_set(route.intent).tools)  # never mutate the set
 
+            # Remove COMPOSIO_REMOTE_BASH_TOOL so the LLM cannot choose it when
+            # the gateway is available. lucy_exec_command is the correct path.
             if settings.openclaw_base_url and settings.openclaw_api_key:
-                tools.extend(get_gateway_tool_definitions())
-                # Remove COMPOSIO_REMOTE_BASH_TOOL so the LLM cannot choose it when
-                # the gateway is available. lucy_exec_command is the correct path.
-                tools = [
-                    t for t in tools
+                cached_tools = [
+                    t for t in cached_tools
                     if t.get("function", {}).get("name") != "COMPOSIO_REMOTE_BASH_TOOL"
                 ]
-
-            # Proactive Slack tools (react, post, DM) -- available always so cron
-            # agents can take visible actions without going through Composio.
-            from lucy.tools.slack_proactive import get_slack_proactive_tool_definitions
-
-            tools.extend(get_slack_proactive_tool_definitions())
-
-            tools.append(
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "lucy_list_crons",
-                        "description": (
-                            "List all scheduled tasks (cron jobs) for this "
-                            "workspace. Returns the name, schedule, description, "
-                            "and next run time for each active recurring task."
-                        ),
-                        "parameters": {
-                            "type": "object",
-                            "properties": {},
-                        },
-                    },
-                }
-            )
-
-            tools.append(
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "lucy_create_cron",
-                        "description": (
-                            "Create a new scheduled recurring task (cron job). "
-                            "The task will run on a schedule and its result is "
-                            "automatically delivered to Slack. By default it "
-                            "posts to the current channel. Set delivery_mode "
-                            "to 'dm' for personal reminders (DMs the user who "
-                            "asked for it). Use standard 5-field cron expressions "
-                            "(minute hour day month weekday). "
-                            "Common examples: '0 9 * * 1-5' (weekdays 9am), "
-                            "'*/30 * * * *' (every 30 min), '0 */2 * * *' (every 2h). "
-                            "Write the description as what the task should PRODUCE "
-                            "or CHECK, not 'send a message'. Delivery is automatic."
-                        ),
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "name": {
-                                    "type": "string",
-                                    "description": (
-                                        "Short slug name for the cron "
-                                        "(e.g. 'stock-checker', 'daily-report')"
-                                    ),
-                                },
-                                "cron_expression": {
-                                    "type": "string",
-                                    "description": (
-                                        "Standard 5-field cron expression "
-                                        "(minute hour day-of-month month day-of-week)"
-                                    ),
-                                },
-                                "title": {
-                                    "type": "string",
-                                    "description": "Human-readable title for the task",
-                                },
-                                "description": {
-                                    "type": "string",
-                                    "description": (
-                                        "Detailed instructions for what the task "
-                                        "should PRODUCE each time it runs. Write "
-                                        "this as the task itself, not as 'send a "
-                                        "message'. Be specific: include data "
-                                        "sources, output format, and conditions "
-                                        "to skip (return SKIP if nothing to report)."
-                                    ),
-                                },
-                                "timezone": {
-                                    "type": "string",
-                                    "description": (
-                                        "IANA timezone for schedule evaluation "
-                                        "(e.g. 'Asia/Kolkata', 'America/New_York'). "
-                                        "If omitted, uses server timezone."
-                                    ),
-                                },
-                                "delivery_mode": {
-                                    "type": "string",
-                                    "enum": ["channel", "dm"],
-                                    "description": (
-                                        "Where to deliver results. 'channel' posts "
-                                        "to the channel where it was created "
-                                        "(default). 'dm' sends a direct message "
-                                        "to the user who requested it. Use 'dm' "
-                                        "for personal reminders, notifications, "
-                                        "or anything meant for one person."
-                                    ),
-                                },
-                                "type": {
-                                    "type": "string",
-                                    "enum": ["agent", "script"],
-                                    "description": (
-                                        "Execution model. 'agent' (default) spins up a full "
-                                        "LLM session with tools — use for tasks that require "
-                                        "reasoning, Composio calls, or dynamic decisions. "
-                                        "'script' runs a Python script directly, no LLM cost — "
-                                        "use for lightweight checks like polling a URL, querying "
-                                        "a DB, or running a deterministic condition. When type "
-                                        "is 'script', provide script_code with the Python source."
-                                    ),
-                                },
-                                "script_code": {
-                                    "type": "string",
-                                    "description": (
-                                        "Python source code to run (only used when type='script'). "
-                                        "Lucy writes this code to a file and runs it on schedule. "
-                                        "The script has WORKSPACE_ID and WORKSPACE_ROOT env vars. "
-                                        "Print to stdout to deliver output to Slack. Print nothing "
-                                        "for a normal (no-alert) run. Can import standard library "
-                                        "and common packages like pymongo, requests, httpx."
-                                    ),
-                                },
-                                "condition_script_path": {
-                                    "type": "string",
-                                    "description": (
-                                        "Optional path to a python script to run before "
-                                        "the main cron job. If the script exits with code 0, "
-                                        "the cron job proceeds. If non-zero, it skips execution "
-                                        "entirely. Perfect for saving LLM costs on high-frequency "
-                                        "checks."
-                                    ),
-                                },
-                                "max_runs": {
-                                    "type": "integer",
-                                    "description": (
-                                        "Optional integer. If set > 0, the cron job will automatically "  # noqa: E501
-                                        "delete itself after successfully running this many times."
-                                    ),
-                                },
-                                "depends_on": {
-                                    "type": "string",
-                                    "description": (
-                                        "Optional string. The name or slug of another cron job that "  # noqa: E501
-                                        "MUST have successfully run today before this one can execute. "  # noqa: E501
-                                        "E.g., 'data-sync' or 'daily-revenue'."
-                                    ),
-                                },
-                            },
-                            "required": ["name", "cron_expression", "title", "description"],
-                        },
-                    },
-                }
-            )
-
-            tools.append(
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "lucy_delete_cron",
-                        "description": (
-                            "Delete an existing scheduled task by name. "
-                            "Removes it from the scheduler immediately."
-                        ),
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "cron_name": {
-                                    "type": "string",
-                                    "description": "Name/slug of the cron to delete",
-                                },
-                            },
-                            "required": ["cron_name"],
-                        },
-                    },
-                }
-            )
-
-            tools.append(
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "lucy_modify_cron",
-                        "description": (
-                            "Update an existing scheduled task's schedule, title, "
-                            "description, timezone, or execution type. Only provide "
-                            "the fields you want to change.\n\n"
-                            "To convert an agent-type cron into a lightweight script "
-                            "(no LLM cost per run), set new_type='script' and provide "
-                            "script_code — a Python script that runs the check directly. "
-                            "The script must exit 0 on success. Output is delivered to "
-                            "Slack if the script prints anything. Return nothing for "
-                            "normal (no-alert) runs."
-                        ),
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "cron_name": {
-                                    "type": "string",
-                                    "description": "Name/slug of the cron to modify",
-                                },
-                                "new_cron_expression": {
-                                    "type": "string",
-                                    "description": "New cron expression (if changing schedule)",
-                                },
-                                "new_title": {
-                                    "type": "string",
-                                    "description": "New title (if changing)",
-                                },
-                                "new_description": {
-                                    "type": "string",
-                                    "description": "New task instructions (if changing, agent type only)",
-                                },
-                                "new_timezone": {
-                                    "type": "string",
-                                    "description": "New IANA timezone (if changing)",
-                                },
-                                "new_type": {
-                                    "type": "string",
-                                    "enum": ["agent", "script"],
-                                    "description": (
-                                        "Change execution model. 'agent' = LLM-driven (expensive), "
-                                        "'script' = Python script (free, no LLM cost). "
-                                        "When switching to 'script', you MUST also provide script_code."
-                                    ),
-                                },
-                                "script_code": {
-                                    "type": "string",
-                                    "description": (
-                                        "Python source code for the script (required when new_type='script', "
-                                        "or to update an existing script). The script runs in the workspace "
-                                        "directory with WORKSPACE_ID and WORKSPACE_ROOT env vars available. "
-                                        "Print output to stdout to deliver it to Slack. Print nothing (or "
-                                        "return SKIP) for a normal no-alert run. The script can use any "
-                                        "standard library or pre-installed packages (pymongo, requests, etc)."
-                                    ),
-                                },
-                            },
-                            "required": ["cron_name"],
-                        },
-                    },
-                }
-            )
-
-            tools.append(
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "lucy_trigger_cron",
-                        "description": (
-                            "Immediately trigger a scheduled task to run right "
-                            "now, regardless of its schedule. Useful for testing "
-                            "or when a user asks 'run my X task now'."
-                        ),
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "cron_name": {
-                                    "type": "string",
-                                    "description": "Name/slug of the cron to trigger",
-                                },
-                            },
-                            "required": ["cron_name"],
-                        },
-                    },
-                }
-            )
-
-            # Heartbeat monitor tools
-            tools.append(
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "lucy_create_heartbeat",
-                        "description": (
-                            "Create a heartbeat monitor that checks a condition "
-                            "at a set interval and alerts immediately when triggered. "
-                            "Use this instead of cron jobs when the user needs "
-                            "INSTANT alerting (e.g. 'tell me as soon as this page "
-                            "goes live', 'alert me if the API goes down'). "
-                            "Heartbeats check every 30s-5min and fire alerts "
-                            "the moment a condition is met. Condition types:\n"
-                            "- api_health: checks if a URL returns a healthy "
-                            "HTTP status (config: {url, expected_status})\n"
-                            "- page_content: checks if a page contains or lacks "
-                            "specific text (config: {url, contains, not_contains, regex})\n"
-                            "- metric_threshold: checks a JSON API value against "
-                            "a threshold (config: {url, json_path, operator, threshold})\n"
-                            "- custom: runs a Python script that returns "
-                            "{triggered: true/false} (config: {script_path})"
-                        ),
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "name": {
-                                    "type": "string",
-                                    "description": (
-                                        "Short descriptive name for this monitor "
-                                        "(e.g. 'api-health-check', 'product-availability')"
-                                    ),
-                                },
-                                "condition_type": {
-                                    "type": "string",
-                                    "enum": [
-                                        "api_health",
-                                        "page_content",
-                                        "metric_threshold",
-                                        "custom",
-                                    ],
-                                    "description": "Type of condition to check",
-                                },
-                                "condition_config": {
-                                    "type": "object",
-                                    "description": (
-                                        "Configuration for the condition. "
-                                        "Depends on condition_type. Examples:\n"
-                                        'api_health: {"url": "https://...", "expected_status": 200}\n'  # noqa: E501
-                                        'page_content: {"url": "https://...", "contains": "In Stock"}\n'  # noqa: E501
-                                        'metric_threshold: {"url": "https://api.../metrics", '
-                                        '"json_path": "data.error_rate", "operator": ">", '
-                                        '"threshold": 5.0}\n'
-                                        'custom: {"script_path": "scripts/check.py"}'
-                                    ),
-                                },
-                                "check_interval_seconds": {
-                                    "type": "integer",
-                                    "description": (
-                                        "How often to check (seconds). Default 300 (5 min). "
-                                        "Minimum 30. Use 60-120 for urgent monitors, "
-                                        "300-600 for standard monitors."
-                                    ),
-                                },
-                                "alert_channel_id": {
-                                    "type": "string",
-                                    "description": (
-                                        "Slack channel ID to post alerts to. "
-                                        "If omitted, uses the current channel."
-                                    ),
-                                },
-                                "alert_template": {
-                                    "type": "string",
-                                    "description": (
-                                        "Alert message template. Use {name} and "
-                                        "{detail} placeholders. Default: "
-                                        "'Condition triggered: {name}'"
-                                    ),
-                                },
-                                "alert_cooldown_seconds": {
-                                    "type": "integer",
-                                    "description": (
-                                        "Minimum seconds between alerts to prevent "
-                                        "spam. Default 3600 (1 hour). Use 300 for "
-                                        "critical monitors."
-                                    ),
-                                },
-                                "description": {
-                                    "type": "string",
-                                    "description": "Human-readable description of what this monitors",  # noqa: E501
-                                },
-                            },
-                            "required": ["name", "condition_type", "condition_config"],
-                        },
-                    },
-                }
-            )
-
-            tools.append(
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "lucy_delete_heartbeat",
-                        "description": (
-                            "Delete a heartbeat monitor by name. Stops monitoring immediately."
-                        ),
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "name": {
-                                    "type": "string",
-                                    "description": "Name of the heartbeat monitor to delete",
-                                },
-                            },
-                            "required": ["name"],
-                        },
-                    },
-                }
-            )
-
-            tools.append(
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "lucy_list_heartbeats",
-                        "description": (
-                            "List all heartbeat monitors for this workspace. "
-                            "Shows name, condition, interval, status, and statistics."
-                        ),
-                        "parameters": {
-                            "type": "object",
-                            "properties": {},
-                        },
-                    },
-                }
-            )
+            tools.extend(cached_tools)
 
             # Load per-workspace MCP connections first so their service slugs
             # are known before we add custom wrappers. MCP tools always take
@@ -940,228 +493,19 @@ class LucyAgent:
                     pass
                 tools.append(wrapper_tool)
 
-            tools.append(
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "lucy_resolve_custom_integration",
-                        "description": (
-                            "Research a service and find the best integration path. "
-                            "Call this IMMEDIATELY when COMPOSIO_MANAGE_CONNECTIONS "
-                            "cannot find a service — no user consent needed to research. "
-                            "The tool runs grounded web research to discover whether the "
-                            "service has: (1) MCP support (preferred), (2) an OpenAPI "
-                            "spec, or (3) a REST API for a custom wrapper. It then "
-                            "attempts the best path automatically and returns specific "
-                            "findings. For MCP services it returns setup instructions; "
-                            "for API services it builds and deploys a wrapper. "
-                            "NEVER ask the user 'want me to give it a shot?' before "
-                            "calling this — do the research first, then present the "
-                            "specific option found. After it succeeds and needs an API "
-                            "key, ask the user and store it with lucy_store_api_key. "
-                            "NEVER use Bright Data, web scraping, or any workaround."
-                        ),
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "services": {
-                                    "type": "array",
-                                    "items": {"type": "string"},
-                                    "description": (
-                                        "List of service names to attempt custom "
-                                        "integration for (e.g. ['Clerk', 'Polar'])"
-                                    ),
-                                },
-                            },
-                            "required": ["services"],
-                        },
-                    },
-                }
-            )
-
-            tools.append(
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "lucy_delete_custom_integration",
-                        "description": (
-                            "Delete a custom integration that was previously "
-                            "built. Removes the wrapper code, tools, and "
-                            "stored API key. ALWAYS ask the user for "
-                            "confirmation before calling this with "
-                            "confirmed=true. First call with confirmed=false "
-                            "to get a summary of what will be removed."
-                        ),
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "service_slug": {
-                                    "type": "string",
-                                    "description": (
-                                        "The slug of the integration to delete "
-                                        "(e.g. 'polarsh', 'clerk')"
-                                    ),
-                                },
-                                "confirmed": {
-                                    "type": "boolean",
-                                    "description": (
-                                        "Set to true only after the user has "
-                                        "explicitly confirmed they want to "
-                                        "delete. Set to false for a preview."
-                                    ),
-                                },
-                            },
-                            "required": ["service_slug"],
-                        },
-                    },
-                }
-            )
-
-            # MCP management tools
-            tools.append(
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "lucy_connect_mcp",
-                        "description": (
-                            "Connect to a service that exposes an MCP (Model Context Protocol) "
-                            "server over HTTP/SSE. Call this after the user provides their MCP URL. "  # noqa: E501
-                            "On success, new mcp_{service}_* tools will be available for future "
-                            "requests. Use when: (1) the user pastes an MCP URL, OR (2) "
-                            "lucy_resolve_custom_integration returns status=needs_user_mcp_url. "
-                            "Do NOT guess MCP URLs — always use a URL provided by the user or "
-                            "returned by the resolver."
-                        ),
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "service": {
-                                    "type": "string",
-                                    "description": (
-                                        "Short slug for the service, e.g. 'craft', 'notion', 'linear'. "  # noqa: E501
-                                        "Used to prefix the discovered tools as mcp_{service}_*."
-                                    ),
-                                },
-                                "mcp_url": {
-                                    "type": "string",
-                                    "description": (
-                                        "The HTTP or SSE URL of the MCP server, as provided by the user "  # noqa: E501
-                                        "or returned by the service settings page."
-                                    ),
-                                },
-                            },
-                            "required": ["service", "mcp_url"],
-                        },
-                    },
-                }
-            )
-
-            tools.append(
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "lucy_disconnect_mcp",
-                        "description": (
-                            "Remove an active MCP connection. Deletes the stored URL and cached "
-                            "tool schemas for the service. The mcp_{service}_* tools will no "
-                            "longer be available after disconnection. Always confirm with the "
-                            "user before calling this."
-                        ),
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "service": {
-                                    "type": "string",
-                                    "description": "Service slug to disconnect, e.g. 'craft'.",
-                                },
-                            },
-                            "required": ["service"],
-                        },
-                    },
-                }
-            )
-
-            tools.append(
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "lucy_list_mcp_connections",
-                        "description": (
-                            "List all active MCP connections for this workspace. "
-                            "Returns each service name, the number of available tools, "
-                            "and when the connection was established. Call this when "
-                            "the user asks what MCP integrations are connected."
-                        ),
-                        "parameters": {
-                            "type": "object",
-                            "properties": {},
-                        },
-                    },
-                }
-            )
-
-            tools.append(
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "lucy_refresh_mcp",
-                        "description": (
-                            "Re-discover tools for an existing MCP connection. Use this when "
-                            "the user says the service added new capabilities, or when tool "
-                            "calls are failing with 'unknown tool' errors from the MCP server. "
-                            "Re-connects to the MCP server and updates the cached tool schemas."
-                        ),
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "service": {
-                                    "type": "string",
-                                    "description": "Service slug to refresh, e.g. 'craft'.",
-                                },
-                            },
-                            "required": ["service"],
-                        },
-                    },
-                }
-            )
-
-        # 3b. Add delegation tools for sub-agent system
-        from lucy.core.sub_agents import REGISTRY as _SUB_REGISTRY
-
-        for agent_type, _spec in _SUB_REGISTRY.items():
-            tools.append(
-                {
-                    "type": "function",
-                    "function": {
-                        "name": f"delegate_to_{agent_type}_agent",
-                        "description": _DELEGATION_DESCRIPTIONS.get(
-                            agent_type,
-                            f"Delegate a task to the {agent_type} specialist.",
-                        ),
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "task": {
-                                    "type": "string",
-                                    "description": (
-                                        "Clear description of what to accomplish. "
-                                        "Include all relevant context."
-                                    ),
-                                },
-                            },
-                            "required": ["task"],
-                        },
-                    },
-                }
-            )
-
-        # 3c. Build tool registry for sub-agent use
+        # 3b. Build tool registry for sub-agent use. Sub-agents pick tools by
+        # name, so they see every static tool, not just this intent's subset.
         self._tool_registry: dict[str, dict[str, Any]] = {
-            t["function"]["name"]: t for t in tools if isinstance(t, dict) and "function" in t
+            t["function"]["name"]: t
+            for t in (*tool_registry.all_tools.tools, *tools)
+            if isinstance(t, dict) and "function" in t
         }
 
         # 4. Build system prompt (SOUL + skills + instructions + environment)
         _LIGHTWEIGHT_INTENTS = {"chat", "lookup", "confirmation", "followup"}
+        # Length of the cacheable static prefix; everything appended below
+        # (time, preferences, channel context) lands after it.
+        cache_prefix_chars = 0
         async with trace.span("build_prompt"):
             if route.intent in _LIGHTWEIGHT_INTENTS and not route.prompt_modules:
                 system_prompt = await build_lightweight_prompt(
@@ -1174,7 +518,7 @@ class LucyAgent:
                 # Use compact SOUL on tool_use intents when many tools are
                 # registered — those prompts are already 85KB+, saving ~6KB.
                 use_compact = route.intent == "tool_use" and len(self._tool_registry) > 15
-                system_prompt = await build_system_prompt(
+                static_prefix, dynamic_suffix = await build_system_prompt_parts(
                     ws,
                     connected_services=connected_services,
                     user_message=message,
@@ -1183,6 +527,8 @@ class LucyAgent:
                     thread_ts=ctx.thread_ts,
                     user_id=ctx.user_slack_id,
                 )
+                system_prompt = static_prefix + dynamic_suffix
+                cache_prefix_chars = len(static_prefix)
             utc_now = datetime.now(UTC)
             time_block = f"\n\n## Current Time\nUTC: {utc_now.strftime('%Y-%m-%d %H:%M UTC')}\n"
 
@@ -1473,6 +819,7 @@ class LucyAgent:
                     route=route,
                     slack_client=slack_client,
                     task_plan=task_plan,
+                    cache_prefix_chars=cache_prefix_chars,
                 ),
                 timeout=ABSOLUTE_MAX_SECONDS,
             )
@@ -1933,6 +1280,7 @@ class LucyAgent:
         route: Any,
         slack_client: Any | None = None,
         task_plan: Any | None = None,
+        cache_prefix_chars: int = 0,
     ) -> str:
         """Multi-turn LLM <-> tool execution loop.
 
@@ -1952,9 +1300,16 @@ class LucyAgent:
         from lucy.core.supervisor import (
             should_check as _sv_should_check,
         )
+        from lucy.pipeline.router import budget_model
 
         client = await self._get_client()
         all_messages = list(messages)
+        # One encoder for the whole loop: turns only re-encode new messages.
+        encoder = PayloadEncoder()
+        cache_tracker = get_prompt_cache_tracker()
+        static_prefix_hash = (
+            prefix_hash(system_prompt[:cache_prefix_chars]) if cache_prefix_chars else ""
+        )
         response_text = ""
         repeated_sigs: dict[str, int] = {}
         tool_name_counts: dict[str, int] = {}
@@ -2024,9 +1379,30 @@ class LucyAgent:
                     "Here's what I managed to complete so far."
                 )
 
+            # Spend budgets are re-checked every call: escalations and long
+            # runs can cross a limit mid-task.
+            budgeted = budget_model(current_model, ctx.workspace_id, ctx.user_slack_id)
+            if budgeted != current_model:
+                logger.info(
+                    "llm_budget_downgrade",
+                    from_model=current_model,
+                    to_model=budgeted,
+                    turn=turn,
+                    workspace_id=ctx.workspace_id,
+                )
+                current_model = budgeted
+
             # Main agent loop calls use streaming for intelligent silence
             # detection. Internal calls (planner, supervisor) stay non-streaming.
             use_streaming = bool(tools)
+            prefix_obs = (
+                cache_tracker.observe(
+                    (ctx.workspace_id, current_model, route.intent),
+                    static_prefix_hash,
+                    cache_prefix_chars,
+                )
+                if static_prefix_hash else None
+            )
             config = ChatConfig(
                 model=current_model,
                 system_prompt=system_prompt,
@@ -2034,6 +1410,11 @@ class LucyAgent:
                 max_tokens=base_max_tokens,
                 stream=use_streaming,
                 wallclock_timeout=min(remaining, settings.agent_wallclock_timeout_s),
+                encoder=encoder,
+                cache_prefix_chars=cache_prefix_chars,
+                content_sink=ctx.reply_stream if use_streaming else None,
+                intent=route.intent,
+                cache_observation=prefix_obs,
             )
 
             try:
@@ -2169,6 +1550,7 @@ class LucyAgent:
                         attempt=_400_recovery_count,
                     )
                     all_messages = await _trim_tool_results(all_messages)
+                    encoder.forget(all_messages)
                     from lucy.pipeline.router import MODEL_TIERS
 
                     frontier = MODEL_TIERS.get("frontier", current_model)
@@ -2922,6 +2304,7 @@ class LucyAgent:
             payload_size = sum(len(m.get("content", "")) for m in all_messages)
             if payload_size > MAX_PAYLOAD_CHARS:
                 all_messages = await _trim_tool_results(all_messages, max_result_chars=1000)
+                encoder.forget(all_messages)
                 logger.info(
                     "payload_trimmed",
                     turn=turn,
@@ -3213,6 +2596,7 @@ class LucyAgent:
                     if _i not in drop_set:
                         trimmed_msgs.append(_m)
                 all_messages = trimmed_msgs
+                encoder.forget(all_messages)
 
         if not response_text.strip():
             partial = self._collect_partial_results(all_messages)
@@ -3546,7 +2930,7 @@ class LucyAgent:
             )
 
             if gate_needed:
-                gated_result = create_gated_result(
+                gated_result = await create_gated_result(
                     tool_name=name,
                     parameters=params,
                     action_type=action_type,
@@ -4145,7 +3529,7 @@ class LucyAgent:
                 from lucy.crons.scheduler import get_scheduler
 
                 scheduler = get_scheduler()
-                jobs = scheduler.list_jobs()
+                jobs = await scheduler.list_workspace_jobs(workspace_id)
                 if not jobs:
                     return {"result": "No scheduled tasks are currently active."}
 
@@ -4187,6 +3571,10 @@ class LucyAgent:
                         entry["timezone"] = j["timezone"]
                     if "created_at" in j and j["created_at"]:
                         entry["created_at"] = j["created_at"]
+                    if j.get("last_run"):
+                        entry["last_run"] = j["last_run"]
+                        entry["last_status"] = j["last_status"]
+                        entry["recent_failure_rate"] = j["failure_rate"]
 
                     if name.lower().strip() in _SYSTEM_CRONS:
                         system_jobs.append(entry)
@@ -4316,7 +3704,10 @@ class LucyAgent:
                 if triggered:
                     return {
                         "success": True,
-                        "message": f"Task '{cron_name}' triggered and running now.",
+                        "message": (
+                            f"Task '{cron_name}' triggered; it starts as soon as "
+                            "a cron slot is free."
+                        ),
                     }
                 return {
                     "success": False,
@@ -4352,26 +3743,20 @@ class LucyAgent:
                     return {"heartbeats": [], "message": "No heartbeat monitors configured."}
                 return {"heartbeats": heartbeats, "count": len(heartbeats)}
 
-            if tool_name.startswith("lucy_search_slack_history") or tool_name.startswith(
-                "lucy_get_channel_history"
-            ):
-                from lucy.workspace.history_search import execute_history_tool
-
-                result_text = await execute_history_tool(ws, tool_name, parameters)
-                return {"result": result_text}
-
-            if tool_name in ["lucy_write_file", "lucy_edit_file"] or tool_name.startswith(
-                "lucy_generate_"
-            ):
-                from lucy.tools.file_generator import execute_file_tool
+            # Module-backed tools: one dict lookup instead of is_*_tool chains.
+            from lucy.tools.registry import ToolCallEnv, get_tool_registry
 
-                return await execute_file_tool(
-                    tool_name=tool_name,
-                    parameters=parameters,
-                    slack_client=self._current_slack_client,
-                    channel_id=self._current_channel_id,
-                    thread_ts=self._current_thread_ts,
-                    workspace_id=ctx.workspace_id,
+            handler = get_tool_registry().handler_for(tool_name)
+            if handler is not None:
+                return await handler(
+                    tool_name,
+                    parameters,
+                    ToolCallEnv(
+                        workspace_id=workspace_id,
+                        slack_client=self._current_slack_client,
+                        channel_id=self._current_channel_id,
+                        thread_ts=self._current_thread_ts,
+                    ),
                 )
 
             if tool_name == "lucy_resolve_custom_integration":
@@ -4452,63 +3837,6 @@ class LucyAgent:
             if tool_name == "lucy_refresh_mcp":
                 return await self._handle_refresh_mcp(parameters, workspace_id)
 
-            from lucy.tools.slack_proactive import is_slack_proactive_tool
-
-            if is_slack_proactive_tool(tool_name):
-                from lucy.tools.slack_proactive import execute_slack_proactive_tool
-
-                return await execute_slack_proactive_tool(
-                    tool_name,
-                    parameters,
-                    self._current_slack_client,
-                )
-
-            from lucy.tools.spaces import is_spaces_tool
-
-            if is_spaces_tool(tool_name):
-                from lucy.tools.spaces import execute_spaces_tool
-
-                return await execute_spaces_tool(
-                    tool_name,
-                    parameters,
-                    workspace_id,
-                )
-
-            from lucy.tools.email_tools import is_email_tool
-
-            if is_email_tool(tool_name):
-                from lucy.tools.email_tools import execute_email_tool
-
-                return await execute_email_tool(tool_name, parameters)
-
-            from lucy.tools.web_search import is_web_search_tool
-
-            if is_web_search_tool(tool_name):
-                from lucy.tools.web_search import execute_web_search
-
-                return await execute_web_search(parameters)
-
-            from lucy.tools.services import is_service_tool
-
-            if is_service_tool(tool_name):
-                from lucy.tools.services import execute_service_tool
-
-                return await execute_service_tool(tool_name, parameters)
-
-            from lucy.tools.code_executor import is_code_tool
-
-            if is_code_tool(tool_name):
-                from lucy.tools.code_executor import execute_code_tool
-
-                return await execute_code_tool(tool_name, parameters, workspace_id)
-
-            from lucy.tools.gateway import is_gateway_tool
-
-            if is_gateway_tool(tool_name):
-                from lucy.tools.gateway import execute_gateway_tool
-
-                return await execute_gateway_tool(tool_name, parameters)
-
             if tool_name.startswith("lucy_custom_"):
                 return await self._execute_custom_wrapper_tool(
                     tool_name,
@@ -5151,6 +4479,9 @@ class LucyAgent:
                     workspace_id=workspace_id,
                     tool_registry=self._tool_registry,
                     progress_callback=None,
+                    user_id=ctx.user_slack_id if ctx else getattr(
+                        self, "_current_user_slack_id", None,
+                    ),
                 ),
                 timeout=SUB_TIMEOUT_SECONDS,
             )
@@ -5223,13 +4554,12 @@ class LucyAgent:
         messages: list[dict[str, Any]] = []
 
         if ctx.thread_ts and ctx.channel_id and slack_client:
+            from lucy.slack.thread_cache import get_thread_cache
+
             try:
-                result = await slack_client.conversations_replies(
-                    channel=ctx.channel_id,
-                    ts=ctx.thread_ts,
-                    limit=100,
+                thread_msgs = await get_thread_cache().messages(
+                    slack_client, ctx.channel_id, ctx.thread_ts, limit=100,
                 )
-                thread_msgs = result.get("messages", [])
 
                 # Exclude the very last message (that's the current message
                 # being processed -- it'll be appended as the final user turn)
@@ -271,7 +271,7 @@ def _build_hitl_narrative_inner(
     return f"I'd like to *{readable}*. Approve to proceed."
 
 
-def create_gated_result(
+async def create_gated_result(
     tool_name: str,
     parameters: dict[str, Any],
     action_type: ActionType,
@@ -291,7 +291,7 @@ def create_gated_result(
 
     description = format_confirmation_message(tool_name, parameters, action_type)
 
-    action_id = create_pending_action(
+    action_id = await create_pending_action(
         tool_name=tool_name,
         parameters=parameters,
         description=description,
@@ -21,16 +21,21 @@ Streaming architecture:
       - Tokens flowing (even slowly) = model is working, no timeout
       - No tokens for STREAM_SILENCE_TIMEOUT = model is hung, cancel + escalate
     Cheap internal calls (planner, supervisor, humanize) use non-streaming.
+    A streamed call can also forward its text deltas to a ``ContentSink``
+    (progressive Slack replies); the sink is reset whenever what it has
+    seen stops being the answer: a retry, or a turn that turns out to be
+    a tool call.
 """
 
 from __future__ import annotations
 
 import asyncio
 import collections
+import hashlib
 import json as _json
 import time
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Protocol
 
 import certifi
 import httpx
@@ -43,7 +48,11 @@ from tenacity import (
 )
 
 from lucy.config import settings
+from lucy.core.payload import PayloadEncoder
+from lucy.core.prompt_cache import PrefixObservation, breakpoint_offset, record_llm_usage
+from lucy.core.prompt_cache import cached_tokens as prompt_cached_tokens
 from lucy.infra.circuit_breaker import openrouter_breaker
+from lucy.infra.coordination import get_coordination
 
 logger = structlog.get_logger()
 
@@ -62,7 +71,9 @@ _STREAM_SILENCE_TIMEOUT = 120.0
 _LLM_WALLCLOCK_TIMEOUT = 1200.0
 
 # Exact-match response cache for short, deterministic internal LLM calls
-# (e.g. classify_service, humanize). Key = "model:content", TTL = 5 min.
+# (e.g. classify_service, humanize). Key = digest of workspace, model,
+# system prompt and content; TTL = 5 min. A local LRU sits in front of the
+# coordination backend, which shares entries between replicas.
 _response_cache: collections.OrderedDict[str, tuple[str, float]] = collections.OrderedDict()
 _CACHE_TTL = 300.0
 _CACHE_MAX_INPUT_LEN = 200
@@ -95,12 +106,13 @@ def _cache_key(
     if len(messages) == 1 and messages[0].get("role") == "user":
         content = messages[0].get("content", "")
         if isinstance(content, str) and len(content) < _CACHE_MAX_INPUT_LEN:
-            sp_hash = hash(system_prompt) if system_prompt else 0
-            return f"{workspace_id}:{model}:{sp_hash}:{content}"
+            # hashlib, not hash(): the key must match across processes.
+            raw = _json.dumps([workspace_id, model, system_prompt or "", content])
+            return "llm:" + hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
     return None
 
 
-def _cache_get(key: str) -> str | None:
+def _cache_get_local(key: str) -> str | None:
     """Retrieve a cached response if still valid (LRU: moves to end)."""
     entry = _response_cache.get(key)
     if entry is None:
@@ -113,14 +125,44 @@ def _cache_get(key: str) -> str | None:
     return text
 
 
-def _cache_put(key: str, text: str) -> None:
-    """Store a response in the cache (LRU eviction via OrderedDict)."""
+def _cache_put_local(key: str, text: str) -> None:
+    """Store a response in the local cache (LRU eviction via OrderedDict)."""
     _response_cache[key] = (text, time.monotonic())
     _response_cache.move_to_end(key)
     while len(_response_cache) > 500:
         _response_cache.popitem(last=False)
 
 
+async def _cache_get(key: str) -> str | None:
+    """Local LRU first, then the shared backend (if replicas share one)."""
+    text = _cache_get_local(key)
+    if text is not None:
+        return text
+    coord = get_coordination()
+    if not coord.shared:
+        return None
+    try:
+        text = await coord.get(key)
+    except Exception as e:
+        logger.debug("shared_response_cache_get_failed", error=str(e))
+        return None
+    if isinstance(text, str):
+        _cache_put_local(key, text)
+        return text
+    return None
+
+
+async def _cache_put(key: str, text: str) -> None:
+    _cache_put_local(key, text)
+    coord = get_coordination()
+    if not coord.shared:
+        return
+    try:
+        await coord.put(key, text, _CACHE_TTL)
+    except Exception as e:
+        logger.debug("shared_response_cache_put_failed", error=str(e))
+
+
 def _is_retryable_llm_error(exc: BaseException) -> bool:
     if isinstance(exc, OpenClawError) and exc.status_code in _RETRYABLE_STATUS_CODES:
         return True
@@ -129,6 +171,14 @@ def _is_retryable_llm_error(exc: BaseException) -> bool:
     return False
 
 
+class ContentSink(Protocol):
+    """Receives a streamed completion's text as it arrives."""
+
+    def feed(self, text: str) -> None: ...
+
+    def reset(self) -> None: ...
+
+
 @dataclass
 class ChatConfig:
     """Configuration for a chat completion."""
@@ -141,6 +191,18 @@ class ChatConfig:
     stream: bool = False
     wallclock_timeout: float = 1200.0
     rate_limit_timeout: float = 30.0
+    # Reuse one encoder across the turns of a run so unchanged messages
+    # and tools are not re-serialized. None = throwaway encoder per call.
+    encoder: PayloadEncoder | None = None
+    # Length of the static system-prompt prefix; providers that need an
+    # explicit cache breakpoint get one there. 0 = no breakpoint.
+    cache_prefix_chars: int = 0
+    # Streaming only: receives the text deltas as they arrive.
+    content_sink: ContentSink | None = None
+    # Cost accounting: the intent the call is billed under, and the
+    # prompt-prefix observation for cache-miss detection.
+    intent: str = "internal"
+    cache_observation: PrefixObservation | None = None
 
 
 @dataclass
@@ -236,70 +298,73 @@ class OpenClawClient:
             else None
         )
         if cache_key:
-            cached = _cache_get(cache_key)
+            cached = await _cache_get(cache_key)
             if cached is not None:
                 logger.debug("internal_cache_hit", model=model)
                 return OpenClawResponse(content=cached)
 
-        final_messages: list[dict[str, Any]] = []
-        if config.system_prompt:
-            final_messages.append(
-                {"role": "system", "content": config.system_prompt}
-            )
-        else:
-            soul = load_soul()
-            if soul:
-                final_messages.append({"role": "system", "content": soul})
-
-        final_messages.extend(messages)
-
-        payload: dict[str, Any] = {
-            "model": model,
-            "messages": final_messages,
-            "temperature": config.temperature,
-            "max_tokens": config.max_tokens,
-        }
-
-        if config.tools:
-            payload["tools"] = config.tools
-            payload["tool_choice"] = "auto"
+        system_prompt = config.system_prompt or load_soul()
+        encoder = config.encoder or PayloadEncoder()
 
         # Inject provider routing preferences if configured for this model.
         # This pins requests to fast providers (e.g. SambaNova at 395 t/s for
         # minimax) instead of OpenRouter's default price-sorted routing.
         provider_routing = _get_provider_routing(model)
         if provider_routing:
-            payload["provider"] = provider_routing
             logger.debug(
                 "provider_routing_applied",
                 model=model,
                 provider_order=provider_routing.get("order"),
             )
 
+        body = encoder.build(
+            model=model,
+            system_prompt=system_prompt,
+            messages=messages,
+            temperature=config.temperature,
+            max_tokens=config.max_tokens,
+            tools=config.tools,
+            provider=provider_routing,
+            stream=config.stream,
+            system_cache_split=breakpoint_offset(model, config.cache_prefix_chars),
+        )
+
         logger.info(
             "chat_completion_request",
             model=model,
-            message_count=len(final_messages),
+            message_count=len(messages) + (1 if system_prompt else 0),
             has_tools=bool(config.tools),
             tool_count=len(config.tools) if config.tools else 0,
             streaming=config.stream,
+            body_bytes=len(body),
         )
 
         if config.stream:
-            return await self._stream_completion(
-                payload, model,
+            response = await self._stream_completion(
+                body, model,
+                rate_limit_timeout=config.rate_limit_timeout,
+                content_sink=config.content_sink,
+            )
+        else:
+            response = await self._non_stream_completion(
+                body, model, cache_key,
+                wallclock_timeout=config.wallclock_timeout,
                 rate_limit_timeout=config.rate_limit_timeout,
             )
 
-        return await self._non_stream_completion(
-            payload, model, cache_key,
-            wallclock_timeout=config.wallclock_timeout,
-            rate_limit_timeout=config.rate_limit_timeout,
+        record_llm_usage(
+            model=model,
+            intent=config.intent,
+            usage=response.usage,
+            observation=config.cache_observation,
+            workspace_id=workspace_id,
+            user_id=user_id,
         )
+        return response
 
     async def _non_stream_completion(
         self,
-        payload: dict[str, Any],
+        body: bytes,
         model: str,
         cache_key: str | None,
         wallclock_timeout: float = 1200.0,
@@ -334,7 +399,7 @@ class OpenClawClient:
             try:
                 t0 = time.monotonic()
                 response = await self._client.post(
-                    "/chat/completions", json=payload,
+                    "/chat/completions", content=body,
                 )
                 llm_ms = round((time.monotonic() - t0) * 1000)
                 response.raise_for_status()
@@ -357,10 +422,7 @@ class OpenClawClient:
                     usage=data.get("usage"),
                 )
 
-                cached_tokens = 0
-                if result.usage:
-                    details = result.usage.get("prompt_tokens_details") or {}
-                    cached_tokens = details.get("cached_tokens", 0)
+                cached_tokens = prompt_cached_tokens(result.usage)
 
                 logger.info(
                     "chat_completion_success",
@@ -419,15 +481,16 @@ class OpenClawClient:
             )
 
         if cache_key and result.content and not result.tool_calls:
-            _cache_put(cache_key, result.content)
+            await _cache_put(cache_key, result.content)
 
         return result
 
     async def _stream_completion(
         self,
-        payload: dict[str, Any],
+        body: bytes,
         model: str,
         rate_limit_timeout: float = 30.0,
+        content_sink: ContentSink | None = None,
     ) -> OpenClawResponse:
         """Streaming path with silence detection.
 
@@ -459,7 +522,6 @@ class OpenClawClient:
 
         _STREAM_RETRYABLE = frozenset({429, 502, 503, 504})
         _MAX_STREAM_ATTEMPTS = 2
-        stream_payload = {**payload, "stream": True}
         t0 = time.monotonic()
         last_activity = time.monotonic()
         content_parts: list[str] = []
@@ -474,12 +536,14 @@ class OpenClawClient:
             usage_data = None
             chunk_count = 0
             last_error = None
+            if content_sink is not None:
+                content_sink.reset()
 
             try:
                 async with self._client.stream(
                     "POST",
                     "/chat/completions",
-                    json=stream_payload,
+                    content=body,
                     timeout=httpx.Timeout(
                         connect=5.0,
                         read=_STREAM_SILENCE_TIMEOUT,
@@ -534,8 +598,13 @@ class OpenClawClient:
 
                         if delta.get("content"):
                             content_parts.append(delta["content"])
+                            if content_sink is not None and not tool_call_deltas:
+                                content_sink.feed(delta["content"])
 
                         if "tool_calls" in delta:
+                            if content_sink is not None and not tool_call_deltas:
+                                # Text before a tool call is narration, not the answer.
+                                content_sink.reset()
                             for tc_delta in delta["tool_calls"]:
                                 idx = tc_delta.get("index", 0)
                                 if idx not in tool_call_deltas:
@@ -630,10 +699,7 @@ class OpenClawClient:
             ]
             tool_calls = self._parse_tool_calls(raw_calls)
 
-        cached_tokens = 0
-        if usage_data:
-            details = usage_data.get("prompt_tokens_details") or {}
-            cached_tokens = details.get("cached_tokens", 0)
+        cached_tokens = prompt_cached_tokens(usage_data)
 
         logger.info(
             "chat_completion_success",
@@ -694,15 +760,31 @@ class OpenClawClient:
         return load_soul()
 
 
+# (mtime_ns, text) of the last SOUL.md read by load_soul().
+_soul_cache: tuple[int, str] | None = None
+
+
 def load_soul() -> str:
     """Load SOUL.md system prompt.
 
     Delegates to the canonical loader in pipeline.prompt so there is
-    a single loading path for all SOUL variants.
+    a single loading path for all SOUL variants. The text is cached and
+    only re-read when the file's mtime changes — this runs on every
+    LLM call that has no explicit system prompt.
     """
+    global _soul_cache
     try:
-        from lucy.pipeline.prompt import _load_soul
-        return _load_soul()
+        from lucy.pipeline.prompt import _SOUL_PATH, _load_soul
+
+        try:
+            mtime = _SOUL_PATH.stat().st_mtime_ns
+        except OSError:
+            mtime = -1
+        if _soul_cache is not None and _soul_cache[0] == mtime:
+            return _soul_cache[1]
+        text = _load_soul()
+        _soul_cache = (mtime, text)
+        return text
     except Exception as e:
         logger.error("soul_load_failed", error=str(e))
     return (
@@ -0,0 +1,123 @@
+"""Incremental, byte-stable request body encoder for chat completions.
+
+Every agent turn resends the whole conversation, but only the tail
+changes between turns. Letting httpx ``json=`` the payload dict re-encodes
+(and re-copies) everything — tools included — on each call, which shows
+up in profiles on long runs with large contexts.
+
+``PayloadEncoder`` is created once per agent run and passed to the client
+through ``ChatConfig.encoder``:
+
+- Each message is encoded once and its bytes cached by object identity.
+  Agent code never mutates a message in place (``trim_tool_results`` and
+  friends build new dicts), so identity is a safe key; the cached entry
+  also pins the message so its id cannot be reused while cached.
+- The tools array is serialized once and reused for as long as the list
+  holds the same tool objects.
+- The system message is encoded once per (prompt, cache split); with a
+  split it is sent as two text parts, the first carrying the provider
+  cache breakpoint (see ``lucy.core.prompt_cache``).
+- The request body is assembled by joining the cached fragments.
+
+Output is deterministic — fixed top-level field order, sorted keys inside
+messages and tools, compact separators — so providers with prefix caching
+see exactly the same bytes for an unchanged prefix.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+from lucy.core.prompt_cache import system_content
+
+# Same settings httpx uses for ``json=``, plus sorted keys for stability.
+_ENCODER = json.JSONEncoder(
+    sort_keys=True, separators=(",", ":"), ensure_ascii=False, allow_nan=False,
+)
+
+
+def encode_json(value: Any) -> bytes:
+    """Canonical compact UTF-8 JSON for a single value."""
+    return _ENCODER.encode(value).encode("utf-8")
+
+
+class PayloadEncoder:
+    """Per-run cache of encoded message fragments and the tools array."""
+
+    __slots__ = ("_messages", "_system", "_tools_ref", "_tools_bytes")
+
+    def __init__(self) -> None:
+        # id(msg) -> (msg, content object at encode time, encoded bytes)
+        self._messages: dict[int, tuple[dict[str, Any], Any, bytes]] = {}
+        self._system: tuple[str, int, bytes] | None = None
+        self._tools_ref: list[dict[str, Any]] = []
+        self._tools_bytes: bytes = b""
+
+    def encode_message(self, message: dict[str, Any]) -> bytes:
+        """Return the encoded bytes for one message, encoding it at most once."""
+        key = id(message)
+        content = message.get("content")
+        entry = self._messages.get(key)
+        if entry is not None and entry[0] is message and entry[1] is content:
+            return entry[2]
+        encoded = encode_json(message)
+        self._messages[key] = (message, content, encoded)
+        return encoded
+
+    def encode_system(self, prompt: str, cache_split: int = 0) -> bytes:
+        """Encode the system message; the prompt is stable for a whole run."""
+        system = self._system
+        if system is None or system[1] != cache_split or system[0] != prompt:
+            content = system_content(prompt, cache_split)
+            system = (prompt, cache_split, encode_json({"role": "system", "content": content}))
+            self._system = system
+        return system[2]
+
+    def encode_tools(self, tools: list[dict[str, Any]]) -> bytes:
+        """Encode the tools array, reusing the last result if unchanged."""
+        cached = self._tools_ref
+        if len(cached) != len(tools) or any(a is not b for a, b in zip(cached, tools, strict=True)):
+            self._tools_ref = list(tools)
+            self._tools_bytes = encode_json(tools)
+        return self._tools_bytes
+
+    def build(
+        self,
+        *,
+        model: str,
+        system_prompt: str | None,
+        messages: list[dict[str, Any]],
+        temperature: float,
+        max_tokens: int,
+        tools: list[dict[str, Any]] | None = None,
+        provider: dict[str, Any] | None = None,
+        stream: bool = False,
+        system_cache_split: int = 0,
+    ) -> bytes:
+        """Assemble a chat-completion request body from cached fragments."""
+        parts: list[bytes] = []
+        if system_prompt:
+            parts.append(self.encode_system(system_prompt, system_cache_split))
+        parts.extend(self.encode_message(m) for m in messages)
+
+        body = [
+            b'{"model":', encode_json(model),
+            b',"messages":[', b",".join(parts), b"]",
+            b',"temperature":', encode_json(temperature),
+            b',"max_tokens":', encode_json(max_tokens),
+        ]
+        if tools:
+            body += [b',"tools":', self.encode_tools(tools), b',"tool_choice":"auto"']
+        if provider:
+            body += [b',"provider":', encode_json(provider)]
+        if stream:
+            body.append(b',"stream":true')
+        body.append(b"}")
+        return b"".join(body)
+
+    def forget(self, live: list[dict[str, Any]]) -> None:
+        """Drop cached fragments for messages no longer in *live*."""
+        keep = {id(m) for m in live}
+        for key in [k for k in self._messages if k not in keep]:
+            del self._messages[key]
@@ -0,0 +1,271 @@
+"""Prompt prefix caching: breakpoints, prefix drift detection, accounting.
+
+``build_system_prompt_parts`` orders the system prompt static-to-dynamic
+so the ~10k-token SOUL + SYSTEM_CORE prefix can be billed at cached
+rates. This module makes sure that actually happens:
+
+- **Breakpoints.** OpenAI, DeepSeek and Kimi cache prefixes
+  automatically. Anthropic (and Gemini, via OpenRouter) only cache up to
+  an explicit ``cache_control`` marker, so for those families the system
+  message is split into two text parts at the static/dynamic boundary
+  and the first part carries the breakpoint.
+- **Drift detection.** The static prefix is hashed per
+  (workspace, model, intent). A hash change while the previous prefix
+  would still be warm in the provider cache means something dynamic
+  leaked into the prefix; it is logged as ``prompt_prefix_changed``.
+  A warm, unchanged prefix that still comes back uncached is logged as
+  ``prompt_cache_miss``.
+- **Accounting.** Cached and uncached input tokens are counted in memory
+  per (workspace, model, intent) and written to ``CostLog`` through the
+  batched cost recorder (``lucy.infra.costs``). ``OpenClawClient`` calls
+  ``record_llm_usage`` for every completion, so planner, supervisor and
+  sub-agent calls are billed too; the workspace and user come from
+  ``bind_usage_owner``, set once per agent run.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+import structlog
+
+from lucy.config import settings
+from lucy.infra.costs import get_cost_recorder
+
+logger = structlog.get_logger()
+
+# Model prefixes whose providers only cache up to an explicit breakpoint.
+_EXPLICIT_BREAKPOINT_MODELS = ("anthropic/", "google/gemini")
+
+# Model prefixes known to cache prompts (explicitly or automatically).
+# Misses are only flagged for these; other providers may not cache at all.
+_CACHING_MODELS = (
+    *_EXPLICIT_BREAKPOINT_MODELS,
+    "openai/", "deepseek/", "moonshotai/", "x-ai/", "z-ai/",
+)
+
+# Providers ignore breakpoints on prefixes below ~1024 tokens.
+_MIN_BREAKPOINT_CHARS = 4096
+
+# A warm prefix should come back at least this fraction cached.
+_MIN_CACHED_RATIO = 0.5
+
+_CHARS_PER_TOKEN = 4
+
+CacheKey = tuple[str, str, str]  # (workspace_id, model, intent)
+
+# (workspace_id, user_id) that LLM calls in this context are billed to.
+_usage_owner: ContextVar[tuple[str, str | None] | None] = ContextVar(
+    "llm_usage_owner", default=None,
+)
+
+
+def needs_explicit_breakpoint(model: str) -> bool:
+    """Whether *model*'s provider family requires ``cache_control`` markers."""
+    return model.startswith(_EXPLICIT_BREAKPOINT_MODELS)
+
+
+def breakpoint_offset(model: str, prefix_chars: int) -> int:
+    """Character offset for the system-prompt breakpoint, or 0 for none."""
+    if prefix_chars < _MIN_BREAKPOINT_CHARS or not needs_explicit_breakpoint(model):
+        return 0
+    return prefix_chars
+
+
+def system_content(prompt: str, split: int = 0) -> str | list[dict[str, Any]]:
+    """System message content, split into cacheable parts at *split*."""
+    if split <= 0 or split >= len(prompt):
+        return prompt
+    return [
+        {"type": "text", "text": prompt[:split], "cache_control": {"type": "ephemeral"}},
+        {"type": "text", "text": prompt[split:]},
+    ]
+
+
+def prefix_hash(prefix: str) -> str:
+    """Short stable fingerprint of a static prompt prefix."""
+    return hashlib.blake2b(prefix.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def cached_tokens(usage: dict[str, Any] | None) -> int:
+    """Prompt tokens served from cache, from an OpenAI-style usage block."""
+    if not usage:
+        return 0
+    details = usage.get("prompt_tokens_details") or {}
+    return int(details.get("cached_tokens") or 0)
+
+
+@dataclass(slots=True)
+class PrefixObservation:
+    """What the tracker knew about a static prefix when a request was sent."""
+
+    prefix_hash: str
+    prefix_chars: int
+    # Same hash seen within the cache TTL: the provider should serve it.
+    warm: bool = False
+    # Hash differs from the one sent within the TTL: a warm cache was lost.
+    changed: bool = False
+
+
+@dataclass(slots=True)
+class CacheStats:
+    """Running prefix-cache counters for one (workspace, model, intent)."""
+
+    requests: int = 0
+    cached_tokens: int = 0
+    uncached_tokens: int = 0
+    prefix_changes: int = 0
+    misses: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.cached_tokens + self.uncached_tokens
+        return self.cached_tokens / total if total else 0.0
+
+
+class PromptCacheTracker:
+    """Per-key prefix hashes and cache counters, bounded LRU."""
+
+    def __init__(self, ttl_s: float = 300.0, max_keys: int = 4096) -> None:
+        self._ttl_s = ttl_s
+        self._max_keys = max_keys
+        # key -> (prefix hash, monotonic time last sent)
+        self._prefixes: OrderedDict[CacheKey, tuple[str, float]] = OrderedDict()
+        self._stats: OrderedDict[CacheKey, CacheStats] = OrderedDict()
+
+    def observe(
+        self, key: CacheKey, digest: str, prefix_chars: int, now: float | None = None,
+    ) -> PrefixObservation:
+        """Note that a request with this prefix is about to be sent."""
+        now = time.monotonic() if now is None else now
+        obs = PrefixObservation(prefix_hash=digest, prefix_chars=prefix_chars)
+        previous = self._prefixes.get(key)
+        if previous is not None and now - previous[1] <= self._ttl_s:
+            obs.warm = previous[0] == digest
+            obs.changed = not obs.warm
+        self._prefixes[key] = (digest, now)
+        self._prefixes.move_to_end(key)
+        if len(self._prefixes) > self._max_keys:
+            self._prefixes.popitem(last=False)
+
+        if obs.changed:
+            self._stats_for(key).prefix_changes += 1
+            logger.warning(
+                "prompt_prefix_changed",
+                workspace_id=key[0],
+                model=key[1],
+                intent=key[2],
+                previous_hash=previous[0] if previous else None,
+                prefix_hash=digest,
+                prefix_chars=prefix_chars,
+            )
+        return obs
+
+    def record(
+        self, key: CacheKey, usage: dict[str, Any] | None, obs: PrefixObservation | None,
+    ) -> tuple[int, int]:
+        """Count a response's cached/uncached input tokens; return them."""
+        prompt_tokens = int((usage or {}).get("prompt_tokens") or 0)
+        cached = min(cached_tokens(usage), prompt_tokens)
+        uncached = prompt_tokens - cached
+
+        stats = self._stats_for(key)
+        stats.requests += 1
+        stats.cached_tokens += cached
+        stats.uncached_tokens += uncached
+
+        if (
+            obs is not None and obs.warm and prompt_tokens
+            and key[1].startswith(_CACHING_MODELS)
+        ):
+            expected = obs.prefix_chars // _CHARS_PER_TOKEN
+            if cached < expected * _MIN_CACHED_RATIO:
+                stats.misses += 1
+                logger.warning(
+                    "prompt_cache_miss",
+                    workspace_id=key[0],
+                    model=key[1],
+                    intent=key[2],
+                    prefix_hash=obs.prefix_hash,
+                    expected_cached_tokens=expected,
+                    cached_tokens=cached,
+                    prompt_tokens=prompt_tokens,
+                )
+        return cached, uncached
+
+    def stats(self) -> dict[CacheKey, CacheStats]:
+        """Snapshot of the counters, keyed by (workspace, model, intent)."""
+        return dict(self._stats)
+
+    def _stats_for(self, key: CacheKey) -> CacheStats:
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = CacheStats()
+            if len(self._stats) > self._max_keys:
+                self._stats.popitem(last=False)
+        else:
+            self._stats.move_to_end(key)
+        return stats
+
+
+_tracker: PromptCacheTracker | None = None
+
+
+def get_prompt_cache_tracker() -> PromptCacheTracker:
+    global _tracker
+    if _tracker is None:
+        _tracker = PromptCacheTracker(ttl_s=settings.prompt_cache_ttl_s)
+    return _tracker
+
+
+def bind_usage_owner(workspace_id: str, user_id: str | None = None) -> None:
+    """Bill LLM calls made from the current context to this workspace and user.
+
+    Tasks created afterwards (sub-agents, supervisors) inherit the owner.
+    """
+    _usage_owner.set((workspace_id, user_id))
+
+
+def record_llm_usage(
+    *,
+    model: str,
+    intent: str,
+    usage: dict[str, Any] | None,
+    observation: PrefixObservation | None = None,
+    workspace_id: str | None = None,
+    user_id: str | None = None,
+) -> None:
+    """Account one LLM response: update counters and queue a CostLog row.
+
+    Without ``workspace_id`` the call is billed to the bound usage owner,
+    and is not recorded at all when there is none.
+    """
+    if not usage:
+        return
+    if workspace_id is None:
+        owner = _usage_owner.get()
+        if owner is None:
+            return
+        workspace_id, user_id = owner[0], user_id or owner[1]
+    key = (workspace_id, model, intent)
+    cached, uncached = get_prompt_cache_tracker().record(key, usage, observation)
+
+    metadata: dict[str, Any] = {"uncached_input_tokens": uncached}
+    if observation is not None:
+        metadata["prefix_hash"] = observation.prefix_hash
+        metadata["prefix_changed"] = observation.changed
+
+    get_cost_recorder().record_llm_call(
+        workspace_id=workspace_id,
+        model=model,
+        intent=intent,
+        usage=usage,
+        cached_tokens=cached,
+        user_id=user_id,
+        metadata=metadata,
+    )
@@ -28,6 +28,7 @@ from lucy.core.openclaw import (
     OpenClawResponse,
     get_openclaw_client,
 )
+from lucy.core.payload import PayloadEncoder
 
 logger = structlog.get_logger()
 
@@ -246,13 +247,17 @@ async def run_subagent(
     tool_registry: dict[str, dict[str, Any]],
     progress_callback: Callable[[str, int], Awaitable[None]] | None = None,
     tool_executor: Any | None = None,
+    user_id: str | None = None,
 ) -> str:
     """Run an isolated sub-agent loop. Returns final text.
 
     Includes: context trimming, loop detection, error retry,
     empty response recovery, and timeout protection.
     Rate limiting handled by shared OpenClawClient singleton.
+    Like the main loop, every call's model goes through ``budget_model``.
     """
+    from lucy.pipeline.router import budget_model
+
     client = await get_openclaw_client()
     system_prompt = _build_sub_system_prompt(spec)
 
@@ -272,13 +277,28 @@ async def run_subagent(
         workspace_id=workspace_id,
     )
 
+    encoder = PayloadEncoder()
+    model = spec.model
     for turn in range(spec.max_turns):
+        budgeted = budget_model(spec.model, workspace_id, user_id)
+        if budgeted != model:
+            logger.info(
+                "llm_budget_downgrade",
+                agent=spec.name,
+                from_model=model,
+                to_model=budgeted,
+                turn=turn,
+                workspace_id=workspace_id,
+            )
+            model = budgeted
         config = ChatConfig(
-            model=spec.model,
+            model=model,
             system_prompt=system_prompt,
             tools=tools if tools else None,
             max_tokens=spec.max_tokens,
             temperature=spec.temperature,
+            encoder=encoder,
+            intent=f"subagent:{spec.name}",
         )
 
         resp = await _llm_call_with_retry(client, messages, config)
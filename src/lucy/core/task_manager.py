@@ -23,6 +23,12 @@ State machine:
                                     → FAILED
                                     → CANCELLED
 
+Durable mode:
+    With ``task_queue_enabled`` tasks are persisted with ``enqueue_task``
+    and run by task queue workers (see ``lucy.core.task_queue``), possibly
+    in another process. This manager keeps a local record of the tasks it
+    enqueued and refreshes their state from the database.
+
 Integration:
     The task manager is NOT the agent loop itself. It WRAPS the agent
     loop. The key insight is that agent.run() is already designed to
@@ -70,9 +76,23 @@ class BackgroundTask:
     progress_message_ts: str | None = None  # Message to update with progress
     result: str | None = None
     error: str | None = None
+    durable: bool = False  # Persisted in the task queue; task_id is the row id
     _asyncio_task: asyncio.Task[Any] | None = field(default=None, repr=False)
 
 
+_ACTIVE_STATES = (TaskState.PENDING, TaskState.ACKNOWLEDGED, TaskState.WORKING)
+
+# Task queue row status -> local state (None: leave as is).
+_QUEUE_STATES: dict[str, TaskState | None] = {
+    "queued": None,
+    "running": TaskState.WORKING,
+    "completed": TaskState.COMPLETED,
+    "failed": TaskState.FAILED,
+    "interrupted": TaskState.FAILED,
+    "cancelled": TaskState.CANCELLED,
+}
+
+
 # ═══════════════════════════════════════════════════════════════════════════
 # TASK CLASSIFICATION — Should this be a background task?
 # ═══════════════════════════════════════════════════════════════════════════
@@ -113,6 +133,7 @@ def should_run_as_background_task(
 
 MAX_BACKGROUND_TASKS = 5  # Per workspace
 MAX_TASK_DURATION = 14_400  # 4-hour safety net (supervisor governs real duration)
+_REFRESH_INTERVAL_S = 2.0
 
 
 class TaskManager:
@@ -141,6 +162,7 @@ class TaskManager:
         self._tasks: dict[str, BackgroundTask] = {}
         # Per-workspace task count for limits
         self._workspace_task_count: dict[str, int] = {}
+        self._refreshed_at = 0.0
 
     async def start_task(
         self,
@@ -183,18 +205,7 @@ class TaskManager:
             description=description,
         )
 
-        if slack_client:
-            try:
-                from lucy.pipeline.humanize import pick
-                ack_result = await slack_client.chat_postMessage(
-                    channel=channel_id,
-                    thread_ts=thread_ts,
-                    text=pick("task_background_ack"),
-                )
-                task.progress_message_ts = ack_result.get("ts")
-                task.state = TaskState.ACKNOWLEDGED
-            except Exception as e:
-                logger.warning("task_ack_failed", error=str(e))
+        await self._acknowledge(task, slack_client)
 
         # Start the actual work
         async def _run_and_cleanup() -> None:
@@ -309,6 +320,114 @@ class TaskManager:
 
         return task
 
+    async def enqueue_task(
+        self,
+        workspace_id: str,
+        channel_id: str,
+        thread_ts: str,
+        description: str,
+        task_type: str,
+        payload: dict[str, Any],
+        slack_client: Any = None,
+        max_attempts: int | None = None,
+    ) -> BackgroundTask:
+        """Persist a background task for the task queue workers.
+
+        Unlike ``start_task`` the work survives restarts and may run in a
+        separate worker process. ``payload`` must be JSON-serializable and
+        hold everything the ``task_type`` handler needs. ``max_attempts``
+        overrides ``task_max_attempts``; use 1 for work whose side effects
+        make a retry unsafe.
+
+        Raises:
+            RuntimeError: the workspace is at its task limit, or the queue
+                is unavailable (callers fall back to running inline).
+        """
+        from lucy.core.task_queue import get_task_queue
+
+        queue = get_task_queue()
+        try:
+            ws_count = await queue.active_count(workspace_id)
+            if ws_count >= MAX_BACKGROUND_TASKS:
+                raise RuntimeError(
+                    f"Workspace {workspace_id} already has {ws_count} "
+                    f"background tasks running. Max is {MAX_BACKGROUND_TASKS}."
+                )
+            row_id = await queue.enqueue(
+                workspace_id,
+                task_type,
+                {**payload, "description": description},
+                channel_id=channel_id or None,
+                thread_ts=thread_ts or None,
+                max_attempts=max_attempts,
+            )
+        except RuntimeError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Task queue unavailable: {e}") from e
+
+        task = BackgroundTask(
+            task_id=str(row_id),
+            workspace_id=workspace_id,
+            channel_id=channel_id,
+            thread_ts=thread_ts,
+            description=description,
+            durable=True,
+        )
+        self._tasks[task.task_id] = task
+        await self._acknowledge(task, slack_client)
+        logger.info(
+            "background_task_queued",
+            task_id=task.task_id,
+            workspace_id=workspace_id,
+            task_type=task_type,
+            description=description[:100],
+        )
+        return task
+
+    async def _acknowledge(self, task: BackgroundTask, slack_client: Any) -> None:
+        if not slack_client:
+            return
+        try:
+            from lucy.pipeline.humanize import pick
+            ack_result = await slack_client.chat_postMessage(
+                channel=task.channel_id,
+                thread_ts=task.thread_ts,
+                text=pick("task_background_ack"),
+            )
+            task.progress_message_ts = ack_result.get("ts")
+            task.state = TaskState.ACKNOWLEDGED
+        except Exception as e:
+            logger.warning("task_ack_failed", error=str(e))
+
+    async def refresh(self) -> None:
+        """Update queued tasks from the database (rate-limited, best effort)."""
+        pending = {
+            t.task_id: t for t in self._tasks.values()
+            if t.durable and t.state in _ACTIVE_STATES
+        }
+        now = time.monotonic()
+        if not pending or now - self._refreshed_at < _REFRESH_INTERVAL_S:
+            return
+        self._refreshed_at = now
+
+        from lucy.core.task_queue import get_task_queue
+
+        try:
+            statuses = await get_task_queue().statuses([uuid.UUID(i) for i in pending])
+        except Exception as e:
+            logger.warning("task_refresh_failed", error=str(e))
+            return
+        for row_id, status in statuses.items():
+            task = pending[str(row_id)]
+            state = _QUEUE_STATES.get(status)
+            if state is None or state == task.state:
+                continue
+            task.state = state
+            if state not in _ACTIVE_STATES:
+                task.completed_at = now
+        self._cleanup_old_tasks()
+
     async def cancel_task(self, task_id: str) -> bool:
         """Cancel a running background task."""
         task = self._tasks.get(task_id)
@@ -317,6 +436,19 @@ class TaskManager:
         ):
             return False
 
+        if task.durable:
+            from lucy.core.task_queue import get_task_queue
+
+            try:
+                cancelled = await get_task_queue().request_cancel(uuid.UUID(task_id))
+            except Exception as e:
+                logger.warning("task_cancel_failed", task_id=task_id, error=str(e))
+                return False
+            if cancelled:
+                task.state = TaskState.CANCELLED
+                task.completed_at = time.monotonic()
+            return cancelled
+
         if task._asyncio_task and not task._asyncio_task.done():
             task._asyncio_task.cancel()
             return True
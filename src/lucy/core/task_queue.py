@@ -0,0 +1,642 @@
+"""Durable background task queue on the ``background_tasks`` table.
+
+``TaskManager`` runs background work as in-process asyncio tasks, which
+are lost on restart and always share the Slack process's event loop.
+With ``task_queue_enabled`` the work is written to ``background_tasks``
+instead and executed by ``TaskWorker``s, in the Slack process and/or in
+dedicated processes (``python scripts/task_worker.py``):
+
+- **Leasing.** Workers claim queued rows with ``SELECT … FOR UPDATE SKIP
+  LOCKED``, so any number of workers can poll the same table without
+  handing a task out twice.
+- **Heartbeats.** A running task's lease is extended every
+  ``task_heartbeat_s``. If its worker dies, the lease lapses after
+  ``task_lease_s`` and another worker picks the task up again.
+- **Resumable progress.** Handlers call ``LeasedTask.checkpoint`` to
+  persist progress; a re-leased task gets it back in ``progress``.
+- **Retries** are re-queued with a backoff until ``max_attempts``.
+- **Cancellation** is a flag on the row, noticed on the next heartbeat.
+- **Abandonment.** A lease that lapses on the last allowed attempt is
+  marked failed instead of started again, and the thread is told.
+
+Task types map to handlers registered with ``register_task_handler``.
+A handler receives the leased task and a Slack client and returns the
+text to post to the task's thread. The client is resolved per task from
+the payload's ``team_id`` when there is one, since each workspace has
+its own bot token.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import socket
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+import structlog
+
+from lucy.config import settings
+
+logger = structlog.get_logger()
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+INTERRUPTED = "interrupted"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+_RETRY_BACKOFF_S = 30.0
+_DRAIN_TIMEOUT_S = 60.0
+
+_TIMEOUT_MESSAGE = (
+    "This task ran for an unusually long time "
+    "and was stopped as a safety measure. "
+    "Let me know if you'd like me to continue."
+)
+_ABANDONED_MESSAGE = (
+    "I got cut off partway through this and won't retry it on my own, "
+    "since some of it may already have run. "
+    "Ask me again if you still need it."
+)
+
+
+@dataclass
+class LeasedTask:
+    """A ``background_tasks`` row currently leased by one worker."""
+
+    id: uuid.UUID
+    workspace_id: str
+    task_type: str
+    payload: dict[str, Any]
+    progress: dict[str, Any]
+    attempt: int
+    max_attempts: int
+    channel_id: str | None
+    thread_ts: str | None
+    worker_id: str
+    queue: TaskQueue = field(repr=False)
+    # The previous attempt was cut off rather than failing: its lease
+    # lapsed (worker died) or a shutting-down worker released it.
+    interrupted: bool = False
+    # The lease lapsed on the last allowed attempt; the row is already
+    # failed and the task must not run. Only the thread needs telling.
+    abandoned: bool = False
+
+    @property
+    def resumed(self) -> bool:
+        """Whether an earlier attempt already checkpointed progress."""
+        return bool(self.progress)
+
+    async def checkpoint(self, **progress: Any) -> None:
+        """Merge *progress* into the task's persisted progress."""
+        self.progress.update(progress)
+        await self.queue.save_progress(self)
+
+
+TaskHandler = Callable[[LeasedTask, Any], Awaitable[str | None]]
+
+_handlers: dict[str, TaskHandler] = {}
+
+
+def register_task_handler(task_type: str, handler: TaskHandler) -> None:
+    """Register the coroutine that executes tasks of *task_type*."""
+    _handlers[task_type] = handler
+
+
+def get_task_handler(task_type: str) -> TaskHandler | None:
+    return _handlers.get(task_type)
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# QUEUE
+# ═══════════════════════════════════════════════════════════════════════════
+
+
+class TaskQueue:
+    """Enqueue, lease and settle rows in ``background_tasks``."""
+
+    def __init__(self, *, lease_s: float = 120.0, max_attempts: int = 3) -> None:
+        self._lease_s = lease_s
+        self._max_attempts = max_attempts
+
+    # ── Producers ───────────────────────────────────────────────────────
+
+    async def enqueue(
+        self,
+        workspace_id: str,
+        task_type: str,
+        payload: dict[str, Any],
+        *,
+        channel_id: str | None = None,
+        thread_ts: str | None = None,
+        max_attempts: int | None = None,
+    ) -> uuid.UUID:
+        """Persist a new task; returns its id."""
+        from lucy.db.models import BackgroundTask
+        from lucy.db.session import db_session
+
+        row = BackgroundTask(
+            workspace_id=uuid.UUID(workspace_id),
+            task_type=task_type,
+            payload=payload,
+            status=QUEUED,
+            slack_channel_id=channel_id,
+            slack_thread_ts=thread_ts,
+            available_at=datetime.now(UTC),
+            max_attempts=max_attempts or self._max_attempts,
+            progress={},
+        )
+        async with db_session() as session:
+            session.add(row)
+            await session.flush()
+            task_id = row.id
+        logger.info(
+            "task_queue_enqueued",
+            task_id=str(task_id),
+            workspace_id=workspace_id,
+            task_type=task_type,
+        )
+        return task_id
+
+    async def request_cancel(self, task_id: uuid.UUID) -> bool:
+        """Cancel a task: immediately if still queued, else on its next heartbeat."""
+        from sqlalchemy import update
+
+        from lucy.db.models import BackgroundTask
+        from lucy.db.session import db_session
+
+        async with db_session() as session:
+            queued = await session.execute(
+                update(BackgroundTask)
+                .where(BackgroundTask.id == task_id, BackgroundTask.status == QUEUED)
+                .values(status=CANCELLED, completed_at=datetime.now(UTC))
+            )
+            running = await session.execute(
+                update(BackgroundTask)
+                .where(BackgroundTask.id == task_id, BackgroundTask.status == RUNNING)
+                .values(cancel_requested=True)
+            )
+        return bool(queued.rowcount or running.rowcount)
+
+    async def statuses(self, task_ids: list[uuid.UUID]) -> dict[uuid.UUID, str]:
+        from sqlalchemy import select
+
+        from lucy.db.models import BackgroundTask
+        from lucy.db.session import db_session
+
+        async with db_session() as session:
+            rows = await session.execute(
+                select(BackgroundTask.id, BackgroundTask.status)
+                .where(BackgroundTask.id.in_(task_ids))
+            )
+            return {task_id: status for task_id, status in rows}
+
+    async def active_count(self, workspace_id: str) -> int:
+        """Queued or running tasks for a workspace, across all workers."""
+        from sqlalchemy import func, select
+
+        from lucy.db.models import BackgroundTask
+        from lucy.db.session import db_session
+
+        async with db_session() as session:
+            return int(await session.scalar(
+                select(func.count()).select_from(BackgroundTask).where(
+                    BackgroundTask.workspace_id == uuid.UUID(workspace_id),
+                    BackgroundTask.status.in_((QUEUED, RUNNING)),
+                )
+            ) or 0)
+
+    # ── Workers ─────────────────────────────────────────────────────────
+
+    async def lease(
+        self, worker_id: str, limit: int, task_types: list[str],
+    ) -> list[LeasedTask]:
+        """Claim up to *limit* runnable tasks for *worker_id*.
+
+        Runnable means queued and past ``available_at``, or running with
+        an expired lease (its worker died). Rows locked by a concurrent
+        ``lease`` are skipped rather than waited on. Expired leases with no
+        attempts left are failed here and returned with ``abandoned`` set.
+        """
+        from sqlalchemy import and_, or_, select
+
+        from lucy.db.models import BackgroundTask
+        from lucy.db.session import db_session
+
+        if limit <= 0 or not task_types:
+            return []
+        now = datetime.now(UTC)
+        leased: list[LeasedTask] = []
+        async with db_session() as session:
+            rows = (await session.execute(
+                select(BackgroundTask)
+                .where(
+                    BackgroundTask.task_type.in_(task_types),
+                    or_(
+                        and_(
+                            BackgroundTask.status == QUEUED,
+                            BackgroundTask.available_at <= now,
+                        ),
+                        and_(
+                            BackgroundTask.status == RUNNING,
+                            BackgroundTask.lease_expires_at < now,
+                        ),
+                    ),
+                )
+                .order_by(BackgroundTask.available_at)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            )).scalars().all()
+
+            for row in rows:
+                abandoned = row.status == RUNNING and row.attempts >= row.max_attempts
+                if abandoned:
+                    # Its last attempt died with the worker; don't start another.
+                    row.status = FAILED
+                    row.error = f"lease expired on attempt {row.attempts}"
+                    row.completed_at = now
+                    row.leased_by = None
+                    logger.warning("task_queue_lease_abandoned", task_id=str(row.id))
+                    leased.append(self._leased(row, worker_id, abandoned=True))
+                    continue
+                interrupted = row.status == RUNNING or row.error == INTERRUPTED
+                if row.status == RUNNING:
+                    logger.info(
+                        "task_queue_lease_reclaimed",
+                        task_id=str(row.id),
+                        previous_worker=row.leased_by,
+                    )
+                row.status = RUNNING
+                row.attempts += 1
+                row.leased_by = worker_id
+                row.lease_expires_at = now + timedelta(seconds=self._lease_s)
+                row.heartbeat_at = now
+                row.started_at = now
+                leased.append(self._leased(row, worker_id, interrupted=interrupted))
+        return leased
+
+    def _leased(self, row: Any, worker_id: str, **flags: bool) -> LeasedTask:
+        return LeasedTask(
+            id=row.id,
+            workspace_id=str(row.workspace_id),
+            task_type=row.task_type,
+            payload=dict(row.payload or {}),
+            progress=dict(row.progress or {}),
+            attempt=row.attempts,
+            max_attempts=row.max_attempts,
+            channel_id=row.slack_channel_id,
+            thread_ts=row.slack_thread_ts,
+            worker_id=worker_id,
+            queue=self,
+            **flags,
+        )
+
+    async def heartbeat(self, task: LeasedTask) -> tuple[bool, bool]:
+        """Extend the lease. Returns (still_held, cancel_requested)."""
+        from sqlalchemy import update
+
+        from lucy.db.models import BackgroundTask
+        from lucy.db.session import db_session
+
+        now = datetime.now(UTC)
+        async with db_session() as session:
+            result = await session.execute(
+                update(BackgroundTask)
+                .where(*self._owned(task))
+                .values(
+                    lease_expires_at=now + timedelta(seconds=self._lease_s),
+                    heartbeat_at=now,
+                )
+                .returning(BackgroundTask.cancel_requested)
+            )
+            cancel = result.scalar_one_or_none()
+        if cancel is None:
+            return False, False
+        return True, bool(cancel)
+
+    async def save_progress(self, task: LeasedTask) -> None:
+        await self._settle(task, progress=task.progress)
+
+    async def complete(self, task: LeasedTask, result: str | None) -> None:
+        await self._settle(
+            task, status=COMPLETED, result=result, completed_at=datetime.now(UTC),
+            leased_by=None, lease_expires_at=None,
+        )
+
+    async def fail(self, task: LeasedTask, error: str, *, retry: bool = True) -> bool:
+        """Record a failed attempt. Returns True if the task was re-queued."""
+        if retry and task.attempt < task.max_attempts:
+            await self._settle(
+                task, status=QUEUED, error=error[:2000], leased_by=None,
+                lease_expires_at=None,
+                available_at=datetime.now(UTC)
+                + timedelta(seconds=_RETRY_BACKOFF_S * task.attempt),
+            )
+            return True
+        await self._settle(
+            task, status=FAILED, error=error[:2000], completed_at=datetime.now(UTC),
+            leased_by=None, lease_expires_at=None,
+        )
+        return False
+
+    async def release(self, task: LeasedTask) -> None:
+        """Hand an interrupted task back to the queue (worker shutting down).
+
+        The attempt is not counted against ``max_attempts``.
+        """
+        from lucy.db.models import BackgroundTask
+
+        await self._settle(
+            task, status=QUEUED, error=INTERRUPTED, leased_by=None, lease_expires_at=None,
+            available_at=datetime.now(UTC), attempts=BackgroundTask.attempts - 1,
+        )
+
+    async def mark_cancelled(self, task: LeasedTask) -> None:
+        await self._settle(
+            task, status=CANCELLED, completed_at=datetime.now(UTC),
+            leased_by=None, lease_expires_at=None,
+        )
+
+    async def _settle(self, task: LeasedTask, **values: Any) -> bool:
+        from sqlalchemy import update
+
+        from lucy.db.models import BackgroundTask
+        from lucy.db.session import db_session
+
+        async with db_session() as session:
+            result = await session.execute(
+                update(BackgroundTask).where(*self._owned(task)).values(**values)
+            )
+        if result.rowcount != 1:
+            logger.warning("task_queue_lease_lost", task_id=str(task.id))
+            return False
+        return True
+
+    @staticmethod
+    def _owned(task: LeasedTask) -> tuple[Any, ...]:
+        from lucy.db.models import BackgroundTask
+
+        return (
+            BackgroundTask.id == task.id,
+            BackgroundTask.leased_by == task.worker_id,
+            BackgroundTask.status == RUNNING,
+        )
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# WORKER
+# ═══════════════════════════════════════════════════════════════════════════
+
+
+class TaskWorker:
+    """Leases tasks from a ``TaskQueue`` and runs their handlers."""
+
+    def __init__(
+        self,
+        queue: TaskQueue,
+        *,
+        worker_id: str | None = None,
+        concurrency: int = 2,
+        task_types: list[str] | None = None,
+        slack_client: Any = None,
+        poll_s: float = 2.0,
+        heartbeat_s: float = 30.0,
+        max_duration_s: float = 14_400.0,
+    ) -> None:
+        self.worker_id = worker_id or default_worker_id()
+        self._queue = queue
+        self._concurrency = max(1, concurrency)
+        self._task_types = task_types
+        self._slack_client = slack_client
+        self._poll_s = poll_s
+        self._heartbeat_s = heartbeat_s
+        self._max_duration_s = max_duration_s
+        self._running: dict[uuid.UUID, asyncio.Task[None]] = {}
+        # Why a running handler was cancelled: "shutdown", "cancelled", "lease_lost".
+        self._stop_reasons: dict[uuid.UUID, str] = {}
+        self._wake = asyncio.Event()
+        self._loop_task: asyncio.Task[None] | None = None
+        self.completed = 0
+        self.failed = 0
+
+    def start(self) -> None:
+        if self._loop_task is None or self._loop_task.done():
+            self._loop_task = asyncio.create_task(
+                self._loop(), name=f"task-worker-{self.worker_id}",
+            )
+            logger.info(
+                "task_worker_started",
+                worker_id=self.worker_id,
+                concurrency=self._concurrency,
+                task_types=self._task_types or sorted(_handlers),
+            )
+
+    async def _loop(self) -> None:
+        while True:
+            self._wake.clear()
+            await self.poll()
+            waiter = asyncio.ensure_future(self._wake.wait())
+            try:
+                await asyncio.wait([waiter], timeout=self._poll_s)
+            finally:
+                waiter.cancel()
+
+    async def poll(self) -> int:
+        """Lease as many tasks as there are free slots; returns how many."""
+        free = self._concurrency - len(self._running)
+        task_types = self._task_types or sorted(_handlers)
+        try:
+            leased = await self._queue.lease(self.worker_id, free, task_types)
+        except Exception as e:
+            logger.warning("task_queue_lease_failed", worker_id=self.worker_id, error=str(e))
+            return 0
+        started = 0
+        for task in leased:
+            if task.abandoned:
+                continue
+            runner = asyncio.create_task(self._execute(task), name=f"queued-task-{task.id}")
+            self._running[task.id] = runner
+            runner.add_done_callback(lambda _t, tid=task.id: self._finished(tid))
+            started += 1
+        for task in leased:
+            if task.abandoned:
+                self.failed += 1
+                await self._post(task, _ABANDONED_MESSAGE)
+        return started
+
+    def _finished(self, task_id: uuid.UUID) -> None:
+        self._running.pop(task_id, None)
+        self._stop_reasons.pop(task_id, None)
+        self._wake.set()
+
+    async def _execute(self, task: LeasedTask) -> None:
+        ids = {"task_id": str(task.id), "task_type": task.task_type, "attempt": task.attempt}
+        handler = get_task_handler(task.task_type)
+        if handler is None:
+            await _quietly(self._queue.fail(task, "no handler registered", retry=False))
+            return
+
+        beat = asyncio.create_task(self._heartbeat(task))
+        logger.info("queued_task_started", resumed=task.resumed, **ids)
+        try:
+            result = await asyncio.wait_for(
+                handler(task, await self._client_for(task)), timeout=self._max_duration_s,
+            )
+        except asyncio.CancelledError:
+            reason = self._stop_reasons.get(task.id, "shutdown")
+            if reason == "cancelled":
+                await _quietly(self._queue.mark_cancelled(task))
+            elif reason == "shutdown":
+                await _quietly(self._queue.release(task))
+            logger.info("queued_task_stopped", reason=reason, **ids)
+        except TimeoutError:
+            self.failed += 1
+            await _quietly(self._queue.fail(task, "max duration exceeded", retry=False))
+            await self._post(task, _TIMEOUT_MESSAGE)
+            logger.critical(
+                "queued_task_safety_net", duration_limit_s=self._max_duration_s, **ids,
+            )
+        except Exception as e:
+            requeued = await _quietly(self._queue.fail(task, str(e)))
+            logger.error(
+                "queued_task_failed",
+                error=str(e),
+                requeued=bool(requeued),
+                exc_info=True,
+                **ids,
+            )
+            if not requeued:
+                self.failed += 1
+                from lucy.pipeline.humanize import pick
+
+                await self._post(task, pick("error_task_failed"))
+        else:
+            self.completed += 1
+            await _quietly(self._queue.complete(task, result))
+            if result:
+                await self._post(task, result)
+            logger.info("queued_task_completed", **ids)
+        finally:
+            beat.cancel()
+
+    async def _heartbeat(self, task: LeasedTask) -> None:
+        while True:
+            await asyncio.sleep(self._heartbeat_s)
+            try:
+                held, cancel = await self._queue.heartbeat(task)
+            except Exception as e:
+                logger.warning("task_queue_heartbeat_failed", task_id=str(task.id), error=str(e))
+                continue
+            if not held or cancel:
+                self._stop_reasons[task.id] = "cancelled" if held else "lease_lost"
+                runner = self._running.get(task.id)
+                if runner is not None:
+                    runner.cancel()
+                return
+
+    async def _client_for(self, task: LeasedTask) -> Any:
+        """The Slack client for the task's workspace, else the worker's own."""
+        team_id = task.payload.get("team_id")
+        if not team_id:
+            return self._slack_client
+        from lucy.core.token_store import get_slack_client
+
+        try:
+            return await get_slack_client(team_id, background=True)
+        except Exception as e:
+            logger.warning(
+                "queued_task_client_failed", task_id=str(task.id), team_id=team_id, error=str(e),
+            )
+            return self._slack_client
+
+    async def _post(self, task: LeasedTask, text: str) -> None:
+        if not task.channel_id:
+            return
+        client = await self._client_for(task)
+        if not client:
+            return
+        try:
+            await client.chat_postMessage(
+                channel=task.channel_id, thread_ts=task.thread_ts, text=text,
+            )
+        except Exception as e:
+            logger.warning("queued_task_post_failed", task_id=str(task.id), error=str(e))
+
+    async def stop(self, drain_timeout_s: float = _DRAIN_TIMEOUT_S) -> None:
+        """Stop leasing, let running tasks finish, then hand the rest back."""
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            try:
+                await self._loop_task
+            except asyncio.CancelledError:
+                pass
+            self._loop_task = None
+        if not self._running:
+            return
+        _, pending = await asyncio.wait(set(self._running.values()), timeout=drain_timeout_s)
+        for runner in pending:
+            runner.cancel()
+        if pending:
+            await asyncio.wait(pending, timeout=10)
+            logger.warning("task_worker_drain_timeout", released=len(pending))
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "worker_id": self.worker_id,
+            "running": len(self._running),
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
+
+async def _quietly(op: Awaitable[Any]) -> Any:
+    """Run a queue update, logging instead of raising (the DB may be down)."""
+    try:
+        return await op
+    except Exception as e:
+        logger.error("task_queue_update_failed", error=str(e))
+        return None
+
+
+def build_task_worker(
+    slack_client: Any = None,
+    *,
+    concurrency: int | None = None,
+    task_types: list[str] | None = None,
+) -> TaskWorker:
+    """A worker configured from settings."""
+    from lucy.core.task_manager import MAX_TASK_DURATION
+
+    return TaskWorker(
+        get_task_queue(),
+        concurrency=concurrency or settings.task_worker_concurrency,
+        task_types=task_types,
+        slack_client=slack_client,
+        poll_s=settings.task_poll_s,
+        heartbeat_s=settings.task_heartbeat_s,
+        max_duration_s=MAX_TASK_DURATION,
+    )
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# SINGLETON
+# ═══════════════════════════════════════════════════════════════════════════
+
+_queue: TaskQueue | None = None
+
+
+def get_task_queue() -> TaskQueue:
+    """Get or create the singleton task queue."""
+    global _queue
+    if _queue is None:
+        _queue = TaskQueue(lease_s=settings.task_lease_s, max_attempts=settings.task_max_attempts)
+    return _queue
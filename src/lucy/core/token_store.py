@@ -3,6 +3,14 @@
 Provides `get_slack_client(workspace_id)` to resolve the correct bot
 token for any workspace, falling back to the global static token when
 no workspace-specific token exists (single-tenant backwards compat).
+
+Each replica caches tokens locally; a store or uninstall anywhere is
+broadcast through the coordination backend so every replica drops its
+copy at once instead of serving a stale token for up to _TOKEN_TTL.
+
+Clients come from the shared Slack transport (slack/transport.py), so
+every caller with the same token shares one connection pool and one set
+of rate-limit buckets.
 """
 
 from __future__ import annotations
@@ -12,22 +20,33 @@ import time
 import uuid
 
 import structlog
-from slack_sdk.web.async_client import AsyncWebClient
 from sqlalchemy import select
 
 from lucy.config import settings
 from lucy.core.crypto import decrypt
 from lucy.db.models import Workspace
 from lucy.db.session import db_session
+from lucy.infra.coordination import ALL_KEYS, get_coordination
+from lucy.slack.transport import PooledSlackClient, get_slack_transport
 
 logger = structlog.get_logger()
 
 _TOKEN_TTL = 300  # 5 min
+_INVALIDATE_TOPIC = "slack_token"
 _cache: dict[str, tuple[str, float]] = {}  # team_id -> (token, expires_at)
-_client_cache: dict[str, tuple[AsyncWebClient, float]] = {}
 _lock = asyncio.Lock()
 
 
+def _drop_local(team_id: str) -> None:
+    if team_id == ALL_KEYS:
+        _cache.clear()
+        return
+    _cache.pop(team_id, None)
+
+
+get_coordination().listen(_INVALIDATE_TOPIC, _drop_local)
+
+
 async def get_bot_token(team_id: str) -> str:
     """Resolve the bot token for a Slack team, with caching."""
     now = time.monotonic()
@@ -52,18 +71,10 @@ async def get_bot_token(team_id: str) -> str:
     raise LookupError(f"No bot token found for team_id={team_id}")
 
 
-async def get_slack_client(team_id: str) -> AsyncWebClient:
-    """Get an AsyncWebClient for the given workspace, cached."""
-    now = time.monotonic()
-
-    cached = _client_cache.get(team_id)
-    if cached and cached[1] > now:
-        return cached[0]
-
+async def get_slack_client(team_id: str, *, background: bool = False) -> PooledSlackClient:
+    """Get the pooled Slack client for the given workspace."""
     token = await get_bot_token(team_id)
-    client = AsyncWebClient(token=token)
-    _client_cache[team_id] = (client, now + _TOKEN_TTL)
-    return client
+    return get_slack_transport().client(token, background=background)
 
 
 async def _fetch_token_from_db(team_id: str) -> str | None:
@@ -129,13 +140,15 @@ async def store_bot_token(
         await session.flush()
         ws_id = ws.id
 
-    _cache.pop(team_id, None)
-    _client_cache.pop(team_id, None)
+    await invalidate_cache(team_id)
     logger.info("bot_token_stored", team_id=team_id, workspace_id=str(ws_id))
     return ws_id
 
 
-def invalidate_cache(team_id: str) -> None:
-    """Remove cached token/client for a workspace (e.g. on uninstall)."""
-    _cache.pop(team_id, None)
-    _client_cache.pop(team_id, None)
+async def invalidate_cache(team_id: str) -> None:
+    """Remove the cached token for a workspace on every replica (e.g. on uninstall)."""
+    _drop_local(team_id)
+    try:
+        await get_coordination().notify(_INVALIDATE_TOPIC, team_id)
+    except Exception as e:
+        logger.warning("token_invalidate_broadcast_failed", team_id=team_id, error=str(e))
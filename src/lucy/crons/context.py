@@ -0,0 +1,204 @@
+"""Cached workspace context for cron instructions.
+
+Every agent cron used to re-read ``LEARNINGS.md``, ``company/SKILL.md``
+and ``team/SKILL.md``, ask Composio for the connected apps, and (for the
+heartbeat) rebuild the Slack channel summary before the agent even
+started. Crons that fire together read the same files over and over.
+
+``CronContextBundle`` keeps those fragments in memory per workspace:
+
+- Files are revalidated with a single ``stat`` (off the event loop) and
+  only re-read when their mtime, size or inode changes (``write_file``
+  renames, so edits always change the inode).
+- The assembled company/team/integrations block is rebuilt only when
+  one of its inputs changed.
+- Connected apps and channel summaries come from outside the workspace
+  files, so they are cached for a short TTL instead.
+- Only the ``max_workspaces`` most recently used workspaces are kept.
+
+The proactive events queue is consumed on read and is never cached.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any
+
+import aiofiles.os
+import structlog
+
+from lucy.config import settings
+from lucy.workspace.filesystem import WorkspaceFS
+
+logger = structlog.get_logger()
+
+_WORKSPACE_FILES = ("company/SKILL.md", "team/SKILL.md")
+
+FileKey = tuple[int, int, int]  # (st_mtime_ns, st_size, st_ino)
+
+
+@dataclass(slots=True)
+class _Fragment:
+    key: FileKey | None
+    content: str | None
+
+
+@dataclass(slots=True)
+class _Timed:
+    value: Any
+    expires_at: float
+
+
+@dataclass(slots=True)
+class _WorkspaceCache:
+    files: dict[str, _Fragment] = field(default_factory=dict)
+    block: tuple[tuple[Any, ...], str] | None = None
+    timed: dict[tuple[str, ...], _Timed] = field(default_factory=dict)
+    # One fetch per workspace at a time: crons firing together share it.
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+class CronContextBundle:
+    """Per-workspace cache of the fragments a cron instruction is built from."""
+
+    def __init__(
+        self,
+        integrations_ttl_s: float = 300.0,
+        channel_summary_ttl_s: float = 60.0,
+        max_workspaces: int = 256,
+    ) -> None:
+        self._integrations_ttl_s = integrations_ttl_s
+        self._channel_summary_ttl_s = channel_summary_ttl_s
+        self._max_workspaces = max_workspaces
+        self._workspaces: OrderedDict[str, _WorkspaceCache] = OrderedDict()
+        self.reads = 0
+
+    # ── Files ───────────────────────────────────────────────────────────
+
+    async def read(self, ws: WorkspaceFS, relative_path: str) -> str | None:
+        """A workspace file's content, re-read only if it changed on disk."""
+        try:
+            st = await aiofiles.os.stat(ws.root / relative_path)
+            key: FileKey | None = (st.st_mtime_ns, st.st_size, st.st_ino)
+        except FileNotFoundError:
+            key = None
+
+        files = self._workspace(ws.workspace_id).files
+        cached = files.get(relative_path)
+        if cached is not None and cached.key == key:
+            return cached.content
+
+        content = await ws.read_file(relative_path) if key is not None else None
+        if key is not None:
+            self.reads += 1
+        self._workspace(ws.workspace_id).files[relative_path] = _Fragment(
+            key=key, content=content,
+        )
+        return content
+
+    async def learnings(self, ws: WorkspaceFS, cron_dir_name: str) -> str | None:
+        return await self.read(ws, f"crons/{cron_dir_name}/LEARNINGS.md")
+
+    # ── Workspace block ─────────────────────────────────────────────────
+
+    async def workspace_context(self, ws: WorkspaceFS) -> str:
+        """Company, team and connected-integrations sections, pre-joined."""
+        company, team = [(await self.read(ws, p)) or "" for p in _WORKSPACE_FILES]
+        apps = await self._connected_apps(ws.workspace_id)
+
+        inputs = (company, team, tuple(apps))
+        cached = self._workspace(ws.workspace_id).block
+        if cached is not None and cached[0] == inputs:
+            return cached[1]
+
+        parts: list[str] = []
+        if company.strip():
+            parts.append(f"\n[Company Context]\n{company.strip()}")
+        if team.strip():
+            parts.append(f"\n[Team Directory]\n{team.strip()}")
+        if apps:
+            parts.append(f"\n[Connected Integrations]\n{', '.join(apps)}")
+        block = "\n".join(parts)
+        self._workspace(ws.workspace_id).block = (inputs, block)
+        return block
+
+    async def _connected_apps(self, workspace_id: str) -> list[str]:
+        try:
+            return await self._cached(
+                ("apps", workspace_id),
+                self._integrations_ttl_s,
+                lambda: self._fetch_connected_apps(workspace_id),
+            )
+        except Exception as e:
+            # Not cached: the next cron retries the lookup.
+            logger.debug("failed_to_inject_integrations", error=str(e))
+            return []
+
+    async def _fetch_connected_apps(self, workspace_id: str) -> list[str]:
+        from lucy.integrations.composio_client import get_composio_client
+
+        client = get_composio_client()
+        return list(await client.get_connected_app_names_reliable(workspace_id))
+
+    # ── Heartbeat extras ────────────────────────────────────────────────
+
+    async def channel_summary(self, ws: WorkspaceFS, hours_back: int) -> str:
+        """Slack channel activity summary, shared for a short TTL."""
+        from lucy.workspace.slack_local_reader import get_channel_summary
+
+        return await self._cached(
+            ("channels", ws.workspace_id, str(hours_back)),
+            self._channel_summary_ttl_s,
+            lambda: get_channel_summary(ws, hours_back=hours_back),
+        )
+
+    # ── Plumbing ────────────────────────────────────────────────────────
+
+    def _workspace(self, workspace_id: str) -> _WorkspaceCache:
+        cache = self._workspaces.get(workspace_id)
+        if cache is None:
+            cache = self._workspaces[workspace_id] = _WorkspaceCache()
+            while len(self._workspaces) > self._max_workspaces:
+                self._workspaces.popitem(last=False)
+        else:
+            self._workspaces.move_to_end(workspace_id)
+        return cache
+
+    async def _cached(self, key: tuple[str, ...], ttl_s: float, fetch: Any) -> Any:
+        cache = self._workspace(key[1])
+        entry = cache.timed.get(key)
+        if entry is not None and entry.expires_at > time.monotonic():
+            return entry.value
+        async with cache.lock:
+            entry = cache.timed.get(key)
+            if entry is not None and entry.expires_at > time.monotonic():
+                return entry.value
+            value = await fetch()
+            cache.timed[key] = _Timed(value=value, expires_at=time.monotonic() + ttl_s)
+            return value
+
+    def invalidate(self, workspace_id: str) -> None:
+        """Forget everything cached for a workspace."""
+        self._workspaces.pop(workspace_id, None)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# SINGLETON
+# ═══════════════════════════════════════════════════════════════════════════
+
+_bundle: CronContextBundle | None = None
+
+
+def get_cron_context() -> CronContextBundle:
+    """Get or create the singleton cron context bundle."""
+    global _bundle
+    if _bundle is None:
+        _bundle = CronContextBundle(
+            integrations_ttl_s=settings.cron_context_integrations_ttl_s,
+            channel_summary_ttl_s=settings.cron_context_channel_summary_ttl_s,
+            max_workspaces=settings.cron_context_max_workspaces,
+        )
+    return _bundle
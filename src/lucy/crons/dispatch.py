@@ -0,0 +1,300 @@
+"""Cron dispatch queue: bounded workers, per-workspace quotas, priorities.
+
+APScheduler triggers no longer run crons themselves; they enqueue a run
+here and return. A dispatcher loop starts queued runs while there is
+capacity:
+
+- **Worker pool.** At most ``cron_workers`` cron runs execute at once.
+- **Workspace quotas.** At most ``cron_workers_per_workspace`` of those
+  belong to one workspace, so one tenant's 9am burst cannot fill the pool.
+- **Priority.** Script crons (cheap, deterministic) start before agent
+  crons, and first attempts before retries. Interactive Slack work wins
+  over all of them: every in-flight interactive request (see
+  ``interactive_slot``) takes one cron slot away, down to
+  ``cron_min_workers``.
+- **Spread.** Scheduled fires are delayed by a stable per-cron offset
+  within ``cron_start_spread_s``, so crons sharing a minute do not all
+  start on the same second.
+- **Retries** are re-queued with a delay instead of sleeping inside a
+  worker slot.
+
+Set ``cron_run_in_process`` to false to keep all of this out of the Slack
+front end and run it with ``python -m lucy.crons.worker`` instead.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import heapq
+import itertools
+import time
+from collections import defaultdict
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any
+
+import structlog
+
+from lucy.config import settings
+
+logger = structlog.get_logger()
+
+PRIORITY_SCRIPT = 0
+PRIORITY_AGENT = 1
+PRIORITY_RETRY = 2
+
+_DRAIN_TIMEOUT_S = 60.0
+
+RunCron = Callable[[str, Any, int], Awaitable[None]]
+
+
+def start_offset(job_id: str, spread_s: float) -> float:
+    """Stable delay in ``[0, spread_s)`` for a cron, derived from its id."""
+    if spread_s <= 0:
+        return 0.0
+    digest = hashlib.blake2b(job_id.encode("utf-8"), digest_size=4).digest()
+    return int.from_bytes(digest, "big") / 2**32 * spread_s
+
+
+@dataclass(order=True, slots=True)
+class _Job:
+    priority: int
+    ready_at: float
+    seq: int
+    workspace_id: str = field(compare=False)
+    cron: Any = field(compare=False)
+    attempt: int = field(compare=False, default=1)
+
+    @property
+    def job_id(self) -> str:
+        return self.cron.job_id
+
+
+class CronDispatcher:
+    """Priority queue of cron runs drained by a bounded set of workers."""
+
+    def __init__(
+        self,
+        run: RunCron,
+        *,
+        workers: int = 4,
+        per_workspace: int = 1,
+        min_workers: int = 1,
+        spread_s: float = 0.0,
+    ) -> None:
+        self._run = run
+        self._workers = max(1, workers)
+        self._per_workspace = max(1, per_workspace)
+        self._min_workers = max(1, min(min_workers, self._workers))
+        self._spread_s = spread_s
+        self._seq = itertools.count()
+        # Not yet due, ordered by ready_at; due, ordered by priority.
+        self._delayed: list[tuple[float, int, _Job]] = []
+        self._ready: list[_Job] = []
+        self._queued_ids: set[str] = set()
+        self._running_ids: set[str] = set()
+        self._per_ws_running: dict[str, int] = defaultdict(int)
+        self._inflight: set[asyncio.Task[None]] = set()
+        self._interactive = 0
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+        self.started = 0
+        self.coalesced = 0
+
+    # ── Submitting ──────────────────────────────────────────────────────
+
+    def submit(
+        self,
+        workspace_id: str,
+        cron: Any,
+        *,
+        attempt: int = 1,
+        delay_s: float = 0.0,
+        spread: bool = False,
+    ) -> bool:
+        """Queue a cron run. Returns False if that cron is already pending.
+
+        A first attempt is dropped while the same cron is queued or
+        running, matching the old ``max_instances=1`` / ``coalesce``
+        behaviour. Retries always go through.
+        """
+        job_id = cron.job_id
+        if attempt == 1 and (job_id in self._queued_ids or job_id in self._running_ids):
+            self.coalesced += 1
+            logger.info("cron_dispatch_coalesced", job_id=job_id)
+            return False
+
+        if attempt > 1:
+            priority = PRIORITY_RETRY
+        elif getattr(cron, "type", "agent") == "script":
+            priority = PRIORITY_SCRIPT
+        else:
+            priority = PRIORITY_AGENT
+        if spread:
+            delay_s += start_offset(job_id, self._spread_s)
+
+        job = _Job(
+            priority=priority,
+            ready_at=time.monotonic() + delay_s,
+            seq=next(self._seq),
+            workspace_id=workspace_id,
+            cron=cron,
+            attempt=attempt,
+        )
+        heapq.heappush(self._delayed, (job.ready_at, job.seq, job))
+        self._queued_ids.add(job_id)
+        self._ensure_running()
+        self._wake.set()
+        return True
+
+    # ── Interactive pressure ────────────────────────────────────────────
+
+    @asynccontextmanager
+    async def interactive(self) -> AsyncIterator[None]:
+        """Mark an interactive request as in flight for its duration."""
+        self._interactive += 1
+        try:
+            yield
+        finally:
+            self._interactive -= 1
+            self._wake.set()
+
+    def capacity(self) -> int:
+        """Cron runs allowed right now, after yielding to interactive work."""
+        return max(self._min_workers, self._workers - self._interactive)
+
+    # ── Dispatching ─────────────────────────────────────────────────────
+
+    def _ensure_running(self) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._task = loop.create_task(self._loop())
+
+    async def _loop(self) -> None:
+        while True:
+            self._wake.clear()
+            timeout = self.dispatch()
+            # asyncio.wait (unlike wait_for) never swallows our own
+            # cancellation when the event fires at the same moment.
+            waiter = asyncio.ensure_future(self._wake.wait())
+            try:
+                await asyncio.wait([waiter], timeout=timeout)
+            finally:
+                waiter.cancel()
+
+    def dispatch(self, now: float | None = None) -> float | None:
+        """Start every runnable job; return seconds until the next one is due."""
+        now = time.monotonic() if now is None else now
+        while self._delayed and self._delayed[0][0] <= now:
+            heapq.heappush(self._ready, heapq.heappop(self._delayed)[2])
+
+        blocked: list[_Job] = []
+        while self._ready and len(self._inflight) < self.capacity():
+            job = heapq.heappop(self._ready)
+            if self._per_ws_running[job.workspace_id] >= self._per_workspace:
+                blocked.append(job)
+                continue
+            self._start(job)
+        for job in blocked:
+            heapq.heappush(self._ready, job)
+
+        if self._delayed:
+            return max(0.0, self._delayed[0][0] - now)
+        return None
+
+    def _start(self, job: _Job) -> None:
+        self._queued_ids.discard(job.job_id)
+        self._running_ids.add(job.job_id)
+        self._per_ws_running[job.workspace_id] += 1
+        self.started += 1
+        task = asyncio.get_running_loop().create_task(self._execute(job))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _execute(self, job: _Job) -> None:
+        try:
+            await self._run(job.workspace_id, job.cron, job.attempt)
+        except Exception as e:
+            logger.error(
+                "cron_dispatch_run_failed",
+                job_id=job.job_id,
+                attempt=job.attempt,
+                error=str(e),
+                exc_info=True,
+            )
+        finally:
+            self._running_ids.discard(job.job_id)
+            self._per_ws_running[job.workspace_id] -= 1
+            if self._per_ws_running[job.workspace_id] <= 0:
+                del self._per_ws_running[job.workspace_id]
+            self._wake.set()
+
+    async def stop(self, drain_timeout_s: float = _DRAIN_TIMEOUT_S) -> None:
+        """Stop dispatching and give in-flight runs a chance to finish."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._inflight:
+            _, pending = await asyncio.wait(set(self._inflight), timeout=drain_timeout_s)
+            for task in pending:
+                task.cancel()
+            if pending:
+                logger.warning("cron_dispatch_drain_timeout", cancelled=len(pending))
+
+    def get_stats(self) -> dict[str, int]:
+        return {
+            "queued": len(self._ready),
+            "delayed": len(self._delayed),
+            "running": len(self._inflight),
+            "interactive": self._interactive,
+            "capacity": self.capacity(),
+            "started": self.started,
+            "coalesced": self.coalesced,
+        }
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# INTERACTIVE HOOK
+# ═══════════════════════════════════════════════════════════════════════════
+
+_dispatcher: CronDispatcher | None = None
+
+
+def set_cron_dispatcher(dispatcher: CronDispatcher | None) -> None:
+    """Register the dispatcher that interactive requests should yield to."""
+    global _dispatcher
+    _dispatcher = dispatcher
+
+
+@asynccontextmanager
+async def interactive_slot() -> AsyncIterator[None]:
+    """Hold back cron work while an interactive Slack request runs.
+
+    A no-op when crons run in a separate worker process.
+    """
+    if _dispatcher is None:
+        yield
+        return
+    async with _dispatcher.interactive():
+        yield
+
+
+def build_dispatcher(run: RunCron) -> CronDispatcher:
+    """A dispatcher configured from settings."""
+    return CronDispatcher(
+        run,
+        workers=settings.cron_workers,
+        per_workspace=settings.cron_workers_per_workspace,
+        min_workers=settings.cron_min_workers,
+        spread_s=settings.cron_start_spread_s,
+    )
@@ -10,17 +10,25 @@ conditions are met. They support:
 - custom: Run a Python script that returns JSON with a "triggered" key
 
 Heartbeats run on a shared evaluation loop (every 30s) rather than
-individual APScheduler jobs. This keeps overhead minimal even with
-hundreds of monitors — each evaluation is a lightweight HTTP check
-or script execution, not an LLM call.
+individual APScheduler jobs. Each pass selects only rows whose indexed
+``next_check_at`` has passed, evaluates them concurrently (bounded by
+``heartbeat_max_concurrency``, each capped at ``heartbeat_eval_timeout_s``)
+over one pooled HTTP client, and writes every result back in a single
+bulk UPDATE. HTTP checks revalidate with the ETag / Last-Modified kept
+in ``last_check_result``, so an unchanged page costs one 304. ``next_check_at`` advances on the monitor's own interval
+grid, so checks do not drift later by however long a pass took.
 """
 
 from __future__ import annotations
 
 import asyncio
+import codecs
+import hashlib
 import json
+import math
 import re
-from datetime import UTC, datetime
+import time
+from datetime import UTC, datetime, timedelta
 from typing import Any
 from uuid import UUID
 
@@ -41,6 +49,32 @@ _SCRIPT_TIMEOUT_S = 30.0
 _CONSECUTIVE_FAILURES_ERROR_THRESHOLD = 3
 _consecutive_failures: dict[str, int] = {}
 
+_http_client: httpx.AsyncClient | None = None
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """Shared keep-alive client for the HTTP-based evaluators."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        limit = settings.heartbeat_http_max_connections
+        _http_client = httpx.AsyncClient(
+            timeout=_HTTP_TIMEOUT,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=limit,
+                max_keepalive_connections=limit,
+            ),
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared evaluator client (called on scheduler shutdown)."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
 
 async def create_heartbeat(
     workspace_id: str,
@@ -88,6 +122,7 @@ async def create_heartbeat(
             alert_cooldown_seconds=alert_cooldown_seconds,
             is_active=True,
             current_status=HeartbeatStatus.HEALTHY,
+            next_check_at=datetime.now(UTC),
         )
 
         session.add(hb)
@@ -208,9 +243,49 @@ async def list_heartbeats(
 # ═══════════════════════════════════════════════════════════════════════════
 
 
+def _conditional_headers(previous: dict[str, Any] | None) -> dict[str, str]:
+    """Validators from the last successful check, as conditional headers."""
+    if not previous or previous.get("error"):
+        return {}
+    headers: dict[str, str] = {}
+    if previous.get("etag"):
+        headers["If-None-Match"] = previous["etag"]
+    if previous.get("last_modified"):
+        headers["If-Modified-Since"] = previous["last_modified"]
+    return headers
+
+
+def _validators(resp: httpx.Response, previous: dict[str, Any] | None) -> dict[str, str]:
+    """ETag / Last-Modified to keep, preferring fresh values over stored ones."""
+    previous = previous or {}
+    kept: dict[str, str] = {}
+    etag = resp.headers.get("etag") or previous.get("etag")
+    last_modified = resp.headers.get("last-modified") or previous.get("last_modified")
+    if etag:
+        kept["etag"] = etag
+    if last_modified:
+        kept["last_modified"] = last_modified
+    return kept
+
+
+def _not_modified_result(
+    previous: dict[str, Any], resp: httpx.Response, keys: tuple[str, ...],
+) -> dict[str, Any]:
+    """Carry the previous verdict forward for a 304 response."""
+    result = {k: previous[k] for k in keys if k in previous}
+    result.update(_validators(resp, previous))
+    result["triggered"] = bool(previous.get("triggered", False))
+    result["not_modified"] = True
+    return result
+
+
 async def _eval_api_health(config: dict[str, Any]) -> dict[str, Any]:
     """Check if a URL returns a healthy HTTP status.
 
+    Only the status line matters, so the body is never downloaded. When
+    the last check stored validators the request is conditional, and a
+    304 counts as the previously seen (healthy) status.
+
     Config:
         url: str — the URL to check
         expected_status: int — expected HTTP status (default 200)
@@ -219,23 +294,33 @@ async def _eval_api_health(config: dict[str, Any]) -> dict[str, Any]:
     url = config.get("url", "")
     expected = config.get("expected_status", _DEFAULT_EXPECTED_STATUS)
     timeout = config.get("timeout", _HTTP_TIMEOUT)
+    previous = config.get("_previous_result")
 
     if not url:
         return {"triggered": False, "error": "No URL configured"}
 
+    headers = _conditional_headers(previous)
+    started = time.monotonic()
     try:
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            resp = await client.get(url, follow_redirects=True)
-            triggered = resp.status_code != expected
+        async with _get_http_client().stream(
+            "GET", url, headers=headers, timeout=timeout
+        ) as resp:
+            elapsed_ms = round((time.monotonic() - started) * 1000)
+            status = resp.status_code
+            if status == 304 and previous and previous.get("status_code") is not None:
+                status = previous["status_code"]
+            triggered = status != expected
             return {
                 "triggered": triggered,
-                "status_code": resp.status_code,
+                "status_code": status,
                 "expected": expected,
-                "response_time_ms": round(resp.elapsed.total_seconds() * 1000),
+                "response_time_ms": elapsed_ms,
+                "not_modified": resp.status_code == 304,
+                **_validators(resp, previous),
                 "detail": (
-                    f"URL returned {resp.status_code} (expected {expected})"
+                    f"URL returned {status} (expected {expected})"
                     if triggered
-                    else f"URL healthy: {resp.status_code}"
+                    else f"URL healthy: {status}"
                 ),
             }
     except httpx.TimeoutException:
@@ -255,6 +340,12 @@ async def _eval_api_health(config: dict[str, Any]) -> dict[str, Any]:
 async def _eval_page_content(config: dict[str, Any]) -> dict[str, Any]:
     """Check if a page contains or lacks specific text.
 
+    The page is fetched conditionally (a 304 repeats the last verdict)
+    and streamed: ``contains``/``not_contains`` are matched chunk by
+    chunk and the download stops as soon as they decide the outcome.
+    A ``regex`` needs the whole body, so it disables early stopping.
+    Fully read bodies are fingerprinted in ``content_digest``.
+
     Config:
         url: str — the URL to fetch
         contains: str | None — text that MUST be present (trigger if absent)
@@ -265,43 +356,69 @@ async def _eval_page_content(config: dict[str, Any]) -> dict[str, Any]:
     contains = config.get("contains")
     not_contains = config.get("not_contains")
     regex_pattern = config.get("regex")
+    previous = config.get("_previous_result")
 
     if not url:
         return {"triggered": False, "error": "No URL configured"}
 
     try:
-        async with httpx.AsyncClient(timeout=_HTTP_TIMEOUT) as client:
-            resp = await client.get(url, follow_redirects=True)
-            body = resp.text
+        async with _get_http_client().stream(
+            "GET", url, headers=_conditional_headers(previous)
+        ) as resp:
+            if resp.status_code == 304 and previous:
+                return _not_modified_result(
+                    previous, resp, ("detail", "status_code", "content_length", "content_digest"),
+                )
+
+            scan = _PageScan(contains, not_contains, keep_body=bool(regex_pattern))
+            digest = hashlib.blake2b(digest_size=16)
+            decoder = codecs.getincrementaldecoder(resp.encoding or "utf-8")(errors="replace")
+            complete = True
+            async for chunk in resp.aiter_bytes():
+                digest.update(chunk)
+                if scan.feed(decoder.decode(chunk)):
+                    complete = False
+                    break
+            if complete:
+                scan.feed(decoder.decode(b"", final=True))
+
+            result: dict[str, Any] = {
+                "status_code": resp.status_code,
+                **_validators(resp, previous),
+            }
+            if complete:
+                result["content_digest"] = digest.hexdigest()
+                result["content_length"] = scan.length
+            else:
+                result["stopped_early"] = True
 
-        if contains and contains not in body:
+        if contains and not scan.found_contains and complete:
             return {
                 "triggered": True,
                 "detail": f"Expected text '{contains[:50]}' not found on page",
-                "status_code": resp.status_code,
+                **result,
             }
 
-        if not_contains and not_contains in body:
+        if scan.found_not_contains:
             return {
                 "triggered": True,
                 "detail": f"Unwanted text '{not_contains[:50]}' found on page",
-                "status_code": resp.status_code,
+                **result,
             }
 
         if regex_pattern:
-            match = re.search(regex_pattern, body, re.IGNORECASE)
+            match = re.search(regex_pattern, scan.body, re.IGNORECASE)
             if match:
                 return {
                     "triggered": True,
                     "detail": f"Pattern matched: '{match.group()[:60]}'",
-                    "status_code": resp.status_code,
+                    **result,
                 }
 
         return {
             "triggered": False,
             "detail": "No conditions triggered",
-            "status_code": resp.status_code,
-            "content_length": len(body),
+            **result,
         }
     except Exception as exc:
         return {
@@ -311,6 +428,52 @@ async def _eval_page_content(config: dict[str, Any]) -> dict[str, Any]:
         }
 
 
+class _PageScan:
+    """Incremental ``contains`` / ``not_contains`` matcher over text chunks.
+
+    Keeps only a needle-sized overlap between chunks (plus the full body
+    when a regex still has to run) and reports when the verdict can no
+    longer change.
+    """
+
+    def __init__(
+        self, contains: str | None, not_contains: str | None, *, keep_body: bool,
+    ) -> None:
+        self._contains = contains or ""
+        self._not_contains = not_contains or ""
+        self._keep_body = keep_body
+        self._overlap = max(len(self._contains), len(self._not_contains), 1) - 1
+        self._tail = ""
+        self._parts: list[str] = []
+        self.found_contains = not self._contains
+        self.found_not_contains = False
+        self.length = 0
+
+    @property
+    def body(self) -> str:
+        return "".join(self._parts)
+
+    def feed(self, text: str) -> bool:
+        """Scan *text*; return True once the rest of the page is irrelevant."""
+        if not text:
+            return False
+        self.length += len(text)
+        if self._keep_body:
+            self._parts.append(text)
+        window = self._tail + text
+        if not self.found_contains and self._contains in window:
+            self.found_contains = True
+        if self._not_contains and self._not_contains in window:
+            self.found_not_contains = True
+        self._tail = window[-self._overlap:] if self._overlap else ""
+
+        if self._keep_body:
+            return False
+        if self.found_not_contains:
+            return True
+        return self.found_contains and not self._not_contains
+
+
 async def _eval_metric_threshold(config: dict[str, Any]) -> dict[str, Any]:
     """Check a numeric value against a threshold.
 
@@ -329,9 +492,8 @@ async def _eval_metric_threshold(config: dict[str, Any]) -> dict[str, Any]:
         return {"triggered": False, "error": "url and json_path are required"}
 
     try:
-        async with httpx.AsyncClient(timeout=_HTTP_TIMEOUT) as client:
-            resp = await client.get(url, follow_redirects=True)
-            data = resp.json()
+        resp = await _get_http_client().get(url)
+        data = resp.json()
 
         value = data
         for key in json_path.split("."):
@@ -447,114 +609,209 @@ _EVALUATORS: dict[str, Any] = {
     "custom": _eval_custom,
 }
 
+# Evaluators that revalidate against validators stored in last_check_result.
+_CONDITIONAL_TYPES = frozenset({"api_health", "page_content"})
+
 
 # ═══════════════════════════════════════════════════════════════════════════
 # EVALUATION LOOP
 # ═══════════════════════════════════════════════════════════════════════════
 
 
+def next_check_time(
+    previous_due: datetime | None,
+    interval_s: int,
+    now: datetime,
+) -> datetime:
+    """First slot on the monitor's interval grid that is after *now*.
+
+    Anchoring on the previous due time rather than on *now* keeps a
+    monitor on its schedule however late a pass runs; slots missed while
+    the loop was busy or down are skipped, not replayed.
+    """
+    interval_s = max(interval_s, _MIN_CHECK_INTERVAL_S)
+    if previous_due is None or previous_due > now:
+        return now + timedelta(seconds=interval_s)
+    behind = (now - previous_due).total_seconds()
+    steps = math.floor(behind / interval_s) + 1
+    return previous_due + timedelta(seconds=steps * interval_s)
+
+
+async def _run_evaluator(
+    hb: Any,
+    semaphore: asyncio.Semaphore,
+    timeout_s: float,
+) -> dict[str, Any]:
+    """Evaluate one heartbeat under the shared concurrency limit.
+
+    Evaluators report their own failures as triggered results; only an
+    unexpected exception escapes, and an overrun becomes a triggered
+    ``evaluation_timeout`` result so one slow monitor cannot hold a pass.
+    """
+    evaluator = _EVALUATORS[hb.condition_type]
+    config = dict(hb.condition_config or {})
+    if hb.condition_type == "custom":
+        config["workspace_id"] = str(hb.workspace_id)
+    elif hb.condition_type in _CONDITIONAL_TYPES:
+        config["_previous_result"] = hb.last_check_result
+
+    async with semaphore:
+        try:
+            return await asyncio.wait_for(evaluator(config), timeout=timeout_s)
+        except TimeoutError:
+            return {
+                "triggered": True,
+                "error": "evaluation_timeout",
+                "detail": f"Check did not finish within {timeout_s:g}s",
+            }
+
+
 async def evaluate_due_heartbeats(slack_client: Any) -> int:
     """Check all heartbeats that are due for evaluation.
 
     Returns the number of heartbeats evaluated.
     """
-    from sqlalchemy import select
+    from sqlalchemy import bindparam, or_, select, update
 
     from lucy.db import AsyncSessionLocal
     from lucy.db.models import Heartbeat, HeartbeatStatus
 
     now = datetime.now(UTC)
-    evaluated = 0
 
     async with AsyncSessionLocal() as session:
-        stmt = select(Heartbeat).where(
-            Heartbeat.is_active.is_(True),
-            Heartbeat.current_status.in_(
-                [
-                    HeartbeatStatus.HEALTHY,
-                    HeartbeatStatus.TRIGGERED,
-                ]
-            ),
+        stmt = (
+            select(Heartbeat)
+            .where(
+                Heartbeat.is_active.is_(True),
+                Heartbeat.current_status.in_(
+                    [
+                        HeartbeatStatus.HEALTHY,
+                        HeartbeatStatus.TRIGGERED,
+                    ]
+                ),
+                or_(
+                    Heartbeat.next_check_at.is_(None),
+                    Heartbeat.next_check_at <= now,
+                ),
+            )
+            .order_by(Heartbeat.next_check_at.asc().nulls_first())
+            .limit(settings.heartbeat_batch_size)
         )
         result = await session.execute(stmt)
-        heartbeats = result.scalars().all()
+        due = list(result.scalars().all())
+
+    if not due:
+        return 0
+
+    runnable = []
+    for hb in due:
+        if hb.condition_type in _EVALUATORS:
+            runnable.append(hb)
+        else:
+            logger.warning(
+                "heartbeat_unknown_condition",
+                name=hb.name,
+                condition_type=hb.condition_type,
+            )
 
-        for hb in heartbeats:
-            if hb.last_check_at:
-                elapsed = (now - hb.last_check_at).total_seconds()
-                if elapsed < hb.check_interval_seconds:
-                    continue
-
-            evaluator = _EVALUATORS.get(hb.condition_type)
-            if not evaluator:
-                logger.warning(
-                    "heartbeat_unknown_condition",
-                    name=hb.name,
-                    condition_type=hb.condition_type,
-                )
-                continue
-
-            try:
-                config = dict(hb.condition_config or {})
-                if hb.condition_type == "custom":
-                    config["workspace_id"] = str(hb.workspace_id)
-
-                check_result = await evaluator(config)
-                triggered = check_result.get("triggered", False)
-
-                hb.check_count = (hb.check_count or 0) + 1
-                hb.last_check_at = now
-                hb.last_check_result = check_result
-
-                if triggered:
-                    should_alert = True
-
-                    if hb.last_alert_at:
-                        since_last_alert = (now - hb.last_alert_at).total_seconds()
-                        if since_last_alert < hb.alert_cooldown_seconds:
-                            should_alert = False
-
-                    if should_alert:
-                        hb.current_status = HeartbeatStatus.TRIGGERED
-                        hb.trigger_count = (hb.trigger_count or 0) + 1
-                        hb.last_alert_at = now
-
-                        await _send_alert(
-                            hb,
-                            check_result,
-                            slack_client,
-                        )
-                else:
-                    _consecutive_failures.pop(str(hb.id), None)
-                    if hb.current_status == HeartbeatStatus.TRIGGERED:
-                        hb.current_status = HeartbeatStatus.HEALTHY
-
-                evaluated += 1
-
-                logger.debug(
-                    "heartbeat_evaluated",
-                    name=hb.name,
-                    triggered=triggered,
-                    check_count=hb.check_count,
-                )
+    semaphore = asyncio.Semaphore(max(1, settings.heartbeat_max_concurrency))
+    outcomes = await asyncio.gather(
+        *(
+            _run_evaluator(hb, semaphore, settings.heartbeat_eval_timeout_s)
+            for hb in runnable
+        ),
+        return_exceptions=True,
+    )
+
+    updates: list[dict[str, Any]] = []
+    alerts: list[tuple[Any, dict[str, Any]]] = []
+    evaluated = 0
 
-            except Exception as exc:
-                hb_key = str(hb.id)
-                _consecutive_failures[hb_key] = _consecutive_failures.get(hb_key, 0) + 1
-                fail_count = _consecutive_failures[hb_key]
-                log_level = (
-                    "error" if fail_count >= _CONSECUTIVE_FAILURES_ERROR_THRESHOLD else "warning"
-                )
-                getattr(logger, log_level)(
-                    "heartbeat_eval_error",
-                    name=hb.name,
-                    error=str(exc),
-                    consecutive_failures=fail_count,
-                )
+    for hb, outcome in zip(runnable, outcomes, strict=True):
+        row = {
+            "id": hb.id,
+            "next_check_at": next_check_time(
+                hb.next_check_at or hb.last_check_at, hb.check_interval_seconds, now
+            ),
+            "check_count": hb.check_count,
+            "trigger_count": hb.trigger_count,
+            "last_check_at": hb.last_check_at,
+            "last_check_result": hb.last_check_result,
+            "last_alert_at": hb.last_alert_at,
+            "current_status": hb.current_status,
+            "previous_status": hb.current_status,
+        }
+        updates.append(row)
+
+        if isinstance(outcome, BaseException):
+            hb_key = str(hb.id)
+            _consecutive_failures[hb_key] = _consecutive_failures.get(hb_key, 0) + 1
+            fail_count = _consecutive_failures[hb_key]
+            log_level = (
+                "error" if fail_count >= _CONSECUTIVE_FAILURES_ERROR_THRESHOLD else "warning"
+            )
+            getattr(logger, log_level)(
+                "heartbeat_eval_error",
+                name=hb.name,
+                error=str(outcome),
+                consecutive_failures=fail_count,
+            )
+            continue
+
+        check_result = outcome
+        triggered = check_result.get("triggered", False)
+        row["check_count"] = (hb.check_count or 0) + 1
+        row["last_check_at"] = now
+        row["last_check_result"] = check_result
+
+        if triggered:
+            should_alert = True
+
+            if hb.last_alert_at:
+                since_last_alert = (now - hb.last_alert_at).total_seconds()
+                if since_last_alert < hb.alert_cooldown_seconds:
+                    should_alert = False
+
+            if should_alert:
+                row["current_status"] = HeartbeatStatus.TRIGGERED
+                row["trigger_count"] = (hb.trigger_count or 0) + 1
+                row["last_alert_at"] = now
+                alerts.append((hb, check_result))
+        else:
+            _consecutive_failures.pop(str(hb.id), None)
+            if hb.current_status == HeartbeatStatus.TRIGGERED:
+                row["current_status"] = HeartbeatStatus.HEALTHY
+
+        evaluated += 1
+
+        logger.debug(
+            "heartbeat_evaluated",
+            name=hb.name,
+            triggered=triggered,
+            check_count=row["check_count"],
+        )
 
-        if evaluated:
+    if updates:
+        # Skip rows whose status changed while we evaluated (e.g. paused by a
+        # user), so this pass doesn't overwrite it with a stale one.
+        stmt = (
+            update(Heartbeat)
+            .where(Heartbeat.current_status == bindparam("previous_status"))
+            .execution_options(synchronize_session=None)
+        )
+        async with AsyncSessionLocal() as session:
+            await session.execute(stmt, updates)
             await session.commit()
 
+    if alerts:
+        sent = await asyncio.gather(
+            *(_send_alert(hb, check_result, slack_client) for hb, check_result in alerts),
+            return_exceptions=True,
+        )
+        for (hb, _), outcome in zip(alerts, sent, strict=True):
+            if isinstance(outcome, BaseException):
+                logger.warning("heartbeat_alert_failed", name=hb.name, error=str(outcome))
+
     return evaluated
 
 
@@ -0,0 +1,255 @@
+"""Structured cron execution history with constant-time lookups.
+
+Each cron keeps two files next to its task.json:
+
+- ``history.jsonl``: one JSON record per run, append-only. It rotates to
+  ``history.1.jsonl`` once it passes ``_MAX_HISTORY_BYTES``.
+- ``history_index.json``: a small sidecar with the last run, the last
+  successful run, per-day counts for the last ``_INDEX_DAYS`` days and the
+  last ``_RECENT_RUNS`` statuses.
+
+Dependency checks, ``lucy_list_crons`` run info and failure rates only
+read the sidecar (cached in memory), so they no longer get slower as a
+cron ages. The human-readable ``execution.log`` is still appended for
+people and for the agent's own file tools, but it is only read back when
+a size check says it needs trimming.
+
+Crons that ran before this store existed get their index built once
+from ``execution.log`` on first lookup.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import re
+from collections import deque
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime, tzinfo
+from typing import Any
+
+import structlog
+
+from lucy.workspace.filesystem import WorkspaceFS
+
+logger = structlog.get_logger()
+
+FAILED = "failed"
+
+_INDEX_DAYS = 30
+_RECENT_RUNS = 50
+_MAX_HISTORY_BYTES = 256 * 1024
+_MAX_LOG_BYTES = 32_768  # 32 KB of execution.log per cron
+
+_LOG_HEADER_RE = re.compile(
+    r"^## (\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d+)?[+\-\d:]*)\s*(.*)$"
+)
+_LOG_STATUS_RE = re.compile(r"status: (\w+)")
+_LOG_ELAPSED_RE = re.compile(r"\((?:elapsed: )?(\d+)ms")
+
+
+@dataclass(slots=True)
+class CronRun:
+    """One cron execution as stored in ``history.jsonl``."""
+
+    ts: str
+    status: str
+    elapsed_ms: int = 0
+    attempt: int = 1
+    error: str = ""
+    preview: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return self.status != FAILED
+
+    @property
+    def at(self) -> datetime:
+        return datetime.fromisoformat(self.ts)
+
+
+def _empty_index() -> dict[str, Any]:
+    return {
+        "runs": 0,
+        "failures": 0,
+        "last": None,
+        "last_ok": None,
+        "days": {},
+        "recent": [],
+    }
+
+
+def apply_run(index: dict[str, Any], run: CronRun) -> dict[str, Any]:
+    """Fold one run into a sidecar index (in place) and return it."""
+    summary = {k: v for k, v in asdict(run).items() if k != "preview"}
+    index["runs"] += 1
+    index["last"] = summary
+    if run.ok:
+        index["last_ok"] = summary
+    else:
+        index["failures"] += 1
+
+    day = run.at.astimezone(UTC).date().isoformat()
+    days = index["days"]
+    entry = days.setdefault(day, {"runs": 0, "failures": 0})
+    entry["runs"] += 1
+    entry["failures"] += 0 if run.ok else 1
+    entry["last_status"] = run.status
+    for stale in sorted(days)[:-_INDEX_DAYS]:
+        del days[stale]
+
+    recent = deque(index["recent"], maxlen=_RECENT_RUNS)
+    recent.append(run.status)
+    index["recent"] = list(recent)
+    return index
+
+
+def parse_execution_log(text: str) -> list[CronRun]:
+    """Runs recorded in a legacy ``execution.log``, oldest first."""
+    runs: list[CronRun] = []
+    for line in text.splitlines():
+        m = _LOG_HEADER_RE.match(line)
+        if not m:
+            continue
+        try:
+            datetime.fromisoformat(m.group(1))
+        except ValueError:
+            continue
+        rest = m.group(2)
+        if "FAILED" in rest:
+            status = FAILED
+        else:
+            sm = _LOG_STATUS_RE.search(rest)
+            status = sm.group(1) if sm else "delivered"
+        em = _LOG_ELAPSED_RE.search(rest)
+        runs.append(CronRun(
+            ts=m.group(1), status=status, elapsed_ms=int(em.group(1)) if em else 0,
+        ))
+    return runs
+
+
+class CronHistoryStore:
+    """Append-only run records plus a cached per-cron summary index.
+
+    Cached indexes are revalidated with a ``stat`` of the sidecar, so runs
+    recorded by a separate cron worker process show up here too.
+    """
+
+    def __init__(self) -> None:
+        self._indexes: dict[tuple[str, str], tuple[int | None, dict[str, Any]]] = {}
+        self._locks: dict[tuple[str, str], asyncio.Lock] = {}
+
+    # ── Writing ─────────────────────────────────────────────────────────
+
+    async def record(self, ws: WorkspaceFS, slug: str, run: CronRun) -> None:
+        """Append a run to history.jsonl and update the sidecar index."""
+        key = (ws.workspace_id, slug)
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            index = self._load(ws, slug)
+            history = ws.root / "crons" / slug / "history.jsonl"
+            if history.is_file() and history.stat().st_size > _MAX_HISTORY_BYTES:
+                history.replace(history.with_name("history.1.jsonl"))
+            await ws.append_file(
+                f"crons/{slug}/history.jsonl",
+                json.dumps(asdict(run), ensure_ascii=False) + "\n",
+            )
+            apply_run(index, run)
+            path = await ws.write_file(f"crons/{slug}/history_index.json", json.dumps(index))
+            self._indexes[key] = (path.stat().st_mtime_ns, index)
+
+    # ── Reading ─────────────────────────────────────────────────────────
+
+    def index(self, ws: WorkspaceFS, slug: str) -> dict[str, Any]:
+        """The sidecar index for a cron (empty if it never ran)."""
+        return self._load(ws, slug)
+
+    def last_run(
+        self, ws: WorkspaceFS, slug: str, *, ok_only: bool = False,
+    ) -> CronRun | None:
+        summary = self._load(ws, slug)["last_ok" if ok_only else "last"]
+        return CronRun(**summary) if summary else None
+
+    def ran_today(self, ws: WorkspaceFS, slug: str, tz: tzinfo = UTC) -> bool | None:
+        """Whether the latest run is from today (in *tz*) and succeeded.
+
+        Returns None when the cron has no recorded runs at all.
+        """
+        last = self.last_run(ws, slug)
+        if last is None:
+            return None
+        today = datetime.now(tz).date()
+        return last.ok and last.at.astimezone(tz).date() == today
+
+    def summary(self, ws: WorkspaceFS, slug: str) -> dict[str, Any] | None:
+        """Last-run info and recent failure rate, or None if it never ran."""
+        index = self._load(ws, slug)
+        if not index["runs"]:
+            return None
+        recent = index["recent"]
+        return {
+            "last_run": index["last"]["ts"],
+            "last_status": index["last"]["status"],
+            "last_success": index["last_ok"]["ts"] if index["last_ok"] else None,
+            "runs": index["runs"],
+            "failure_rate": round(recent.count(FAILED) / len(recent), 2) if recent else 0.0,
+        }
+
+    def _load(self, ws: WorkspaceFS, slug: str) -> dict[str, Any]:
+        # The sidecar is a few hundred bytes, so plain blocking reads are fine.
+        key = (ws.workspace_id, slug)
+        path = ws.root / "crons" / slug / "history_index.json"
+        try:
+            mtime: int | None = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        cached = self._indexes.get(key)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        index: dict[str, Any] | None = None
+        if mtime is not None:
+            try:
+                index = {**_empty_index(), **json.loads(path.read_text(encoding="utf-8"))}
+            except (OSError, json.JSONDecodeError):
+                logger.warning("cron_history_index_corrupt", workspace_id=key[0], cron=slug)
+        if index is None:
+            index = _empty_index()
+            legacy = ws.root / "crons" / slug / "execution.log"
+            if legacy.is_file():
+                for run in parse_execution_log(legacy.read_text(encoding="utf-8")):
+                    apply_run(index, run)
+        self._indexes[key] = (mtime, index)
+        return index
+
+
+async def append_execution_log(ws: WorkspaceFS, slug: str, entry: str) -> None:
+    """Append to the human-readable execution.log, trimming by size only.
+
+    The file is read back only when it outgrows ``_MAX_LOG_BYTES``; it is
+    then cut to the most recent 75%, starting at a ``## `` entry.
+    """
+    log_path = f"crons/{slug}/execution.log"
+    path = await ws.append_file(log_path, entry)
+    if path.stat().st_size <= _MAX_LOG_BYTES:
+        return
+    existing_log = await ws.read_file(log_path) or ""
+    trim_target = existing_log[-(int(_MAX_LOG_BYTES * 0.75)):]
+    first_entry = trim_target.find("\n## ")
+    await ws.write_file(
+        log_path, trim_target[first_entry:] if first_entry >= 0 else trim_target,
+    )
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# SINGLETON
+# ═══════════════════════════════════════════════════════════════════════════
+
+_store: CronHistoryStore | None = None
+
+
+def get_history_store() -> CronHistoryStore:
+    """Get or create the singleton cron history store."""
+    global _store
+    if _store is None:
+        _store = CronHistoryStore()
+    return _store
@@ -0,0 +1,222 @@
+"""SQL-backed cron index for lazy, sharded scheduling.
+
+By default every cron is its own APScheduler job, registered at boot
+after parsing every workspace's task.json files. That is fine for a few
+hundred workspaces. With ``cron_index_enabled`` the scheduler instead:
+
+- mirrors each workspace's crons into the ``schedules`` table, with
+  ``next_run_at`` computed from the cron expression;
+- keeps a single sweep job that selects due rows through the
+  ``ix_schedules_next_run`` index and claims each one with a
+  compare-and-set on ``next_run_at``, so a fire is never dispatched twice;
+- indexes workspaces in the background after boot, so startup does not
+  wait for task.json discovery.
+
+Workspaces are split across scheduler processes by a stable hash of the
+workspace id (``cron_shard_count`` / ``cron_shard_index``). Each process
+only indexes, sweeps and runs maintenance for its own shard. The hash is
+stored on each row as ``shard_key``, so the sweep filters by shard in SQL
+and a backlog in a shard whose worker is down cannot crowd out the rows
+of the others.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import uuid
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any
+
+import structlog
+from apscheduler.triggers.cron import CronTrigger
+
+from lucy.config import settings
+
+if TYPE_CHECKING:
+    from lucy.crons.scheduler import CronConfig
+
+logger = structlog.get_logger()
+
+
+def shard_key(workspace_id: str) -> int:
+    """Stable non-negative 63-bit hash of a workspace id (fits a BIGINT)."""
+    digest = hashlib.blake2b(workspace_id.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") >> 1
+
+
+def shard_for(workspace_id: str, shard_count: int) -> int:
+    """Stable shard number of a workspace."""
+    if shard_count <= 1:
+        return 0
+    return shard_key(workspace_id) % shard_count
+
+
+def owns_workspace(workspace_id: str) -> bool:
+    """Whether this scheduler process is responsible for *workspace_id*."""
+    return shard_for(workspace_id, settings.cron_shard_count) == settings.cron_shard_index
+
+
+def next_fire(cron: CronConfig, after: datetime) -> datetime | None:
+    """Next time *cron* fires strictly after *after*."""
+    trigger = CronTrigger.from_crontab(cron.cron, timezone=cron.timezone or None)
+    # get_next_fire_time is inclusive; fire times are whole seconds.
+    return trigger.get_next_fire_time(None, after.replace(microsecond=0) + timedelta(seconds=1))
+
+
+@dataclass(slots=True)
+class DueCron:
+    schedule_id: uuid.UUID
+    workspace_id: str
+    cron: CronConfig
+    next_run_at: datetime
+
+
+class CronIndex:
+    """Reads and writes the ``schedules`` rows that mirror task.json crons."""
+
+    async def sync_workspace(
+        self, workspace_id: str, crons: list[CronConfig], now: datetime,
+    ) -> int:
+        """Make the index match *crons*; returns the number of rows changed."""
+        from sqlalchemy import select
+
+        from lucy.db.models import Schedule
+        from lucy.db.session import db_session
+
+        ws_uuid = uuid.UUID(workspace_id)
+        key = shard_key(workspace_id)
+        changed = 0
+        async with db_session() as session:
+            rows = (await session.execute(
+                select(Schedule).where(
+                    Schedule.workspace_id == ws_uuid,
+                    Schedule.deleted_at.is_(None),
+                )
+            )).scalars().all()
+            by_name = {row.name: row for row in rows}
+
+            for cron in crons:
+                config = asdict(cron)
+                row = by_name.pop(cron.path, None)
+                if row is None:
+                    session.add(Schedule(
+                        workspace_id=ws_uuid,
+                        name=cron.path,
+                        description=cron.title,
+                        cron_expression=cron.cron,
+                        timezone=cron.timezone,
+                        intent_template=cron.description,
+                        config=config,
+                        is_active=True,
+                        next_run_at=next_fire(cron, now),
+                        shard_key=key,
+                    ))
+                    changed += 1
+                    continue
+                if row.shard_key != key:
+                    # Rows indexed before shard_key existed.
+                    row.shard_key = key
+                    changed += 1
+                if row.config == config and row.is_active:
+                    continue
+                retimed = (
+                    not row.is_active
+                    or row.cron_expression != cron.cron
+                    or row.timezone != cron.timezone
+                )
+                row.description = cron.title
+                row.cron_expression = cron.cron
+                row.timezone = cron.timezone
+                row.intent_template = cron.description
+                row.config = config
+                row.is_active = True
+                if retimed:
+                    row.next_run_at = next_fire(cron, now)
+                changed += 1
+
+            for row in by_name.values():
+                if row.is_active:
+                    row.is_active = False
+                    changed += 1
+
+        if changed:
+            logger.info("cron_index_synced", workspace_id=workspace_id, changed=changed)
+        return changed
+
+    async def due(self, now: datetime, limit: int = 500) -> list[DueCron]:
+        """Active crons whose next run has passed, for this shard only."""
+        from sqlalchemy import select
+
+        from lucy.crons.scheduler import CronConfig
+        from lucy.db.models import Schedule
+        from lucy.db.session import db_session
+
+        query = select(
+            Schedule.id, Schedule.workspace_id, Schedule.config, Schedule.next_run_at,
+        ).where(
+            Schedule.is_active.is_(True),
+            Schedule.deleted_at.is_(None),
+            Schedule.next_run_at <= now,
+        )
+        if settings.cron_shard_count > 1:
+            query = query.where(
+                Schedule.shard_key % settings.cron_shard_count == settings.cron_shard_index,
+            )
+        async with db_session() as session:
+            rows = (await session.execute(
+                query.order_by(Schedule.next_run_at).limit(limit)
+            )).all()
+
+        due: list[DueCron] = []
+        for schedule_id, ws_uuid, config, next_run_at in rows:
+            workspace_id = str(ws_uuid)
+            try:
+                cron = CronConfig(**config)
+            except TypeError as e:
+                logger.warning("cron_index_row_invalid", schedule_id=str(schedule_id), error=str(e))
+                continue
+            due.append(DueCron(schedule_id, workspace_id, cron, next_run_at))
+        return due
+
+    async def claim(
+        self, item: DueCron, new_next: datetime | None, now: datetime,
+    ) -> bool:
+        """Advance a due row; False if another scheduler already did."""
+        from sqlalchemy import update
+
+        from lucy.db.models import Schedule
+        from lucy.db.session import db_session
+
+        values: dict[str, Any] = {
+            "next_run_at": new_next,
+            "last_run_at": now,
+            "run_count": Schedule.run_count + 1,
+        }
+        if new_next is None:
+            values["is_active"] = False
+        async with db_session() as session:
+            result = await session.execute(
+                update(Schedule)
+                .where(
+                    Schedule.id == item.schedule_id,
+                    Schedule.next_run_at == item.next_run_at,
+                )
+                .values(**values)
+            )
+        return result.rowcount == 1
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# SINGLETON
+# ═══════════════════════════════════════════════════════════════════════════
+
+_index: CronIndex | None = None
+
+
+def get_cron_index() -> CronIndex:
+    """Get or create the singleton cron index."""
+    global _index
+    if _index is None:
+        _index = CronIndex()
+    return _index
@@ -6,6 +6,7 @@ agent run with the task description as the instruction.
 
 Capabilities:
 - Cron expression validation before scheduling
+- Bounded, per-workspace-fair execution via the dispatch queue (dispatch.py)
 - Per-job retry with exponential backoff
 - Slack notification on persistent failures
 - Timezone-aware scheduling
@@ -19,20 +20,29 @@ import json
 import re
 from dataclasses import dataclass
 from datetime import UTC, datetime
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 import structlog
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 
 from lucy.config import settings
+from lucy.crons.dispatch import build_dispatcher, set_cron_dispatcher
+from lucy.crons.history import FAILED, CronRun, append_execution_log, get_history_store
+from lucy.crons.index import get_cron_index, next_fire, owns_workspace
+from lucy.infra.admission import AdmissionRejectedError, Priority, agent_slot
 from lucy.workspace.filesystem import get_workspace
 
+if TYPE_CHECKING:
+    from lucy.core.task_queue import LeasedTask
+
 logger = structlog.get_logger()
 
 MAX_RETRIES = 2
 RETRY_DELAY_BASE = 30
 _MISFIRE_GRACE_TIME_S = 300
+# Task queue type for manual triggers handed to a standalone cron worker.
+CRON_TRIGGER_TASK = "cron_trigger"
 
 # Workspace directories are UUID v4 format: 8-4-4-4-12 hex chars
 _UUID_RE = re.compile(
@@ -178,6 +188,10 @@ class CronScheduler:
         # Populated lazily on first use. slack_sync only runs for this workspace.
         self._client_team_id: str = ""
         self._running = False
+        self.dispatcher = build_dispatcher(self._dispatch_cron)
+        # Crons last scheduled per workspace, for rescans in worker mode.
+        self._loaded_crons: dict[str, list[CronConfig]] = {}
+        self._discovery_task: asyncio.Task[None] | None = None
 
     def _on_job_missed(self, event: Any) -> None:
         logger.warning(
@@ -186,41 +200,47 @@ class CronScheduler:
             scheduled_run_time=str(event.scheduled_run_time),
         )
 
-    async def start(self) -> None:
-        """Discover all workspaces and schedule their crons."""
+    async def start(self, watch_workspaces: bool = False) -> None:
+        """Discover all workspaces and schedule their crons.
+
+        ``watch_workspaces`` periodically rescans task.json files; a
+        standalone worker needs it because crons are created and edited
+        from the Slack process.
+
+        With ``cron_index_enabled`` the scheduler starts immediately and
+        indexes this shard's workspaces in the background (see
+        ``lucy.crons.index``).
+        """
         base = settings.workspace_root
         if not base.is_dir():
             logger.info("no_workspace_root", path=str(base))
             return
 
         total_jobs = 0
-        for ws_dir in sorted(base.iterdir()):
-            if not ws_dir.is_dir():
-                continue
-            ws_id = ws_dir.name
-            # Only schedule crons for UUID-format workspace directories.
-            # Slack team IDs (T04...), test directories, and other stale
-            # artifacts are skipped to prevent spurious cron runs and
-            # false "workspace exists" hits from WorkspaceFS.
-            if not _is_valid_workspace_dir(ws_id):
-                logger.debug("scheduler_skipping_non_uuid_workspace", ws_id=ws_id)
-                continue
-            crons = await self._load_crons(ws_id)
-            for cron in crons:
-                try:
-                    self._schedule_cron(ws_id, cron)
-                    total_jobs += 1
-                except Exception as e:
-                    logger.error(
-                        "cron_schedule_failed",
-                        workspace_id=ws_id,
-                        cron_path=cron.path,
-                        error=str(e),
-                    )
+        if settings.cron_index_enabled:
+            self._schedule_index_sweep()
+            self._schedule_workspace_maintenance()
+            total_jobs += 3
+            self._discovery_task = asyncio.create_task(self._index_all_workspaces())
+        else:
+            discovered = await self._discover_crons(await self._owned_workspaces())
+            for ws_id, crons in discovered.items():
+                self._loaded_crons[ws_id] = crons
+                for cron in crons:
+                    try:
+                        self._schedule_cron(ws_id, cron)
+                        total_jobs += 1
+                    except Exception as e:
+                        logger.error(
+                            "cron_schedule_failed",
+                            workspace_id=ws_id,
+                            cron_path=cron.path,
+                            error=str(e),
+                        )
 
-            self._schedule_slack_sync(ws_id)
-            self._schedule_memory_consolidation(ws_id)
-            total_jobs += 2
+                self._schedule_slack_sync(ws_id)
+                self._schedule_memory_consolidation(ws_id)
+                total_jobs += 2
 
         self._schedule_humanize_pool_refresh()
         total_jobs += 1
@@ -228,9 +248,56 @@ class CronScheduler:
         self._schedule_heartbeat_loop()
         total_jobs += 1
 
+        if watch_workspaces:
+            self._schedule_workspace_rescan()
+            total_jobs += 1
+
+        set_cron_dispatcher(self.dispatcher)
         self.scheduler.start()
         self._running = True
-        logger.info("cron_scheduler_started", total_jobs=total_jobs)
+        logger.info(
+            "cron_scheduler_started",
+            total_jobs=total_jobs,
+            indexed=settings.cron_index_enabled,
+            shard=f"{settings.cron_shard_index}/{settings.cron_shard_count}",
+        )
+
+    async def _owned_workspaces(self) -> list[str]:
+        """Workspace ids under the workspace root that belong to this shard."""
+
+        def _scan() -> list[str]:
+            base = settings.workspace_root
+            if not base.is_dir():
+                return []
+            # Only UUID-format workspace directories are scheduled. Slack
+            # team IDs (T04...), test directories, and other stale artifacts
+            # are skipped to prevent spurious cron runs and false
+            # "workspace exists" hits from WorkspaceFS.
+            return [
+                d.name for d in sorted(base.iterdir())
+                if d.is_dir() and _is_valid_workspace_dir(d.name)
+            ]
+
+        return [ws_id for ws_id in await asyncio.to_thread(_scan) if owns_workspace(ws_id)]
+
+    async def _discover_crons(self, workspace_ids: list[str]) -> dict[str, list[CronConfig]]:
+        """Parse many workspaces' crons concurrently."""
+        sem = asyncio.Semaphore(max(1, settings.cron_discovery_concurrency))
+
+        async def _one(ws_id: str) -> list[CronConfig]:
+            async with sem:
+                return await self._load_crons(ws_id)
+
+        results = await asyncio.gather(
+            *(_one(ws_id) for ws_id in workspace_ids), return_exceptions=True,
+        )
+        discovered: dict[str, list[CronConfig]] = {}
+        for ws_id, result in zip(workspace_ids, results, strict=True):
+            if isinstance(result, BaseException):
+                logger.error("cron_discovery_failed", workspace_id=ws_id, error=str(result))
+                continue
+            discovered[ws_id] = result
+        return discovered
 
     async def stop(self) -> None:
         if self._running:
@@ -242,8 +309,17 @@ class CronScheduler:
                     "cron_scheduler_stopping_with_jobs",
                     pending_jobs=running_jobs[:20],
                 )
+            if self._discovery_task is not None:
+                self._discovery_task.cancel()
+                self._discovery_task = None
             self.scheduler.shutdown(wait=True)
             self._running = False
+            set_cron_dispatcher(None)
+            await self.dispatcher.stop()
+
+            from lucy.crons.heartbeat import close_http_client
+
+            await close_http_client()
             logger.info("cron_scheduler_stopped")
 
     async def reload_workspace(self, workspace_id: str) -> int:
@@ -251,12 +327,16 @@ class CronScheduler:
 
         Returns the number of crons loaded.
         """
+        if settings.cron_index_enabled:
+            return await self._sync_index(workspace_id)
+
         # Remove existing jobs for this workspace
         for job in self.scheduler.get_jobs():
             if job.id.startswith(f"{workspace_id}:"):
                 self.scheduler.remove_job(job.id)
 
         crons = await self._load_crons(workspace_id)
+        self._loaded_crons[workspace_id] = crons
         for cron in crons:
             try:
                 self._schedule_cron(workspace_id, cron)
@@ -279,20 +359,49 @@ class CronScheduler:
         return len(crons)
 
     async def trigger_now(self, workspace_id: str, cron_path: str) -> bool:
-        """Manually trigger a cron immediately (for testing)."""
+        """Manually trigger a cron now, without waiting for it to finish.
+
+        The run goes through the dispatch queue like a scheduled fire, so
+        it counts against the worker pool and workspace quota, and is
+        coalesced if that cron is already queued or running. With
+        ``cron_run_in_process`` off that queue lives in the cron worker, so
+        the trigger is handed to it through the task queue. Returns False
+        if no cron has that path.
+        """
         crons = await self._load_crons(workspace_id)
         target = next((c for c in crons if c.path == cron_path), None)
         if not target:
             return False
-        await self._run_cron(workspace_id, target)
+        if settings.cron_run_in_process:
+            self.dispatcher.submit(workspace_id, target)
+        else:
+            from lucy.core.task_queue import get_task_queue
+
+            await get_task_queue().enqueue(
+                workspace_id, CRON_TRIGGER_TASK, {"cron_path": cron_path}, max_attempts=1,
+            )
         return True
 
+    async def run_triggered(self, task: LeasedTask, slack_client: Any) -> None:
+        """Task queue handler for ``CRON_TRIGGER_TASK`` in the cron worker."""
+        crons = await self._load_crons(task.workspace_id)
+        cron_path = task.payload["cron_path"]
+        target = next((c for c in crons if c.path == cron_path), None)
+        if target is None:
+            logger.warning(
+                "cron_trigger_target_missing",
+                workspace_id=task.workspace_id,
+                cron_path=cron_path,
+            )
+            return
+        self.dispatcher.submit(task.workspace_id, target)
+
     def _schedule_cron(self, workspace_id: str, cron: CronConfig) -> None:
         """Schedule a single cron job with timezone support."""
         tz = cron.timezone if cron.timezone else None
         trigger = CronTrigger.from_crontab(cron.cron, timezone=tz)
         self.scheduler.add_job(
-            self._run_cron,
+            self._enqueue_cron,
             trigger=trigger,
             args=[workspace_id, cron],
             id=cron.job_id,
@@ -308,6 +417,14 @@ class CronScheduler:
             timezone=tz or "server",
         )
 
+    async def _enqueue_cron(self, workspace_id: str, cron: CronConfig) -> None:
+        """Trigger target: hand the run to the dispatch queue and return."""
+        self.dispatcher.submit(workspace_id, cron, spread=True)
+
+    async def _dispatch_cron(self, workspace_id: str, cron: CronConfig, attempt: int) -> None:
+        """Dispatcher target: run one attempt, re-queueing retries."""
+        await self._run_cron(workspace_id, cron, first_attempt=attempt, requeue=True)
+
     async def create_cron(
         self,
         workspace_id: str,
@@ -470,12 +587,15 @@ class CronScheduler:
             cron_dir = ws.root / "crons" / slug
 
         job_id = f"{workspace_id}:/{slug}"
-        try:
-            self.scheduler.remove_job(job_id)
-        except Exception as e:
-            logger.warning("cron_job_remove_failed", job_id=job_id, error=str(e))
+        if not settings.cron_index_enabled:
+            try:
+                self.scheduler.remove_job(job_id)
+            except Exception as e:
+                logger.warning("cron_job_remove_failed", job_id=job_id, error=str(e))
 
         shutil.rmtree(cron_dir, ignore_errors=True)
+        if settings.cron_index_enabled:
+            await self._sync_index(workspace_id)
         logger.info("cron_deleted", workspace_id=workspace_id, cron_name=slug)
         return {"success": True, "deleted": slug}
 
@@ -660,9 +780,69 @@ class CronScheduler:
                     entry["created_at"] = cron_cfg.created_at
                     if cron_cfg.timezone:
                         entry["timezone"] = cron_cfg.timezone
+                    try:
+                        runs = get_history_store().summary(
+                            get_workspace(job.args[0]), cron_cfg.path.strip("/")
+                        )
+                    except Exception as e:
+                        runs = None
+                        logger.warning("cron_history_summary_failed", error=str(e))
+                    if runs:
+                        entry.update(runs)
             jobs.append(entry)
+        if settings.cron_index_enabled:
+            jobs.extend(self._list_indexed_jobs())
         return jobs
 
+    async def list_workspace_jobs(self, workspace_id: str) -> list[dict[str, Any]]:
+        """``list_jobs``, or the workspace's crons if the scheduler runs elsewhere.
+
+        With ``cron_run_in_process`` off this process never starts the
+        scheduler, so the listing is built from the workspace's task.json
+        files and run history instead.
+        """
+        if self._running:
+            return self.list_jobs()
+        now = datetime.now(UTC)
+        return [self._cron_entry(workspace_id, cron, now)
+                for cron in await self._load_crons(workspace_id)]
+
+    def _list_indexed_jobs(self) -> list[dict[str, Any]]:
+        """``list_jobs`` entries for crons fired by the index sweep."""
+        now = datetime.now(UTC)
+        return [
+            self._cron_entry(ws_id, cron, now)
+            for ws_id, crons in self._loaded_crons.items()
+            for cron in crons
+        ]
+
+    def _cron_entry(self, workspace_id: str, cron: CronConfig, now: datetime) -> dict[str, Any]:
+        """A ``list_jobs`` entry computed from the cron's own schedule."""
+        try:
+            next_run = next_fire(cron, now)
+        except Exception:
+            next_run = None
+        entry: dict[str, Any] = {
+            "id": cron.job_id,
+            "name": cron.title,
+            "next_run": next_run.isoformat() if next_run else None,
+            "schedule": cron.cron,
+            "description": cron.description[:200],
+            "created_at": cron.created_at,
+        }
+        if cron.timezone:
+            entry["timezone"] = cron.timezone
+        try:
+            runs = get_history_store().summary(
+                get_workspace(workspace_id), cron.path.strip("/")
+            )
+        except Exception as e:
+            runs = None
+            logger.warning("cron_history_summary_failed", error=str(e))
+        if runs:
+            entry.update(runs)
+        return entry
+
     def _schedule_memory_consolidation(self, workspace_id: str) -> None:
         """Schedule periodic memory consolidation for a workspace.
 
@@ -758,6 +938,147 @@ class CronScheduler:
         except Exception as e:
             logger.warning("heartbeat_eval_failed", error=str(e))
 
+    def _schedule_workspace_rescan(self) -> None:
+        """Pick up cron files created or edited by another process."""
+        from apscheduler.triggers.interval import IntervalTrigger
+
+        try:
+            self.scheduler.add_job(
+                self._rescan_workspaces,
+                trigger=IntervalTrigger(seconds=settings.cron_worker_rescan_s),
+                id="_global:workspace_rescan",
+                name="Workspace cron rescan",
+                replace_existing=True,
+            )
+        except Exception as e:
+            logger.error("workspace_rescan_schedule_failed", error=str(e))
+
+    async def _rescan_workspaces(self) -> None:
+        """Reload every workspace whose task.json set has changed."""
+        for ws_id in await self._owned_workspaces():
+            try:
+                crons = await self._load_crons(ws_id)
+                if crons != self._loaded_crons.get(ws_id):
+                    await self.reload_workspace(ws_id)
+            except Exception as e:
+                logger.warning("workspace_rescan_failed", workspace_id=ws_id, error=str(e))
+
+    # ── Indexed mode ────────────────────────────────────────────────────
+
+    async def _index_all_workspaces(self) -> None:
+        """Background discovery: mirror this shard's crons into the index."""
+        try:
+            workspace_ids = await self._owned_workspaces()
+            sem = asyncio.Semaphore(max(1, settings.cron_discovery_concurrency))
+
+            async def _one(ws_id: str) -> None:
+                async with sem:
+                    try:
+                        await self._sync_index(ws_id)
+                    except Exception as e:
+                        logger.error("cron_index_sync_failed", workspace_id=ws_id, error=str(e))
+
+            await asyncio.gather(*(_one(ws_id) for ws_id in workspace_ids))
+            logger.info("cron_index_discovery_complete", workspaces=len(workspace_ids))
+        except Exception as e:
+            logger.error("cron_index_discovery_failed", error=str(e), exc_info=True)
+
+    async def _sync_index(self, workspace_id: str) -> int:
+        """Reload one workspace's task.json files into the cron index."""
+        crons = await self._load_crons(workspace_id)
+        await get_cron_index().sync_workspace(workspace_id, crons, datetime.now(UTC))
+        self._loaded_crons[workspace_id] = crons
+        logger.info(
+            "workspace_crons_reloaded",
+            workspace_id=workspace_id,
+            count=len(crons),
+            indexed=True,
+        )
+        return len(crons)
+
+    def _schedule_index_sweep(self) -> None:
+        """Fire due indexed crons every ``cron_index_sweep_s`` seconds."""
+        from apscheduler.triggers.interval import IntervalTrigger
+
+        try:
+            self.scheduler.add_job(
+                self._run_index_sweep,
+                trigger=IntervalTrigger(seconds=settings.cron_index_sweep_s),
+                id="_global:cron_index_sweep",
+                name="Cron index sweep",
+                replace_existing=True,
+            )
+        except Exception as e:
+            logger.error("cron_index_sweep_schedule_failed", error=str(e))
+
+    async def _run_index_sweep(self) -> None:
+        """Claim due rows in the cron index and queue their runs."""
+        index = get_cron_index()
+        now = datetime.now(UTC)
+        try:
+            due = await index.due(now)
+        except Exception as e:
+            logger.warning("cron_index_sweep_failed", error=str(e))
+            return
+
+        for item in due:
+            try:
+                new_next = next_fire(item.cron, now)
+                if not await index.claim(item, new_next, now):
+                    continue
+            except Exception as e:
+                logger.warning(
+                    "cron_index_claim_failed", job_id=item.cron.job_id, error=str(e),
+                )
+                continue
+            lateness = (now - item.next_run_at).total_seconds()
+            if lateness > _MISFIRE_GRACE_TIME_S:
+                # Same rule as APScheduler's misfire_grace_time: skip, don't
+                # replay, fires missed while no scheduler was running.
+                logger.warning(
+                    "cron_job_missed",
+                    job_id=item.cron.job_id,
+                    scheduled_run_time=item.next_run_at.isoformat(),
+                )
+                continue
+            self.dispatcher.submit(item.workspace_id, item.cron, spread=True)
+
+    def _schedule_workspace_maintenance(self) -> None:
+        """Shard-wide Slack sync and memory consolidation jobs.
+
+        Indexed mode replaces the two per-workspace jobs with one job each
+        that walks this shard's workspaces.
+        """
+        for func, crontab, job_id, name in (
+            (self._run_shard_slack_sync, "*/10 * * * *",
+             "_global:slack_sync", "Slack sync"),
+            (self._run_shard_memory_consolidation, "0 */6 * * *",
+             "_global:memory_consolidation", "Memory consolidation"),
+        ):
+            try:
+                self.scheduler.add_job(
+                    func,
+                    trigger=CronTrigger.from_crontab(crontab),
+                    id=job_id,
+                    name=name,
+                    replace_existing=True,
+                )
+            except Exception as e:
+                logger.error("maintenance_job_schedule_failed", job_id=job_id, error=str(e))
+
+    async def _run_shard_slack_sync(self) -> None:
+        for ws_id in await self._owned_workspaces():
+            await self._run_slack_sync(ws_id)
+
+    async def _run_shard_memory_consolidation(self) -> None:
+        sem = asyncio.Semaphore(max(1, settings.cron_discovery_concurrency))
+
+        async def _one(ws_id: str) -> None:
+            async with sem:
+                await self._run_memory_consolidation(ws_id)
+
+        await asyncio.gather(*(_one(ws_id) for ws_id in await self._owned_workspaces()))
+
     def _schedule_slack_sync(self, workspace_id: str) -> None:
         """Register the lightweight Slack message sync cron for a workspace."""
         job_id = f"{workspace_id}:_slack_sync"
@@ -851,6 +1172,10 @@ class CronScheduler:
 
     async def _load_crons(self, workspace_id: str) -> list[CronConfig]:
         """Load all task.json files from a workspace's crons/ directory."""
+        return await asyncio.to_thread(self._parse_crons, workspace_id)
+
+    def _parse_crons(self, workspace_id: str) -> list[CronConfig]:
+        """Blocking part of ``_load_crons``; runs in a worker thread."""
         ws = get_workspace(workspace_id)
         crons_dir = ws.root / "crons"
         if not crons_dir.is_dir():
@@ -1047,9 +1372,19 @@ class CronScheduler:
             return owner_id
         return None
 
-    async def _run_cron(self, workspace_id: str, cron: CronConfig) -> None:
+    async def _run_cron(
+        self,
+        workspace_id: str,
+        cron: CronConfig,
+        first_attempt: int = 1,
+        requeue: bool = False,
+    ) -> None:
         """Execute a cron job through the full Lucy agent pipeline or as a script.
 
+        ``first_attempt`` is the first attempt number to make. With ``requeue``
+        a retry goes back on the dispatch queue with its backoff delay
+        instead of sleeping here and holding a worker slot.
+
         Flow:
         0. Check condition script (if configured)
         1. Read LEARNINGS.md for accumulated context
@@ -1080,16 +1415,6 @@ class CronScheduler:
             dep_slug = cron.depends_on.lower().replace(" ", "-")
             dep_slug = "".join(c for c in dep_slug if c.isalnum() or c == "-")
             try:
-                dep_log = await ws.read_file(f"crons/{dep_slug}/execution.log")
-                if not dep_log:
-                    logger.info(
-                        "cron_dependency_not_met_no_log",
-                        workspace_id=workspace_id,
-                        cron_path=cron.path,
-                        depends_on=dep_slug,
-                    )
-                    return
-
                 import zoneinfo as _zi
 
                 cron_tz = UTC
@@ -1100,14 +1425,16 @@ class CronScheduler:
                         logger.warning(
                             "cron_timezone_parse_failed", timezone=cron.timezone, error=str(e)
                         )
-                today = datetime.now(cron_tz).strftime("%Y-%m-%d")
 
-                ran_today = False
-                for line in reversed(dep_log.splitlines()):
-                    if line.startswith("## ") and today in line:
-                        if "FAILED" not in line:
-                            ran_today = True
-                        break
+                ran_today = get_history_store().ran_today(ws, dep_slug, cron_tz)
+                if ran_today is None:
+                    logger.info(
+                        "cron_dependency_not_met_no_log",
+                        workspace_id=workspace_id,
+                        cron_path=cron.path,
+                        depends_on=dep_slug,
+                    )
+                    return
 
                 if not ran_today:
                     logger.info(
@@ -1157,30 +1484,17 @@ class CronScheduler:
                     path=str(script_path),
                 )
 
-        learnings = await ws.read_file(f"crons/{cron_dir_name}/LEARNINGS.md")
+        from lucy.crons.context import get_cron_context
 
-        company_ctx = await ws.read_file("company/SKILL.md") or ""
-        team_ctx = await ws.read_file("team/SKILL.md") or ""
+        cron_ctx = get_cron_context()
+        learnings = await cron_ctx.learnings(ws, cron_dir_name)
 
         now_utc = datetime.now(UTC).strftime("%Y-%m-%d %H:%M:%S UTC")
 
         global_context_parts = [f"Current Time: {now_utc}"]
-        if company_ctx.strip():
-            global_context_parts.append(f"\n[Company Context]\n{company_ctx.strip()}")
-        if team_ctx.strip():
-            global_context_parts.append(f"\n[Team Directory]\n{team_ctx.strip()}")
-
-        try:
-            from lucy.integrations.composio_client import get_composio_client
-
-            cclient = get_composio_client()
-            connected_apps = await cclient.get_connected_app_names_reliable(workspace_id)
-            if connected_apps:
-                global_context_parts.append(
-                    f"\n[Connected Integrations]\n{', '.join(connected_apps)}"
-                )
-        except Exception as e:
-            logger.debug("failed_to_inject_integrations", error=str(e))
+        workspace_block = await cron_ctx.workspace_context(ws)
+        if workspace_block:
+            global_context_parts.append(workspace_block)
 
         # For the heartbeat, inject proactive events and a channel activity summary.
         # This gives the heartbeat agent rich awareness of what has happened since
@@ -1202,13 +1516,12 @@ class CronScheduler:
                 logger.debug("proactive_events_inject_failed", error=str(e))
 
             try:
-                from lucy.workspace.slack_local_reader import (
-                    get_channel_summary,
-                    get_last_heartbeat_time,
-                )
+                from lucy.workspace.slack_local_reader import get_last_heartbeat_time
 
                 last_hb = await get_last_heartbeat_time(ws)
-                channel_summary_ctx = await get_channel_summary(ws, hours_back=1 if last_hb else 4)
+                channel_summary_ctx = await cron_ctx.channel_summary(
+                    ws, hours_back=1 if last_hb else 4
+                )
             except Exception as e:
                 logger.debug("channel_summary_inject_failed", error=str(e))
 
@@ -1225,7 +1538,7 @@ class CronScheduler:
         max_attempts = 1 if cron.type == "script" else (1 + cron.max_retries)
         delivery_target = await self._resolve_delivery_target_async(cron)
 
-        for attempt in range(1, max_attempts + 1):
+        for attempt in range(first_attempt, max_attempts + 1):
             try:
                 # --- Phase 1.2: Script vs Agent Execution ---
                 if cron.type == "script":
@@ -1276,11 +1589,21 @@ class CronScheduler:
                         user_slack_id=cron.requesting_user_id or None,
                         is_cron_execution=True,
                     )
-                    response = await agent.run(
-                        message=instruction,
-                        ctx=ctx,
-                        slack_client=self.slack_client,
-                    )
+                    try:
+                        async with agent_slot(Priority.CRON, workspace_id):
+                            response = await agent.run(
+                                message=instruction,
+                                ctx=ctx,
+                                slack_client=self.slack_client,
+                            )
+                    except AdmissionRejectedError as e:
+                        logger.warning(
+                            "cron_shed",
+                            workspace_id=workspace_id,
+                            cron_path=cron.path,
+                            waited_s=round(e.waited_s),
+                        )
+                        return
 
                 elapsed_ms = round((_time.monotonic() - t0) * 1000)
                 _upper = response.strip().upper() if response else ""
@@ -1331,20 +1654,14 @@ class CronScheduler:
                     log_entry += f" [succeeded on attempt {attempt}]"
                 log_entry += f"\n{(response or '')[:500]}\n"
 
-                log_path = f"crons/{cron_dir_name}/execution.log"
-                await ws.append_file(log_path, log_entry)
-
-                # Cap log size: keep the most recent MAX_LOG_BYTES bytes.
-                # Older runs are trimmed by removing lines from the beginning.
-                _MAX_LOG_BYTES = 32_768  # 32 KB per cron
-                existing_log = await ws.read_file(log_path) or ""
-                if len(existing_log) > _MAX_LOG_BYTES:
-                    # Find the first `## ` section header after the trim point and
-                    # discard everything before it so we keep complete entries.
-                    trim_target = existing_log[-(int(_MAX_LOG_BYTES * 0.75)) :]
-                    first_entry = trim_target.find("\n## ")
-                    trimmed_log = trim_target[first_entry:] if first_entry >= 0 else trim_target
-                    await ws.write_file(log_path, trimmed_log)
+                await append_execution_log(ws, cron_dir_name, log_entry)
+                await get_history_store().record(ws, cron_dir_name, CronRun(
+                    ts=now,
+                    status=status,
+                    elapsed_ms=elapsed_ms,
+                    attempt=attempt,
+                    preview=(response or "")[:500],
+                ))
 
                 from lucy.workspace.activity_log import log_activity
 
@@ -1427,6 +1744,11 @@ class CronScheduler:
                         delay_s=delay,
                         error_category=err_cls.category.value,
                     )
+                    if requeue:
+                        self.dispatcher.submit(
+                            workspace_id, cron, attempt=attempt + 1, delay_s=delay,
+                        )
+                        return
                     await asyncio.sleep(delay)
 
         elapsed_ms = round((_time.monotonic() - t0) * 1000)
@@ -1443,10 +1765,18 @@ class CronScheduler:
         )
 
         now = datetime.now(UTC).isoformat()
-        await ws.append_file(
-            f"crons/{cron_dir_name}/execution.log",
+        await append_execution_log(
+            ws,
+            cron_dir_name,
             f"\n## {now} -- FAILED after {max_attempts} attempts ({elapsed_ms}ms)\n{error_str[:300]}\n",  # noqa: E501
         )
+        await get_history_store().record(ws, cron_dir_name, CronRun(
+            ts=now,
+            status=FAILED,
+            elapsed_ms=elapsed_ms,
+            attempt=max_attempts,
+            error=error_str[:300],
+        ))
 
         if cron.notify_on_failure and self.slack_client:
             await self._notify_cron_failure(workspace_id, cron, error_str, max_attempts, elapsed_ms)
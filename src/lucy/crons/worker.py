@@ -0,0 +1,78 @@
+"""Standalone cron worker process.
+
+Runs the scheduler, dispatch queue and heartbeat loop without the Slack
+front end, so cron agent runs never share an event loop with interactive
+traffic. Start the front end with ``LUCY_CRON_RUN_IN_PROCESS=false`` and
+run alongside it:
+
+    python -m lucy.crons.worker
+
+Crons created or edited from Slack are picked up by the periodic
+workspace rescan (``cron_worker_rescan_s``). Manual triggers arrive
+through the task queue as ``cron_trigger`` tasks, which only this
+process leases.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import signal
+
+import structlog
+
+from lucy.config import settings
+
+logger = structlog.get_logger()
+
+
+async def run_worker() -> None:
+    """Run the cron scheduler until SIGTERM/SIGINT, then drain."""
+    from lucy.core.task_queue import build_task_worker, register_task_handler
+    from lucy.crons.scheduler import CRON_TRIGGER_TASK, get_scheduler
+    from lucy.db.session import close_db
+    from lucy.infra.budgets import get_budget_engine
+    from lucy.infra.costs import get_cost_recorder
+    from lucy.slack.transport import get_slack_transport
+
+    ssl_ctx = None
+    try:
+        import ssl
+
+        import certifi
+
+        ssl_ctx = ssl.create_default_context(cafile=certifi.where())
+    except ImportError:
+        pass
+
+    transport = get_slack_transport()
+    slack_client = transport.client(settings.slack_bot_token, background=True, ssl=ssl_ctx)
+    scheduler = get_scheduler(slack_client=slack_client)
+    await scheduler.start(watch_workspaces=True)
+    register_task_handler(CRON_TRIGGER_TASK, scheduler.run_triggered)
+    triggers = build_task_worker(slack_client, concurrency=1, task_types=[CRON_TRIGGER_TASK])
+    triggers.start()
+    logger.info("cron_worker_started", workers=settings.cron_workers)
+
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stopping.set)
+
+    try:
+        await stopping.wait()
+    finally:
+        logger.info("cron_worker_stopping", **scheduler.dispatcher.get_stats())
+        await triggers.stop()
+        await scheduler.stop()
+        await get_budget_engine().stop()
+        await get_cost_recorder().stop()
+        await transport.close()
+        await close_db()
+
+
+def main() -> None:
+    asyncio.run(run_worker())
+
+
+if __name__ == "__main__":
+    main()
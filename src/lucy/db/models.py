@@ -13,13 +13,15 @@ from __future__ import annotations
 
 import json
 import uuid
-from datetime import UTC, datetime
+from datetime import UTC, date, datetime
 from decimal import Decimal
 from enum import Enum
 from typing import Any
 
 from sqlalchemy import (
+    BigInteger,
     Boolean,
+    Date,
     DateTime,
     ForeignKey,
     Index,
@@ -721,6 +723,10 @@ class Schedule(Base):
         ForeignKey("tasks.id", ondelete="SET NULL"), nullable=True
     )
     next_run_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    shard_key: Mapped[int | None] = mapped_column(
+        BigInteger, nullable=True,
+        comment="Hash of workspace_id; the cron index sweep filters on shard_key % shard count",
+    )
 
     run_count: Mapped[int] = mapped_column(Integer, default=0)
     success_count: Mapped[int] = mapped_column(Integer, default=0)
@@ -741,6 +747,10 @@ class Heartbeat(Base):
     __tablename__ = "heartbeats"
     __table_args__ = (
         Index("ix_heartbeats_workspace_active", "workspace_id", "is_active"),
+        Index(
+            "ix_heartbeats_due", "next_check_at",
+            postgresql_where="is_active",
+        ),
         {"comment": "Condition-based monitoring"},
     )
 
@@ -796,6 +806,10 @@ class Heartbeat(Base):
 
     last_check_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
     last_check_result: Mapped[dict[str, Any] | None] = mapped_column(JSONB, nullable=True)
+    next_check_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True,
+        comment="When the evaluation loop should next check this monitor"
+    )
 
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
@@ -1012,6 +1026,14 @@ class CostLog(Base):
     # Usage
     input_tokens: Mapped[int | None] = mapped_column(Integer, nullable=True)
     output_tokens: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    cached_input_tokens: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0",
+        comment="Portion of input_tokens served from the provider prefix cache"
+    )
+    intent: Mapped[str | None] = mapped_column(
+        String(32), nullable=True,
+        comment="Router intent for LLM calls (chat|tool_use|code|...)"
+    )
 
     # Cost (USD)
     cost_usd: Mapped[Decimal] = mapped_column(Numeric(12, 6), nullable=False)
@@ -1034,6 +1056,42 @@ class CostLog(Base):
     )
 
 
+class CostDailyRollup(Base):
+    """Pre-aggregated daily spend per workspace and component.
+
+    Maintained incrementally by the cost recorder alongside ``cost_log``
+    inserts so budget checks read one row instead of summing the raw log.
+    """
+
+    __tablename__ = "cost_daily_rollups"
+    __table_args__ = (
+        UniqueConstraint("workspace_id", "day", "component", name="uix_cost_rollup_day"),
+        {"comment": "Per-workspace daily cost totals (incremental upserts)"},
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    workspace_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("workspaces.id", ondelete="CASCADE"), nullable=False
+    )
+    day: Mapped[date] = mapped_column(Date, nullable=False, comment="UTC day")
+    component: Mapped[str] = mapped_column(
+        String(50), nullable=False,
+        comment="llm_call|tool_execution|integration_api|sandbox"
+    )
+
+    calls: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    input_tokens: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    cached_input_tokens: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    output_tokens: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    cost_usd: Mapped[Decimal] = mapped_column(Numeric(14, 6), nullable=False, default=0)
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+
 class AuditLog(Base):
     """Immutable audit trail — partitioned by month."""
 
@@ -1386,11 +1444,20 @@ class AuthCode(Base):
 
 
 class BackgroundTask(Base):
-    """Persisted in-flight background work for restart recovery."""
+    """Persisted background work; also the durable task queue.
+
+    Workers lease queued rows with ``FOR UPDATE SKIP LOCKED`` and keep the
+    lease alive with heartbeats. A row whose lease expires is picked up
+    again by another worker, resuming from ``progress``.
+    """
 
     __tablename__ = "background_tasks"
     __table_args__ = (
         Index("ix_bg_tasks_workspace_status", "workspace_id", "status"),
+        Index(
+            "ix_bg_tasks_queue", "status", "available_at",
+            postgresql_where="status IN ('queued', 'running')",
+        ),
         {"comment": "Persisted background tasks for restart resilience"},
     )
 
@@ -1410,7 +1477,7 @@ class BackgroundTask(Base):
     )
     status: Mapped[str] = mapped_column(
         String(20), default="running", nullable=False,
-        comment="running|completed|interrupted|failed",
+        comment="queued|running|completed|interrupted|failed|cancelled",
     )
     slack_channel_id: Mapped[str | None] = mapped_column(
         String(32), nullable=True,
@@ -1425,3 +1492,39 @@ class BackgroundTask(Base):
         DateTime(timezone=True), nullable=True,
     )
     error: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    # Queue / leasing
+    available_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False,
+        comment="Earliest time a worker may lease this task (retry backoff)",
+    )
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    max_attempts: Mapped[int] = mapped_column(Integer, default=3, nullable=False)
+    leased_by: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    lease_expires_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True,
+    )
+    heartbeat_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True,
+    )
+    progress: Mapped[dict[str, Any]] = mapped_column(
+        JSONB, default=dict, nullable=False,
+        comment="Checkpoint written by the handler; passed back on resume",
+    )
+    result: Mapped[str | None] = mapped_column(Text, nullable=True)
+    cancel_requested: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+
+
+class CoordinationLease(Base):
+    """Expiring keys shared by app replicas: claims, locks and small cached values."""
+
+    __tablename__ = "coordination_leases"
+    __table_args__ = (
+        Index("ix_coordination_leases_expires", "expires_at"),
+        {"comment": "Cross-replica event claims and locks"},
+    )
+
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    owner: Mapped[str] = mapped_column(String(100), nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    value: Mapped[Any | None] = mapped_column(JSONB, nullable=True)
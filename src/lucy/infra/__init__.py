@@ -1,21 +1,37 @@
-"""Infrastructure utilities: rate limiting, tracing, circuit breaking."""
+"""Infrastructure utilities: rate limits, tracing, breakers, costs, budgets, locks, admission."""
 
 from __future__ import annotations
 
+from lucy.infra.admission import AdmissionController, Priority, get_admission_controller
+from lucy.infra.budgets import BudgetLevel, get_budget_engine
 from lucy.infra.circuit_breaker import (
     CircuitBreaker,
     CircuitOpenError,
     composio_breaker,
     openrouter_breaker,
 )
+from lucy.infra.concurrency import ShardedLockTable, TTLSet
+from lucy.infra.coordination import CoordinationBackend, get_coordination
+from lucy.infra.costs import CostRecorder, get_cost_recorder
 from lucy.infra.rate_limiter import get_rate_limiter
 from lucy.infra.trace import Trace
 
 __all__ = [
+    "AdmissionController",
+    "BudgetLevel",
     "CircuitBreaker",
     "CircuitOpenError",
+    "CoordinationBackend",
+    "CostRecorder",
+    "Priority",
+    "ShardedLockTable",
+    "TTLSet",
     "Trace",
     "composio_breaker",
+    "get_admission_controller",
+    "get_budget_engine",
+    "get_coordination",
+    "get_cost_recorder",
     "get_rate_limiter",
     "openrouter_breaker",
 ]
@@ -0,0 +1,294 @@
+"""Priority admission control for agent runs.
+
+Every agent run takes one of ``max_concurrent_agents`` slots. A plain
+FIFO semaphore let a "hi" queue behind long data exports and cron
+agents. Here waiters are grouped into priority classes, and a freed slot
+goes to:
+
+1. A class chosen by weighted stride scheduling. Each class advances its
+   pass by ``1 / weight`` per admission, and the lowest pass goes next.
+   Higher-weight classes get proportionally more slots, but no class
+   starves.
+2. Within that class, the waiter whose workspace currently holds the
+   fewest slots (oldest first on ties). One busy workspace cannot crowd
+   out the rest.
+
+``admission_reserved_slots`` slots are only handed to interactive
+classes, so quick chats always have headroom. Each class has a
+queue-time SLO. Breaches are counted. Classes with a shed threshold
+give up with ``AdmissionRejectedError`` once they have waited that long;
+the rest just keep waiting (deferred).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any
+
+import structlog
+
+from lucy.config import settings
+
+logger = structlog.get_logger()
+
+_current: ContextVar[Priority | None] = ContextVar("admission_priority", default=None)
+
+
+class Priority(str, Enum):
+    FAST = "fast"
+    INTERACTIVE = "interactive"
+    RESUME = "resume"
+    HEAVY = "heavy"
+    BACKGROUND = "background"
+    CRON = "cron"
+
+
+@dataclass(frozen=True)
+class ClassPolicy:
+    weight: int
+    slo_s: float
+    reserved: bool = False
+    shed_after_s: float | None = None
+
+
+def default_policies() -> dict[Priority, ClassPolicy]:
+    cron_shed = settings.admission_cron_shed_s or None
+    return {
+        Priority.FAST: ClassPolicy(weight=8, slo_s=2.0, reserved=True),
+        Priority.INTERACTIVE: ClassPolicy(weight=4, slo_s=10.0, reserved=True),
+        Priority.RESUME: ClassPolicy(weight=4, slo_s=10.0, reserved=True),
+        Priority.HEAVY: ClassPolicy(weight=2, slo_s=60.0),
+        Priority.BACKGROUND: ClassPolicy(weight=1, slo_s=300.0),
+        Priority.CRON: ClassPolicy(weight=1, slo_s=600.0, shed_after_s=cron_shed),
+    }
+
+
+_FAST_INTENTS = frozenset({"chat", "lookup", "confirmation", "followup"})
+_HEAVY_INTENTS = frozenset({"reasoning", "code", "data", "document"})
+
+
+def priority_for(intent: str = "", trigger: str = "message") -> Priority:
+    """Map a router intent and what triggered the run to a priority class.
+
+    ``trigger`` is ``"message"`` for a live Slack message, or one of
+    ``"background"``, ``"cron"``, ``"resume"``.
+    """
+    if trigger == "cron":
+        return Priority.CRON
+    if trigger == "background":
+        return Priority.BACKGROUND
+    if trigger == "resume":
+        return Priority.RESUME
+    if intent in _FAST_INTENTS:
+        return Priority.FAST
+    if intent in _HEAVY_INTENTS:
+        return Priority.HEAVY
+    return Priority.INTERACTIVE
+
+
+class AdmissionRejectedError(Exception):
+    """A waiter was shed after exceeding its class's queue-time limit."""
+
+    def __init__(self, priority: Priority, waited_s: float) -> None:
+        super().__init__(f"{priority.value} run shed after {waited_s:.0f}s in queue")
+        self.priority = priority
+        self.waited_s = waited_s
+
+
+@dataclass(slots=True)
+class _Waiter:
+    priority: Priority
+    workspace_id: str
+    seq: int
+    enqueued_at: float
+    future: asyncio.Future[None]
+
+
+@dataclass(slots=True)
+class _ClassStats:
+    admitted: int = 0
+    shed: int = 0
+    slo_breaches: int = 0
+    wait_total_s: float = 0.0
+    wait_max_s: float = 0.0
+
+
+class AdmissionController:
+    """Weighted, workspace-fair replacement for the agent semaphore."""
+
+    def __init__(
+        self,
+        capacity: int,
+        *,
+        reserved: int = 0,
+        policies: dict[Priority, ClassPolicy] | None = None,
+    ) -> None:
+        self.capacity = max(1, capacity)
+        self.reserved = max(0, min(reserved, self.capacity - 1))
+        self.policies = policies or default_policies()
+        self.in_use = 0
+        self._running: dict[str, int] = {}
+        self._queues: dict[Priority, list[_Waiter]] = {p: [] for p in self.policies}
+        self._pass: dict[Priority, float] = {p: 0.0 for p in self.policies}
+        self._vtime = 0.0
+        self._seq = itertools.count()
+        self._stats: dict[Priority, _ClassStats] = {p: _ClassStats() for p in self.policies}
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority, workspace_id: str = "") -> AsyncIterator[None]:
+        """Hold an agent slot for the duration of the block."""
+        await self.acquire(priority, workspace_id)
+        token = _current.set(priority)
+        try:
+            yield
+        finally:
+            _current.reset(token)
+            self.release(workspace_id)
+
+    async def acquire(self, priority: Priority, workspace_id: str = "") -> None:
+        now = time.monotonic()
+        if not self.queued and self._has_room(priority):
+            self._admit(priority, workspace_id, waited_s=0.0)
+            return
+
+        queue = self._queues[priority]
+        if not queue:
+            # A class that sat idle does not bank credit while away.
+            self._pass[priority] = max(self._pass[priority], self._vtime)
+        waiter = _Waiter(
+            priority, workspace_id, next(self._seq), now,
+            asyncio.get_running_loop().create_future(),
+        )
+        queue.append(waiter)
+        self._dispatch()
+
+        shed_after = self.policies[priority].shed_after_s
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout=shed_after)
+        except TimeoutError:
+            if waiter.future.done():
+                return
+            queue.remove(waiter)
+            waited = time.monotonic() - now
+            self._stats[priority].shed += 1
+            logger.warning(
+                "admission_shed",
+                priority=priority.value,
+                workspace_id=workspace_id,
+                waited_s=round(waited, 1),
+            )
+            raise AdmissionRejectedError(priority, waited) from None
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                self.release(workspace_id)
+            elif waiter in queue:
+                queue.remove(waiter)
+            raise
+
+    def release(self, workspace_id: str = "") -> None:
+        self.in_use -= 1
+        held = self._running.get(workspace_id, 0) - 1
+        if held > 0:
+            self._running[workspace_id] = held
+        else:
+            self._running.pop(workspace_id, None)
+        self._dispatch()
+
+    @property
+    def queued(self) -> int:
+        return sum(len(q) for q in self._queues.values())
+
+    def _has_room(self, priority: Priority) -> bool:
+        if self.policies[priority].reserved:
+            return self.in_use < self.capacity
+        return self.in_use < self.capacity - self.reserved
+
+    def _admit(self, priority: Priority, workspace_id: str, waited_s: float) -> None:
+        self.in_use += 1
+        self._running[workspace_id] = self._running.get(workspace_id, 0) + 1
+        stats = self._stats[priority]
+        stats.admitted += 1
+        stats.wait_total_s += waited_s
+        stats.wait_max_s = max(stats.wait_max_s, waited_s)
+        if waited_s > self.policies[priority].slo_s:
+            stats.slo_breaches += 1
+            logger.info(
+                "admission_slo_breach",
+                priority=priority.value,
+                workspace_id=workspace_id,
+                waited_s=round(waited_s, 1),
+            )
+
+    def _dispatch(self) -> None:
+        while self.in_use < self.capacity:
+            eligible = [p for p, q in self._queues.items() if q and self._has_room(p)]
+            if not eligible:
+                return
+            priority = min(eligible, key=lambda p: (self._pass[p], -self.policies[p].weight))
+            self._vtime = self._pass[priority]
+            self._pass[priority] += 1.0 / self.policies[priority].weight
+
+            queue = self._queues[priority]
+            waiter = min(queue, key=lambda w: (self._running.get(w.workspace_id, 0), w.seq))
+            queue.remove(waiter)
+            self._admit(
+                priority, waiter.workspace_id, waited_s=time.monotonic() - waiter.enqueued_at,
+            )
+            waiter.future.set_result(None)
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "capacity": self.capacity,
+            "reserved": self.reserved,
+            "in_use": self.in_use,
+            "queued": self.queued,
+            "classes": {
+                p.value: {
+                    "queued": len(self._queues[p]),
+                    "admitted": s.admitted,
+                    "shed": s.shed,
+                    "slo_breaches": s.slo_breaches,
+                    "wait_avg_s": round(s.wait_total_s / s.admitted, 3) if s.admitted else 0.0,
+                    "wait_max_s": round(s.wait_max_s, 3),
+                }
+                for p, s in self._stats.items()
+            },
+        }
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# SINGLETON
+# ═══════════════════════════════════════════════════════════════════════════
+
+_controller: AdmissionController | None = None
+
+
+def get_admission_controller() -> AdmissionController:
+    """Get or create the singleton AdmissionController."""
+    global _controller
+    if _controller is None:
+        _controller = AdmissionController(
+            settings.max_concurrent_agents, reserved=settings.admission_reserved_slots,
+        )
+    return _controller
+
+
+def current_priority() -> Priority | None:
+    """Priority of the agent slot the calling task runs under, if any.
+
+    Shared resources downstream (e.g. the Slack transport) use this to
+    keep cron and background runs from starving interactive replies.
+    """
+    return _current.get()
+
+
+def agent_slot(priority: Priority, workspace_id: str = "") -> Any:
+    """Shorthand for ``get_admission_controller().slot(...)``."""
+    return get_admission_controller().slot(priority, workspace_id)
@@ -0,0 +1,256 @@
+"""Daily LLM spend budgets per workspace and per user.
+
+The router consults this before every LLM call, so the check has to be
+O(1): spend lives in in-memory counters (one per workspace, one per
+workspace+user) that are charged as cost events are recorded.
+
+Counters only see this process. A background task therefore reconciles
+them every ``budget_reconcile_interval_s`` with ``cost_daily_rollups``,
+which the cost recorder keeps up to date from ``cost_log``. The larger
+of the two figures wins, so spend from other processes, or from before
+a restart, is never forgotten. The same pass loads per-workspace
+overrides from ``Workspace.settings`` (``llm_daily_budget_usd`` and
+``llm_daily_budget_tokens``). Per-user counters are in-memory only.
+With every default limit at 0 the pass still loads overrides, so a single
+workspace can be capped without a global default; it only skips the
+rollup query while no override exists either.
+
+Budgets never reject a request. Past ``budget_soft_ratio`` of a limit
+the level is ``SOFT`` and premium tiers step down to ``default``; past
+the limit it is ``EXHAUSTED`` and everything runs on ``fast``. See
+``pipeline.router.apply_budget``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from enum import IntEnum
+from typing import Any
+
+import structlog
+
+from lucy.config import settings
+
+logger = structlog.get_logger()
+
+
+class BudgetLevel(IntEnum):
+    OK = 0
+    SOFT = 1
+    EXHAUSTED = 2
+
+
+@dataclass(slots=True)
+class _Counter:
+    day: int
+    usd: float = 0.0
+    tokens: int = 0
+
+
+def _today() -> int:
+    return datetime.now(UTC).date().toordinal()
+
+
+class BudgetEngine:
+    """In-memory daily spend counters with periodic reconciliation."""
+
+    def __init__(
+        self,
+        *,
+        workspace_usd: float = 0.0,
+        workspace_tokens: int = 0,
+        user_usd: float = 0.0,
+        user_tokens: int = 0,
+        soft_ratio: float = 0.8,
+        reconcile_interval_s: float = 60.0,
+    ) -> None:
+        # A limit of 0 disables that dimension.
+        self._workspace_limits = (workspace_usd, workspace_tokens)
+        self._user_limits = (user_usd, user_tokens)
+        self._has_defaults = any((workspace_usd, workspace_tokens, user_usd, user_tokens))
+        self._soft_ratio = soft_ratio
+        self._reconcile_interval_s = reconcile_interval_s
+        self._workspaces: dict[str, _Counter] = {}
+        self._users: dict[tuple[str, str], _Counter] = {}
+        self._overrides: dict[str, tuple[float, int]] = {}
+        self._announced: dict[str, tuple[int, BudgetLevel]] = {}
+        self._task: asyncio.Task[None] | None = None
+
+    # ── Charging ────────────────────────────────────────────────────────
+
+    def charge(
+        self, workspace_id: str, user_id: str | None, *, usd: float, tokens: int,
+    ) -> None:
+        """Add one LLM call's spend to the workspace and user counters."""
+        today = _today()
+        _add(self._counter(self._workspaces, workspace_id, today), usd, tokens)
+        if user_id:
+            _add(self._counter(self._users, (workspace_id, user_id), today), usd, tokens)
+        self._ensure_reconciling()
+
+    @staticmethod
+    def _counter(table: dict[Any, _Counter], key: Any, today: int) -> _Counter:
+        counter = table.get(key)
+        if counter is None or counter.day != today:
+            counter = table[key] = _Counter(day=today)
+        return counter
+
+    # ── Checking ────────────────────────────────────────────────────────
+
+    def level(self, workspace_id: str, user_id: str | None = None) -> BudgetLevel:
+        """Current budget pressure for a workspace (and optionally a user)."""
+        self._ensure_reconciling()
+        today = _today()
+        ratio = _ratio(
+            self._workspaces.get(workspace_id), today,
+            self._overrides.get(workspace_id, self._workspace_limits),
+        )
+        if user_id:
+            ratio = max(ratio, _ratio(
+                self._users.get((workspace_id, user_id)), today, self._user_limits,
+            ))
+
+        if ratio >= 1.0:
+            level = BudgetLevel.EXHAUSTED
+        elif ratio >= self._soft_ratio:
+            level = BudgetLevel.SOFT
+        else:
+            return BudgetLevel.OK
+
+        if self._announced.get(workspace_id) != (today, level):
+            self._announced[workspace_id] = (today, level)
+            logger.warning(
+                "llm_budget_pressure",
+                workspace_id=workspace_id,
+                user_id=user_id,
+                level=level.name,
+                usage_ratio=round(ratio, 3),
+            )
+        return level
+
+    def spend(self, workspace_id: str) -> tuple[float, int]:
+        """Today's (usd, tokens) for a workspace as currently known."""
+        counter = self._workspaces.get(workspace_id)
+        if counter is None or counter.day != _today():
+            return 0.0, 0
+        return counter.usd, counter.tokens
+
+    # ── Reconciliation ──────────────────────────────────────────────────
+
+    def _ensure_reconciling(self) -> None:
+        if self._reconcile_interval_s <= 0:
+            return
+        if self._task is not None and not self._task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._task = loop.create_task(self._reconcile_loop())
+
+    async def _reconcile_loop(self) -> None:
+        while True:
+            try:
+                await self.reconcile()
+            except Exception as e:
+                logger.warning("llm_budget_reconcile_failed", error=str(e))
+            await asyncio.sleep(self._reconcile_interval_s)
+
+    async def reconcile(self) -> None:
+        """Pull today's totals and budget overrides from the database."""
+        from sqlalchemy import cast, select
+        from sqlalchemy.dialects.postgresql import JSONB, array
+
+        from lucy.db.models import CostDailyRollup, Workspace
+        from lucy.db.session import db_session
+
+        today = datetime.now(UTC).date()
+        async with db_session() as session:
+            overrides = await session.execute(
+                select(Workspace.id, Workspace.settings).where(
+                    cast(Workspace.settings, JSONB).has_any(
+                        array(["llm_daily_budget_usd", "llm_daily_budget_tokens"]),
+                    )
+                )
+            )
+            default_usd, default_tokens = self._workspace_limits
+            self.set_overrides({
+                str(ws): (
+                    float(ws_settings.get("llm_daily_budget_usd", default_usd)),
+                    int(ws_settings.get("llm_daily_budget_tokens", default_tokens)),
+                )
+                for ws, ws_settings in overrides
+            })
+            if not self._has_defaults and not self._overrides:
+                return
+            rollups = await session.execute(
+                select(
+                    CostDailyRollup.workspace_id,
+                    CostDailyRollup.cost_usd,
+                    CostDailyRollup.input_tokens + CostDailyRollup.output_tokens,
+                ).where(
+                    CostDailyRollup.day == today,
+                    CostDailyRollup.component == "llm_call",
+                )
+            )
+            totals = {str(ws): (float(usd), int(tok)) for ws, usd, tok in rollups}
+        self.absorb(totals)
+
+    def absorb(self, totals: dict[str, tuple[float, int]]) -> None:
+        """Raise counters to at least the persisted totals for today."""
+        today = _today()
+        for workspace_id, (usd, tokens) in totals.items():
+            counter = self._counter(self._workspaces, workspace_id, today)
+            counter.usd = max(counter.usd, usd)
+            counter.tokens = max(counter.tokens, tokens)
+
+    def set_overrides(self, overrides: dict[str, tuple[float, int]]) -> None:
+        self._overrides = overrides
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+def _add(counter: _Counter, usd: float, tokens: int) -> None:
+    counter.usd += usd
+    counter.tokens += tokens
+
+
+def _ratio(counter: _Counter | None, today: int, limits: tuple[float, int]) -> float:
+    if counter is None or counter.day != today:
+        return 0.0
+    usd_limit, token_limit = limits
+    ratio = counter.usd / usd_limit if usd_limit > 0 else 0.0
+    if token_limit > 0:
+        ratio = max(ratio, counter.tokens / token_limit)
+    return ratio
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# SINGLETON
+# ═══════════════════════════════════════════════════════════════════════════
+
+_engine: BudgetEngine | None = None
+
+
+def get_budget_engine() -> BudgetEngine:
+    """Get or create the singleton budget engine."""
+    global _engine
+    if _engine is None:
+        _engine = BudgetEngine(
+            workspace_usd=settings.budget_workspace_daily_usd,
+            workspace_tokens=settings.budget_workspace_daily_tokens,
+            user_usd=settings.budget_user_daily_usd,
+            user_tokens=settings.budget_user_daily_tokens,
+            soft_ratio=settings.budget_soft_ratio,
+            reconcile_interval_s=settings.budget_reconcile_interval_s,
+        )
+    return _engine
@@ -92,6 +92,14 @@ class CircuitBreaker:
                 cooldown_s=self.cooldown_seconds,
             )
 
+    def release_probe(self) -> None:
+        """Give back a HALF_OPEN probe slot without recording an outcome.
+
+        For callers that abandon a call for reasons unrelated to the
+        service's health (e.g. a cancelled race).
+        """
+        self._probe_in_flight = False
+
     def should_allow_request(self) -> bool:
         """Return True if the circuit is CLOSED or HALF_OPEN (probe).
 
@@ -0,0 +1,145 @@
+"""Concurrency primitives for the Slack event path.
+
+Every incoming message checks an event-dedup table and takes a per-thread
+lock. Both used to sit behind a single global ``asyncio.Lock`` and scan or
+rebuild their whole table on every event. The structures here keep that
+work flat as traffic grows:
+
+- ``TTLSet`` remembers keys for a fixed TTL. Entries live in insertion
+  order, which for a fixed TTL is also expiry order, so purging pops
+  from the front and only ever touches keys that actually expired.
+- ``ShardedLockTable`` hands out per-key ``asyncio.Lock``s. Keys are
+  hashed into shards; each shard expires idle locks with a time wheel,
+  so a lookup only inspects the bucket(s) whose time has come instead
+  of every lock in the table.
+
+Neither needs a lock of its own: get-or-create never awaits, so it is
+atomic on the event loop.
+
+Both are per process. Across replicas the handlers additionally claim
+events and threads through ``lucy.infra.coordination``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+
+class TTLSet:
+    """Keys remembered for ``ttl_s`` seconds, purged in expiry order."""
+
+    def __init__(self, ttl_s: float) -> None:
+        self.ttl_s = ttl_s
+        # key -> time added (monotonic). Oldest first.
+        self.entries: OrderedDict[str, float] = OrderedDict()
+
+    def add(self, key: str, now: float | None = None) -> bool:
+        """Remember *key*. Returns False if it was already present."""
+        now = time.monotonic() if now is None else now
+        self.purge(now)
+        if key in self.entries:
+            return False
+        self.entries[key] = now
+        return True
+
+    def purge(self, now: float | None = None) -> int:
+        """Drop expired keys; returns how many were dropped."""
+        now = time.monotonic() if now is None else now
+        entries = self.entries
+        dropped = 0
+        while entries:
+            key, added = next(iter(entries.items()))
+            if now - added < self.ttl_s:
+                break
+            entries.popitem(last=False)
+            dropped += 1
+        return dropped
+
+    def __contains__(self, key: object) -> bool:
+        added = self.entries.get(key)  # type: ignore[call-overload]
+        return added is not None and time.monotonic() - added < self.ttl_s
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+@dataclass(slots=True)
+class _LockEntry:
+    lock: asyncio.Lock
+    last_used: float
+
+
+class _LockShard:
+    """One shard of a ``ShardedLockTable``: locks plus their expiry wheel."""
+
+    def __init__(self, idle_ttl_s: float, tick_s: float) -> None:
+        self._idle_ttl_s = idle_ttl_s
+        self._tick_s = tick_s
+        self.locks: dict[str, _LockEntry] = {}
+        # Tick number -> keys that may expire at that tick. A key can sit in
+        # an earlier bucket than its real expiry; it is re-filed when seen.
+        self._wheel: dict[int, list[str]] = {}
+        self._cursor: int | None = None
+
+    def get(self, key: str, now: float) -> asyncio.Lock:
+        self._advance(now)
+        entry = self.locks.get(key)
+        if entry is None:
+            entry = self.locks[key] = _LockEntry(asyncio.Lock(), now)
+            self._file(key, now)
+        else:
+            # Refreshing last_used is enough: the old bucket re-files the key.
+            entry.last_used = now
+        return entry.lock
+
+    def _file(self, key: str, last_used: float) -> None:
+        tick = int((last_used + self._idle_ttl_s) // self._tick_s) + 1
+        self._wheel.setdefault(tick, []).append(key)
+
+    def _advance(self, now: float) -> None:
+        target = int(now // self._tick_s)
+        if self._cursor is None:
+            self._cursor = target
+            return
+        if target <= self._cursor:
+            return
+        if target - self._cursor <= len(self._wheel):
+            due = range(self._cursor + 1, target + 1)
+        else:
+            due = sorted(t for t in self._wheel if t <= target)  # type: ignore[assignment]
+        self._cursor = target
+        for tick in due:
+            for key in self._wheel.pop(tick, ()):
+                entry = self.locks.get(key)
+                if entry is None:
+                    continue
+                if entry.lock.locked() or now - entry.last_used < self._idle_ttl_s:
+                    self._file(key, max(entry.last_used, now - self._idle_ttl_s + self._tick_s))
+                else:
+                    del self.locks[key]
+
+
+class ShardedLockTable:
+    """Per-key asyncio locks, dropped after ``idle_ttl_s`` without use."""
+
+    def __init__(
+        self, *, shards: int = 16, idle_ttl_s: float = 300.0, wheel_slots: int = 30,
+    ) -> None:
+        tick_s = max(idle_ttl_s / max(1, wheel_slots), 0.001)
+        self._shards = [_LockShard(idle_ttl_s, tick_s) for _ in range(max(1, shards))]
+
+    def _shard(self, key: str) -> _LockShard:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=4).digest()
+        return self._shards[int.from_bytes(digest, "big") % len(self._shards)]
+
+    def get(self, key: str, now: float | None = None) -> asyncio.Lock:
+        """The lock for *key*, created on first use."""
+        now = time.monotonic() if now is None else now
+        return self._shard(key).get(key, now)
+
+    def __len__(self) -> int:
+        return sum(len(shard.locks) for shard in self._shards)
@@ -0,0 +1,439 @@
+"""Coordination state shared between Lucy app replicas.
+
+Event dedup, thread leases, the implicit-mention cooldown, pending HITL
+actions, connection watches, the internal LLM response cache and
+token-cache invalidation all go through one backend chosen by
+``settings.coordination_backend``:
+
+- ``"memory"`` (default): ``MemoryCoordination``. State is per process,
+  exactly as before; fine for a single app process.
+- ``"postgres"``: ``PostgresCoordination``. State lives in the
+  ``coordination_leases`` table and invalidations travel over
+  LISTEN/NOTIFY, so N replicas can sit behind one Slack app.
+
+The model is a set of expiring keys. Each key may carry a JSON value:
+
+- ``claim`` takes a key only if it is free or expired. Use it for
+  locks, once-only work and dedup.
+- ``put``/``get``/``take``/``scan``/``delete`` treat the keys as a small
+  TTL'd KV. ``take`` is an atomic read-and-delete, so exactly one
+  replica consumes an entry.
+- ``notify``/``listen`` broadcast a key on a topic. Replicas use it to
+  drop process-local caches.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import json
+import os
+import socket
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+import structlog
+
+from lucy.config import settings
+
+logger = structlog.get_logger()
+
+# Broadcast to every listener of a topic when missed notifications are
+# possible (listener reconnect): drop everything, not just one key.
+ALL_KEYS = "*"
+
+_NOTIFY_CHANNEL = "lucy_coordination"
+_PURGE_INTERVAL_S = 60.0
+_LISTEN_RETRY_S = 5.0
+
+
+class CoordinationBackend(ABC):
+    """Operations every backend provides. See the module docstring."""
+
+    shared = False
+
+    def __init__(self, owner: str | None = None) -> None:
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}"
+        self._listeners: dict[str, list[Callable[[str], None]]] = {}
+
+    @abstractmethod
+    async def claim(self, key: str, ttl_s: float, value: Any = None) -> bool:
+        """Take *key* for *ttl_s* seconds. False if it is held and unexpired."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def release(self, key: str) -> None:
+        """Give up a key this process claimed."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get(self, key: str) -> Any:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def put(self, key: str, value: Any, ttl_s: float) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def take(self, key: str) -> Any:
+        """Delete *key* and return its value. Only one caller gets it."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def scan(self, prefix: str) -> dict[str, Any]:
+        """All live keys starting with *prefix*, with their values."""
+        raise NotImplementedError
+
+    def listen(self, topic: str, callback: Callable[[str], None]) -> None:
+        """Call *callback(key)* whenever any replica notifies *topic*."""
+        self._listeners.setdefault(topic, []).append(callback)
+
+    @abstractmethod
+    async def notify(self, topic: str, key: str) -> None:
+        raise NotImplementedError
+
+    async def start(self) -> None:
+        """Start background work (the Postgres listener). Idempotent."""
+        return None
+
+    async def stop(self) -> None:
+        """Stop background work."""
+        return None
+
+    def _dispatch(self, topic: str, key: str) -> None:
+        for callback in self._listeners.get(topic, ()):
+            try:
+                callback(key)
+            except Exception as e:
+                logger.warning("coordination_listener_failed", topic=topic, error=str(e))
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# IN-MEMORY BACKEND
+# ═══════════════════════════════════════════════════════════════════════════
+
+
+@dataclass(slots=True)
+class _Entry:
+    value: Any
+    expires_at: float
+
+
+class MemoryCoordination(CoordinationBackend):
+    """Process-local backend. Expired keys are dropped via an expiry heap."""
+
+    def __init__(self, owner: str | None = None) -> None:
+        super().__init__(owner)
+        self.clock: Callable[[], float] = time.monotonic
+        self._entries: dict[str, _Entry] = {}
+        # (expires_at, key); stale pairs for re-put keys are skipped on pop.
+        self._expiry: list[tuple[float, str]] = []
+
+    def _live(self, key: str) -> _Entry | None:
+        now = self.clock()
+        self._purge(now)
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at <= now:
+            del self._entries[key]
+            return None
+        return entry
+
+    def _set(self, key: str, value: Any, ttl_s: float) -> None:
+        now = self.clock()
+        self._purge(now)
+        expires_at = now + ttl_s
+        self._entries[key] = _Entry(value, expires_at)
+        heapq.heappush(self._expiry, (expires_at, key))
+
+    def _purge(self, now: float) -> None:
+        expiry = self._expiry
+        while expiry and expiry[0][0] <= now:
+            _, key = heapq.heappop(expiry)
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= now:
+                del self._entries[key]
+
+    async def claim(self, key: str, ttl_s: float, value: Any = None) -> bool:
+        if self._live(key) is not None:
+            return False
+        self._set(key, value, ttl_s)
+        return True
+
+    async def release(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    async def exists(self, key: str) -> bool:
+        return self._live(key) is not None
+
+    async def get(self, key: str) -> Any:
+        entry = self._live(key)
+        return entry.value if entry else None
+
+    async def put(self, key: str, value: Any, ttl_s: float) -> None:
+        self._set(key, value, ttl_s)
+
+    async def take(self, key: str) -> Any:
+        entry = self._live(key)
+        if entry is None:
+            return None
+        del self._entries[key]
+        return entry.value
+
+    async def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    async def scan(self, prefix: str) -> dict[str, Any]:
+        self._purge(self.clock())
+        return {k: e.value for k, e in self._entries.items() if k.startswith(prefix)}
+
+    async def notify(self, topic: str, key: str) -> None:
+        self._dispatch(topic, key)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# POSTGRES BACKEND
+# ═══════════════════════════════════════════════════════════════════════════
+
+
+class PostgresCoordination(CoordinationBackend):
+    """Backend on the ``coordination_leases`` table, shared by all replicas.
+
+    Every write is a single statement, so claims and takes are atomic
+    without advisory locks or long transactions. Invalidations use
+    ``pg_notify`` on one channel; a dedicated asyncpg connection listens.
+    """
+
+    shared = True
+
+    def __init__(self, owner: str | None = None) -> None:
+        super().__init__(owner)
+        self._purged_at = 0.0
+        self._listener: asyncio.Task[None] | None = None
+
+    async def claim(self, key: str, ttl_s: float, value: Any = None) -> bool:
+        from sqlalchemy.dialects.postgresql import insert
+
+        from lucy.db.models import CoordinationLease
+        from lucy.db.session import db_session
+
+        now = datetime.now(UTC)
+        expires_at = now + timedelta(seconds=ttl_s)
+        stmt = insert(CoordinationLease).values(
+            key=key, owner=self.owner, expires_at=expires_at, value=value,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[CoordinationLease.key],
+            set_={"owner": self.owner, "expires_at": expires_at, "value": value},
+            where=CoordinationLease.expires_at < now,
+        ).returning(CoordinationLease.key)
+        async with db_session() as session:
+            claimed = (await session.execute(stmt)).scalar_one_or_none() is not None
+        await self._maybe_purge()
+        return claimed
+
+    async def release(self, key: str) -> None:
+        from sqlalchemy import delete
+
+        from lucy.db.models import CoordinationLease
+        from lucy.db.session import db_session
+
+        async with db_session() as session:
+            await session.execute(
+                delete(CoordinationLease).where(
+                    CoordinationLease.key == key,
+                    CoordinationLease.owner == self.owner,
+                )
+            )
+
+    async def exists(self, key: str) -> bool:
+        from sqlalchemy import select
+
+        from lucy.db.models import CoordinationLease
+        from lucy.db.session import db_session
+
+        async with db_session() as session:
+            row = await session.execute(
+                select(CoordinationLease.key).where(
+                    CoordinationLease.key == key,
+                    CoordinationLease.expires_at > datetime.now(UTC),
+                )
+            )
+            return row.scalar_one_or_none() is not None
+
+    async def get(self, key: str) -> Any:
+        from sqlalchemy import select
+
+        from lucy.db.models import CoordinationLease
+        from lucy.db.session import db_session
+
+        async with db_session() as session:
+            row = await session.execute(
+                select(CoordinationLease.value).where(
+                    CoordinationLease.key == key,
+                    CoordinationLease.expires_at > datetime.now(UTC),
+                )
+            )
+            return row.scalar_one_or_none()
+
+    async def put(self, key: str, value: Any, ttl_s: float) -> None:
+        from sqlalchemy.dialects.postgresql import insert
+
+        from lucy.db.models import CoordinationLease
+        from lucy.db.session import db_session
+
+        expires_at = datetime.now(UTC) + timedelta(seconds=ttl_s)
+        stmt = insert(CoordinationLease).values(
+            key=key, owner=self.owner, expires_at=expires_at, value=value,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[CoordinationLease.key],
+            set_={"owner": self.owner, "expires_at": expires_at, "value": value},
+        )
+        async with db_session() as session:
+            await session.execute(stmt)
+        await self._maybe_purge()
+
+    async def take(self, key: str) -> Any:
+        from sqlalchemy import delete
+
+        from lucy.db.models import CoordinationLease
+        from lucy.db.session import db_session
+
+        async with db_session() as session:
+            row = await session.execute(
+                delete(CoordinationLease)
+                .where(
+                    CoordinationLease.key == key,
+                    CoordinationLease.expires_at > datetime.now(UTC),
+                )
+                .returning(CoordinationLease.value)
+            )
+            return row.scalar_one_or_none()
+
+    async def delete(self, key: str) -> None:
+        from sqlalchemy import delete
+
+        from lucy.db.models import CoordinationLease
+        from lucy.db.session import db_session
+
+        async with db_session() as session:
+            await session.execute(delete(CoordinationLease).where(CoordinationLease.key == key))
+
+    async def scan(self, prefix: str) -> dict[str, Any]:
+        from sqlalchemy import select
+
+        from lucy.db.models import CoordinationLease
+        from lucy.db.session import db_session
+
+        async with db_session() as session:
+            rows = await session.execute(
+                select(CoordinationLease.key, CoordinationLease.value).where(
+                    CoordinationLease.key.startswith(prefix, autoescape=True),
+                    CoordinationLease.expires_at > datetime.now(UTC),
+                )
+            )
+            return {key: value for key, value in rows.all()}
+
+    async def notify(self, topic: str, key: str) -> None:
+        from sqlalchemy import func, select
+
+        from lucy.db.session import db_session
+
+        payload = json.dumps({"topic": topic, "key": key})
+        async with db_session() as session:
+            await session.execute(select(func.pg_notify(_NOTIFY_CHANNEL, payload)))
+
+    async def start(self) -> None:
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen_loop())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+
+    async def _listen_loop(self) -> None:
+        import asyncpg
+
+        dsn = settings.database_url.replace("postgresql+asyncpg://", "postgresql://", 1)
+        connected_before = False
+        while True:
+            try:
+                conn = await asyncpg.connect(dsn)
+                try:
+                    lost = asyncio.Event()
+                    conn.add_termination_listener(lambda _c: lost.set())
+                    await conn.add_listener(_NOTIFY_CHANNEL, self._on_notify)
+                    if connected_before:
+                        # Anything sent while we were away is lost: flush.
+                        for topic in list(self._listeners):
+                            self._dispatch(topic, ALL_KEYS)
+                    connected_before = True
+                    logger.info("coordination_listener_connected")
+                    await lost.wait()
+                finally:
+                    await conn.close()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("coordination_listener_failed", error=str(e))
+            await asyncio.sleep(_LISTEN_RETRY_S)
+
+    def _on_notify(self, _conn: Any, _pid: int, _channel: str, payload: str) -> None:
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            return
+        self._dispatch(message.get("topic", ""), message.get("key", ""))
+
+    async def _maybe_purge(self) -> None:
+        now = time.monotonic()
+        if now - self._purged_at < _PURGE_INTERVAL_S:
+            return
+        self._purged_at = now
+
+        from sqlalchemy import delete
+
+        from lucy.db.models import CoordinationLease
+        from lucy.db.session import db_session
+
+        try:
+            async with db_session() as session:
+                await session.execute(
+                    delete(CoordinationLease).where(
+                        CoordinationLease.expires_at < datetime.now(UTC),
+                    )
+                )
+        except Exception as e:
+            logger.warning("coordination_purge_failed", error=str(e))
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# SINGLETON
+# ═══════════════════════════════════════════════════════════════════════════
+
+_backend: CoordinationBackend | None = None
+
+
+def get_coordination() -> CoordinationBackend:
+    """Get or create the singleton coordination backend."""
+    global _backend
+    if _backend is None:
+        if settings.coordination_backend == "postgres":
+            _backend = PostgresCoordination()
+        else:
+            _backend = MemoryCoordination()
+    return _backend
@@ -0,0 +1,381 @@
+"""Batched cost accounting into ``cost_log``.
+
+Every LLM call, Composio call and sandbox run becomes one ``CostLog``
+row. Writing those inline would put a database round-trip on the agent's
+hot path, so callers hand events to a ``CostRecorder`` instead:
+
+- ``record()`` is synchronous and never blocks. Events go into a bounded
+  in-memory queue; when it is full the event is dropped and counted
+  (``dropped``) — losing a cost row beats stalling an agent turn.
+- A background task drains the queue and writes a batch whenever
+  ``cost_flush_rows`` events are waiting or ``cost_flush_interval_ms``
+  has passed, as one multi-row ``INSERT``.
+- The same transaction upserts ``cost_daily_rollups`` (workspace, day,
+  component) with the batch totals, so budget checks read a single row
+  instead of summing the raw log.
+
+Prices come from ``_MODEL_PRICES`` (USD per million tokens, matched by
+model prefix). When OpenRouter reports the billed ``cost`` in the usage
+block, that figure wins.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import UTC, date, datetime
+from decimal import Decimal
+from typing import Any
+
+import structlog
+
+from lucy.config import settings
+from lucy.infra.budgets import get_budget_engine
+
+logger = structlog.get_logger()
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# PRICE TABLE
+# ═══════════════════════════════════════════════════════════════════════════
+# USD per million tokens: (input, cached input, output). Longest matching
+# prefix wins. Only used when the provider does not report the cost.
+
+_MODEL_PRICES: dict[str, tuple[float, float, float]] = {
+    "minimax/minimax-m2": (0.30, 0.03, 1.10),
+    "google/gemini-2.5-flash": (0.30, 0.075, 2.50),
+    "google/gemini-2.5-pro": (1.25, 0.31, 10.00),
+    "google/gemini-3-flash": (0.50, 0.05, 3.00),
+    "google/gemini-3.1-pro": (2.00, 0.20, 12.00),
+    "anthropic/claude-sonnet": (3.00, 0.30, 15.00),
+    "anthropic/claude-opus": (15.00, 1.50, 75.00),
+    "anthropic/claude-haiku": (1.00, 0.10, 5.00),
+    "openai/gpt-5": (1.25, 0.125, 10.00),
+    "deepseek/": (0.28, 0.028, 0.42),
+    "_default": (1.00, 0.10, 4.00),
+}
+
+# Flat per-call / per-second prices for non-LLM components.
+_COMPOSIO_CALL_USD = Decimal("0")
+_SANDBOX_SECOND_USD: dict[str, Decimal] = {
+    "composio": Decimal("0.00005"),
+    "openclaw": Decimal("0"),
+    "local": Decimal("0"),
+}
+
+_MICRO = Decimal("0.000001")
+
+
+def _model_price(model: str) -> tuple[float, float, float]:
+    best = ""
+    for prefix in _MODEL_PRICES:
+        if prefix != "_default" and model.startswith(prefix) and len(prefix) > len(best):
+            best = prefix
+    return _MODEL_PRICES[best or "_default"]
+
+
+def price_llm_call(
+    model: str, prompt_tokens: int, cached_tokens: int, completion_tokens: int,
+) -> Decimal:
+    """Estimated USD cost of one LLM call from the price table."""
+    inp, cached, out = _model_price(model)
+    usd = (
+        (prompt_tokens - cached_tokens) * inp
+        + cached_tokens * cached
+        + completion_tokens * out
+    ) / 1_000_000
+    return Decimal(str(usd)).quantize(_MICRO)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# RECORDER
+# ═══════════════════════════════════════════════════════════════════════════
+
+
+@dataclass(slots=True)
+class CostEvent:
+    """One billable call, ready to become a ``cost_log`` row."""
+
+    workspace_id: uuid.UUID
+    component: str
+    provider: str
+    cost_usd: Decimal
+    model: str | None = None
+    intent: str | None = None
+    input_tokens: int | None = None
+    output_tokens: int | None = None
+    cached_input_tokens: int = 0
+    metadata: dict[str, Any] = field(default_factory=dict)
+    created_at: datetime = field(default_factory=lambda: datetime.now(UTC))
+
+    def row(self) -> dict[str, Any]:
+        return {
+            "id": uuid.uuid4(),
+            "workspace_id": self.workspace_id,
+            "component": self.component,
+            "provider": self.provider,
+            "model": self.model,
+            "intent": self.intent,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cached_input_tokens": self.cached_input_tokens,
+            "cost_usd": self.cost_usd,
+            "request_metadata": self.metadata,
+            "year_month": self.created_at.strftime("%Y-%m"),
+            "created_at": self.created_at,
+        }
+
+
+def rollup(events: list[CostEvent]) -> list[dict[str, Any]]:
+    """Aggregate a batch into (workspace, day, component) rollup deltas."""
+    totals: dict[tuple[uuid.UUID, date, str], list[Any]] = defaultdict(
+        lambda: [0, 0, 0, 0, Decimal(0)],
+    )
+    for ev in events:
+        t = totals[(ev.workspace_id, ev.created_at.date(), ev.component)]
+        t[0] += 1
+        t[1] += ev.input_tokens or 0
+        t[2] += ev.cached_input_tokens
+        t[3] += ev.output_tokens or 0
+        t[4] += ev.cost_usd
+    return [
+        {
+            "id": uuid.uuid4(), "workspace_id": ws, "day": day, "component": component,
+            "calls": t[0], "input_tokens": t[1], "cached_input_tokens": t[2],
+            "output_tokens": t[3], "cost_usd": t[4],
+        }
+        for (ws, day, component), t in totals.items()
+    ]
+
+
+class CostRecorder:
+    """Bounded queue of cost events drained into batched inserts."""
+
+    def __init__(
+        self,
+        *,
+        max_queue: int = 10_000,
+        batch_rows: int = 200,
+        flush_interval_s: float = 0.5,
+    ) -> None:
+        self._queue: asyncio.Queue[CostEvent] = asyncio.Queue(maxsize=max_queue)
+        self._batch_rows = batch_rows
+        self._flush_interval_s = flush_interval_s
+        self._task: asyncio.Task[None] | None = None
+        self._batch_ready = asyncio.Event()
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+
+    # ── Producers ───────────────────────────────────────────────────────
+
+    def record(self, event: CostEvent) -> bool:
+        """Queue an event without blocking. Returns False if it was dropped."""
+        if not settings.cost_recording_enabled:
+            return False
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                logger.warning("cost_event_dropped", dropped=self.dropped)
+            return False
+        if self._queue.qsize() >= self._batch_rows:
+            self._batch_ready.set()
+        self._ensure_running()
+        return True
+
+    def record_llm_call(
+        self,
+        *,
+        workspace_id: str,
+        model: str,
+        intent: str | None,
+        usage: dict[str, Any],
+        cached_tokens: int = 0,
+        user_id: str | None = None,
+        metadata: dict[str, Any] | None = None,
+    ) -> bool:
+        """Record an LLM call from an OpenAI-style usage block.
+
+        Also charges the call to the workspace/user spend budgets.
+        """
+        prompt = int(usage.get("prompt_tokens") or 0)
+        completion = int(usage.get("completion_tokens") or 0)
+        reported = usage.get("cost")
+        cost = (
+            Decimal(str(reported)).quantize(_MICRO)
+            if isinstance(reported, (int, float)) and not isinstance(reported, bool)
+            else price_llm_call(model, prompt, cached_tokens, completion)
+        )
+        get_budget_engine().charge(
+            workspace_id, user_id, usd=float(cost), tokens=prompt + completion,
+        )
+
+        ws = _workspace_uuid(workspace_id)
+        if ws is None:
+            return False
+        if user_id:
+            metadata = {**(metadata or {}), "user_id": user_id}
+        return self.record(CostEvent(
+            workspace_id=ws,
+            component="llm_call",
+            provider="openrouter",
+            cost_usd=cost,
+            model=model,
+            intent=intent,
+            input_tokens=prompt,
+            output_tokens=completion,
+            cached_input_tokens=cached_tokens,
+            metadata=metadata or {},
+        ))
+
+    def record_integration_call(
+        self, *, workspace_id: str, provider: str, tool: str,
+    ) -> bool:
+        """Record one external integration call (Composio, custom wrappers)."""
+        ws = _workspace_uuid(workspace_id)
+        if ws is None:
+            return False
+        return self.record(CostEvent(
+            workspace_id=ws,
+            component="integration_api",
+            provider=provider,
+            cost_usd=_COMPOSIO_CALL_USD if provider == "composio" else Decimal(0),
+            metadata={"tool": tool},
+        ))
+
+    def record_sandbox_run(
+        self, *, workspace_id: str, provider: str, elapsed_ms: int, method: str,
+    ) -> bool:
+        """Record one code execution, billed per second of wall time."""
+        ws = _workspace_uuid(workspace_id)
+        if ws is None:
+            return False
+        per_second = _SANDBOX_SECOND_USD.get(provider, Decimal(0))
+        return self.record(CostEvent(
+            workspace_id=ws,
+            component="sandbox",
+            provider=provider,
+            cost_usd=(per_second * elapsed_ms / 1000).quantize(_MICRO),
+            metadata={"method": method, "elapsed_ms": elapsed_ms},
+        ))
+
+    # ── Drain loop ──────────────────────────────────────────────────────
+
+    def _ensure_running(self) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._task = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            first = await self._queue.get()
+            try:
+                if self._queue.qsize() + 1 < self._batch_rows:
+                    # asyncio.wait (unlike wait_for) never swallows our own
+                    # cancellation when the event fires at the same moment.
+                    self._batch_ready.clear()
+                    waiter = asyncio.ensure_future(self._batch_ready.wait())
+                    try:
+                        await asyncio.wait([waiter], timeout=self._flush_interval_s)
+                    finally:
+                        waiter.cancel()
+            except asyncio.CancelledError:
+                self._queue.put_nowait(first)
+                raise
+            await self._flush([first, *self._take(self._batch_rows - 1)])
+
+    def _take(self, limit: int) -> list[CostEvent]:
+        batch: list[CostEvent] = []
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return batch
+
+    async def _flush(self, batch: list[CostEvent]) -> None:
+        try:
+            await self._write(batch)
+            self.written += len(batch)
+        except Exception as e:
+            self.failed += len(batch)
+            logger.warning("cost_flush_failed", rows=len(batch), error=str(e))
+
+    async def _write(self, batch: list[CostEvent]) -> None:
+        from sqlalchemy import insert
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+        from lucy.db.models import CostDailyRollup, CostLog
+        from lucy.db.session import db_session
+
+        stmt = pg_insert(CostDailyRollup).values(rollup(batch))
+        totals = CostDailyRollup.__table__.c
+        stmt = stmt.on_conflict_do_update(
+            constraint="uix_cost_rollup_day",
+            set_={
+                name: totals[name] + stmt.excluded[name]
+                for name in (
+                    "calls", "input_tokens", "cached_input_tokens",
+                    "output_tokens", "cost_usd",
+                )
+            } | {"updated_at": datetime.now(UTC)},
+        )
+        async with db_session() as session:
+            await session.execute(insert(CostLog).values([ev.row() for ev in batch]))
+            await session.execute(stmt)
+
+    async def stop(self) -> None:
+        """Stop the drain task and write whatever is still queued."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        while batch := self._take(self._batch_rows):
+            await self._flush(batch)
+
+    def get_stats(self) -> dict[str, int]:
+        return {
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+
+def _workspace_uuid(workspace_id: str) -> uuid.UUID | None:
+    # Some paths fall back to the Slack team id when the workspace row is
+    # unknown; those calls cannot be attributed in cost_log.
+    try:
+        return uuid.UUID(str(workspace_id))
+    except ValueError:
+        return None
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# SINGLETON
+# ═══════════════════════════════════════════════════════════════════════════
+
+_recorder: CostRecorder | None = None
+
+
+def get_cost_recorder() -> CostRecorder:
+    """Get or create the singleton cost recorder."""
+    global _recorder
+    if _recorder is None:
+        _recorder = CostRecorder(
+            max_queue=settings.cost_queue_max,
+            batch_rows=settings.cost_flush_rows,
+            flush_interval_s=settings.cost_flush_interval_ms / 1000,
+        )
+    return _recorder
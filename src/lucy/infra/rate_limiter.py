@@ -63,10 +63,14 @@ class TokenBucket:
         )
         self._last_refill = now
 
-    async def acquire(self, tokens: float = 1.0, timeout: float = 30.0) -> bool:
+    async def acquire(
+        self, tokens: float = 1.0, timeout: float = 30.0, reserve: float = 0.0,
+    ) -> bool:
         """Try to acquire tokens. Returns True if acquired, False if timed out.
 
         If not enough tokens, waits until they're available (up to timeout).
+        ``reserve`` tokens must stay in the bucket after this acquire, so
+        low-priority callers leave headroom for everyone else.
         """
         deadline = time.monotonic() + timeout
 
@@ -74,12 +78,12 @@ class TokenBucket:
             while True:
                 self._refill()
 
-                if self._tokens >= tokens:
+                if self._tokens - reserve >= tokens:
                     self._tokens -= tokens
                     return True
 
                 # Calculate wait time
-                needed = tokens - self._tokens
+                needed = tokens + reserve - self._tokens
                 wait_time = needed / self.rate
 
                 # Check if we'd exceed timeout
@@ -95,7 +99,9 @@ class TokenBucket:
         await asyncio.sleep(min(wait_time, remaining))
 
         # Re-acquire lock and try again (recursive)
-        return await self.acquire(tokens, timeout=max(0, deadline - time.monotonic()))
+        return await self.acquire(
+            tokens, timeout=max(0, deadline - time.monotonic()), reserve=reserve,
+        )
 
     @property
     def available_tokens(self) -> float:
@@ -31,6 +31,7 @@ from tenacity import (
 
 from lucy.config import settings
 from lucy.infra.circuit_breaker import composio_breaker
+from lucy.infra.costs import get_cost_recorder
 
 logger = structlog.get_logger()
 
@@ -412,6 +413,9 @@ class ComposioClient:
                 tool=tool_name,
                 workspace_id=workspace_id,
             )
+            get_cost_recorder().record_integration_call(
+                workspace_id=workspace_id, provider="composio", tool=tool_name,
+            )
 
             # --- Architectural Auto-Repair for MANAGE_CONNECTIONS ---
             if tool_name == "COMPOSIO_MANAGE_CONNECTIONS" and isinstance(result, dict):
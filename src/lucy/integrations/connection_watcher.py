@@ -3,6 +3,9 @@
 When Lucy sends an auth URL to the user, this module polls Composio until
 the connection becomes ACTIVE, then proactively notifies the user in-thread
 and re-triggers the original task.
+
+Each watch is claimed in the coordination backend, so with several app
+replicas only one polls a given connection and a thread is resumed once.
 """
 
 from __future__ import annotations
@@ -14,6 +17,7 @@ from typing import Any
 import structlog
 
 from lucy.config import settings
+from lucy.infra.coordination import get_coordination
 
 logger = structlog.get_logger()
 
@@ -21,6 +25,10 @@ POLL_INTERVAL_SECONDS = settings.connection_poll_interval_s
 MAX_POLL_DURATION_SECONDS = settings.connection_poll_max_duration_s
 MAX_CONCURRENT_WATCHES = settings.connection_max_concurrent_watches
 
+# How long a thread stays marked as resumed, so late sibling watches
+# don't re-run the original request.
+_RESUMED_TTL_S = 86_400.0
+
 
 @dataclass
 class PendingConnection:
@@ -37,8 +45,6 @@ class PendingConnection:
 
 _active_watches: dict[str, asyncio.Task[None]] = {}
 _background_tasks: set[asyncio.Task[None]] = set()
-_resume_locks: dict[str, asyncio.Lock] = {}
-_resumed_threads: set[str] = set()
 
 
 def start_watching(
@@ -105,6 +111,29 @@ async def _poll_until_connected(
     watch_key: str,
 ) -> None:
     """Poll Composio every few seconds until the connection becomes ACTIVE."""
+    coord = get_coordination()
+    claimed = await coord.claim(
+        f"watch:{watch_key}",
+        MAX_POLL_DURATION_SECONDS + POLL_INTERVAL_SECONDS * 2,
+        value={"display_name": pending.display_name},
+    )
+    if not claimed:
+        logger.debug("connection_watch_owned_elsewhere", key=watch_key)
+        return
+    try:
+        await _poll_loop(pending, say_fn, slack_client)
+    finally:
+        try:
+            await coord.release(f"watch:{watch_key}")
+        except Exception as e:
+            logger.debug("connection_watch_release_failed", key=watch_key, error=str(e))
+
+
+async def _poll_loop(
+    pending: PendingConnection,
+    say_fn: Any,
+    slack_client: Any | None,
+) -> None:
     from lucy.integrations.composio_client import get_composio_client
 
     client = get_composio_client()
@@ -212,7 +241,7 @@ async def _handle_connection_success(
             error=str(exc),
         )
 
-    others_pending = _get_sibling_watches(pending)
+    others_pending = await _get_sibling_watches(pending)
 
     if others_pending:
         names = ", ".join(others_pending)
@@ -234,34 +263,23 @@ async def _handle_connection_success(
 
     if not others_pending:
         thread_key = f"{pending.workspace_id}:{pending.thread_ts}"
-        if thread_key not in _resume_locks:
-            _resume_locks[thread_key] = asyncio.Lock()
-
-        async with _resume_locks[thread_key]:
-            if thread_key in _resumed_threads:
-                return
-            _resumed_threads.add(thread_key)
+        if not await get_coordination().claim(f"resumed:{thread_key}", _RESUMED_TTL_S):
+            return
 
         await _resume_original_task(pending, say_fn, slack_client)
 
 
-def _get_sibling_watches(pending: PendingConnection) -> list[str]:
+async def _get_sibling_watches(pending: PendingConnection) -> list[str]:
     """Return display names of other active watches in the same thread."""
-    prefix = f"{pending.workspace_id}:"
+    prefix = f"watch:{pending.workspace_id}:"
     suffix = f":{pending.thread_ts}"
-    own_key = f"{pending.workspace_id}:{pending.toolkit_slug}:{pending.thread_ts}"
-    siblings: list[str] = []
-    for key, task in _active_watches.items():
-        if key == own_key or task.done():
-            continue
-        if key.startswith(prefix) and key.endswith(suffix):
-            slug = key.removeprefix(prefix).removesuffix(suffix)
-            from lucy.integrations.composio_client import ComposioClient
-            display = ComposioClient._SLUG_DISPLAY_NAMES.get(
-                slug, slug.replace("_", " ").title(),
-            )
-            siblings.append(display)
-    return siblings
+    own_key = f"{prefix}{pending.toolkit_slug}{suffix}"
+    watches = await get_coordination().scan(prefix)
+    return [
+        (value or {}).get("display_name", "")
+        for key, value in sorted(watches.items())
+        if key != own_key and key.endswith(suffix)
+    ]
 
 
 async def _resume_original_task(
@@ -294,11 +312,14 @@ async def _resume_original_task(
             f"is available. Do NOT ask for authorization again."
         )
 
-        response_text = await agent.run(
-            message=resume_msg,
-            ctx=ctx,
-            slack_client=slack_client,
-        )
+        from lucy.infra.admission import Priority, agent_slot
+
+        async with agent_slot(Priority.RESUME, pending.workspace_id):
+            response_text = await agent.run(
+                message=resume_msg,
+                ctx=ctx,
+                slack_client=slack_client,
+            )
 
         if response_text and response_text.strip():
             from lucy.pipeline.output import process_output
@@ -10,13 +10,14 @@ from lucy.pipeline.edge_cases import (
 from lucy.pipeline.fast_path import FastPathResult, evaluate_fast_path
 from lucy.pipeline.humanize import humanize, pick, refresh_pools
 from lucy.pipeline.output import process_output, process_output_sync
-from lucy.pipeline.prompt import build_system_prompt
+from lucy.pipeline.prompt import build_system_prompt, build_system_prompt_parts
 from lucy.pipeline.router import MODEL_TIERS, classify_and_route
 
 __all__ = [
     "MODEL_TIERS",
     "FastPathResult",
     "build_system_prompt",
+    "build_system_prompt_parts",
     "classify_and_route",
     "evaluate_fast_path",
     "humanize",
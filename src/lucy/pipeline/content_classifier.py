@@ -11,14 +11,21 @@ Internal content includes:
 
 Uses structural markers (XML tags, section boundaries) AND semantic
 patterns to avoid false positives on legitimate user content.
+
+Meta and full-line patterns are prefiltered per response with
+``RuleSet.live`` (pipeline/rules.py), so paragraphs are only searched for
+the patterns whose literals occur somewhere in the text.
 """
 
 from __future__ import annotations
 
 import re
+from collections.abc import Sequence
 
 import structlog
 
+from lucy.pipeline.rules import RuleSet
+
 logger = structlog.get_logger()
 
 
@@ -62,6 +69,12 @@ _INTERNAL_XML_BLOCK_RE = re.compile(
     re.DOTALL | re.IGNORECASE,
 )
 
+# Opening tag only; used to hold back streamed text inside an unfinished block
+_OPEN_INTERNAL_TAG_RE = re.compile(
+    r"<(" + "|".join(re.escape(t) for t in _INTERNAL_XML_TAGS) + r")(?:\s[^>]*)?>",
+    re.IGNORECASE,
+)
+
 # Match stray opening/closing tags that weren't properly paired
 _STRAY_INTERNAL_TAG_RE = re.compile(
     r"</?(" + "|".join(re.escape(t) for t in _INTERNAL_XML_TAGS) + r")(?:\s[^>]*)?>",
@@ -154,15 +167,28 @@ _FULL_LINE_INTERNAL_RE: list[re.Pattern[str]] = [
     re.compile(r"^\s*Remember,\s+(?:the user|I should).+$", re.IGNORECASE | re.MULTILINE),
 ]
 
+_META_RULES = RuleSet(_META_PATTERNS)
+_FULL_LINE_RULES = RuleSet((pattern, None) for pattern in _FULL_LINE_INTERNAL_RE)
+# All full-line patterns share the same flags, so one alternation checks a line.
+_FULL_LINE_INTERNAL_ANY = re.compile(
+    "|".join(f"(?:{p.pattern})" for p in _FULL_LINE_INTERNAL_RE),
+    re.IGNORECASE | re.MULTILINE,
+)
+
 
 # ═══════════════════════════════════════════════════════════════════════
 # PARAGRAPH-LEVEL CLASSIFIER
 # ═══════════════════════════════════════════════════════════════════════
 
 
-def _is_internal_paragraph(paragraph: str) -> tuple[bool, str]:
+def _is_internal_paragraph(
+    paragraph: str, candidates: Sequence[int] | None = None,
+) -> tuple[bool, str]:
     """Check if a paragraph is internal content.
 
+    ``candidates`` limits the meta patterns checked to those indices of
+    ``_META_PATTERNS`` (from ``_META_RULES.live``); None checks them all.
+
     Returns (is_internal, reason).
     """
     stripped = paragraph.strip()
@@ -181,26 +207,25 @@ def _is_internal_paragraph(paragraph: str) -> tuple[bool, str]:
             return True, "stray_internal_tag"
 
     # Check meta-referential patterns
-    for pattern, reason in _META_PATTERNS:
-        if pattern.search(stripped):
-            # Be careful: only flag if the paragraph is predominantly meta.
-            # A paragraph that starts with user content and mentions
-            # "the original response" in passing should not be stripped.
-            # Heuristic: if the pattern match is in the first 100 chars,
-            # it's likely the paragraph IS the meta content.
-            match = pattern.search(stripped)
-            if match and match.start() < 100:
-                return True, reason
+    if candidates is None:
+        candidates = range(len(_META_PATTERNS))
+    for i in candidates:
+        pattern, reason = _META_PATTERNS[i]
+        # Be careful: only flag if the paragraph is predominantly meta.
+        # A paragraph that starts with user content and mentions
+        # "the original response" in passing should not be stripped.
+        # Heuristic: if the pattern match is in the first 100 chars,
+        # it's likely the paragraph IS the meta content.
+        match = pattern.search(stripped)
+        if match and match.start() < 100:
+            return True, reason
 
     return False, ""
 
 
 def _is_internal_line(line: str) -> bool:
     """Check if a single line is internal content."""
-    for pattern in _FULL_LINE_INTERNAL_RE:
-        if pattern.match(line):
-            return True
-    return False
+    return _FULL_LINE_INTERNAL_ANY.match(line) is not None
 
 
 # ═══════════════════════════════════════════════════════════════════════
@@ -225,14 +250,16 @@ def strip_internal_content(text: str) -> str:
     cleaned = _STRAY_INTERNAL_TAG_RE.sub("", cleaned)
 
     # Step 3: Remove full internal lines
-    lines = cleaned.split("\n")
-    kept_lines: list[str] = []
-    for line in lines:
-        if not _is_internal_line(line):
-            kept_lines.append(line)
-    cleaned = "\n".join(kept_lines)
+    if _FULL_LINE_RULES.live(cleaned):
+        lines = cleaned.split("\n")
+        kept_lines: list[str] = []
+        for line in lines:
+            if not _is_internal_line(line):
+                kept_lines.append(line)
+        cleaned = "\n".join(kept_lines)
 
     # Step 4: Classify remaining paragraphs and strip internal ones
+    live = _META_RULES.live(cleaned)
     paragraphs = re.split(r"(\n\n+)", cleaned)
     kept_parts: list[str] = []
     for part in paragraphs:
@@ -244,7 +271,7 @@ def strip_internal_content(text: str) -> str:
             kept_parts.append(part)
             continue
 
-        is_internal, reason = _is_internal_paragraph(part)
+        is_internal, reason = _is_internal_paragraph(part, live)
         if not is_internal:
             kept_parts.append(part)
 
@@ -260,6 +287,15 @@ def strip_internal_content(text: str) -> str:
     return result
 
 
+def has_unclosed_internal_block(text: str) -> bool:
+    """True if ``text`` opens an internal XML block it doesn't close yet.
+
+    Streaming callers hold text back until the block ends, so the whole
+    block is stripped instead of leaking its first paragraphs.
+    """
+    return bool(_OPEN_INTERNAL_TAG_RE.search(_INTERNAL_XML_BLOCK_RE.sub("", text)))
+
+
 def _clean_artifacts(text: str) -> str:
     """Clean up leftover artifacts from content stripping.
 
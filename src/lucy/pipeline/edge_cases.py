@@ -65,6 +65,7 @@ async def format_task_status(
     try:
         from lucy.core.task_manager import TaskState, get_task_manager
         tm = get_task_manager()
+        await tm.refresh()
         tasks = tm.get_workspace_tasks(workspace_id)
 
         active = [
@@ -101,6 +102,7 @@ async def handle_task_cancellation(
     try:
         from lucy.core.task_manager import TaskState, get_task_manager
         tm = get_task_manager()
+        await tm.refresh()
         tasks = tm.get_workspace_tasks(workspace_id)
 
         active = [
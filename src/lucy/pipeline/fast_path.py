@@ -26,11 +26,11 @@ What does NOT qualify:
 
 from __future__ import annotations
 
-import re
 from dataclasses import dataclass
 
 import structlog
 
+from lucy.pipeline.features import Feature, extract_features
 from lucy.pipeline.humanize import pick
 
 logger = structlog.get_logger()
@@ -44,57 +44,6 @@ class FastPathResult:
     reason: str = ""
 
 
-# ═══════════════════════════════════════════════════════════════════════════
-# FAST PATH PATTERNS
-# ═══════════════════════════════════════════════════════════════════════════
-
-_GREETING_RE = re.compile(
-    r"^(?:hi|hey|hello|yo|hiya|sup|what'?s up|howdy|good (?:morning|afternoon|evening))"
-    r"(?:\s+(?:lucy|there|everyone|team))?"
-    r"[!.\s]*$",
-    re.IGNORECASE,
-)
-
-_CONVERSATIONAL_GREETING_RE = re.compile(
-    r"^(?:hi|hey|hello|yo|hiya|sup|howdy|good (?:morning|afternoon|evening))"
-    r"(?:\s+\w+)?[!,.]?\s+"
-    r"(?:how(?:'s| is| are) (?:it going|things|you|everything|you doing|life).*|"
-    r"what'?s (?:up|new|good|happening|going on).*|"
-    r"how(?:'s| is) (?:your|the) (?:day|morning|afternoon|evening|night|weekend).*|"
-    r"hope (?:you'?re|all is|everything'?s?).*|"
-    r"nice to (?:see|meet|hear|chat).*)"
-    r"[!?.\s]*$",
-    re.IGNORECASE,
-)
-
-_STATUS_RE = re.compile(
-    r"^(?:are you (?:there|online|up|available|awake)\??|"
-    r"you (?:there|up|online|around)\??|"
-    r"ping|status|alive\??)"
-    r"[!.\s]*$",
-    re.IGNORECASE,
-)
-
-_HELP_RE = re.compile(
-    r"^(?:help|what can you do\??|what do you do\??|"
-    r"how do you work\??|what are you\??|who are you\??|"
-    r"tell me about yourself.*|introduce yourself.*|"
-    r"who is lucy\??|what is lucy\??)"
-    r"[!.\s]*$",
-    re.IGNORECASE,
-)
-
-_ALIVE_RE = re.compile(
-    r"^(?:(?:can you|do you) hear me\??|"
-    r"are you (?:alive|working|listening|there|awake|up)\??|"
-    r"(?:quick )?test.*|testing.*|"
-    r"just (?:checking|testing).*|"
-    r"(?:say |respond with )?(?:hello|hi|hey)\s*(?:back)?[!.\s]*)"
-    r"[!?.\s]*$",
-    re.IGNORECASE,
-)
-
-
 # ═══════════════════════════════════════════════════════════════════════════
 # FAST PATH EVALUATION
 # ═══════════════════════════════════════════════════════════════════════════
@@ -107,14 +56,16 @@ def evaluate_fast_path(
     """Evaluate whether a message can be handled without the full agent loop.
 
     Responses come from LLM-generated pools (pre-warmed at startup).
-    If pools aren't ready yet, falls back to sensible defaults.
+    If pools aren't ready yet, falls back to sensible defaults. The
+    patterns are matched once per message in pipeline/features.py.
     """
     text = message.strip()
 
     if has_thread_context and thread_depth > 0:
         return FastPathResult(is_fast=False, response=None, reason="in_thread")
 
-    if _GREETING_RE.match(text) or _CONVERSATIONAL_GREETING_RE.match(text):
+    features = extract_features(text)
+    if Feature.FAST_GREETING in features or Feature.CONVERSATIONAL_GREETING in features:
         response = pick("greeting")
         logger.info("fast_path_match", pattern="greeting", message=text[:50])
         return FastPathResult(is_fast=True, response=response, reason="greeting")
@@ -131,17 +82,17 @@ def evaluate_fast_path(
     if len(text) > 80:
         return FastPathResult(is_fast=False, response=None, reason="too_long")
 
-    if _STATUS_RE.match(text):
+    if Feature.STATUS in features:
         response = pick("status")
         logger.info("fast_path_match", pattern="status", message=text[:50])
         return FastPathResult(is_fast=True, response=response, reason="status")
 
-    if _HELP_RE.match(text):
+    if Feature.HELP in features:
         response = pick("help")
         logger.info("fast_path_match", pattern="help", message=text[:50])
         return FastPathResult(is_fast=True, response=response, reason="help")
 
-    if _ALIVE_RE.match(text):
+    if Feature.ALIVE in features:
         response = pick("status")
         logger.info("fast_path_match", pattern="alive_check", message=text[:50])
         return FastPathResult(is_fast=True, response=response, reason="alive_check")
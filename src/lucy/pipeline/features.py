@@ -0,0 +1,615 @@
+"""Shared message features for routing, fast path, reactions, skills and memory.
+
+Every incoming message used to be run through five separate regex chains.
+The router, the fast path, the reaction picker, skill detection and
+``should_persist_memory`` each scanned the same text on their own, and
+together they made well over a hundred regex passes.
+
+``extract_features`` now computes every pattern's verdict once, as a
+``MessageFeatures`` bitset, and each consumer reads the bits it needs.
+The decision logic (ordering, length cut-offs, thread depth) stays in the
+consumers. The patterns live here.
+
+The scan reuses the output pipeline's literal prefilter (pipeline/rules.py).
+The text is case-folded once, and a pattern only runs if one of its
+required literals occurs in the text. A typical message runs about 7 of
+the ~100 patterns. Results are memoized per message text, since the
+handler, router and memory paths all classify the same message.
+
+tests/fixtures/message_corpus.jsonl holds labelled messages.
+scripts/bench_routing.py reports routing accuracy and per-message
+latency over that corpus.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from enum import IntFlag, auto
+from functools import lru_cache
+
+from lucy.pipeline.rules import fold, ignores_case, required_literals
+
+
+class Feature(IntFlag):
+    """One bit per message pattern."""
+
+    # Router
+    GREETING = auto()
+    SIMPLE_QUESTION = auto()
+    ACTION_VERB = auto()
+    MONITORING = auto()
+    CHECK = auto()
+    DATA_SOURCE = auto()
+    DOCUMENT = auto()
+    DATA_TASK = auto()
+    RESEARCH_HEAVY = auto()
+    RESEARCH_LIGHT = auto()
+    CODE = auto()
+    # Fast path
+    FAST_GREETING = auto()
+    CONVERSATIONAL_GREETING = auto()
+    STATUS = auto()
+    HELP = auto()
+    ALIVE = auto()
+    # Reactions
+    REACT_THANKS = auto()
+    REACT_ACK = auto()
+    REACT_APPROVAL = auto()
+    REACT_URGENT = auto()
+    REACT_PROBLEM = auto()
+    REACT_QUESTION = auto()
+    REACT_BUILD = auto()
+    REACT_ANALYSIS = auto()
+    REACT_SHIP = auto()
+    REACT_FYI = auto()
+    # Memory
+    QUESTION_OPENING = auto()
+    REMEMBER = auto()
+    PREFERENCE = auto()
+    DECISION = auto()
+    PROJECT = auto()
+    TEAM = auto()
+    COMPANY = auto()
+    HYPOTHETICAL = auto()
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# ROUTER
+# ═══════════════════════════════════════════════════════════════════════════
+
+_CODE_KEYWORDS = re.compile(
+    r"\b(code|deploy|script|function|debug|refactor|implement|"
+    r"write a? ?program|create a? ?app|build [\w ]* ?app|make [\w ]* ?app|"
+    r"lambda|api endpoint|pull request|"
+    # regex is an unambiguous coding concept
+    r"regex|"
+    # dockerfile and ci/cd are unambiguous devops/coding terms
+    r"dockerfile|ci/cd|"
+    # 'package' only when clearly code-related (install/npm/pip context)
+    r"npm package|pip package|install package|"
+    # Removed 'pipeline' — too ambiguous: "sales pipeline", "data pipeline",
+    # "onboarding pipeline" are business questions, not coding tasks.
+    # Removed 'class' — too broad: "class of customer", "first-class", "class action".
+    # Removed 'algorithm' — "what algorithm does Google use?" is research, not coding.
+    # Removed 'module' — "which module handles invoicing?" is a lookup, not coding.
+    r"write the algorithm|implement the algorithm|code the algorithm)\b",
+    re.IGNORECASE,
+)
+
+_RESEARCH_LIGHT = re.compile(
+    r"\b(research|analyze|compare|strategy|competitor|"
+    r"market|pricing model|evaluation|"
+    r"investigate|audit|benchmark|"
+    r"tell me about|summarize|overview|what do you know)\b",
+    re.IGNORECASE,
+)
+
+_RESEARCH_HEAVY = re.compile(
+    r"\b(deep dive|deep analysis|comprehensive|thorough|investigate|audit|"
+    r"benchmark|detailed analysis|competitive analysis|full report|"
+    r"in[- ]depth|exhaustive|complete analysis)\b",
+    re.IGNORECASE,
+)
+
+_GREETING_PATTERNS = re.compile(
+    r"^(hi|hey|hello|yo|sup|thanks|thank you|ok|okay|got it|"
+    r"sounds good|perfect|great|cool|nice|yes|no|yep|nope|sure)"
+    r"(\s+(there|lucy|everyone|all|team))*\s*[!.?]*$",
+    re.IGNORECASE,
+)
+
+_SIMPLE_QUESTION = re.compile(
+    r"^(what|when|where|who|how|is|are|do|does|can|will)\b.{0,60}\??\s*$",
+    re.IGNORECASE,
+)
+
+_ACTION_VERBS = re.compile(
+    r"\b(do|send|run|execute|delete|cancel|merge|deploy|schedule|create|update|remove|build|push)\b",
+    re.IGNORECASE,
+)
+
+_MONITORING_KEYWORDS = re.compile(
+    r"(?:"
+    r"(?:inform|alert|notify|tell|ping|warn)\s+me\s+(?:when|if|as\s+soon\s+as|whenever)"
+    r"|(?:keep|start)\s+(?:monitoring|tracking|watching|checking)"
+    r"|long[- ]running\s+task"
+    r"|(?:monitor|watch|track)\s+(?:for\s+)?(?:changes?|drops?|spikes?|issues?|errors?|performance)"
+    r"|as\s+soon\s+as\s+(?:something|anything|it|there)"
+    r"|real[- ]?time\s+(?:alert|monitor|notification|tracking)"
+    r"|heartbeat\s+(?:for|on|to|check|monitor)"
+    r"|(?:set\s+up|create|configure|build)\s+(?:a\s+|an\s+)?(?:monitor|alert|watch|heartbeat|notification)"
+    r"|continuously\s+(?:monitor|check|track|watch)"
+    r"|(?:daily|weekly|hourly|every\s+\d+\s+(?:min|hour|day))\s+(?:report|check|update|summary)"
+    r"|(?:goes?\s+live|back\s+in\s+stock|becomes?\s+available)"
+    r"|(?:drops?\s+below|goes?\s+(?:above|over|under))"
+    r")",
+    re.IGNORECASE,
+)
+
+_CHECK_PATTERNS = re.compile(
+    r"\b(check|verify|look|find|search|pull|get|fetch|show|list)\b",
+    re.IGNORECASE,
+)
+
+_DATA_SOURCE_KEYWORDS = re.compile(
+    r"\b(calendar|email|emails|gmail|inbox|unread|schedule|meeting|meetings|"
+    r"slack|github|issues?|pull requests?|commits?|notion|sheets?|"
+    r"spreadsheet|jira|linear|trello|drive|news|latest|"
+    r"integrations?|connected|connections?)\b",
+    re.IGNORECASE,
+)
+
+_DOCUMENT_KEYWORDS = re.compile(
+    r"\b(pdf|report|document|spreadsheet|excel|csv|"
+    r"create a (?:report|pdf|document|spreadsheet))\b",
+    re.IGNORECASE,
+)
+
+_DATA_TASK_KEYWORDS = re.compile(
+    r"\b(all (?:\w+ )?(?:users?|customers?|data|records?|subscribers?|members?)|"
+    r"export|bulk|every (?:user|customer|record|subscriber|member)|"
+    r"complete (?:list|report|export|data|breakdown)|"
+    r"raw data|user ?base|multi[- ]sheet|detailed analysis|"
+    r"full (?:report|list|export|breakdown|data)|"
+    r"conversion rate|signups? (?:by|per|over)|"
+    r"(?:pull|get|fetch) .*(?:clerk|polar|user|customer) .*data)\b",
+    re.IGNORECASE,
+)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# FAST PATH
+# ═══════════════════════════════════════════════════════════════════════════
+
+_GREETING_RE = re.compile(
+    r"^(?:hi|hey|hello|yo|hiya|sup|what'?s up|howdy|good (?:morning|afternoon|evening))"
+    r"(?:\s+(?:lucy|there|everyone|team))?"
+    r"[!.\s]*$",
+    re.IGNORECASE,
+)
+
+_CONVERSATIONAL_GREETING_RE = re.compile(
+    r"^(?:hi|hey|hello|yo|hiya|sup|howdy|good (?:morning|afternoon|evening))"
+    r"(?:\s+\w+)?[!,.]?\s+"
+    r"(?:how(?:'s| is| are) (?:it going|things|you|everything|you doing|life).*|"
+    r"what'?s (?:up|new|good|happening|going on).*|"
+    r"how(?:'s| is) (?:your|the) (?:day|morning|afternoon|evening|night|weekend).*|"
+    r"hope (?:you'?re|all is|everything'?s?).*|"
+    r"nice to (?:see|meet|hear|chat).*)"
+    r"[!?.\s]*$",
+    re.IGNORECASE,
+)
+
+_STATUS_RE = re.compile(
+    r"^(?:are you (?:there|online|up|available|awake)\??|"
+    r"you (?:there|up|online|around)\??|"
+    r"ping|status|alive\??)"
+    r"[!.\s]*$",
+    re.IGNORECASE,
+)
+
+_HELP_RE = re.compile(
+    r"^(?:help|what can you do\??|what do you do\??|"
+    r"how do you work\??|what are you\??|who are you\??|"
+    r"tell me about yourself.*|introduce yourself.*|"
+    r"who is lucy\??|what is lucy\??)"
+    r"[!.\s]*$",
+    re.IGNORECASE,
+)
+
+_ALIVE_RE = re.compile(
+    r"^(?:(?:can you|do you) hear me\??|"
+    r"are you (?:alive|working|listening|there|awake|up)\??|"
+    r"(?:quick )?test.*|testing.*|"
+    r"just (?:checking|testing).*|"
+    r"(?:say |respond with )?(?:hello|hi|hey)\s*(?:back)?[!.\s]*)"
+    r"[!?.\s]*$",
+    re.IGNORECASE,
+)
+
+# ═══════════════════════════════════════════════════════════════════════════
+# REACTIONS
+# ═══════════════════════════════════════════════════════════════════════════
+
+# ── React-only patterns (no reply needed) ─────────────────────────────────
+_THANKS_RE = re.compile(
+    r"^(?:(?:ok(?:ay)?|alright|sure|yep|yup|cool|great|nice)\s+)?"
+    r"(?:thanks?(?:\s+(?:a lot|so much|very much|a ton|for|viktor|lucy))?|"
+    r"ty(?:\s|!|$)|thx|cheers|appreciate it|much appreciated|"
+    r"thank you(?:\s+(?:so much|very much|a lot|for))?)"
+    r"[!.\s]*$",
+    re.IGNORECASE,
+)
+
+_ACK_RE = re.compile(
+    r"^(?:got it|noted|understood|makes sense|perfect|"
+    r"sounds good|sounds great|cool|nice|great|awesome|"
+    r"amazing|love it|beautiful|sweet|wonderful|brilliant|"
+    r"exactly|precisely|right on|spot on|nailed it)"
+    r"[!.\s]*$",
+    re.IGNORECASE,
+)
+
+_APPROVAL_RE = re.compile(
+    r"^(?:(?:looks? )?good(?:\s+to (?:me|go))?|approved?|"
+    r"lgtm|ship it|go (?:ahead|for it)|yes(?:\s+please)?|"
+    r"yep|yup|sure|absolutely|definitely|"
+    r"ok(?:ay)?(?:\s+(?:cool|great|nice|perfect|no worries))?)"
+    r"[!.\s]*$",
+    re.IGNORECASE,
+)
+
+# ── React + reply patterns ────────────────────────────────────────────────
+_URGENT_RE = re.compile(
+    r"\b(?:urgent|asap|immediately|critical|emergency|"
+    r"right now|time.?sensitive|drop everything|p0|sev.?1)\b",
+    re.IGNORECASE,
+)
+
+_PROBLEM_RE = re.compile(
+    r"\b(?:bug|broken|crash(?:ing|ed)?|error|fail(?:ing|ed|ure)?|"
+    r"down|outage|not working|500|404)\b",
+    re.IGNORECASE,
+)
+
+_QUESTION_RE = re.compile(
+    r"\b(?:can you (?:check|find|look)|"
+    r"what(?:'s| is) (?:the|our|my)|how (?:do|does|can)|"
+    r"where (?:is|are|can)|investigate|look into|dig into)\b",
+    re.IGNORECASE,
+)
+
+_BUILD_RE = re.compile(
+    r"\b(?:create|build|make|generate|draft|prepare|"
+    r"write|set up|configure|schedule)\b",
+    re.IGNORECASE,
+)
+
+_ANALYSIS_RE = re.compile(
+    r"\b(?:analyze|research|compare|benchmark|audit|"
+    r"report|deep dive|competitor|market)\b",
+    re.IGNORECASE,
+)
+
+_SHIP_RE = re.compile(
+    r"\b(?:deploy|ship|release|push|launch|go live|publish)\b",
+    re.IGNORECASE,
+)
+
+_FYI_RE = re.compile(
+    r"\b(?:fyi|heads up|just (?:so you know|letting you know)|"
+    r"for (?:your )?(?:info|reference|context))\b",
+    re.IGNORECASE,
+)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# MEMORY
+# ═══════════════════════════════════════════════════════════════════════════
+
+# Common interrogative openings: the user is asking, not stating a fact
+_QUESTION_OPENING_RE = re.compile(
+    r"^(?:what|where|when|who|how|why|which|can you|could you|do you|did you|is there|are there)\b",  # noqa: E501
+    re.IGNORECASE,
+)
+
+_REMEMBER_SIGNALS = re.compile(
+    r"\b(?:"
+    r"remember|note that|keep in mind|fyi|for your reference|"
+    r"going forward|from now on|always|never|our (?:target|goal|kpi)|"
+    r"my (?:name|role|email|timezone|preference)|"
+    r"we use|we switched to|our stack|we're moving to|"
+    r"our (?:company|team|product) (?:use[sd]?|is|has|runs?)|"
+    r"(?:new|updated?) (?:target|goal|deadline|process)|"
+    r"i(?:'m| am) (?:the|a|responsible for)|"
+    r"(?:my|our) (?:mrr|revenue|arr|budget|runway) is|"
+    r"my (?:boss|manager|lead|cto|ceo|coo|vp|director|head|supervisor|report|pm|po|owner) is|"
+    r"(?:he|she|they)(?:'s| is| are) (?:my|our|the) (?:boss|manager|lead|head|director)|"
+    r"(?:reports?|reports to|manages?|leads?|runs?) (?:the |our )?(?:team|department|eng|product|design|sales|marketing)"  # noqa: E501
+    r")\b",
+    re.IGNORECASE,
+)
+
+_COMPANY_SIGNALS = re.compile(
+    r"\b(?:"
+    r"our company|we(?:'re| are) (?:a|an)|our product|our service|"
+    r"our (?:mrr|arr|revenue|valuation|headcount|team size)|"
+    r"we (?:use|switched to|moved to|migrated to)|our stack|"
+    r"we(?:'re| are) (?:based|located)|"
+    r"our (?:clients?|customers?)|(?:founded|started) in"
+    r")\b",
+    re.IGNORECASE,
+)
+
+_TEAM_SIGNALS = re.compile(
+    r"\b(?:"
+    r"i(?:'m| am) (?:the|a|an|responsible)|"
+    r"(?:he|she|they)(?:'s| is| are) (?:the|our|a)|"
+    r"(?:works?|working) on|reports? to|"
+    r"new (?:hire|team member|employee)|"
+    r"(?:joined|leaving|left) (?:the )?(?:team|company)|"
+    r"my (?:team lead|tech lead|engineering lead|product lead|design lead|"
+    r"manager|direct manager|skip|skip.level|project manager|product manager|"
+    r"program manager|account manager|pm|po|eng lead|head of (?:eng|product|design|sales|marketing))|"  # noqa: E501
+    r"(?:head|lead|manager|director|vp|chief) of (?:eng(?:ineering)?|product|design|sales|marketing|growth|ops)|"  # noqa: E501
+    r"[A-Z][a-z]+ (?:manages?|leads?|runs?) (?:the )?(?:team|eng(?:ineering)?|product|design|sales|marketing)|"  # noqa: E501
+    r"is (?:our|the) (?:cto|ceo|coo|vp|head of \w+|founder|co.?founder|director)"
+    r")\b",
+    re.IGNORECASE,
+)
+
+
+_PREFERENCE_SIGNALS = re.compile(
+    r"\b(?:"
+    r"i (?:prefer|like|want|need)|"
+    r"(?:please )?(?:always|never) (?:use|include|add|format)|"
+    r"my (?:preferred|favorite|default)|"
+    r"(?:use|format|write|send) (?:it |things )?in|"
+    r"(?:don't|do not|stop) (?:use|include|add|send)|"
+    r"(?:tone|style|voice|format) should be"
+    r")\b",
+    re.IGNORECASE,
+)
+
+_DECISION_SIGNALS = re.compile(
+    r"\b(?:"
+    r"(?:we|i) decided|(?:let's|we'll) go with|"
+    r"(?:final|approved|confirmed) (?:decision|choice|plan)|"
+    r"(?:we're|we are) going (?:to|with)|"
+    r"(?:the plan is|decision made|settled on|chose|picked)"
+    r")\b",
+    re.IGNORECASE,
+)
+
+_PROJECT_SIGNALS = re.compile(
+    r"\b(?:"
+    r"(?:the|our|this) project|deadline (?:is|was)|"
+    r"(?:launch|ship|release|deploy) (?:date|by|on|is)|"
+    r"(?:sprint|milestone|phase|roadmap)|"
+    r"(?:working on|building|developing|shipping)"
+    r")\b",
+    re.IGNORECASE,
+)
+
+_HYPOTHETICAL_SIGNALS = re.compile(
+    r"\b(?:"
+    r"(?:what if|imagine|hypothetically|suppose|let's say|pretend|"
+    r"for example|e\.g\.|test|testing|dummy|fake|sample|mock|"
+    r"i'll ask (?:about )?this later|ask (?:me|you) (?:about )?(?:this|it) later)"
+    r")\b",
+    re.IGNORECASE,
+)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# SKILL TRIGGERS
+# ═══════════════════════════════════════════════════════════════════════════
+
+_SKILL_TRIGGERS: dict[str, list[str]] = {
+    "pdf-creation": [
+        r"\bpdf\b", r"\breport\b", r"\bdocument\b", r"\binvoice\b",
+        r"\bgenerate.*(?:doc|file)\b",
+    ],
+    "excel-editing": [
+        r"\bexcel\b", r"\bxlsx?\b", r"\bspreadsheet\b",
+        r"\bworkbook\b", r"\bcsv.*format\b",
+    ],
+    "docx-editing": [
+        r"\bdocx?\b", r"\bword\s*(?:doc|file)?\b", r"\bproposal\b",
+        r"\bletter\b", r"\bmemo\b",
+    ],
+    "pptx-editing": [
+        r"\bpptx?\b", r"\bpowerpoint\b", r"\bslide\b", r"\bpresentation\b",
+        r"\bdeck\b", r"\bpitch\b",
+    ],
+    "codebase-engineering": [
+        r"\bgit(?:hub)?\b", r"\bpull\s*request\b", r"\bPR\b", r"\bcommit\b",
+        r"\bbranch\b", r"\brepository\b", r"\brepo\b", r"\bcode\s*review\b",
+        r"\bmerge\b", r"\bdeploy\b",
+    ],
+    "scheduled-crons": [
+        r"\bschedule\b", r"\bcron\b", r"\brecurring\b", r"\bautomate\b",
+        r"\bevery\s*(?:day|week|hour|morning)\b",
+    ],
+    "integrations": [
+        r"\bintegrat(?:e|ion)s?\b", r"\bconnect(?:ed|ions?)?\b",
+        r"\bauthoriz\b", r"\bOAuth\b",
+        r"\btools?\b", r"\bservices?\b", r"\bapps?\b",
+        r"\bwhat.+(?:have|connected|available)\b",
+    ],
+    "slack-admin": [
+        r"\bchannel\b", r"\binvite\b", r"\bworkspace\b",
+        r"\bslack\s*(?:user|member)\b",
+    ],
+    "company": [
+        r"\b(?:our|the)\s+(?:company|team|product|business)\b",
+        r"\bwho\s+(?:are\s+we|is)\b",
+        r"\bwhat\s+do\s+(?:we|you)\s+(?:do|know)\b",
+    ],
+    "spaces": [
+        r"\bspace\b", r"\blanding\s*page\b", r"\bmini[- ]site\b",
+        r"\bpublic\s+page\b",
+    ],
+    "skill-creation": [
+        r"\bcreate\s+(?:a\s+)?(?:new\s+)?skill\b", r"\bnew\s+skill\b",
+        r"\bsave\s+(?:this|what\s+(?:you|we)\s+learned)\b",
+        r"\bremember\s+how\s+to\b",
+    ],
+    "thread-orchestration": [
+        r"\bthread\b", r"\borchestrat\b", r"\bparallel\s+task\b",
+        r"\bmultiple\s+(?:tasks?|agents?)\b",
+    ],
+    "async-workflows": [
+        r"\basync\b", r"\bbackground\s+task\b", r"\blong[- ]running\b",
+        r"\bwhen\s+(?:it'?s?\s+done|finished|complete)\b",
+    ],
+}
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# EXTRACTION
+# ═══════════════════════════════════════════════════════════════════════════
+
+_FEATURE_PATTERNS: dict[Feature, re.Pattern[str]] = {
+    Feature.GREETING: _GREETING_PATTERNS,
+    Feature.SIMPLE_QUESTION: _SIMPLE_QUESTION,
+    Feature.ACTION_VERB: _ACTION_VERBS,
+    Feature.MONITORING: _MONITORING_KEYWORDS,
+    Feature.CHECK: _CHECK_PATTERNS,
+    Feature.DATA_SOURCE: _DATA_SOURCE_KEYWORDS,
+    Feature.DOCUMENT: _DOCUMENT_KEYWORDS,
+    Feature.DATA_TASK: _DATA_TASK_KEYWORDS,
+    Feature.RESEARCH_HEAVY: _RESEARCH_HEAVY,
+    Feature.RESEARCH_LIGHT: _RESEARCH_LIGHT,
+    Feature.CODE: _CODE_KEYWORDS,
+    Feature.FAST_GREETING: _GREETING_RE,
+    Feature.CONVERSATIONAL_GREETING: _CONVERSATIONAL_GREETING_RE,
+    Feature.STATUS: _STATUS_RE,
+    Feature.HELP: _HELP_RE,
+    Feature.ALIVE: _ALIVE_RE,
+    Feature.REACT_THANKS: _THANKS_RE,
+    Feature.REACT_ACK: _ACK_RE,
+    Feature.REACT_APPROVAL: _APPROVAL_RE,
+    Feature.REACT_URGENT: _URGENT_RE,
+    Feature.REACT_PROBLEM: _PROBLEM_RE,
+    Feature.REACT_QUESTION: _QUESTION_RE,
+    Feature.REACT_BUILD: _BUILD_RE,
+    Feature.REACT_ANALYSIS: _ANALYSIS_RE,
+    Feature.REACT_SHIP: _SHIP_RE,
+    Feature.REACT_FYI: _FYI_RE,
+    Feature.QUESTION_OPENING: _QUESTION_OPENING_RE,
+    Feature.REMEMBER: _REMEMBER_SIGNALS,
+    Feature.PREFERENCE: _PREFERENCE_SIGNALS,
+    Feature.DECISION: _DECISION_SIGNALS,
+    Feature.PROJECT: _PROJECT_SIGNALS,
+    Feature.TEAM: _TEAM_SIGNALS,
+    Feature.COMPANY: _COMPANY_SIGNALS,
+    Feature.HYPOTHETICAL: _HYPOTHETICAL_SIGNALS,
+}
+
+# Skill trigger bits follow the named features in the same bitset.
+_SKILL_SHIFT = max(Feature).bit_length()
+_SKILL_PATTERNS: list[tuple[str, re.Pattern[str]]] = [
+    (skill, re.compile(p, re.IGNORECASE))
+    for skill, patterns in _SKILL_TRIGGERS.items()
+    for p in patterns
+]
+
+_RULES: list[tuple[re.Pattern[str], int]] = (
+    [(pattern, int(feature)) for feature, pattern in _FEATURE_PATTERNS.items()]
+    + [(pattern, 1 << (_SKILL_SHIFT + i)) for i, (_, pattern) in enumerate(_SKILL_PATTERNS)]
+)
+# ``^``-anchored patterns were applied with re.match; match() stops after
+# position 0 instead of trying every offset.
+_ANCHORED = [pattern.pattern.startswith("^") for pattern, _ in _RULES]
+
+
+def _build_index() -> tuple[int, dict[str, int], dict[str, list[str]]]:
+    """Literal prefilter over every rule, as rule-index bitmasks.
+
+    Returns the rules that always run (no provable literal, or case
+    sensitive), the rules each case-folded literal unlocks, and those
+    literals keyed by their first two characters.
+    """
+    always = 0
+    unlocks: dict[str, int] = {}
+    for i, (pattern, _) in enumerate(_RULES):
+        guard = required_literals(pattern)
+        if guard is None or not ignores_case(pattern):
+            always |= 1 << i
+            continue
+        for literal in guard:
+            unlocks[literal] = unlocks.get(literal, 0) | 1 << i
+    by_prefix: dict[str, list[str]] = {}
+    for literal in unlocks:
+        by_prefix.setdefault(literal[:2], []).append(literal)
+    return always, unlocks, by_prefix
+
+
+_ALWAYS, _UNLOCKS, _BY_PREFIX = _build_index()
+
+
+def _live(text: str) -> int:
+    """Bitmask of the rules whose required literals occur in ``text``.
+
+    Checking all ~400 distinct literals with ``in`` costs more than the
+    regexes it saves on a short message, so only literals whose first two
+    characters occur in the text are tested.
+    """
+    folded = fold(text)
+    live = _ALWAYS
+    grams = {folded[i:i + 2] for i in range(len(folded) - 1)}
+    grams.update(folded)  # one-character literals
+    for gram in grams.intersection(_BY_PREFIX):
+        for literal in _BY_PREFIX[gram]:
+            if literal in folded:
+                live |= _UNLOCKS[literal]
+    return live
+
+
+@dataclass(frozen=True, slots=True)
+class MessageFeatures:
+    """Which patterns matched a message (stripped), as one bitset."""
+
+    bits: int = 0
+    research_light: int = 0  # number of light research keywords
+
+    def __contains__(self, feature: Feature) -> bool:
+        # int & IntFlag builds a new enum member; int & int doesn't.
+        return bool(self.bits & feature._value_)
+
+    @property
+    def skill_scores(self) -> dict[str, int]:
+        """Matched trigger count per skill, for skills with any match."""
+        scores: dict[str, int] = {}
+        skill_bits = self.bits >> _SKILL_SHIFT
+        while skill_bits:
+            i = (skill_bits & -skill_bits).bit_length() - 1
+            skill_bits &= skill_bits - 1
+            skill = _SKILL_PATTERNS[i][0]
+            scores[skill] = scores.get(skill, 0) + 1
+        return scores
+
+
+def extract_features(message: str) -> MessageFeatures:
+    """Features of ``message``; leading and trailing whitespace are ignored."""
+    return _extract(message.strip())
+
+
+@lru_cache(maxsize=1024)
+def _extract(text: str) -> MessageFeatures:
+    bits = 0
+    research_light = 0
+    live = _live(text)
+    while live:
+        i = (live & -live).bit_length() - 1
+        live &= live - 1
+        pattern, bit = _RULES[i]
+        if bit == Feature.RESEARCH_LIGHT:
+            research_light = len(pattern.findall(text))
+            if research_light:
+                bits |= bit
+        elif (pattern.match if _ANCHORED[i] else pattern.search)(text):
+            bits |= bit
+    return MessageFeatures(bits, research_light)
@@ -20,7 +20,11 @@ The de-AI engine has two tiers, but only Tier 1 is active:
                       The code is kept as a safety net but the threshold is set
                       to 999 so it never triggers in practice.
 
-Applied to every message before posting to Slack.
+Applied to every message before posting to Slack. Each layer's regex list
+is a ``RuleSet`` (pipeline/rules.py): rules whose required literals are
+absent from the text are skipped without a regex scan, and the rest run in
+order exactly as successive ``re.sub`` calls would. See
+scripts/bench_output.py for timings over tests/fixtures/output_corpus.
 """
 
 from __future__ import annotations
@@ -31,7 +35,11 @@ import re
 import structlog
 
 from lucy.config import LLMPresets, settings
-from lucy.pipeline.content_classifier import strip_internal_content
+from lucy.pipeline.content_classifier import (
+    has_unclosed_internal_block,
+    strip_internal_content,
+)
+from lucy.pipeline.rules import RuleSet
 
 logger = structlog.get_logger()
 
@@ -193,17 +201,21 @@ _HUMANIZE_MAP = {
 }
 
 
-def _sanitize(text: str) -> str:
-    original = text
-    for pattern, replacement in _REDACT_PATTERNS:
-        text = pattern.sub(replacement, text)
+def _humanize_or_strip(match: re.Match[str]) -> str:
+    name = match.group(0)
+    return _HUMANIZE_MAP.get(name, "")
+
+
+_SANITIZE_RULES = RuleSet([
+    *_REDACT_PATTERNS,
+    (_ALLCAPS_TOOL_RE, _humanize_or_strip),
+    (re.compile(r"  +"), " "),
+])
 
-    def _humanize_or_strip(match: re.Match[str]) -> str:
-        name = match.group(0)
-        return _HUMANIZE_MAP.get(name, "")
 
-    text = _ALLCAPS_TOOL_RE.sub(_humanize_or_strip, text)
-    text = re.sub(r"  +", " ", text)
+def _sanitize(text: str) -> str:
+    original = text
+    text = _SANITIZE_RULES.sub(text)
     if not text.strip() and original.strip():
         return "I've completed the task."
     return text
@@ -246,32 +258,33 @@ def _convert_markdown_to_slack(text: str) -> str:
     text, code_blocks = _stash_code_blocks(text)
 
     text = _convert_tables_to_lists(text)
-    # Convert markdown links FIRST (before bold conversion touches them)
-    text = re.sub(
-        r"\[([^\]]+)\]\((https?://[^)\s]+)\)",
-        r"<\2|\1>",
-        text,
-    )
-
-    # Bold: **text** → *text*, but NOT when the content is a URL
-    def _bold_replace(m: re.Match[str]) -> str:
-        inner = m.group(1)
-        if inner.startswith("http://") or inner.startswith("https://"):
-            return inner
-        return f"*{inner}*"
-
-    text = re.sub(r"\*\*(.+?)\*\*", _bold_replace, text)
-    text = re.sub(r"^#{1,6}\s+(.+)$", r"*\1*", text, flags=re.MULTILINE)
-    text = re.sub(r"\*\*\*\*", "", text)
-    text = re.sub(r"\*\*", "", text)
-    # Clean stray * attached to URLs (e.g. "*https://url*" → "https://url")
-    text = re.sub(r"\*(https?://[^\s*|>]+)\*", r"\1", text)
-    text = re.sub(r"\n{3,}", "\n\n", text)
+    text = _MARKDOWN_RULES.sub(text)
 
     text = _unstash_code_blocks(text, code_blocks)
     return text
 
 
+def _bold_replace(m: re.Match[str]) -> str:
+    """Bold: **text** → *text*, but NOT when the content is a URL."""
+    inner = m.group(1)
+    if inner.startswith("http://") or inner.startswith("https://"):
+        return inner
+    return f"*{inner}*"
+
+
+_MARKDOWN_RULES = RuleSet([
+    # Convert markdown links FIRST (before bold conversion touches them)
+    (re.compile(r"\[([^\]]+)\]\((https?://[^)\s]+)\)"), r"<\2|\1>"),
+    (re.compile(r"\*\*(.+?)\*\*"), _bold_replace),
+    (re.compile(r"^#{1,6}\s+(.+)$", re.MULTILINE), r"*\1*"),
+    (re.compile(r"\*\*\*\*"), ""),
+    (re.compile(r"\*\*"), ""),
+    # Clean stray * attached to URLs (e.g. "*https://url*" → "https://url")
+    (re.compile(r"\*(https?://[^\s*|>]+)\*"), r"\1"),
+    (re.compile(r"\n{3,}"), "\n\n"),
+])
+
+
 def _convert_tables_to_lists(text: str) -> str:
     lines = text.split("\n")
     result: list[str] = []
@@ -411,17 +424,17 @@ _BROKEN_URLS: list[tuple[re.Pattern[str], str]] = [
 ]
 
 
+_BROKEN_URL_RULES = RuleSet(_BROKEN_URLS)
+_TONE_RULES = RuleSet(_TONE_REPLACEMENTS)
+
+
 def _fix_broken_urls(text: str) -> str:
     """Remove broken/truncated URLs in both plain and Slack mrkdwn format."""
-    for pattern, replacement in _BROKEN_URLS:
-        text = pattern.sub(replacement, text)
-    return text
+    return _BROKEN_URL_RULES.sub(text)
 
 
 def _validate_tone(text: str) -> str:
-    for pattern, replacement in _TONE_REPLACEMENTS:
-        text = pattern.sub(replacement, text)
-    return text
+    return _TONE_RULES.sub(text)
 
 
 # ═══════════════════════════════════════════════════════════════════════
@@ -589,20 +602,23 @@ _AI_TELL_PATTERNS: list[tuple[re.Pattern[str], int, str]] = [
 # ever need it (e.g. with a personality-aware prompt and better model).
 # To re-enable, lower this back to 3 (or whatever score makes sense).
 # ───────────────────────────────────────────────────────────────────
-_LLM_REWRITE_THRESHOLD = 999
+_LLM_REWRITE_OFF = 999
+_LLM_REWRITE_THRESHOLD = _LLM_REWRITE_OFF
 _LLM_REWRITE_MIN_CHARS = 120
 _DEAI_MAX_TOKENS_MULTIPLIER = 2
 _DEAI_MIN_LENGTH_RATIO = 0.3
 _DEAI_MAX_LENGTH_RATIO = 2.0
 
 
+_AI_TELL_RULES = RuleSet((p, (weight, category)) for p, weight, category in _AI_TELL_PATTERNS)
+
+
 def _detect_ai_tells(text: str) -> list[tuple[str, int, str]]:
     """Scan text for AI-tell patterns. Returns list of (match, weight, category)."""
-    tells: list[tuple[str, int, str]] = []
-    for pattern, weight, category in _AI_TELL_PATTERNS:
-        for match in pattern.finditer(text):
-            tells.append((match.group(0), weight, category))
-    return tells
+    return [
+        (match.group(0), weight, category)
+        for (weight, category), match in _AI_TELL_RULES.finditer(text)
+    ]
 
 
 def _ai_tell_score(text: str) -> int:
@@ -695,11 +711,12 @@ _REGEX_DEAI_PATTERNS: list[tuple[re.Pattern[str], str]] = [
 ]
 
 
+_DEAI_RULES = RuleSet(_REGEX_DEAI_PATTERNS)
+
+
 def _regex_deai(text: str) -> str:
     """Fast regex-based de-AI pass. Always runs as safety net."""
-    for pattern, replacement in _REGEX_DEAI_PATTERNS:
-        text = pattern.sub(replacement, text)
-    return text
+    return _DEAI_RULES.sub(text)
 
 
 # --- Tier 2: LLM-based contextual rewrite ---
@@ -823,17 +840,16 @@ async def _llm_deai_rewrite(text: str, tells: list[tuple[str, int, str]]) -> str
 async def _deai(text: str) -> str:
     """De-AI: detect tells and fix via regex. LLM rewrite path exists but is
     disabled (threshold=999) — see comment on _LLM_REWRITE_THRESHOLD above."""
-    tells = _detect_ai_tells(text)
-
-    if not tells:
+    if not _AI_TELL_RULES.search_any(text):
         return text
 
-    score = sum(w for _, w, _ in tells)
-
-    if score >= _LLM_REWRITE_THRESHOLD and len(text) >= _LLM_REWRITE_MIN_CHARS:
-        rewritten = await _llm_deai_rewrite(text, tells)
-        if rewritten is not None:
-            return rewritten
+    # Scoring needs every match of every pattern; skip it while the rewrite is off.
+    if _LLM_REWRITE_THRESHOLD < _LLM_REWRITE_OFF and len(text) >= _LLM_REWRITE_MIN_CHARS:
+        tells = _detect_ai_tells(text)
+        if sum(w for _, w, _ in tells) >= _LLM_REWRITE_THRESHOLD:
+            rewritten = await _llm_deai_rewrite(text, tells)
+            if rewritten is not None:
+                return rewritten
 
     return _regex_deai(text)
 
@@ -902,12 +918,90 @@ def process_output_sync(text: str | None) -> str:
     if not text.strip():
         return "I've completed the task."
 
+    return _apply_sync_layers(text).strip()
+
+
+def _apply_sync_layers(text: str, *, skip_tone_validation: bool = False) -> str:
+    """Layers 1-4 (regex-only de-AI) on text that already passed layer 0."""
     text, _code_stash = _stash_code_blocks(text)
     text = _sanitize(text)
     text = _unstash_code_blocks(text, _code_stash)
 
     text = _fix_broken_urls(text)
     text = _convert_markdown_to_slack(text)
-    text = _validate_tone(text)
-    text = _regex_deai(text)
-    return text.strip()
+    if not skip_tone_validation:
+        text = _validate_tone(text)
+    return _regex_deai(text)
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# STREAMING
+# ═══════════════════════════════════════════════════════════════════════
+
+_EMPTY_FALLBACK = "I've completed the task."
+
+
+class IncrementalOutput:
+    """Runs the output layers over a response while it is still being generated.
+
+    Deltas are buffered until a paragraph break (blank line). Everything up
+    to the last break is processed as one block, unless the break falls
+    inside an open ``` fence or an unfinished internal XML block; then the
+    text waits for a later break. Code blocks are therefore always stashed
+    whole, and internal blocks are stripped whole.
+
+    ``text`` is the processed output so far. It is meant for progressive
+    display only: the final message should still go through
+    ``process_output`` on the full response, since a few layers (artifact
+    cleanup, the de-AI LLM tier) look across paragraphs.
+    """
+
+    def __init__(self, *, skip_tone_validation: bool = False) -> None:
+        self.skip_tone_validation = skip_tone_validation
+        self._pending = ""
+        self._parts: list[str] = []
+
+    @property
+    def text(self) -> str:
+        return "\n\n".join(self._parts)
+
+    def feed(self, delta: str) -> bool:
+        """Add streamed text; True if new processed output became available."""
+        self._pending += delta
+        if "\n" not in delta:
+            return False
+        cut = self._pending.rfind("\n\n")
+        if cut <= 0 or not _is_complete(self._pending[:cut]):
+            return False
+        block, self._pending = self._pending[:cut], self._pending[cut:].lstrip("\n")
+        return self._process(block)
+
+    def flush(self) -> bool:
+        """Process whatever is buffered (end of stream)."""
+        block, self._pending = self._pending, ""
+        return self._process(block)
+
+    def reset(self) -> None:
+        """Drop everything; the next delta starts a new response."""
+        self._pending = ""
+        self._parts.clear()
+
+    def _process(self, block: str) -> bool:
+        if not block.strip():
+            return False
+        # Both layer 0 and the sanitizer answer "nothing left" with a
+        # fallback sentence; for one block of many that just means "drop it".
+        out = strip_internal_content(block)
+        if out != _EMPTY_FALLBACK:
+            out = _apply_sync_layers(out, skip_tone_validation=self.skip_tone_validation)
+        out = out.strip()
+        if out == _EMPTY_FALLBACK and _EMPTY_FALLBACK not in block:
+            out = ""
+        if out:
+            self._parts.append(out)
+        return bool(out)
+
+
+def _is_complete(text: str) -> bool:
+    """No open code fence and no unfinished internal block."""
+    return text.count("```") % 2 == 0 and not has_unclosed_internal_block(text)
@@ -2,7 +2,8 @@
 
 Assembles the system prompt from layered components. Content is ordered
 static-to-dynamic so that LLM providers with automatic prefix caching
-(Gemini, DeepSeek, Kimi) get maximum cache hits.
+(Gemini, DeepSeek, Kimi) get maximum cache hits. Providers that need an
+explicit breakpoint get one at the boundary (see ``lucy.core.prompt_cache``).
 
 Order:
   STATIC PREFIX  — SOUL.md + SYSTEM_CORE.md + common modules + env block
@@ -184,7 +185,37 @@ async def build_system_prompt(
 ) -> str:
     """Build the complete system prompt for a workspace.
 
-    Content is ordered static-to-dynamic for prefix caching:
+    See ``build_system_prompt_parts`` for the layout; this returns the
+    static prefix and dynamic suffix joined into one string.
+    """
+    static_prefix, dynamic_suffix = await build_system_prompt_parts(
+        ws,
+        connected_services,
+        user_message,
+        prompt_modules,
+        compact=compact,
+        user_id=user_id,
+        thread_ts=thread_ts,
+        invocation_context=invocation_context,
+    )
+    return static_prefix + dynamic_suffix
+
+
+async def build_system_prompt_parts(
+    ws: WorkspaceFS,
+    connected_services: list[str] | None = None,
+    user_message: str | None = None,
+    prompt_modules: list[str] | None = None,
+    compact: bool = False,
+    user_id: str | None = None,
+    thread_ts: str | None = None,
+    invocation_context: dict[str, str] | None = None,
+) -> tuple[str, str]:
+    """Build the system prompt as a ``(static_prefix, dynamic_suffix)`` pair.
+
+    Content is ordered static-to-dynamic for prefix caching. The split is
+    returned so callers can place an explicit cache breakpoint at the
+    boundary (see ``lucy.core.prompt_cache``):
 
     STATIC PREFIX (identical across requests per workspace):
       1. SOUL.md — personality traits and voice
@@ -237,7 +268,6 @@ async def build_system_prompt(
         env_block = (
             "<current_environment>\n"
             f"Current date: {date_str}\n"
-            f"Current time: {utc_str} / {ist_str}\n"
             "You are communicating via: Slack (already connected and authenticated)\n"
             f"Connected integrations: {services_str}\n"
             "DO NOT ask users to connect any of these — they are already active.\n"
@@ -341,6 +371,13 @@ async def build_system_prompt(
     # ── DYNAMIC SUFFIX ───────────────────────────────────────────
     dynamic_parts: list[str] = []
 
+    # The clock changes every minute, so it must stay out of the static
+    # prefix or no two requests would ever share a cached prefix.
+    if connected_services:
+        dynamic_parts.append(
+            f"<current_time>\nCurrent time: {utc_str} / {ist_str}\n</current_time>"
+        )
+
     if prompt_modules:
         intent_modules_text = _load_prompt_modules(
             prompt_modules, compact=compact,
@@ -508,22 +545,22 @@ async def build_system_prompt(
     )
 
     if dynamic_parts:
-        full_prompt = (
-            static_prefix + _SECTION_SEP
+        dynamic_suffix = (
+            _SECTION_SEP
             + "\n\n".join(dynamic_parts)
             + _REFLECTION_SUFFIX
         )
     else:
-        full_prompt = static_prefix + _REFLECTION_SUFFIX
+        dynamic_suffix = _REFLECTION_SUFFIX
 
     logger.debug(
         "system_prompt_built",
         workspace_id=ws.workspace_id,
-        prompt_length=len(full_prompt),
+        prompt_length=len(static_prefix) + len(dynamic_suffix),
         static_prefix_length=len(static_prefix),
         compact=compact,
         connected_services=connected_services or [],
         has_relevant_skills=bool(relevant_skills),
         prompt_modules=prompt_modules or [],
     )
-    return full_prompt
+    return static_prefix, dynamic_suffix
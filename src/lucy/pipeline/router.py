@@ -15,10 +15,11 @@ Model tiers (configurable in config.py):
 
 from __future__ import annotations
 
-import re
 from dataclasses import dataclass, field
 
 from lucy.config import settings
+from lucy.infra.budgets import BudgetLevel, get_budget_engine
+from lucy.pipeline.features import Feature, extract_features
 
 MODEL_TIERS: dict[str, str] = {
     "fast": settings.model_tier_fast,
@@ -29,105 +30,6 @@ MODEL_TIERS: dict[str, str] = {
     "frontier": settings.model_tier_frontier,
 }
 
-_CODE_KEYWORDS = re.compile(
-    r"\b(code|deploy|script|function|debug|refactor|implement|"
-    r"write a? ?program|create a? ?app|build [\w ]* ?app|make [\w ]* ?app|"
-    r"lambda|api endpoint|pull request|"
-    # regex is an unambiguous coding concept
-    r"regex|"
-    # dockerfile and ci/cd are unambiguous devops/coding terms
-    r"dockerfile|ci/cd|"
-    # 'package' only when clearly code-related (install/npm/pip context)
-    r"npm package|pip package|install package|"
-    # Removed 'pipeline' — too ambiguous: "sales pipeline", "data pipeline",
-    # "onboarding pipeline" are business questions, not coding tasks.
-    # Removed 'class' — too broad: "class of customer", "first-class", "class action".
-    # Removed 'algorithm' — "what algorithm does Google use?" is research, not coding.
-    # Removed 'module' — "which module handles invoicing?" is a lookup, not coding.
-    r"write the algorithm|implement the algorithm|code the algorithm)\b",
-    re.IGNORECASE,
-)
-
-_RESEARCH_LIGHT = re.compile(
-    r"\b(research|analyze|compare|strategy|competitor|"
-    r"market|pricing model|evaluation|"
-    r"investigate|audit|benchmark|"
-    r"tell me about|summarize|overview|what do you know)\b",
-    re.IGNORECASE,
-)
-
-_RESEARCH_HEAVY = re.compile(
-    r"\b(deep dive|deep analysis|comprehensive|thorough|investigate|audit|"
-    r"benchmark|detailed analysis|competitive analysis|full report|"
-    r"in[- ]depth|exhaustive|complete analysis)\b",
-    re.IGNORECASE,
-)
-
-_GREETING_PATTERNS = re.compile(
-    r"^(hi|hey|hello|yo|sup|thanks|thank you|ok|okay|got it|"
-    r"sounds good|perfect|great|cool|nice|yes|no|yep|nope|sure)"
-    r"(\s+(there|lucy|everyone|all|team))*\s*[!.?]*$",
-    re.IGNORECASE,
-)
-
-_SIMPLE_QUESTION = re.compile(
-    r"^(what|when|where|who|how|is|are|do|does|can|will)\b.{0,60}\??\s*$",
-    re.IGNORECASE,
-)
-
-_ACTION_VERBS = re.compile(
-    r"\b(do|send|run|execute|delete|cancel|merge|deploy|schedule|create|update|remove|build|push)\b",
-    re.IGNORECASE,
-)
-
-_MONITORING_KEYWORDS = re.compile(
-    r"(?:"
-    r"(?:inform|alert|notify|tell|ping|warn)\s+me\s+(?:when|if|as\s+soon\s+as|whenever)"
-    r"|(?:keep|start)\s+(?:monitoring|tracking|watching|checking)"
-    r"|long[- ]running\s+task"
-    r"|(?:monitor|watch|track)\s+(?:for\s+)?(?:changes?|drops?|spikes?|issues?|errors?|performance)"
-    r"|as\s+soon\s+as\s+(?:something|anything|it|there)"
-    r"|real[- ]?time\s+(?:alert|monitor|notification|tracking)"
-    r"|heartbeat\s+(?:for|on|to|check|monitor)"
-    r"|(?:set\s+up|create|configure|build)\s+(?:a\s+|an\s+)?(?:monitor|alert|watch|heartbeat|notification)"
-    r"|continuously\s+(?:monitor|check|track|watch)"
-    r"|(?:daily|weekly|hourly|every\s+\d+\s+(?:min|hour|day))\s+(?:report|check|update|summary)"
-    r"|(?:goes?\s+live|back\s+in\s+stock|becomes?\s+available)"
-    r"|(?:drops?\s+below|goes?\s+(?:above|over|under))"
-    r")",
-    re.IGNORECASE,
-)
-
-_CHECK_PATTERNS = re.compile(
-    r"\b(check|verify|look|find|search|pull|get|fetch|show|list)\b",
-    re.IGNORECASE,
-)
-
-_DATA_SOURCE_KEYWORDS = re.compile(
-    r"\b(calendar|email|emails|gmail|inbox|unread|schedule|meeting|meetings|"
-    r"slack|github|issues?|pull requests?|commits?|notion|sheets?|"
-    r"spreadsheet|jira|linear|trello|drive|news|latest|"
-    r"integrations?|connected|connections?)\b",
-    re.IGNORECASE,
-)
-
-_DOCUMENT_KEYWORDS = re.compile(
-    r"\b(pdf|report|document|spreadsheet|excel|csv|"
-    r"create a (?:report|pdf|document|spreadsheet))\b",
-    re.IGNORECASE,
-)
-
-_DATA_TASK_KEYWORDS = re.compile(
-    r"\b(all (?:\w+ )?(?:users?|customers?|data|records?|subscribers?|members?)|"
-    r"export|bulk|every (?:user|customer|record|subscriber|member)|"
-    r"complete (?:list|report|export|data|breakdown)|"
-    r"raw data|user ?base|multi[- ]sheet|detailed analysis|"
-    r"full (?:report|list|export|breakdown|data)|"
-    r"conversion rate|signups? (?:by|per|over)|"
-    r"(?:pull|get|fetch) .*(?:clerk|polar|user|customer) .*data)\b",
-    re.IGNORECASE,
-)
-
 # Dynamic prompt modules loaded AFTER the static prefix (tool_use + memory
 # are already in the static prefix for all non-chat intents). Only truly
 # intent-specific modules are listed here.
@@ -161,7 +63,9 @@ def classify_and_route(
 ) -> ModelChoice:
     """Classify message intent and select the best model.
 
-    Runs in <1ms — no LLM calls, pure regex + heuristics.
+    Runs in <1ms — no LLM calls, pure regex + heuristics. The patterns
+    live in pipeline/features.py and are shared with the fast path,
+    reactions, skills and memory.
 
     Args:
         message: The user's message text
@@ -170,6 +74,7 @@ def classify_and_route(
             this thread contained tool calls / active work indicators.
     """
     text = message.strip()
+    features = extract_features(text)
 
     def _choice(intent: str, tier: str) -> ModelChoice:
         return ModelChoice(
@@ -180,7 +85,7 @@ def classify_and_route(
         )
 
     # 1. Pure greetings/acknowledgments
-    if _GREETING_PATTERNS.match(text):
+    if Feature.GREETING in features:
         if prev_had_tool_calls:
             return _choice("confirmation", "default")
         return _choice("chat", "fast")
@@ -189,56 +94,102 @@ def classify_and_route(
     if thread_depth > 5 and len(text) < 50:
         if prev_had_tool_calls:
             return _choice("followup", "default")
-        if _ACTION_VERBS.search(text):
+        if Feature.ACTION_VERB in features:
             return _choice("command", "default")
         return _choice("followup", "fast")
 
     # 3. Monitoring / alerting — must check BEFORE data tasks so
     #    "monitor performance" doesn't misroute as a data export.
-    if _MONITORING_KEYWORDS.search(text):
+    if Feature.MONITORING in features:
         return _choice("monitoring", "default")
 
     # 3a. Data tasks — bulk data exports, "all users", complete reports
-    if _DATA_TASK_KEYWORDS.search(text):
-        if _DOCUMENT_KEYWORDS.search(text):
+    if Feature.DATA_TASK in features:
+        if Feature.DOCUMENT in features:
             return _choice("document", "document")
         return _choice("data", "code")
 
     # 3b. Document creation — check BEFORE research so "create a report
     #    about competitors" routes to document, not research.
-    if _DOCUMENT_KEYWORDS.search(text) and _ACTION_VERBS.search(text):
+    if Feature.DOCUMENT in features and Feature.ACTION_VERB in features:
         return _choice("document", "document")
 
     # 4. Deep research / analysis — check before code to avoid
     #    "research code tools" being classified as coding.
-    has_heavy = bool(_RESEARCH_HEAVY.search(text))
-    light_matches = _RESEARCH_LIGHT.findall(text)
-    if has_heavy or len(light_matches) >= 3:
+    light_matches = features.research_light
+    if Feature.RESEARCH_HEAVY in features or light_matches >= 3:
         return _choice("reasoning", "research")
-    if len(light_matches) >= 2 and len(text) > 50:
+    if light_matches >= 2 and len(text) > 50:
         return _choice("reasoning", "research")
     if light_matches and len(text) > 40:
         return _choice("tool_use", "default")
 
     # 5. Coding tasks (removed "build" — "build me a report" is not code)
-    has_code = _CODE_KEYWORDS.search(text)
-    if has_code:
-        if _CHECK_PATTERNS.search(text) and len(text) < 80:
+    if Feature.CODE in features:
+        if Feature.CHECK in features and len(text) < 80:
             return _choice("tool_use", "default")
         return _choice("code", "code")
 
     # 6. Messages referencing external data sources always need tools
-    if _DATA_SOURCE_KEYWORDS.search(text):
+    if Feature.DATA_SOURCE in features:
         return _choice("tool_use", "default")
 
     # 7. Short check/verify requests — need tool calls, not fast tier
-    if len(text) < 60 and _CHECK_PATTERNS.search(text):
+    if len(text) < 60 and Feature.CHECK in features:
         return _choice("tool_use", "default")
 
     # 8. Simple lookups — truly simple questions with no data dependency
-    if len(text) < 40 and _SIMPLE_QUESTION.match(text):
-        if not _CHECK_PATTERNS.search(text) and not _DATA_SOURCE_KEYWORDS.search(text):
+    if len(text) < 40 and Feature.SIMPLE_QUESTION in features:
+        if Feature.CHECK not in features and Feature.DATA_SOURCE not in features:
             return _choice("lookup", "fast")
 
     # 9. Default — tool-calling, general tasks
     return _choice("tool_use", "default")
+
+
+# Under budget pressure: SOFT steps premium tiers down to default,
+# EXHAUSTED sends everything to fast (frontier → default → fast).
+_SOFT_DOWNGRADE: dict[str, str] = {
+    "frontier": "default",
+    "research": "default",
+    "document": "default",
+    "code": "default",
+}
+
+
+def budget_tier(tier: str, level: BudgetLevel) -> str:
+    """The tier to use for *tier* at the given budget pressure."""
+    if level >= BudgetLevel.EXHAUSTED:
+        return "fast"
+    if level >= BudgetLevel.SOFT:
+        return _SOFT_DOWNGRADE.get(tier, tier)
+    return tier
+
+
+def apply_budget(
+    choice: ModelChoice, workspace_id: str, user_id: str | None = None,
+) -> ModelChoice:
+    """Downgrade a routing decision if the workspace is near its budget."""
+    level = get_budget_engine().level(workspace_id, user_id)
+    tier = budget_tier(choice.tier, level)
+    if tier == choice.tier:
+        return choice
+    return ModelChoice(
+        intent=choice.intent,
+        model=MODEL_TIERS[tier],
+        tier=tier,
+        prompt_modules=choice.prompt_modules,
+    )
+
+
+def budget_model(model: str, workspace_id: str, user_id: str | None = None) -> str:
+    """Per-call check: the model to actually use for *model* right now.
+
+    Covers models chosen after routing (overrides, frontier escalation).
+    O(1): one counter lookup plus a scan of the six tiers when downgrading.
+    """
+    level = get_budget_engine().level(workspace_id, user_id)
+    if level == BudgetLevel.OK:
+        return model
+    tier = next((t for t, m in MODEL_TIERS.items() if m == model), "frontier")
+    return MODEL_TIERS[budget_tier(tier, level)]
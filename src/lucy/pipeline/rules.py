@@ -0,0 +1,178 @@
+"""Prefiltered regex rule sets for the output pipeline.
+
+Each output layer is an ordered list of regexes. Applying it as one
+``re.sub`` per rule scans the whole response once per rule, even though a
+typical reply can only match a few of them: most responses contain no
+``COMPOSIO_`` names, no API keys and no ``<invoke>`` tags.
+
+A ``RuleSet`` compiles, for every rule, the literals that any match must
+contain. These are read from the parsed pattern: a run of literal
+characters, or for an alternation the set of literals one of which must
+appear. A rule whose literals are absent from the text (case-folded, for
+case-insensitive rules only) cannot match and is skipped with a substring
+check instead of a regex scan. Rules are still applied in order, each on the output of the
+previous one, so results are identical to the sequential ``sub`` chain.
+
+Folding one combined alternation over all rules was measured too. CPython's
+``re`` has no multi-pattern automaton, so at each position it tries every
+alternative in turn, and the combined scan was slower than the separate
+ones. Combined alternations are only used where a rule list is checked for
+"any rule matches here" (see content_classifier).
+
+The literals come from ``re``'s private parser. If it is missing, or no
+longer parses a known pattern to the expected literals, there is no
+prefilter: every rule runs, which is slower but gives the same output.
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+try:
+    from re import _constants as sre
+    from re import _parser as sre_parse
+except ImportError:  # pragma: no cover - private modules, moved before
+    sre = sre_parse = None
+
+Guard = frozenset[str]
+
+# re's IGNORECASE also matches these against ASCII 'i' / 's'; str.lower() doesn't
+# ("İ".lower() is two characters).
+_FOLD_EXTRA = str.maketrans({"ı": "i", "ſ": "s", "İ": "i"})
+_REPEATS = (
+    (sre.MAX_REPEAT, sre.MIN_REPEAT, sre.POSSESSIVE_REPEAT) if sre is not None else ()
+)
+
+
+def fold(text: str) -> str:
+    """Case-fold ``text`` the way guards are compared."""
+    if "ı" in text or "ſ" in text or "İ" in text:
+        text = text.translate(_FOLD_EXTRA)
+    return text.lower()
+
+
+def ignores_case(pattern: re.Pattern[str]) -> bool:
+    """True if any part of ``pattern`` matches case-insensitively."""
+    return bool(pattern.flags & re.IGNORECASE) or "(?i" in pattern.pattern
+
+
+def required_literals(pattern: re.Pattern[str]) -> Guard | None:
+    """Literals one of which every match of ``pattern`` contains.
+
+    Folded when the pattern ignores case. None when nothing useful can be
+    proven, or when the parser is unavailable; the rule then always runs.
+    """
+    if not _PARSER_OK:
+        return None
+    return _analyze(pattern)
+
+
+def _analyze(pattern: re.Pattern[str]) -> Guard | None:
+    try:
+        best = _best(_facts(list(sre_parse.parse(pattern.pattern, pattern.flags))))
+    except Exception:
+        return None
+    if not best:
+        return None
+    return frozenset(map(fold, best)) if ignores_case(pattern) else best
+
+
+def _parser_works() -> bool:
+    """True if the private parser yields the literals ``_facts`` expects."""
+    if sre_parse is None:
+        return False
+    probe = re.compile(r"ab(?:cdef|ghij)+\d?k")
+    return _analyze(probe) == frozenset({"cdef", "ghij"})
+
+
+def _facts(items: list[tuple[Any, Any]]) -> list[Guard]:
+    """Necessary conditions of a parsed sequence, one literal set each."""
+    facts: list[Guard] = []
+    run: list[str] = []
+
+    def flush() -> None:
+        if run:
+            facts.append(frozenset({"".join(run)}))
+            run.clear()
+
+    for op, av in items:
+        if op is sre.LITERAL:
+            run.append(chr(av))
+            continue
+        flush()
+        if op is sre.SUBPATTERN:
+            facts.extend(_facts(list(av[3])))
+        elif op is sre.ATOMIC_GROUP:
+            facts.extend(_facts(list(av)))
+        elif op in _REPEATS and av[0] >= 1:
+            facts.extend(_facts(list(av[2])))
+        elif op is sre.BRANCH:
+            alternatives = [_best(_facts(list(alt))) for alt in av[1]]
+            if all(alternatives):
+                facts.append(frozenset().union(*alternatives))
+    flush()
+    return facts
+
+
+def _best(facts: list[Guard]) -> Guard | None:
+    """The most selective fact: longest shortest-literal, then fewest literals."""
+    return max(facts, key=lambda f: (min(map(len, f)), -len(f)), default=None)
+
+
+class RuleSet[T]:
+    """Ordered ``(pattern, payload)`` rules with per-rule literal prefilters."""
+
+    __slots__ = ("rules", "_guards", "_icase")
+
+    def __init__(self, rules: Iterable[tuple[re.Pattern[str], T]]) -> None:
+        self.rules = list(rules)
+        self._guards = [required_literals(pattern) for pattern, _ in self.rules]
+        self._icase = [ignores_case(pattern) for pattern, _ in self.rules]
+
+    def live(self, text: str) -> list[int]:
+        """Indices of the rules that might match somewhere in ``text``."""
+        folded = fold(text) if any(self._icase) else text
+        return [
+            i for i, (guard, icase) in enumerate(zip(self._guards, self._icase, strict=True))
+            if _passes(guard, folded if icase else text)
+        ]
+
+    def sub(self, text: str) -> str:
+        """Apply each rule's ``sub`` in order (payloads are replacements)."""
+        folded: str | None = None
+        for (pattern, repl), guard, icase in zip(
+            self.rules, self._guards, self._icase, strict=True,
+        ):
+            if guard is not None:
+                if icase:
+                    if folded is None:
+                        folded = fold(text)
+                    haystack = folded
+                else:
+                    haystack = text
+                if not _passes(guard, haystack):
+                    continue
+            text, count = pattern.subn(repl, text)
+            if count:
+                folded = None
+        return text
+
+    def search_any(self, text: str) -> bool:
+        """True if any rule matches ``text``."""
+        return any(self.rules[i][0].search(text) for i in self.live(text))
+
+    def finditer(self, text: str) -> Iterator[tuple[T, re.Match[str]]]:
+        """Every match of every rule, rule by rule, with its payload."""
+        for i in self.live(text):
+            pattern, payload = self.rules[i]
+            for match in pattern.finditer(text):
+                yield payload, match
+
+
+_PARSER_OK = _parser_works()
+
+
+def _passes(guard: Guard | None, folded: str) -> bool:
+    return guard is None or any(lit in folded for lit in guard)
@@ -8,6 +8,7 @@ from lucy.slack.hitl import (
     is_destructive_tool_call,
 )
 from lucy.slack.middleware import (
+    pooled_client_middleware,
     resolve_channel_middleware,
     resolve_user_middleware,
     resolve_workspace_middleware,
@@ -17,6 +18,7 @@ __all__ = [
     "create_pending_action",
     "get_pending_action_metadata",
     "is_destructive_tool_call",
+    "pooled_client_middleware",
     "register_handlers",
     "resolve_channel_middleware",
     "resolve_user_middleware",
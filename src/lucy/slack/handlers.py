@@ -19,68 +19,70 @@ from slack_bolt.async_app import AsyncAck, AsyncApp, AsyncBoltContext, AsyncSay
 from slack_sdk.errors import SlackApiError
 
 from lucy.config import settings
+from lucy.core.task_queue import LeasedTask, register_task_handler
+from lucy.infra.admission import Priority, agent_slot, priority_for
+from lucy.infra.concurrency import ShardedLockTable, TTLSet
+from lucy.infra.coordination import get_coordination
+from lucy.slack.rich_output import ProgressiveReply
+from lucy.slack.thread_cache import get_thread_cache
 
 logger = structlog.get_logger()
 
-_processed_events: dict[str, float] = {}
-_dedup_lock: asyncio.Lock | None = None
 EVENT_DEDUP_TTL = settings.event_dedup_ttl
+_event_dedup = TTLSet(EVENT_DEDUP_TTL)
+_processed_events = _event_dedup.entries
 HANDLER_EXECUTION_TIMEOUT = settings.handler_execution_timeout
 APPROVED_ACTION_TIMEOUT = settings.approved_action_timeout
 
+_thread_locks = ShardedLockTable(
+    shards=settings.thread_lock_shards, idle_ttl_s=settings.thread_lock_idle_ttl_s,
+)
 
-_agent_semaphore: asyncio.Semaphore | None = None
-MAX_CONCURRENT_AGENTS = settings.max_concurrent_agents
 
-_thread_locks: dict[str, asyncio.Lock] = {}
-_thread_lock_registry: asyncio.Lock | None = None
+def _thread_lock_key(thread_ts: str, workspace_id: str = "") -> str:
+    # Keys include workspace_id to avoid cross-tenant lock collisions.
+    return f"{workspace_id}:{thread_ts}" if workspace_id else thread_ts
 
 
-def _get_thread_lock_registry() -> asyncio.Lock:
-    global _thread_lock_registry
-    if _thread_lock_registry is None:
-        _thread_lock_registry = asyncio.Lock()
-    return _thread_lock_registry
+async def _get_thread_lock(thread_ts: str, workspace_id: str = "") -> asyncio.Lock:
+    """Get or create a per-thread lock to prevent concurrent agent runs."""
+    return _thread_locks.get(_thread_lock_key(thread_ts, workspace_id))
 
 
-async def _get_thread_lock(thread_ts: str, workspace_id: str = "") -> asyncio.Lock:
-    """Get or create a per-thread lock to prevent concurrent agent runs.
+async def _claim_event(dedup_key: str) -> bool:
+    """True the first time an event is seen (by any replica, if shared)."""
+    if not _event_dedup.add(dedup_key):
+        return False
+    coord = get_coordination()
+    if not coord.shared:
+        return True
+    try:
+        return await coord.claim(f"event:{dedup_key}", EVENT_DEDUP_TTL)
+    except Exception as e:
+        logger.warning("shared_event_claim_failed", error=str(e))
+        return True
 
-    Keys include workspace_id to avoid cross-tenant lock collisions.
-    """
-    lock_key = f"{workspace_id}:{thread_ts}" if workspace_id else thread_ts
-    registry = _get_thread_lock_registry()
-    async with registry:
-        now = time.monotonic()
-        stale = [
-            k for k, v in _thread_locks.items()
-            if not v.locked() and hasattr(v, "_created_at")
-            and now - v._created_at > 300  # type: ignore[attr-defined]
-        ]
-        for k in stale:
-            del _thread_locks[k]
-
-        if lock_key not in _thread_locks:
-            lock = asyncio.Lock()
-            lock._created_at = now  # type: ignore[attr-defined]
-            _thread_locks[lock_key] = lock
-        return _thread_locks[lock_key]
-
-
-def _get_dedup_lock() -> asyncio.Lock:
-    """Lazily create the dedup lock inside the running event loop."""
-    global _dedup_lock
-    if _dedup_lock is None:
-        _dedup_lock = asyncio.Lock()
-    return _dedup_lock
-
-
-def _get_agent_semaphore() -> asyncio.Semaphore:
-    """Lazily create the agent concurrency semaphore."""
-    global _agent_semaphore
-    if _agent_semaphore is None:
-        _agent_semaphore = asyncio.Semaphore(MAX_CONCURRENT_AGENTS)
-    return _agent_semaphore
+
+async def _claim_thread(lock_key: str) -> bool:
+    """Take the cross-replica lease on a thread (always True when local)."""
+    coord = get_coordination()
+    if not coord.shared:
+        return True
+    try:
+        return await coord.claim(f"thread:{lock_key}", HANDLER_EXECUTION_TIMEOUT)
+    except Exception as e:
+        logger.warning("shared_thread_claim_failed", error=str(e))
+        return True
+
+
+async def _release_thread(lock_key: str) -> None:
+    coord = get_coordination()
+    if not coord.shared:
+        return
+    try:
+        await coord.release(f"thread:{lock_key}")
+    except Exception as e:
+        logger.warning("shared_thread_release_failed", error=str(e))
 
 
 def register_handlers(app: AsyncApp) -> None:
@@ -120,6 +122,7 @@ def register_handlers(app: AsyncApp) -> None:
         context: AsyncBoltContext,
         client: Any,
     ) -> None:
+        get_thread_cache().observe(event, start_thread=True)
         text = event.get("text", "")
         channel_id = event.get("channel")
         thread_ts = event.get("thread_ts") or event.get("ts")
@@ -158,6 +161,8 @@ def register_handlers(app: AsyncApp) -> None:
         context: AsyncBoltContext,
         client: Any,
     ) -> None:
+        # Every message (Lucy's own, edits, deletions) keeps cached threads current.
+        get_thread_cache().observe(event, start_thread=event.get("channel_type") == "im")
         bot_user_id = context.get("bot_user_id")
         if event.get("user") == bot_user_id:
             return
@@ -211,6 +216,7 @@ def register_handlers(app: AsyncApp) -> None:
             from lucy.core.task_manager import get_task_manager
 
             task_mgr = get_task_manager()
+            await task_mgr.refresh()
             active = task_mgr.get_active_for_thread(
                 event.get("thread_ts"),
                 workspace_id=context.get("workspace_id", ""),
@@ -358,7 +364,7 @@ def register_handlers(app: AsyncApp) -> None:
         # This prevents other workspace members from executing actions on behalf
         # of someone else without their knowledge.
         from lucy.slack.hitl import get_pending_action_metadata, resolve_pending_action
-        metadata = get_pending_action_metadata(action_id)
+        metadata = await get_pending_action_metadata(action_id)
         if metadata:
             requesting_user = metadata.get("requesting_user_id", "")
             if requesting_user and approver_id and requesting_user != approver_id:
@@ -637,7 +643,7 @@ def register_handlers(app: AsyncApp) -> None:
         team_id = str(context.get("team_id") or "")
         if team_id:
             from lucy.core.token_store import invalidate_cache
-            invalidate_cache(team_id)
+            await invalidate_cache(team_id)
             try:
                 from lucy.db.session import db_session
                 from lucy.db.models import Workspace
@@ -661,7 +667,7 @@ def register_handlers(app: AsyncApp) -> None:
         team_id = str(context.get("team_id") or "")
         if team_id:
             from lucy.core.token_store import invalidate_cache
-            invalidate_cache(team_id)
+            await invalidate_cache(team_id)
         logger.info("tokens_revoked", team_id=team_id)
 
 
@@ -673,8 +679,20 @@ def _build_progress_message(workspace_id: str) -> str | None:
     """Build a progress update from actual agent state (no LLM call).
 
     Reads the live tool-call counter from the running agent so the message
-    reflects real work done, not generated filler.
+    reflects real work done, not generated filler. While a local script is
+    running, its latest output line is quoted instead.
     """
+    from lucy.workspace.output_stream import latest_output
+
+    live = latest_output(workspace_id)
+    if live is not None:
+        minutes, seconds = divmod(round(time.monotonic() - live.started_at), 60)
+        line = live.last_line.replace("`", "'")
+        return (
+            f"Still working on this. A {live.label} I'm running has been going for "
+            f"{minutes}m {seconds:02d}s. Latest output: `{line}`"
+        )
+
     try:
         from lucy.core.agent import get_agent
         agent = get_agent()
@@ -704,10 +722,14 @@ async def _maybe_send_progress(
     text: str,
     workspace_id: str,
     delay_seconds: float = 180.0,
+    reply: ProgressiveReply | None = None,
 ) -> None:
-    """Decision gate: wait 3 minutes, then send ONE progress update if still running."""
+    """Decision gate: wait 3 minutes, then send ONE progress update if still running.
+
+    Skipped when the answer is already streaming into the thread.
+    """
     await asyncio.sleep(delay_seconds)
-    if agent_task.done():
+    if agent_task.done() or (reply is not None and reply.ts is not None):
         return
     progress_msg = _build_progress_message(workspace_id)
     if progress_msg:
@@ -732,8 +754,6 @@ async def _handle_message(
     user_id: str | None = None,
 ) -> None:
     """Handle a user message: add reaction, run agent, post response."""
-    global _processed_events
-
     # Skip Slack retries (HTTP Events API sends x-slack-retry-num on retry)
     retry_num = context.get("retry_num") or context.get("x-slack-retry-num")
     retry_reason = context.get("retry_reason") or context.get("x-slack-retry-reason")
@@ -755,17 +775,9 @@ async def _handle_message(
     )
     if event_ts:
         dedup_key = f"{team_id_for_dedup}:{event_ts}" if team_id_for_dedup else event_ts
-        lock = _get_dedup_lock()
-        async with lock:
-            now = time.monotonic()
-            if dedup_key in _processed_events:
-                logger.debug("event_dedup_skip", event_ts=event_ts)
-                return
-            _processed_events[dedup_key] = now
-            _processed_events = {
-                k: v for k, v in _processed_events.items()
-                if now - v < EVENT_DEDUP_TTL
-            }
+        if not await _claim_event(dedup_key):
+            logger.debug("event_dedup_skip", event_ts=event_ts)
+            return
 
     workspace_id = context.get("workspace_id")
     if not workspace_id:
@@ -851,11 +863,19 @@ async def _handle_message(
     effective_thread = thread_ts or event_ts
     acquired = False
     tlock = None
+    thread_key = ""
     if effective_thread:
+        thread_key = _thread_lock_key(effective_thread, workspace_id)
         tlock = await _get_thread_lock(effective_thread, workspace_id)
         try:
             acquired = await asyncio.wait_for(tlock.acquire(), timeout=0.1)
         except TimeoutError:
+            acquired = False
+        if acquired and not await _claim_thread(thread_key):
+            # Another replica is running an agent in this thread.
+            tlock.release()
+            acquired = False
+        if not acquired:
             logger.info(
                 "thread_busy_skipped",
                 thread_ts=effective_thread,
@@ -873,6 +893,7 @@ async def _handle_message(
     # ── Full agent loop path ──────────────────────────────────────────
     working_emoji = get_working_emoji(text)
     progress_task: asyncio.Task | None = None  # type: ignore[type-arg]
+    reply: ProgressiveReply | None = None
     if client and channel_id and event_ts:
         reaction_task = asyncio.create_task(
             _add_reaction(client, channel_id, event_ts, emoji=working_emoji)
@@ -919,6 +940,7 @@ async def _handle_message(
             get_task_manager,
             should_run_as_background_task,
         )
+        from lucy.crons.dispatch import interactive_slot
         from lucy.pipeline.router import classify_and_route
 
         route = classify_and_route(
@@ -930,39 +952,59 @@ async def _handle_message(
             task_mgr = get_task_manager()
 
             async def _bg_handler() -> str:
-                sem = _get_agent_semaphore()
-                async with sem:
+                async with (
+                    agent_slot(Priority.BACKGROUND, workspace_id),
+                    interactive_slot(),
+                ):
                     return await _run_with_recovery(
                         agent, text, ctx, client, workspace_id,
                     )
 
             try:
-                await task_mgr.start_task(
-                    workspace_id=workspace_id,
-                    channel_id=channel_id or "",
-                    thread_ts=thread_ts or "",
-                    description=text[:300],
-                    handler=_bg_handler,
-                    slack_client=client,
-                )
+                if settings.task_queue_enabled:
+                    await task_mgr.enqueue_task(
+                        workspace_id=workspace_id,
+                        channel_id=channel_id or "",
+                        thread_ts=thread_ts or "",
+                        description=text[:300],
+                        task_type="agent_run",
+                        payload={"text": text, "user_id": user_id, "team_id": team_id},
+                        slack_client=client,
+                        # Posts and tool writes may already have happened;
+                        # a failed run is reported, not repeated.
+                        max_attempts=1,
+                    )
+                else:
+                    await task_mgr.start_task(
+                        workspace_id=workspace_id,
+                        channel_id=channel_id or "",
+                        thread_ts=thread_ts or "",
+                        description=text[:300],
+                        handler=_bg_handler,
+                        slack_client=client,
+                    )
                 # Task acknowledged — don't post response here,
                 # the task will post its own result when done
                 return
             except RuntimeError as e:
-                # Too many background tasks — fall through to sync
+                # Too many background tasks (or no queue) — fall through to sync
                 logger.warning("background_task_limit", error=str(e))
 
         # ── Normal synchronous path (thread-locked) ─────────────────
+        priority = priority_for(route.intent)
+        if settings.slack_stream_replies and client and channel_id:
+            reply = ProgressiveReply(client, channel_id, thread_ts, workspace_id)
+            ctx.reply_stream = reply
+
         async def _sync_run() -> str:
-            sem = _get_agent_semaphore()
-            async with sem:
+            async with agent_slot(priority, workspace_id), interactive_slot():
                 return await _run_with_recovery(
                     agent, text, ctx, client, workspace_id,
                 )
 
         agent_task = asyncio.create_task(_sync_run())
         progress_task = asyncio.create_task(
-            _maybe_send_progress(agent_task, say, thread_ts, text, workspace_id)
+            _maybe_send_progress(agent_task, say, thread_ts, text, workspace_id, reply=reply)
         )
         progress_task.add_done_callback(_log_task_exception)
 
@@ -1018,38 +1060,28 @@ async def _handle_message(
                 "Could you rephrase or provide more details?"
             )
 
-        if should_split_response(slack_text):
+        if reply is not None:
+            # Replaces the streamed draft (if any) with the final text.
+            chunks = await reply.finish(slack_text)
+        elif should_split_response(slack_text):
             chunks = split_response(slack_text)
-            for i, chunk in enumerate(chunks):
-                blocks = text_to_blocks(chunk)
-                chunk_kwargs: dict[str, Any] = {"thread_ts": thread_ts}
-                if blocks:
-                    blocks = enhance_blocks(blocks)
-                    chunk_kwargs["blocks"] = blocks
-                    chunk_kwargs["text"] = chunk[:500]
-                else:
-                    chunk_kwargs["text"] = chunk
-
-                if trace and i == 0:
-                    async with trace.span("slack_post"):
-                        await say(**chunk_kwargs)
-                else:
-                    await say(**chunk_kwargs)
         else:
-            blocks = text_to_blocks(slack_text)
-            post_kwargs: dict[str, Any] = {"thread_ts": thread_ts}
+            chunks = [slack_text]
+        for i, chunk in enumerate(chunks):
+            blocks = text_to_blocks(chunk)
+            chunk_kwargs: dict[str, Any] = {"thread_ts": thread_ts}
             if blocks:
                 blocks = enhance_blocks(blocks)
-                post_kwargs["blocks"] = blocks
-                post_kwargs["text"] = slack_text[:500]
+                chunk_kwargs["blocks"] = blocks
+                chunk_kwargs["text"] = chunk[:500]
             else:
-                post_kwargs["text"] = slack_text
+                chunk_kwargs["text"] = chunk
 
-            if trace:
+            if trace and i == 0:
                 async with trace.span("slack_post"):
-                    await say(**post_kwargs)
+                    await say(**chunk_kwargs)
             else:
-                await say(**post_kwargs)
+                await say(**chunk_kwargs)
 
     except Exception as e:
         logger.error(
@@ -1090,8 +1122,13 @@ async def _handle_message(
     finally:
         if progress_task is not None and not progress_task.done():
             progress_task.cancel()
+        if reply is not None:
+            # No-op after finish(); otherwise drops a draft of an answer
+            # that was never delivered (timeout, error, HITL prompt).
+            await reply.discard()
         if acquired and tlock is not None:
             tlock.release()
+            await _release_thread(thread_key)
         if client and channel_id and event_ts:
             cleanup_task = asyncio.create_task(
                 _remove_reaction(client, channel_id, event_ts, emoji=working_emoji)
@@ -1196,6 +1233,59 @@ async def _run_with_recovery(
     raise RuntimeError(degradation_msg)
 
 
+async def _run_queued_agent_task(task: LeasedTask, slack_client: Any) -> str:
+    """Task queue handler for background agent runs (``agent_run``).
+
+    Enqueued with ``max_attempts=1``, so a failed run is never repeated.
+    A run cut off by a worker shutdown is handed back and restarts from
+    the top (an agent run cannot pick up mid-loop), and says so in the
+    thread. ``slack_client`` is the workspace's own client, which the
+    worker resolves from the payload's ``team_id``.
+    """
+    from lucy.core.agent import AgentContext, get_agent
+    from lucy.crons.dispatch import interactive_slot
+
+    if task.interrupted and slack_client and task.channel_id:
+        try:
+            await slack_client.chat_postMessage(
+                channel=task.channel_id,
+                thread_ts=task.thread_ts,
+                text="I got interrupted partway through this, so I'm picking it back up now.",
+            )
+        except Exception as e:
+            logger.warning("task_resume_post_failed", error=str(e))
+    await task.checkpoint(attempt=task.attempt, started_at=time.time())
+
+    payload = task.payload
+    team_id = payload.get("team_id")
+    ctx = AgentContext(
+        workspace_id=task.workspace_id,
+        channel_id=task.channel_id,
+        thread_ts=task.thread_ts,
+        user_slack_id=payload.get("user_id"),
+        team_id=team_id,
+    )
+    if team_id:
+        # The worker may be a separate process; point Composio at this
+        # workspace's entity exactly as the inline path does.
+        try:
+            from lucy.integrations.composio_client import get_composio_client
+            get_composio_client().set_entity_id(task.workspace_id, f"slack_{team_id}")
+        except Exception as e:
+            logger.warning(
+                "composio_setup_failed",
+                workspace_id=task.workspace_id,
+                error=str(e),
+            )
+    async with agent_slot(Priority.BACKGROUND, task.workspace_id), interactive_slot():
+        return await _run_with_recovery(
+            get_agent(), payload["text"], ctx, slack_client, task.workspace_id,
+        )
+
+
+register_task_handler("agent_run", _run_queued_agent_task)
+
+
 # ═══════════════════════════════════════════════════════════════════════
 # HELPERS
 # ═══════════════════════════════════════════════════════════════════════
@@ -1318,10 +1408,8 @@ async def _is_lucy_in_thread(
     if not channel_id or not thread_ts:
         return False
     try:
-        result = await client.conversations_replies(
-            channel=channel_id, ts=thread_ts, limit=50
-        )
-        for msg in result.get("messages", []):
+        messages = await get_thread_cache().messages(client, channel_id, thread_ts, limit=50)
+        for msg in messages:
             if lucy_bot_id and (
                 msg.get("user") == lucy_bot_id
                 or msg.get("bot_id") == lucy_bot_id
@@ -7,11 +7,14 @@ prompt to the user via Block Kit buttons.
 
 Pending actions expire after PENDING_TTL_SECONDS.
 
-Storage: in-memory (fast path) + workspace file (survive restarts).
+Storage: the coordination backend (``lucy.infra.coordination``), shared
+by all replicas when it is Postgres. With the in-memory backend each
+action is also written to a workspace file so it survives restarts.
 """
 
 from __future__ import annotations
 
+import asyncio
 import json
 import time
 import uuid
@@ -21,12 +24,16 @@ from typing import Any
 import structlog
 
 from lucy.config import settings
+from lucy.infra.coordination import get_coordination
 
 logger = structlog.get_logger()
 
 PENDING_TTL_SECONDS = 300.0
 
-_pending_actions: dict[str, dict[str, Any]] = {}
+_KEY_PREFIX = "hitl:"
+_EXPIRY_GRACE_S = 3600.0
+_CLEANUP_INTERVAL_S = 15.0
+_cleaned_at = 0.0
 
 
 def _hitl_store_path(workspace_id: str) -> Path:
@@ -47,9 +54,7 @@ def _persist_action(workspace_id: str, action_id: str, action: dict[str, Any]) -
             except Exception as e:
                 logger.warning("hitl_store_parse_failed", error=str(e))
                 data = {}
-        # Store wall-clock timestamp for cross-process TTL
-        storable = {**action, "wall_created_at": time.time()}
-        data[action_id] = storable
+        data[action_id] = action
         # Prune expired entries while we're here
         cutoff = time.time() - PENDING_TTL_SECONDS
         data = {k: v for k, v in data.items() if v.get("wall_created_at", 0) > cutoff}
@@ -72,27 +77,19 @@ def _remove_persisted_action(workspace_id: str, action_id: str) -> None:
 
 
 def _load_from_disk(workspace_id: str) -> dict[str, dict[str, Any]]:
-    """Load surviving HITL actions from disk into in-memory store."""
+    """Load surviving, unexpired HITL actions from a workspace file."""
     try:
         path = _hitl_store_path(workspace_id)
         if not path.exists():
             return {}
         data: dict[str, Any] = json.loads(path.read_text(encoding="utf-8"))
-        cutoff = time.time() - PENDING_TTL_SECONDS
-        valid = {}
-        for k, v in data.items():
-            if v.get("wall_created_at", 0) > cutoff:
-                # Restore monotonic-compatible created_at (approximate)
-                elapsed = time.time() - v.get("wall_created_at", time.time())
-                v["created_at"] = time.monotonic() - elapsed
-                valid[k] = v
-        return valid
+        return {k: v for k, v in data.items() if not _is_expired(v)}
     except Exception as e:
         logger.warning("hitl_load_from_disk_failed", error=str(e))
         return {}
 
 
-def create_pending_action(
+async def create_pending_action(
     tool_name: str,
     parameters: dict[str, Any],
     description: str,
@@ -114,13 +111,14 @@ def create_pending_action(
         "description": description,
         "workspace_id": workspace_id,
         "requesting_user_id": requesting_user_id,
-        "created_at": time.monotonic(),
         "wall_created_at": time.time(),
     }
-    _pending_actions[action_id] = action
-    _persist_action(workspace_id, action_id, action)
+    coord = get_coordination()
+    await coord.put(_action_key(action_id), action, PENDING_TTL_SECONDS + _EXPIRY_GRACE_S)
+    if not coord.shared:
+        _persist_action(workspace_id, action_id, action)
 
-    _cleanup_expired()
+    await _cleanup_expired()
 
     logger.info(
         "hitl_action_created",
@@ -131,15 +129,19 @@ def create_pending_action(
     return action_id
 
 
-def get_pending_action_metadata(action_id: str) -> dict[str, Any] | None:
+async def get_pending_action_metadata(action_id: str) -> dict[str, Any] | None:
     """Return metadata for a pending action without resolving it.
 
     Used for pre-flight checks (e.g., ownership verification) before approval.
-    Returns None if the action is not found in memory (disk not checked — this
-    is intentional: a server restart means we can't verify ownership, so we
-    allow the approval to proceed rather than block legitimate post-restart use).
+    Returns None if the action is not in the coordination store (disk not
+    checked — this is intentional: a server restart means we can't verify
+    ownership, so we allow the approval to proceed rather than block
+    legitimate post-restart use).
     """
-    return _pending_actions.get(action_id)
+    action = await get_coordination().get(_action_key(action_id))
+    if action is None or _is_expired(action):
+        return None
+    return action
 
 
 async def resolve_pending_action(
@@ -151,14 +153,19 @@ async def resolve_pending_action(
     Returns the action data if approved and found, None otherwise.
     Falls back to disk if not in the in-memory store (handles restarts).
     """
-    _cleanup_expired()
-    action = _pending_actions.pop(action_id, None)
-
-    if not action:
+    await _cleanup_expired()
+    coord = get_coordination()
+    # take() is atomic: of two concurrent resolves (even on different
+    # replicas), exactly one gets the action, so it can't run twice.
+    action = await coord.take(_action_key(action_id))
+    if action is not None and _is_expired(action):
+        action = None
+
+    if not action and not coord.shared:
         # Try loading from disk (server may have restarted).
-        # IMPORTANT: Do NOT re-insert into _pending_actions here — that would
-        # create a ghost entry that a second concurrent resolve call could pop
-        # and execute again, causing double-execution in multi-process deploys.
+        # IMPORTANT: Do NOT re-insert into the store here — that would
+        # create a ghost entry that a second concurrent resolve call could
+        # take and execute again, causing double execution.
         logger.info("hitl_action_not_in_memory_trying_disk", action_id=action_id)
         root = Path(settings.workspace_root)
         if root.is_dir():
@@ -180,7 +187,7 @@ async def resolve_pending_action(
 
     # Remove from disk regardless of approval/cancel
     workspace_id = action.get("workspace_id", "")
-    if workspace_id:
+    if workspace_id and not coord.shared:
         _remove_persisted_action(workspace_id, action_id)
 
     if approved:
@@ -204,20 +211,41 @@ def register_expiry_callback(cb: Any) -> None:
     _expiry_callbacks.append(cb)
 
 
-def _cleanup_expired() -> None:
-    """Remove expired pending actions and fire expiry callbacks."""
-    import asyncio
+def _action_key(action_id: str) -> str:
+    return f"{_KEY_PREFIX}{action_id}"
+
+
+def _is_expired(action: dict[str, Any], now: float | None = None) -> bool:
+    now = time.time() if now is None else now
+    return now - action.get("wall_created_at", 0) > PENDING_TTL_SECONDS
 
-    now = time.monotonic()
-    expired = [
-        (aid, data) for aid, data in _pending_actions.items()
-        if now - data["created_at"] > PENDING_TTL_SECONDS
-    ]
-    for aid, data in expired:
-        _pending_actions.pop(aid, None)
+
+async def _cleanup_expired() -> None:
+    """Remove expired pending actions and fire expiry callbacks.
+
+    Entries outlive PENDING_TTL_SECONDS by a grace period so that an
+    expired action is still there to be taken here, by exactly one
+    replica, which then sends the expiry notice.
+    """
+    global _cleaned_at
+    if time.monotonic() - _cleaned_at < _CLEANUP_INTERVAL_S:
+        return
+    _cleaned_at = time.monotonic()
+
+    coord = get_coordination()
+    now = time.time()
+    try:
+        pending = await coord.scan(_KEY_PREFIX)
+    except Exception as e:
+        logger.warning("hitl_cleanup_scan_failed", error=str(e))
+        return
+    for key, data in pending.items():
+        if not _is_expired(data, now) or await coord.take(key) is None:
+            continue
+        aid = key.removeprefix(_KEY_PREFIX)
         # Remove from disk so it doesn't reappear after restart
         workspace_id = data.get("workspace_id", "")
-        if workspace_id:
+        if workspace_id and not coord.shared:
             _remove_persisted_action(workspace_id, aid)
 
         logger.info(
@@ -230,9 +258,7 @@ def _cleanup_expired() -> None:
         # Fire expiry callbacks (e.g. notify the requesting user in Slack)
         for cb in _expiry_callbacks:
             try:
-                loop = asyncio.get_event_loop()
-                if loop.is_running():
-                    asyncio.ensure_future(cb(data))
+                asyncio.ensure_future(cb(data))
             except Exception as exc:
                 logger.debug("hitl_expiry_callback_failed", error=str(exc))
 
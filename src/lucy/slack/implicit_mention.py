@@ -23,6 +23,8 @@ from typing import Any
 
 import structlog
 
+from lucy.infra.coordination import get_coordination
+
 logger = structlog.get_logger()
 
 # ── Layer 1: Free regex gate ──────────────────────────────────────────────
@@ -79,30 +81,27 @@ _DIRECTED_AT_LUCY = re.compile(
 
 # ── Rate limiting ─────────────────────────────────────────────────────────
 
-# Per-channel cooldown to prevent spam
+# Per-channel cooldown to prevent spam. Kept in the coordination backend
+# so the cooldown holds across replicas.
 _COOLDOWN_SECONDS = 30.0
-_last_implicit_trigger: dict[str, float] = {}
-_rate_lock = asyncio.Lock()
-
 
-async def _check_rate_limit(channel_id: str, workspace_id: str = "") -> bool:
-    """Return True if we're within cooldown (should NOT trigger).
 
-    Keys include workspace_id to avoid cross-tenant rate limit collisions.
-    """
+def _cooldown_key(channel_id: str, workspace_id: str = "") -> str:
+    # Keys include workspace_id to avoid cross-tenant rate limit collisions.
     key = f"{workspace_id}:{channel_id}" if workspace_id else channel_id
-    async with _rate_lock:
-        last = _last_implicit_trigger.get(key, 0.0)
-        if time.monotonic() - last < _COOLDOWN_SECONDS:
-            return True  # rate limited
-        return False
+    return f"implicit:{key}"
+
+
+async def _check_rate_limit(channel_id: str, workspace_id: str = "") -> bool:
+    """Return True if we're within cooldown (should NOT trigger)."""
+    return await get_coordination().exists(_cooldown_key(channel_id, workspace_id))
 
 
 async def _record_trigger(channel_id: str, workspace_id: str = "") -> None:
     """Record that we triggered in this channel."""
-    key = f"{workspace_id}:{channel_id}" if workspace_id else channel_id
-    async with _rate_lock:
-        _last_implicit_trigger[key] = time.monotonic()
+    await get_coordination().put(
+        _cooldown_key(channel_id, workspace_id), time.time(), _COOLDOWN_SECONDS,
+    )
 
 
 # ── Layer 1: Regex check ─────────────────────────────────────────────────
@@ -2,6 +2,7 @@
 
 Resolves workspace_id and user_id from Slack events and attaches to context.
 Creates workspaces/users on first encounter (lazy onboarding).
+Swaps Bolt's per-request web client for the pooled transport client.
 """
 
 from __future__ import annotations
@@ -17,10 +18,24 @@ from sqlalchemy.exc import IntegrityError
 
 from lucy.db.models import Channel, User, Workspace
 from lucy.db.session import AsyncSessionLocal
+from lucy.slack.transport import PooledSlackClient, get_slack_transport
 
 logger = structlog.get_logger()
 
 
+async def pooled_client_middleware(context: Any, next: Callable[[], Any]) -> None:
+    """Replace the per-request AsyncWebClient with the pooled client.
+
+    Bolt builds a fresh client (and connection pool) for every request.
+    Runs after authorization, so the client already holds the team's
+    bot token; ``say`` is built lazily from ``context.client``.
+    """
+    client = context.get("client")
+    if client is not None and client.token and not isinstance(client, PooledSlackClient):
+        context["client"] = get_slack_transport().client(client.token, ssl=client.ssl)
+    await next()
+
+
 async def resolve_workspace_middleware(
     request: AsyncBoltRequest, context: Any, next: Callable[[], Any]
 ) -> None:
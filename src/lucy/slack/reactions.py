@@ -14,11 +14,12 @@ Viktor's approach:
 
 from __future__ import annotations
 
-import re
 from dataclasses import dataclass
 
 import structlog
 
+from lucy.pipeline.features import Feature, extract_features
+
 logger = structlog.get_logger()
 
 
@@ -30,79 +31,24 @@ class ReactionDecision:
     should_react: bool
 
 
-_REACTION_RULES: list[tuple[re.Pattern[str], str, bool]] = [
-    # (pattern, emoji_name, react_only)
+# First match wins. The patterns live in pipeline/features.py and are
+# matched once per message alongside the router's and fast path's.
+_REACTION_RULES: list[tuple[Feature, str, bool]] = [
+    # (feature, emoji_name, react_only)
 
     # ── React-only patterns (no reply needed) ─────────────────────────
-    (re.compile(
-        r"^(?:(?:ok(?:ay)?|alright|sure|yep|yup|cool|great|nice)\s+)?"
-        r"(?:thanks?(?:\s+(?:a lot|so much|very much|a ton|for|viktor|lucy))?|"
-        r"ty(?:\s|!|$)|thx|cheers|appreciate it|much appreciated|"
-        r"thank you(?:\s+(?:so much|very much|a lot|for))?)"
-        r"[!.\s]*$",
-        re.IGNORECASE,
-    ), "saluting_face", True),
-
-    (re.compile(
-        r"^(?:got it|noted|understood|makes sense|perfect|"
-        r"sounds good|sounds great|cool|nice|great|awesome|"
-        r"amazing|love it|beautiful|sweet|wonderful|brilliant|"
-        r"exactly|precisely|right on|spot on|nailed it)"
-        r"[!.\s]*$",
-        re.IGNORECASE,
-    ), "white_check_mark", True),
-
-    (re.compile(
-        r"^(?:(?:looks? )?good(?:\s+to (?:me|go))?|approved?|"
-        r"lgtm|ship it|go (?:ahead|for it)|yes(?:\s+please)?|"
-        r"yep|yup|sure|absolutely|definitely|"
-        r"ok(?:ay)?(?:\s+(?:cool|great|nice|perfect|no worries))?)"
-        r"[!.\s]*$",
-        re.IGNORECASE,
-    ), "thumbsup", True),
+    (Feature.REACT_THANKS, "saluting_face", True),
+    (Feature.REACT_ACK, "white_check_mark", True),
+    (Feature.REACT_APPROVAL, "thumbsup", True),
 
     # ── React + reply patterns ────────────────────────────────────────
-    (re.compile(
-        r"\b(?:urgent|asap|immediately|critical|emergency|"
-        r"right now|time.?sensitive|drop everything|p0|sev.?1)\b",
-        re.IGNORECASE,
-    ), "zap", False),
-
-    (re.compile(
-        r"\b(?:bug|broken|crash(?:ing|ed)?|error|fail(?:ing|ed|ure)?|"
-        r"down|outage|not working|500|404)\b",
-        re.IGNORECASE,
-    ), "mag", False),
-
-    (re.compile(
-        r"\b(?:can you (?:check|find|look)|"
-        r"what(?:'s| is) (?:the|our|my)|how (?:do|does|can)|"
-        r"where (?:is|are|can)|investigate|look into|dig into)\b",
-        re.IGNORECASE,
-    ), "eyes", False),
-
-    (re.compile(
-        r"\b(?:create|build|make|generate|draft|prepare|"
-        r"write|set up|configure|schedule)\b",
-        re.IGNORECASE,
-    ), "hammer_and_wrench", False),
-
-    (re.compile(
-        r"\b(?:analyze|research|compare|benchmark|audit|"
-        r"report|deep dive|competitor|market)\b",
-        re.IGNORECASE,
-    ), "bar_chart", False),
-
-    (re.compile(
-        r"\b(?:deploy|ship|release|push|launch|go live|publish)\b",
-        re.IGNORECASE,
-    ), "rocket", False),
-
-    (re.compile(
-        r"\b(?:fyi|heads up|just (?:so you know|letting you know)|"
-        r"for (?:your )?(?:info|reference|context))\b",
-        re.IGNORECASE,
-    ), "memo", True),
+    (Feature.REACT_URGENT, "zap", False),
+    (Feature.REACT_PROBLEM, "mag", False),
+    (Feature.REACT_QUESTION, "eyes", False),
+    (Feature.REACT_BUILD, "hammer_and_wrench", False),
+    (Feature.REACT_ANALYSIS, "bar_chart", False),
+    (Feature.REACT_SHIP, "rocket", False),
+    (Feature.REACT_FYI, "memo", True),
 ]
 
 _DEFAULT_REACTION = ReactionDecision(
@@ -119,9 +65,10 @@ def classify_reaction(message: str) -> ReactionDecision:
     """
     text = message.strip()
     word_count = len(text.split())
+    features = extract_features(text)
 
-    for pattern, emoji, react_only in _REACTION_RULES:
-        if pattern.search(text):
+    for feature, emoji, react_only in _REACTION_RULES:
+        if feature in features:
             if react_only and word_count > 8:
                 return ReactionDecision(
                     emoji=emoji,
@@ -5,15 +5,24 @@ Enhances Lucy's existing Block Kit (blockkit.py) with:
 2. Section emojis — strategic emoji prefixes for headers
 3. Block Kit enhancement — post-processing of blocks
 4. Response splitting — long messages split at natural break points
+5. Progressive replies — a streamed answer rendered into one message
+   with coalesced ``chat.update`` calls
 """
 
 from __future__ import annotations
 
+import asyncio
 import re
+import time
 from typing import Any
 
 import structlog
 
+from lucy.config import settings
+from lucy.pipeline.output import IncrementalOutput
+from lucy.slack.blockkit import text_to_blocks
+from lucy.slack.transport import retry_after
+
 logger = structlog.get_logger()
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -227,3 +236,195 @@ def split_response(text: str) -> list[str]:
         chunks.append(remaining.strip())
 
     return chunks
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# PROGRESSIVE REPLIES
+# ═══════════════════════════════════════════════════════════════════════════
+
+_MAX_FINAL_RETRY_AFTER_S = 10.0
+
+
+class ProgressiveReply:
+    """Renders an answer into Slack while the model is still writing it.
+
+    Used as the agent's ``reply_stream``: the LLM client feeds it text
+    deltas, ``IncrementalOutput`` turns completed paragraphs into mrkdwn,
+    and a background flusher posts the message once
+    ``slack_stream_min_chars`` are ready, then edits it with
+    ``chat.update``. Deltas that arrive between two updates are coalesced
+    into the next one. Updates are at least ``slack_stream_update_interval_s``
+    apart, take a token from the workspace's Slack rate-limit bucket (skipped,
+    not waited for, when it is empty), and back off by ``Retry-After`` on a
+    429.
+
+    ``reset()`` (a tool call started, so the text so far was narration)
+    deletes any posted draft; the next answer starts a new one.
+
+    The caller ends it with ``finish()`` (final text replaces the draft) or
+    ``discard()`` (draft deleted, e.g. on failure or a HITL prompt).
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        channel_id: str,
+        thread_ts: str | None,
+        workspace_id: str = "",
+        *,
+        skip_tone_validation: bool = False,
+    ) -> None:
+        self.client = client
+        self.channel_id = channel_id
+        self.thread_ts = thread_ts
+        self.workspace_id = workspace_id
+        self.min_chars = settings.slack_stream_min_chars
+        self.interval = settings.slack_stream_update_interval_s
+        self.ts: str | None = None
+        self.updates = 0
+        self._output = IncrementalOutput(skip_tone_validation=skip_tone_validation)
+        self._dirty = asyncio.Event()
+        self._flusher: asyncio.Task[None] | None = None
+        self._closed = False
+        self._sent = ""
+        self._next_at = 0.0
+        # Bumped by reset(); a post that was in flight across it is stale.
+        self._generation = 0
+        self._deletes: set[asyncio.Task[None]] = set()
+
+    # ── ContentSink ──────────────────────────────────────────────────
+
+    def feed(self, text: str) -> None:
+        if self._closed or not self._output.feed(text):
+            return
+        self._dirty.set()
+        if self._flusher is None:
+            self._flusher = asyncio.get_running_loop().create_task(self._flush_loop())
+
+    def reset(self) -> None:
+        self._output.reset()
+        self._dirty.clear()
+        self._generation += 1
+        self._sent = ""
+        if self.ts is not None:
+            ts, self.ts = self.ts, None
+            self._delete_later(ts)
+
+    # ── Lifecycle ────────────────────────────────────────────────────
+
+    async def finish(self, slack_text: str) -> list[str]:
+        """Stop streaming and put the final text in place of the draft.
+
+        Returns the chunks the caller still has to post: all of them when
+        no draft was posted, otherwise the ones after the first.
+        """
+        await self._stop()
+        chunks = split_response(slack_text) if should_split_response(slack_text) else [slack_text]
+        if self.ts is None:
+            return chunks
+        for _ in range(2):
+            try:
+                await self._send(chunks[0])
+                return chunks[1:]
+            except Exception as e:
+                wait = retry_after(e)
+                if wait is None or wait > _MAX_FINAL_RETRY_AFTER_S:
+                    logger.warning("progressive_reply_final_update_failed", error=str(e))
+                    break
+                await asyncio.sleep(wait)
+        # Couldn't edit the draft: remove it and let the caller post normally.
+        await self.discard()
+        return chunks
+
+    async def discard(self) -> None:
+        """Stop streaming and delete the draft, if one was posted."""
+        await self._stop()
+        if self.ts is None:
+            return
+        ts, self.ts = self.ts, None
+        await self._delete(ts)
+
+    async def _stop(self) -> None:
+        self._closed = True
+        if self._flusher is not None:
+            self._flusher.cancel()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+        if self._deletes:
+            await asyncio.gather(*self._deletes, return_exceptions=True)
+
+    def _delete_later(self, ts: str) -> None:
+        task = asyncio.get_running_loop().create_task(self._delete(ts))
+        self._deletes.add(task)
+        task.add_done_callback(self._deletes.discard)
+
+    async def _delete(self, ts: str) -> None:
+        try:
+            await self.client.chat_delete(channel=self.channel_id, ts=ts)
+        except Exception as e:
+            logger.debug("progressive_reply_delete_failed", error=str(e))
+
+    # ── Rendering ────────────────────────────────────────────────────
+
+    async def _flush_loop(self) -> None:
+        from lucy.infra.rate_limiter import get_rate_limiter
+
+        limiter = get_rate_limiter()
+        while not self._closed:
+            await self._dirty.wait()
+            delay = self._next_at - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._dirty.clear()
+
+            text = format_links(self._output.text)
+            if should_split_response(text):
+                text = split_response(text)[0]
+            if not text.strip() or text == self._sent:
+                continue
+            if self.ts is None and len(text) < self.min_chars:
+                continue
+            if not await limiter.acquire_api("slack", timeout=0, workspace_id=self.workspace_id):
+                self._retry_in(self.interval)
+                continue
+            try:
+                if not await self._send(text):
+                    continue
+            except Exception as e:
+                wait = retry_after(e)
+                if wait is None:
+                    logger.warning("progressive_reply_update_failed", error=str(e))
+                    self._closed = True
+                    return
+                logger.info("progressive_reply_rate_limited", retry_after_s=wait)
+                self._retry_in(wait)
+                continue
+            self._sent = text
+            self.updates += 1
+            self._next_at = time.monotonic() + self.interval
+
+    def _retry_in(self, seconds: float) -> None:
+        self._next_at = time.monotonic() + seconds
+        self._dirty.set()
+
+    async def _send(self, text: str) -> bool:
+        """Post or edit the draft. False if a reset() made the post stale."""
+        blocks = text_to_blocks(text)
+        kwargs: dict[str, Any] = {"channel": self.channel_id}
+        if blocks:
+            kwargs["blocks"] = enhance_blocks(blocks)
+            kwargs["text"] = text[:500]
+        else:
+            kwargs["text"] = text
+        if self.ts is None:
+            generation = self._generation
+            response = await self.client.chat_postMessage(thread_ts=self.thread_ts, **kwargs)
+            if generation != self._generation:
+                self._delete_later(response["ts"])
+                return False
+            self.ts = response["ts"]
+        else:
+            # An empty list clears blocks left over from an earlier draft.
+            kwargs.setdefault("blocks", [])
+            await self.client.chat_update(ts=self.ts, **kwargs)
+        return True
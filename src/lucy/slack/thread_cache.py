@@ -0,0 +1,231 @@
+"""Per-thread Slack message cache.
+
+One threaded message used to cost up to three ``conversations.replies``
+round trips. ``_is_lucy_in_thread`` checked for an earlier Lucy reply,
+the agent measured thread depth, and ``_build_thread_messages`` loaded
+the history. All three now read from this cache.
+
+A thread is fetched once, with the largest limit any consumer asks for.
+After that it is kept current from the Slack events themselves. Lucy
+receives every message posted in threads she is in, including her own
+replies and their edits and deletions. Entries expire after
+``slack_thread_cache_ttl_s``, which covers anything the events missed.
+
+Bolt drops Lucy's own messages (``ignoring_self_events_enabled``), so
+her replies, edits and deletions never arrive as events. The Slack
+transport records them instead, from each successful chat.postMessage,
+chat.update and chat.delete (``record_call``).
+
+Only a process that receives events can keep threads current. Until
+``observe`` has been called at least once (e.g. in the cron worker),
+every read goes straight to Slack. With a shared coordination backend,
+a thread's events are spread over several replicas, so no replica's copy
+is complete; the cache is then bypassed altogether.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any
+
+import structlog
+
+from lucy.config import settings
+
+logger = structlog.get_logger()
+
+# conversations.replies returns the *first* ``limit`` messages of a
+# thread, so one fetch at the largest limit answers every smaller one.
+FETCH_LIMIT = 100
+
+
+@dataclass
+class _Thread:
+    messages: list[dict[str, Any]] = field(default_factory=list)
+    fetched_at: float = 0.0
+
+
+def _ts_key(ts: str) -> float:
+    try:
+        return float(ts)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class ThreadCache:
+    """LRU of thread messages, fed by conversations.replies and events."""
+
+    def __init__(self, ttl_s: float, max_threads: int = 500, *, enabled: bool = True) -> None:
+        self.ttl_s = ttl_s
+        self.max_threads = max_threads
+        self.enabled = enabled
+        self.live = False
+        self._threads: OrderedDict[tuple[str, str], _Thread] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    async def messages(
+        self,
+        client: Any,
+        channel_id: str,
+        thread_ts: str,
+        limit: int = FETCH_LIMIT,
+    ) -> list[dict[str, Any]]:
+        """The first ``limit`` messages of a thread, oldest first.
+
+        Same result as ``conversations_replies(limit=limit)["messages"]``.
+        Errors from Slack propagate to the caller.
+        """
+        key = (channel_id, thread_ts)
+        thread = self._threads.get(key)
+        if (
+            self.enabled
+            and self.live
+            and thread is not None
+            and time.monotonic() - thread.fetched_at < self.ttl_s
+        ):
+            self._threads.move_to_end(key)
+            self._hits += 1
+            return thread.messages[:limit]
+
+        self._misses += 1
+        result = await client.conversations_replies(
+            channel=channel_id, ts=thread_ts, limit=max(limit, FETCH_LIMIT),
+        )
+        messages = list(result.get("messages", []))
+        if self.enabled and self.live:
+            self._store(key, messages)
+        return messages[:limit]
+
+    def observe(self, event: dict[str, Any], *, start_thread: bool = False) -> None:
+        """Apply a Slack ``message`` or ``app_mention`` event to cached threads.
+
+        ``start_thread`` seeds a new thread from a top-level message that
+        Lucy is about to answer in-thread, so its first read is a hit.
+        """
+        self.live = True
+        channel_id = event.get("channel")
+        if not channel_id:
+            return
+        subtype = event.get("subtype")
+
+        if subtype == "message_changed":
+            message = event.get("message") or {}
+            thread = self._cached(channel_id, message)
+            if thread is not None:
+                for i, existing in enumerate(thread.messages):
+                    if existing.get("ts") == message.get("ts"):
+                        thread.messages[i] = message
+                        break
+            return
+
+        if subtype == "message_deleted":
+            previous = event.get("previous_message") or {}
+            thread = self._cached(channel_id, previous)
+            if thread is not None:
+                deleted = event.get("deleted_ts") or previous.get("ts")
+                thread.messages = [m for m in thread.messages if m.get("ts") != deleted]
+            return
+
+        ts = event.get("ts")
+        if not ts:
+            return
+        if not event.get("thread_ts"):
+            if start_thread and self.enabled and (channel_id, ts) not in self._threads:
+                self._store((channel_id, ts), [event])
+            return
+        self._append(channel_id, event)
+
+    def record_call(self, method: str, args: dict[str, Any], response: Any) -> None:
+        """Apply one of Lucy's own successful chat.* calls to cached threads.
+
+        ``args`` are the call's arguments and ``response`` Slack's answer.
+        """
+        channel_id = response.get("channel") or args.get("channel")
+        if not channel_id or not self._threads:
+            return
+        message = dict(response.get("message") or {})
+
+        if method == "chat.postMessage":
+            thread_ts = args.get("thread_ts") or message.get("thread_ts")
+            ts = response.get("ts") or message.get("ts")
+            if thread_ts and ts:
+                message.update(ts=ts, thread_ts=thread_ts)
+                message.setdefault("text", args.get("text", ""))
+                self._append(channel_id, message)
+            return
+
+        ts = args.get("ts")
+        for (channel, _), thread in self._threads.items():
+            if channel != channel_id:
+                continue
+            for i, existing in enumerate(thread.messages):
+                if existing.get("ts") != ts:
+                    continue
+                if method == "chat.delete":
+                    del thread.messages[i]
+                else:
+                    updated = {**existing, **message}
+                    if "text" in args and "text" not in message:
+                        updated["text"] = args["text"]
+                    thread.messages[i] = updated
+                return
+
+    def _append(self, channel_id: str, message: dict[str, Any]) -> None:
+        thread = self._cached(channel_id, message)
+        # A thread fetched at the limit may continue past what we hold;
+        # the first FETCH_LIMIT messages are already complete.
+        if thread is None or len(thread.messages) >= FETCH_LIMIT:
+            return
+        if any(m.get("ts") == message.get("ts") for m in thread.messages):
+            return
+        thread.messages.append(message)
+        thread.messages.sort(key=lambda m: _ts_key(m.get("ts", "")))
+
+    def invalidate(self, channel_id: str, thread_ts: str) -> None:
+        self._threads.pop((channel_id, thread_ts), None)
+
+    def clear(self) -> None:
+        self._threads.clear()
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "threads": len(self._threads),
+            "hits": self._hits,
+            "misses": self._misses,
+            "live": self.live,
+            "enabled": self.enabled,
+        }
+
+    def _cached(self, channel_id: str, message: dict[str, Any]) -> _Thread | None:
+        thread_ts = message.get("thread_ts")
+        if not thread_ts:
+            return None
+        return self._threads.get((channel_id, thread_ts))
+
+    def _store(self, key: tuple[str, str], messages: list[dict[str, Any]]) -> None:
+        self._threads[key] = _Thread(messages=messages, fetched_at=time.monotonic())
+        self._threads.move_to_end(key)
+        while len(self._threads) > self.max_threads:
+            self._threads.popitem(last=False)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# SINGLETON
+# ═══════════════════════════════════════════════════════════════════════════
+
+_cache: ThreadCache | None = None
+
+
+def get_thread_cache() -> ThreadCache:
+    """Get or create the singleton ThreadCache."""
+    global _cache
+    if _cache is None:
+        _cache = ThreadCache(
+            settings.slack_thread_cache_ttl_s,
+            max_threads=settings.slack_thread_cache_max_threads,
+            enabled=settings.coordination_backend == "memory",
+        )
+    return _cache
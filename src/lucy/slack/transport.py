@@ -0,0 +1,399 @@
+"""Shared Slack Web API transport.
+
+Slack calls come from handlers, reactions, task progress, cron delivery
+and the proactive/sync jobs. Each of them used to hold its own
+AsyncWebClient, and Bolt makes a fresh one per request. Every client
+opened its own connections and knew nothing about what the others were
+sending. Heavy workspaces hit 429s during cron bursts, and user-facing
+replies waited behind them.
+
+``PooledSlackClient`` is a drop-in AsyncWebClient. Its ``api_call`` goes
+through the ``SlackTransport`` singleton, which keeps per bot token:
+
+- one aiohttp session (connection pool) shared by every client;
+- a token bucket per method, sized from Slack's rate-limit tier, plus a
+  one-per-second bucket per channel for chat.postMessage;
+- a per-method pause taken from ``Retry-After`` when Slack answers 429.
+  The call is then retried, up to ``slack_max_retries`` times;
+- coalescing. Identical reads already in flight share one request. A
+  repeated reactions.add/remove of the same emoji on the same message
+  within ``slack_reaction_memo_s`` is answered from memory;
+- successful chat.postMessage/update/delete calls are applied to the
+  thread cache, since Lucy's own messages never come back as events.
+
+Calls made under a CRON or BACKGROUND admission slot, or through a client
+made with ``background=True``, must leave ``slack_foreground_reserve`` of
+each bucket untouched. That keeps replies flowing during cron bursts.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import time
+from dataclasses import dataclass, field
+from ssl import SSLContext
+from typing import Any
+
+import aiohttp
+import structlog
+from slack_sdk.web.async_client import AsyncWebClient
+
+from lucy.config import settings
+from lucy.infra.admission import Priority, current_priority
+from lucy.infra.rate_limiter import TokenBucket
+from lucy.slack.thread_cache import get_thread_cache
+
+logger = structlog.get_logger()
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# METHOD TIERS
+# ═══════════════════════════════════════════════════════════════════════════
+
+# Requests per minute allowed by Slack's Web API tiers
+_TIER_PER_MINUTE: dict[int, int] = {1: 1, 2: 20, 3: 50, 4: 100}
+_DEFAULT_TIER = 3
+
+_METHOD_TIERS: dict[str, int] = {
+    "auth.test": 4,
+    "chat.delete": 3,
+    "chat.getPermalink": 4,
+    "chat.postEphemeral": 4,
+    "chat.postMessage": 4,
+    "chat.update": 3,
+    "conversations.create": 2,
+    "conversations.history": 3,
+    "conversations.info": 3,
+    "conversations.join": 3,
+    "conversations.list": 2,
+    "conversations.members": 4,
+    "conversations.open": 3,
+    "conversations.replies": 3,
+    "files.completeUploadExternal": 4,
+    "files.getUploadURLExternal": 4,
+    "files.upload": 2,
+    "reactions.add": 3,
+    "reactions.get": 3,
+    "reactions.remove": 2,
+    "search.messages": 2,
+    "team.info": 3,
+    "users.conversations": 3,
+    "users.info": 4,
+    "users.list": 2,
+    "users.lookupByEmail": 3,
+    "views.open": 4,
+    "views.publish": 4,
+}
+
+# chat.postMessage is also limited to roughly one message per second per
+# channel, with short bursts tolerated.
+_POST_PER_CHANNEL = (1.0, 3.0)
+
+# Reads that concurrent identical callers can share
+_COALESCED_READS = frozenset({
+    "auth.test",
+    "conversations.history",
+    "conversations.info",
+    "conversations.members",
+    "conversations.replies",
+    "team.info",
+    "users.info",
+})
+_REACTION_METHODS = frozenset({"reactions.add", "reactions.remove"})
+# Lucy's own thread messages, which Bolt never delivers back as events
+_THREAD_WRITES = frozenset({"chat.postMessage", "chat.update", "chat.delete"})
+_BACKGROUND_PRIORITIES = frozenset({Priority.BACKGROUND, Priority.CRON})
+_REACTION_MEMO_MAX = 1000
+
+
+def retry_after(exc: BaseException) -> float | None:
+    """Seconds to wait if ``exc`` is a Slack 429, else None."""
+    response = getattr(exc, "response", None)
+    if getattr(response, "status_code", None) != 429:
+        return None
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("Retry-After", 1))
+    except (TypeError, ValueError):
+        return 1.0
+
+
+def _pool_key(token: str | None) -> str:
+    if not token:
+        return "anonymous"
+    return hashlib.sha256(token.encode()).hexdigest()[:16]
+
+
+def _call_args(kwargs: dict[str, Any]) -> dict[str, Any]:
+    """Flatten the params/data/json payloads of an api_call into one dict."""
+    args: dict[str, Any] = {}
+    for part in ("params", "data", "json"):
+        payload = kwargs.get(part)
+        if isinstance(payload, dict):
+            args.update(payload)
+    return args
+
+
+def _coalesce_key(method: str, args: dict[str, Any]) -> str:
+    return method + json.dumps(args, sort_keys=True, default=str)
+
+
+def _settle(inflight: dict[str, asyncio.Future[Any]], key: str, fut: asyncio.Future[Any]) -> None:
+    if inflight.get(key) is fut:
+        del inflight[key]
+    if not fut.cancelled():
+        fut.exception()  # retrieved, even if every waiter was cancelled
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# TRANSPORT
+# ═══════════════════════════════════════════════════════════════════════════
+
+
+@dataclass
+class _Pool:
+    """Everything shared by the clients of one bot token."""
+
+    session: aiohttp.ClientSession | None = None
+    buckets: dict[str, TokenBucket] = field(default_factory=dict)
+    paused_until: dict[str, float] = field(default_factory=dict)
+    inflight: dict[str, asyncio.Future[Any]] = field(default_factory=dict)
+    # (channel, timestamp, name) -> (method, expires_at, response)
+    reactions: dict[tuple[str, str, str], tuple[str, float, Any]] = field(default_factory=dict)
+
+
+class SlackTransport:
+    """Pooled, rate-limited Slack Web API access shared by the process."""
+
+    def __init__(self) -> None:
+        self._pools: dict[str, _Pool] = {}
+        self._clients: dict[tuple[str, bool], PooledSlackClient] = {}
+        self._stats: dict[str, dict[str, int]] = {}
+
+    def client(
+        self,
+        token: str | None,
+        *,
+        background: bool = False,
+        ssl: SSLContext | None = None,
+    ) -> PooledSlackClient:
+        """Get the pooled client for ``token``, creating it on first use.
+
+        ``background`` marks every call from the client as low priority,
+        whatever admission slot the caller holds.
+        """
+        key = (_pool_key(token), background)
+        client = self._clients.get(key)
+        if client is None:
+            client = PooledSlackClient(
+                token=token, ssl=ssl, transport=self, pool_key=key[0], background=background,
+            )
+            self._clients[key] = client
+        elif ssl is not None and client.ssl is None:
+            client.ssl = ssl
+        return client
+
+    def session(self, pool_key: str) -> aiohttp.ClientSession:
+        """The shared HTTP session for a pool (created lazily, in the loop)."""
+        pool = self._pool(pool_key)
+        if pool.session is None or pool.session.closed:
+            pool.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=settings.slack_pool_connections),
+            )
+        return pool.session
+
+    async def call(
+        self, client: PooledSlackClient, method: str, kwargs: dict[str, Any],
+    ) -> Any:
+        """Run one Web API call for ``client`` through the pool."""
+        pool = self._pool(client.pool_key)
+        stats = self._stat(method)
+        stats["calls"] += 1
+        args = _call_args(kwargs)
+        background = client.background or current_priority() in _BACKGROUND_PRIORITIES
+
+        if method in _REACTION_METHODS:
+            target = (
+                str(args.get("channel", "")),
+                str(args.get("timestamp", "")),
+                str(args.get("name", "")),
+            )
+            memo = pool.reactions.get(target)
+            if memo and memo[0] == method and memo[1] > time.monotonic():
+                stats["coalesced"] += 1
+                return memo[2]
+            response = await self._send(pool, client, method, kwargs, args, background)
+            self._remember_reaction(pool, target, method, response)
+            return response
+
+        if method not in _COALESCED_READS:
+            response = await self._send(pool, client, method, kwargs, args, background)
+            if method in _THREAD_WRITES:
+                get_thread_cache().record_call(method, args, response)
+            return response
+
+        key = _coalesce_key(method, args)
+        shared = pool.inflight.get(key)
+        if shared is not None:
+            stats["coalesced"] += 1
+        else:
+            shared = asyncio.ensure_future(
+                self._send(pool, client, method, kwargs, args, background)
+            )
+            pool.inflight[key] = shared
+            shared.add_done_callback(lambda fut: _settle(pool.inflight, key, fut))
+        # A cancelled caller must not cancel the request others are waiting on.
+        return await asyncio.shield(shared)
+
+    async def _send(
+        self,
+        pool: _Pool,
+        client: PooledSlackClient,
+        method: str,
+        kwargs: dict[str, Any],
+        args: dict[str, Any],
+        background: bool,
+    ) -> Any:
+        attempt = 0
+        while True:
+            await self._admit(pool, method, args, background)
+            try:
+                return await client._raw_api_call(method, **kwargs)
+            except Exception as exc:
+                wait = retry_after(exc)
+                if wait is None or attempt >= settings.slack_max_retries:
+                    raise
+                resume = time.monotonic() + wait
+                pool.paused_until[method] = max(pool.paused_until.get(method, 0.0), resume)
+                self._stat(method)["rate_limited"] += 1
+                logger.warning(
+                    "slack_rate_limited",
+                    method=method,
+                    retry_after=wait,
+                    attempt=attempt + 1,
+                    background=background,
+                )
+                attempt += 1
+
+    async def _admit(
+        self, pool: _Pool, method: str, args: dict[str, Any], background: bool,
+    ) -> None:
+        """Wait out any 429 pause, then take a token from the method's buckets."""
+        while (pause := pool.paused_until.get(method, 0.0) - time.monotonic()) > 0:
+            await asyncio.sleep(pause)
+
+        timeout = (
+            settings.slack_background_queue_timeout_s if background
+            else settings.slack_queue_timeout_s
+        )
+        bucket = self._bucket(pool, method)
+        reserve = bucket.capacity * settings.slack_foreground_reserve if background else 0.0
+        started = time.monotonic()
+        admitted = await bucket.acquire(timeout=timeout, reserve=reserve)
+        channel = args.get("channel")
+        if admitted and method == "chat.postMessage" and channel:
+            rate, capacity = _POST_PER_CHANNEL
+            key = f"{method}:{channel}"
+            if key not in pool.buckets:
+                pool.buckets[key] = TokenBucket(rate=rate, capacity=capacity)
+            admitted = await pool.buckets[key].acquire(timeout=timeout)
+
+        stats = self._stat(method)
+        if time.monotonic() - started > 0.05:
+            stats["queued"] += 1
+        if not admitted:
+            # Send anyway: Slack has the final say and a 429 is retried above.
+            stats["queue_timeouts"] += 1
+            logger.warning("slack_queue_timeout", method=method, background=background)
+
+    def _bucket(self, pool: _Pool, method: str) -> TokenBucket:
+        bucket = pool.buckets.get(method)
+        if bucket is None:
+            per_minute = _TIER_PER_MINUTE[_METHOD_TIERS.get(method, _DEFAULT_TIER)]
+            # About ten seconds of burst, never less than two calls
+            bucket = TokenBucket(rate=per_minute / 60.0, capacity=max(2.0, per_minute / 6.0))
+            pool.buckets[method] = bucket
+        return bucket
+
+    def _remember_reaction(
+        self, pool: _Pool, target: tuple[str, str, str], method: str, response: Any,
+    ) -> None:
+        now = time.monotonic()
+        if len(pool.reactions) >= _REACTION_MEMO_MAX:
+            for key in [k for k, v in pool.reactions.items() if v[1] <= now]:
+                del pool.reactions[key]
+        pool.reactions[target] = (method, now + settings.slack_reaction_memo_s, response)
+
+    def _pool(self, pool_key: str) -> _Pool:
+        pool = self._pools.get(pool_key)
+        if pool is None:
+            pool = self._pools[pool_key] = _Pool()
+        return pool
+
+    def _stat(self, method: str) -> dict[str, int]:
+        stats = self._stats.get(method)
+        if stats is None:
+            stats = self._stats[method] = {
+                "calls": 0, "coalesced": 0, "queued": 0, "queue_timeouts": 0, "rate_limited": 0,
+            }
+        return stats
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "pools": len(self._pools),
+            "methods": {method: dict(stats) for method, stats in self._stats.items()},
+        }
+
+    async def close(self) -> None:
+        """Close every pooled HTTP session."""
+        for pool in self._pools.values():
+            if pool.session is not None and not pool.session.closed:
+                await pool.session.close()
+        self._pools.clear()
+        self._clients.clear()
+
+
+class PooledSlackClient(AsyncWebClient):
+    """AsyncWebClient whose API calls go through the shared SlackTransport.
+
+    Use ``get_slack_transport().client(token)`` rather than constructing
+    one directly, so every caller with the same token shares one pool.
+    """
+
+    def __init__(
+        self,
+        *,
+        transport: SlackTransport,
+        pool_key: str,
+        background: bool = False,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(**kwargs)
+        self._transport = transport
+        self.pool_key = pool_key
+        self.background = background
+
+    async def api_call(self, api_method: str, **kwargs: Any) -> Any:  # type: ignore[override]
+        return await self._transport.call(self, api_method, kwargs)
+
+    async def _raw_api_call(self, api_method: str, **kwargs: Any) -> Any:
+        if self.session is None or self.session.closed:
+            self.session = self._transport.session(self.pool_key)
+        return await super().api_call(api_method, **kwargs)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# SINGLETON
+# ═══════════════════════════════════════════════════════════════════════════
+
+_transport: SlackTransport | None = None
+
+
+def get_slack_transport() -> SlackTransport:
+    """Get or create the singleton SlackTransport."""
+    global _transport
+    if _transport is None:
+        _transport = SlackTransport()
+    return _transport
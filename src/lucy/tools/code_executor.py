@@ -13,7 +13,7 @@ Architecture:
 Pipeline for Python:
     1. Pre-validate (syntax, scope, imports) via code_validator
     2. If fixable issues found, auto-fix (add missing imports)
-    3. Execute in sandbox
+    3. Execute in sandbox (or the thread's persistent session with session=true)
     4. If execution fails, analyze error and return structured hint
     5. If auto-retriable (max 2), fix and retry automatically
     6. Return formatted result with hints for the LLM
@@ -32,14 +32,17 @@ from typing import Any
 
 import structlog
 
+from lucy.config import settings
 from lucy.tools.code_validator import (
     analyze_execution_error,
     validate_python,
+    validate_python_file,
 )
 from lucy.workspace.executor import (
     ExecutionResult,
     execute_bash,
     execute_python,
+    execute_python_session,
     execute_workspace_script,
 )
 
@@ -53,6 +56,7 @@ logger = structlog.get_logger()
 _MAX_RESULT_CHARS = 4000  # Truncate output for LLM context window
 _MAX_TIMEOUT = 300
 _MAX_AUTO_RETRIES = 2  # Max automatic retry attempts after failure
+_MAX_SESSION_NAMES = 50  # Session variable names echoed back to the LLM
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -61,6 +65,27 @@ _MAX_AUTO_RETRIES = 2  # Max automatic retry attempts after failure
 
 def get_code_tool_definitions() -> list[dict[str, Any]]:
     """Return OpenAI-format tool definitions for code execution."""
+    tools = _base_code_tool_definitions()
+    if settings.python_sessions_enabled:
+        python_fn = tools[0]["function"]
+        python_fn["description"] = python_fn["description"].replace(
+            "Do NOT reference variables from previous executions.",
+            "Do NOT reference variables from previous executions — unless "
+            "you pass session=true.",
+        )
+        python_fn["parameters"]["properties"]["session"] = {
+            "type": "boolean",
+            "description": (
+                "Run in this thread's persistent session: variables, imports "
+                "and loaded data stay available to later session=true calls "
+                "in the same thread. Use for multi-step analysis of the same "
+                "data (load once, then explore). Default: false."
+            ),
+        }
+    return tools
+
+
+def _base_code_tool_definitions() -> list[dict[str, Any]]:
     return [
         {
             "type": "function",
@@ -186,6 +211,7 @@ async def execute_code_tool(
     tool_name: str,
     parameters: dict[str, Any],
     workspace_id: str = "",
+    thread_ts: str | None = None,
 ) -> dict[str, Any]:
     """Execute a code tool with validation, auto-fix, and error analysis.
 
@@ -204,7 +230,7 @@ async def execute_code_tool(
     try:
         if tool_name == "lucy_execute_python":
             return await _execute_python_with_validation(
-                parameters, workspace_id, timeout, description, t0,
+                parameters, workspace_id, timeout, description, t0, thread_ts,
             )
 
         elif tool_name == "lucy_execute_bash":
@@ -240,6 +266,7 @@ async def _execute_python_with_validation(
     timeout: int,
     description: str,
     t0: float,
+    thread_ts: str | None = None,
 ) -> dict[str, Any]:
     """Execute Python code with pre-validation, auto-fix, and error analysis."""
     code = parameters.get("code", "")
@@ -251,8 +278,21 @@ async def _execute_python_with_validation(
     if danger:
         return {"error": f"Blocked: {danger}"}
 
+    # ── Session mode: validate against names the session already holds ──
+    use_session = bool(
+        parameters.get("session") and thread_ts and settings.python_sessions_enabled
+    )
+    session_names: frozenset[str] | None = None
+    if use_session:
+        from lucy.workspace.python_sessions import get_python_sessions
+
+        sessions = get_python_sessions()
+        session_names = (
+            sessions.known_names(workspace_id, thread_ts) if sessions else frozenset()
+        )
+
     # ── Step 1: Pre-execution validation ──
-    validation = validate_python(code, auto_fix=True)
+    validation = validate_python(code, auto_fix=True, session_names=session_names)
 
     if not validation.valid and not validation.fixed_code:
         # Code has unfixable errors — don't waste an execution attempt
@@ -270,6 +310,9 @@ async def _execute_python_with_validation(
             "error": validation.format_for_llm(),
             "validation_failed": True,
             "hint": (
+                "Fix the issues above and try again. The session keeps only "
+                "names defined by statements that already ran."
+            ) if use_session else (
                 "Fix the issues above and try again. Remember: each execution "
                 "is a fresh, independent environment with no shared state."
             ),
@@ -292,11 +335,20 @@ async def _execute_python_with_validation(
     last_error_hint = ""
 
     while retries <= _MAX_AUTO_RETRIES:
-        result = await execute_python(
-            workspace_id=workspace_id,
-            code=execute_code,
-            timeout=timeout,
-        )
+        result = None
+        if use_session:
+            result = await execute_python_session(
+                workspace_id, thread_ts or "", execute_code, timeout,
+            )
+            if result is None:
+                use_session = False
+                logger.info("python_session_unavailable", description=description)
+        if result is None:
+            result = await execute_python(
+                workspace_id=workspace_id,
+                code=execute_code,
+                timeout=timeout,
+            )
 
         if result.success:
             elapsed_ms = round((time.monotonic() - t0) * 1000)
@@ -305,6 +357,7 @@ async def _execute_python_with_validation(
                 formatted["note"] = (
                     "Code was auto-fixed before execution (added missing imports)."
                 )
+            _annotate_session(formatted, parameters, result, workspace_id, thread_ts)
 
             await _log_execution(
                 workspace_id, "lucy_execute_python", description, result, elapsed_ms,
@@ -326,8 +379,9 @@ async def _execute_python_with_validation(
         error_text = result.error or f"Exit code: {result.exit_code}"
         last_error_hint = analyze_execution_error(error_text, execute_code)
 
-        # Check if the error is auto-retriable
-        retry_fix = _try_auto_fix_from_error(execute_code, error_text)
+        # Check if the error is auto-retriable. Not in a session: statements
+        # before the failure already changed its state, and would run twice.
+        retry_fix = None if use_session else _try_auto_fix_from_error(execute_code, error_text)
         if retry_fix and retries < _MAX_AUTO_RETRIES:
             execute_code = retry_fix
             retries += 1
@@ -348,6 +402,7 @@ async def _execute_python_with_validation(
 
     formatted = _format_result(last_result, elapsed_ms, description)
     formatted["error_analysis"] = last_error_hint
+    _annotate_session(formatted, parameters, last_result, workspace_id, thread_ts)
     if retries > 0:
         formatted["auto_retries"] = retries
         formatted["note"] = (
@@ -432,23 +487,21 @@ async def _execute_script_tool(
 
     args = parameters.get("args", [])
 
-    # Pre-validate the script if we can read it
+    # Pre-validate the script if we can read it (skipped while unchanged)
     try:
         from lucy.workspace.filesystem import get_workspace
         ws = get_workspace(workspace_id)
-        code = await ws.read_file(script_path)
-        if code:
-            validation = validate_python(code, auto_fix=False)
-            if not validation.valid:
-                elapsed_ms = round((time.monotonic() - t0) * 1000)
-                return {
-                    "success": False,
-                    "execution_method": "pre_validation",
-                    "elapsed_ms": elapsed_ms,
-                    "error": validation.format_for_llm(),
-                    "validation_failed": True,
-                    "hint": f"Script '{script_path}' has validation errors. Fix and re-save.",
-                }
+        validation = await validate_python_file(ws, script_path)
+        if validation is not None and not validation.valid:
+            elapsed_ms = round((time.monotonic() - t0) * 1000)
+            return {
+                "success": False,
+                "execution_method": "pre_validation",
+                "elapsed_ms": elapsed_ms,
+                "error": validation.format_for_llm(),
+                "validation_failed": True,
+                "hint": f"Script '{script_path}' has validation errors. Fix and re-save.",
+            }
     except Exception:
         pass  # If we can't read it, let execute_workspace_script handle the error
 
@@ -527,6 +580,31 @@ def _try_auto_fix_from_error(code: str, error_text: str) -> str | None:
 # HELPERS
 # ═══════════════════════════════════════════════════════════════════════════
 
+def _annotate_session(
+    formatted: dict[str, Any],
+    parameters: dict[str, Any],
+    result: ExecutionResult,
+    workspace_id: str,
+    thread_ts: str | None,
+) -> None:
+    """Tell the LLM what the session holds, or that it ran stateless."""
+    if not parameters.get("session"):
+        return
+    if result.method != "local_python_session" or not thread_ts:
+        formatted["session"] = (
+            "unavailable — this call ran in a fresh environment; nothing was kept."
+        )
+        return
+
+    from lucy.workspace.python_sessions import get_python_sessions
+
+    sessions = get_python_sessions()
+    names = sorted(sessions.known_names(workspace_id, thread_ts)) if sessions else []
+    formatted["session_names"] = names[:_MAX_SESSION_NAMES]
+    if len(names) > _MAX_SESSION_NAMES:
+        formatted["session_names"].append(f"... (+{len(names) - _MAX_SESSION_NAMES} more)")
+
+
 def _format_result(
     result: ExecutionResult,
     elapsed_ms: int,
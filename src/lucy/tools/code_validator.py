@@ -18,11 +18,20 @@ from __future__ import annotations
 
 import ast
 import builtins
+import hashlib
 import importlib.util
-from dataclasses import dataclass, field
+import pkgutil
+import re
+import sys
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from typing import TYPE_CHECKING
 
 import structlog
 
+if TYPE_CHECKING:
+    from lucy.workspace.filesystem import WorkspaceFS
+
 logger = structlog.get_logger()
 
 
@@ -49,6 +58,7 @@ class ValidationResult:
     valid: bool
     issues: list[ValidationIssue] = field(default_factory=list)
     fixed_code: str | None = None  # If auto-fix was applied
+    stateful: bool = False  # Validated against a persistent session
 
     @property
     def errors(self) -> list[ValidationIssue]:
@@ -71,11 +81,17 @@ class ValidationResult:
                 lines.append(f"     → Fix: {issue.fix_hint}")
 
         lines.append("")
-        lines.append(
-            "IMPORTANT: Each code execution is independent — no shared state "
-            "between calls. All variables, imports, and data must be defined "
-            "within the same code block."
-        )
+        if self.stateful:
+            lines.append(
+                "NOTE: This runs in a persistent session — names defined by "
+                "earlier session calls in this thread are available."
+            )
+        else:
+            lines.append(
+                "IMPORTANT: Each code execution is independent — no shared state "
+                "between calls. All variables, imports, and data must be defined "
+                "within the same code block."
+            )
         return "\n".join(lines)
 
 
@@ -131,6 +147,27 @@ _RISKY_MODULES = {
 }
 
 
+_installed_modules: frozenset[str] | None = None
+# Modules found by a probe after the table was built. Misses are not kept:
+# a package installed mid-session must be accepted on the very next run.
+_probe_hits: set[str] = set()
+
+
+def warm_module_table() -> frozenset[str]:
+    """Build the process-wide table of importable top-level modules.
+
+    One scan of ``sys.path`` instead of a ``find_spec`` per unknown import;
+    call at startup to take the scan off the first request's path.
+    """
+    global _installed_modules
+    if _installed_modules is None:
+        names = {m.name for m in pkgutil.iter_modules()}
+        names.update(sys.builtin_module_names)
+        names.update(sys.stdlib_module_names)
+        _installed_modules = frozenset(names)
+    return _installed_modules
+
+
 def _is_module_available(module_name: str) -> bool:
     """Check if a module can be imported (without actually importing it)."""
     top_level = module_name.split(".")[0]
@@ -138,11 +175,20 @@ def _is_module_available(module_name: str) -> bool:
         return True
     if top_level in _COMMON_THIRD_PARTY:
         return True
-    # Actually probe the system
+    if top_level in warm_module_table():
+        return True
+    # Not on sys.path at scan time — probe (meta-path hooks, late installs).
+    if top_level in _probe_hits:
+        return True
+    # Finders cache directory listings; drop them so a fresh install counts.
+    importlib.invalidate_caches()
     try:
-        return importlib.util.find_spec(top_level) is not None
+        found = importlib.util.find_spec(top_level) is not None
     except (ModuleNotFoundError, ValueError):
-        return False
+        found = False
+    if found:
+        _probe_hits.add(top_level)
+    return found
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -321,13 +367,17 @@ class _ScopeAnalyzer(ast.NodeVisitor):
         # ast.Attribute and ast.Subscript assignments don't define new names
         # at module scope — the base object must already exist
 
-    def get_undefined(self) -> set[str]:
-        """Return names that are referenced but not defined or built-in."""
+    def get_undefined(self, predefined: frozenset[str] = frozenset()) -> set[str]:
+        """Return names that are referenced but not defined or built-in.
+
+        ``predefined`` holds names that already exist before the code runs
+        (e.g. variables from earlier calls in a persistent session).
+        """
         if "*" in self.defined:
             # Star import means we can't be sure what's defined
             return set()
 
-        all_defined = self.defined | _BUILTIN_NAMES | self._comp_vars
+        all_defined = self.defined | _BUILTIN_NAMES | self._comp_vars | predefined
         return self.referenced - all_defined
 
 
@@ -602,6 +652,28 @@ def analyze_execution_error(error_text: str, code: str) -> str:
     ])
 
 
+# Exception classes analyze_execution_error has a specific hint for. Seen
+# repeatedly in a still-running job's stderr, they mean a loop that keeps
+# failing the same way (see workspace/output_stream.py).
+_FATAL_ERROR_KINDS = frozenset({
+    "NameError", "ModuleNotFoundError", "ImportError", "TypeError", "KeyError",
+    "IndexError", "AttributeError", "FileNotFoundError", "JSONDecodeError", "SyntaxError",
+})
+_EXCEPTION_LINE_RE = re.compile(r"^(?:[A-Za-z_]\w*\.)*([A-Za-z_]\w*)(?::\s|$)")
+
+
+def fatal_error_kind(line: str) -> str | None:
+    """Exception class named by a traceback's final ``Error: message`` line.
+
+    Only unindented lines count, and only the error kinds that
+    analyze_execution_error recognises; anything else returns None.
+    """
+    match = _EXCEPTION_LINE_RE.match(line.rstrip())
+    if match and match.group(1) in _FATAL_ERROR_KINDS:
+        return match.group(1)
+    return None
+
+
 def _suggest_module_alternative(module_name: str) -> str:
     """Suggest alternatives for unavailable modules."""
     alternatives: dict[str, str] = {
@@ -625,11 +697,78 @@ def _suggest_module_alternative(module_name: str) -> str:
     return alternatives.get(module_name, "Try using standard library alternatives.")
 
 
+# ═══════════════════════════════════════════════════════════════════════════
+# VALIDATION CACHES
+# ═══════════════════════════════════════════════════════════════════════════
+
+# Retries, repeated tool calls and cron scripts re-validate identical code.
+# Results with import issues are never cached: installing the package must
+# be enough to make the same code pass.
+_VALIDATION_CACHE_SIZE = 512
+_FILE_CACHE_SIZE = 1024
+
+_validation_cache: OrderedDict[str, ValidationResult] = OrderedDict()
+_file_cache: dict[str, tuple[int, int, ValidationResult]] = {}
+
+
+def _validation_key(
+    code: str, auto_fix: bool, session_names: frozenset[str] | None,
+) -> str:
+    h = hashlib.blake2b(code.encode("utf-8", "surrogatepass"), digest_size=16)
+    h.update(b"\0fix" if auto_fix else b"\0nofix")
+    if session_names is not None:
+        h.update(b"\0session\0" + "\0".join(sorted(session_names)).encode())
+    return h.hexdigest()
+
+
+def _cacheable(result: ValidationResult) -> bool:
+    return not any(i.category == "import" for i in result.issues)
+
+
+def _copy(result: ValidationResult) -> ValidationResult:
+    """Cached results are shared; hand out copies callers may mutate."""
+    return replace(result, issues=list(result.issues))
+
+
+async def validate_python_file(ws: WorkspaceFS, relative_path: str) -> ValidationResult | None:
+    """Validate a workspace script without auto-fix, skipping unchanged files.
+
+    Keyed by (mtime, size), so a cron script that hasn't changed since its
+    last run is neither re-read nor re-validated. Returns None when the
+    file can't be read.
+    """
+    try:
+        version = await ws.file_version(relative_path)
+        if version is None:
+            return None
+        key = f"{ws.root}\0{relative_path}"
+        hit = _file_cache.get(key)
+        if hit is not None and hit[:2] == version:
+            return _copy(hit[2])
+        code = await ws.read_file(relative_path)
+    except (OSError, UnicodeDecodeError, ValueError):
+        return None
+    if code is None:
+        return None
+    result = validate_python(code, auto_fix=False)
+    _file_cache.pop(key, None)
+    if _cacheable(result):
+        if len(_file_cache) >= _FILE_CACHE_SIZE:
+            del _file_cache[next(iter(_file_cache))]
+        _file_cache[key] = (*version, _copy(result))
+    return result
+
+
 # ═══════════════════════════════════════════════════════════════════════════
 # MAIN VALIDATION ENTRY POINT
 # ═══════════════════════════════════════════════════════════════════════════
 
-def validate_python(code: str, *, auto_fix: bool = True) -> ValidationResult:
+def validate_python(
+    code: str,
+    *,
+    auto_fix: bool = True,
+    session_names: frozenset[str] | None = None,
+) -> ValidationResult:
     """Validate Python code before execution.
 
     Performs:
@@ -637,13 +776,37 @@ def validate_python(code: str, *, auto_fix: bool = True) -> ValidationResult:
     2. Scope analysis (undefined variables)
     3. Import availability check
 
+    Results are memoized by a hash of the code and options.
+
     Args:
         code: Python source code to validate.
         auto_fix: If True, attempt to fix common issues (missing imports).
+        session_names: Names already defined in the persistent session this
+            code will run in, or None for a fresh, stateless execution.
 
     Returns:
         ValidationResult with issues, validity status, and optionally fixed code.
     """
+    key = _validation_key(code, auto_fix, session_names)
+    cached = _validation_cache.get(key)
+    if cached is not None:
+        _validation_cache.move_to_end(key)
+        return _copy(cached)
+
+    result = _validate_uncached(code, auto_fix, session_names)
+    if _cacheable(result):
+        _validation_cache[key] = _copy(result)
+        while len(_validation_cache) > _VALIDATION_CACHE_SIZE:
+            _validation_cache.popitem(last=False)
+    return result
+
+
+def _validate_uncached(
+    code: str,
+    auto_fix: bool,
+    session_names: frozenset[str] | None,
+) -> ValidationResult:
+    stateful = session_names is not None
     issues: list[ValidationIssue] = []
 
     # ── Step 1: Syntax check ──
@@ -660,32 +823,35 @@ def validate_python(code: str, *, auto_fix: bool = True) -> ValidationResult:
                 f"Check for missing colons, unmatched brackets, or indentation."
             ),
         ))
-        return ValidationResult(valid=False, issues=issues)
+        return ValidationResult(valid=False, issues=issues, stateful=stateful)
 
     # ── Step 2: Scope analysis ──
     analyzer = _ScopeAnalyzer()
     analyzer.visit(tree)
 
-    undefined = analyzer.get_undefined()
+    undefined = analyzer.get_undefined(session_names or frozenset())
     for name in sorted(undefined):
         # Skip common false positives
         if name.startswith("_") and len(name) > 1:
             continue
 
         is_known_import = name in _COMMON_MISSING_IMPORTS
+        if is_known_import:
+            fix_hint = f"Add: {_COMMON_MISSING_IMPORTS[name]}"
+        elif stateful:
+            fix_hint = f"Define '{name}' in this code block or an earlier session call."
+        else:
+            fix_hint = (
+                f"Define '{name}' within this code block. "
+                f"Each execution is independent — variables from previous "
+                f"calls don't persist."
+            )
+        where = "this code block or earlier in the session" if stateful else "this code block"
         issues.append(ValidationIssue(
             severity="warning" if is_known_import else "error",
             category="scope",
-            message=f"Name '{name}' is used but not defined in this code block.",
-            fix_hint=(
-                f"Add: {_COMMON_MISSING_IMPORTS[name]}"
-                if is_known_import
-                else (
-                    f"Define '{name}' within this code block. "
-                    f"Each execution is independent — variables from previous "
-                    f"calls don't persist."
-                )
-            ),
+            message=f"Name '{name}' is used but not defined in {where}.",
+            fix_hint=fix_hint,
             auto_fixable=is_known_import,
         ))
 
@@ -712,12 +878,13 @@ def validate_python(code: str, *, auto_fix: bool = True) -> ValidationResult:
         fixed_code = _try_auto_fix(code, issues)
         if fixed_code:
             # Re-validate the fixed code
-            recheck = validate_python(fixed_code, auto_fix=False)
+            recheck = validate_python(fixed_code, auto_fix=False, session_names=session_names)
             if recheck.valid:
                 return ValidationResult(
                     valid=True,
                     issues=issues,  # Keep original issues for logging
                     fixed_code=fixed_code,
+                    stateful=stateful,
                 )
             # If re-validation fails, fall through to return original issues
 
@@ -725,4 +892,5 @@ def validate_python(code: str, *, auto_fix: bool = True) -> ValidationResult:
         valid=not has_errors,
         issues=issues,
         fixed_code=fixed_code,
+        stateful=stateful,
     )
@@ -0,0 +1,931 @@
+"""Tool-definition registry: immutable schemas built once per process.
+
+``LucyAgent.run`` used to rebuild the full tool list on every request and
+route ``lucy_*`` calls through a chain of ``is_*_tool`` checks. The
+registry does both jobs up front:
+
+- Static tool schemas (module definitions plus the cron, heartbeat,
+  integration and delegation tools) are built once, in a fixed order, so
+  the serialized tool prefix is byte-stable across requests.
+- Schemas are grouped, and each router intent (see
+  ``pipeline/router.INTENT_MODULES``) gets a frozen, pre-serialized
+  ``ToolSet`` containing only the groups it needs.
+- A name → handler table replaces the prefix chains in
+  ``_execute_internal_tool`` with a single dict lookup.
+
+Workspace-specific tools (Composio meta-tools, MCP connections, custom
+wrappers) are still appended per run by the agent, after the static
+prefix.
+"""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+import structlog
+
+from lucy.config import settings
+
+logger = structlog.get_logger()
+
+
+@dataclass(frozen=True)
+class ToolCallEnv:
+    """Per-call context a registry handler may need."""
+
+    workspace_id: str
+    slack_client: Any | None = None
+    channel_id: str | None = None
+    thread_ts: str | None = None
+
+
+ToolHandler = Callable[[str, dict[str, Any], ToolCallEnv], Awaitable[dict[str, Any]]]
+
+
+@dataclass(frozen=True)
+class ToolSet:
+    """A frozen, pre-serialized subset of tool definitions.
+
+    ``tools`` is shared between requests — callers must copy it
+    (``list(tool_set.tools)``) before appending and must never mutate the
+    dicts themselves.
+    """
+
+    intent: str
+    tools: tuple[dict[str, Any], ...]
+    names: frozenset[str]
+    json: str = field(repr=False)
+
+
+def serialize_tools(tools: list[dict[str, Any]] | tuple[dict[str, Any], ...]) -> str:
+    """Deterministic compact JSON for a tools array.
+
+    Key order is sorted so the same schemas always produce the same bytes,
+    which is what provider-side prefix caching keys on.
+    """
+    return json.dumps(list(tools), sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+# ── Static schemas that have no home module ──────────────────────────────
+
+_DELEGATION_DESCRIPTIONS: dict[str, str] = {
+    "research": (
+        "Delegate research, analysis, or information gathering to a "
+        "specialist. Use for web research, competitive analysis, market "
+        "research, or deep dives that require multiple searches. Returns "
+        "structured findings."
+    ),
+    "code": (
+        "Delegate code writing, debugging, or modification to a code "
+        "specialist. Use for writing scripts, fixing bugs, creating "
+        "applications, or any programming task. Returns working code."
+    ),
+    "integrations": (
+        "Delegate service connection tasks to an integrations specialist. "
+        "Use when a user needs to connect a new service, troubleshoot "
+        "connections, or build custom integrations. Returns connection "
+        "status."
+    ),
+    "document": (
+        "Delegate document creation to a specialist for professional, "
+        "client-facing content. Use for PDFs, reports, spreadsheets, "
+        "presentations, or any formatted document. Returns the completed "
+        "document."
+    ),
+}
+
+
+def _cron_tool_definitions() -> list[dict[str, Any]]:
+    return [
+        {
+            "type": "function",
+            "function": {
+                "name": "lucy_list_crons",
+                "description": (
+                    "List all scheduled tasks (cron jobs) for this "
+                    "workspace. Returns the name, schedule, description, "
+                    "and next run time for each active recurring task."
+                ),
+                "parameters": {
+                    "type": "object",
+                    "properties": {},
+                },
+            },
+        },
+        {
+            "type": "function",
+            "function": {
+                "name": "lucy_create_cron",
+                "description": (
+                    "Create a new scheduled recurring task (cron job). "
+                    "The task will run on a schedule and its result is "
+                    "automatically delivered to Slack. By default it "
+                    "posts to the current channel. Set delivery_mode "
+                    "to 'dm' for personal reminders (DMs the user who "
+                    "asked for it). Use standard 5-field cron expressions "
+                    "(minute hour day month weekday). "
+                    "Common examples: '0 9 * * 1-5' (weekdays 9am), "
+                    "'*/30 * * * *' (every 30 min), '0 */2 * * *' (every 2h). "
+                    "Write the description as what the task should PRODUCE "
+                    "or CHECK, not 'send a message'. Delivery is automatic."
+                ),
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "name": {
+                            "type": "string",
+                            "description": (
+                                "Short slug name for the cron "
+                                "(e.g. 'stock-checker', 'daily-report')"
+                            ),
+                        },
+                        "cron_expression": {
+                            "type": "string",
+                            "description": (
+                                "Standard 5-field cron expression "
+                                "(minute hour day-of-month month day-of-week)"
+                            ),
+                        },
+                        "title": {
+                            "type": "string",
+                            "description": "Human-readable title for the task",
+                        },
+                        "description": {
+                            "type": "string",
+                            "description": (
+                                "Detailed instructions for what the task "
+                                "should PRODUCE each time it runs. Write "
+                                "this as the task itself, not as 'send a "
+                                "message'. Be specific: include data "
+                                "sources, output format, and conditions "
+                                "to skip (return SKIP if nothing to report)."
+                            ),
+                        },
+                        "timezone": {
+                            "type": "string",
+                            "description": (
+                                "IANA timezone for schedule evaluation "
+                                "(e.g. 'Asia/Kolkata', 'America/New_York'). "
+                                "If omitted, uses server timezone."
+                            ),
+                        },
+                        "delivery_mode": {
+                            "type": "string",
+                            "enum": ["channel", "dm"],
+                            "description": (
+                                "Where to deliver results. 'channel' posts "
+                                "to the channel where it was created "
+                                "(default). 'dm' sends a direct message "
+                                "to the user who requested it. Use 'dm' "
+                                "for personal reminders, notifications, "
+                                "or anything meant for one person."
+                            ),
+                        },
+                        "type": {
+                            "type": "string",
+                            "enum": ["agent", "script"],
+                            "description": (
+                                "Execution model. 'agent' (default) spins up a full "
+                                "LLM session with tools — use for tasks that require "
+                                "reasoning, Composio calls, or dynamic decisions. "
+                                "'script' runs a Python script directly, no LLM cost — "
+                                "use for lightweight checks like polling a URL, querying "
+                                "a DB, or running a deterministic condition. When type "
+                                "is 'script', provide script_code with the Python source."
+                            ),
+                        },
+                        "script_code": {
+                            "type": "string",
+                            "description": (
+                                "Python source code to run (only used when type='script'). "
+                                "Lucy writes this code to a file and runs it on schedule. "
+                                "The script has WORKSPACE_ID and WORKSPACE_ROOT env vars. "
+                                "Print to stdout to deliver output to Slack. Print nothing "
+                                "for a normal (no-alert) run. Can import standard library "
+                                "and common packages like pymongo, requests, httpx."
+                            ),
+                        },
+                        "condition_script_path": {
+                            "type": "string",
+                            "description": (
+                                "Optional path to a python script to run before "
+                                "the main cron job. If the script exits with code 0, "
+                                "the cron job proceeds. If non-zero, it skips execution "
+                                "entirely. Perfect for saving LLM costs on high-frequency "
+                                "checks."
+                            ),
+                        },
+                        "max_runs": {
+                            "type": "integer",
+                            "description": (
+                                "Optional integer. If set > 0, the cron job will automatically "  # noqa: E501
+                                "delete itself after successfully running this many times."
+                            ),
+                        },
+                        "depends_on": {
+                            "type": "string",
+                            "description": (
+                                "Optional string. The name or slug of another cron job that "  # noqa: E501
+                                "MUST have successfully run today before this one can execute. "  # noqa: E501
+                                "E.g., 'data-sync' or 'daily-revenue'."
+                            ),
+                        },
+                    },
+                    "required": ["name", "cron_expression", "title", "description"],
+                },
+            },
+        },
+        {
+            "type": "function",
+            "function": {
+                "name": "lucy_delete_cron",
+                "description": (
+                    "Delete an existing scheduled task by name. "
+                    "Removes it from the scheduler immediately."
+                ),
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "cron_name": {
+                            "type": "string",
+                            "description": "Name/slug of the cron to delete",
+                        },
+                    },
+                    "required": ["cron_name"],
+                },
+            },
+        },
+        {
+            "type": "function",
+            "function": {
+                "name": "lucy_modify_cron",
+                "description": (
+                    "Update an existing scheduled task's schedule, title, "
+                    "description, timezone, or execution type. Only provide "
+                    "the fields you want to change.\n\n"
+                    "To convert an agent-type cron into a lightweight script "
+                    "(no LLM cost per run), set new_type='script' and provide "
+                    "script_code — a Python script that runs the check directly. "
+                    "The script must exit 0 on success. Output is delivered to "
+                    "Slack if the script prints anything. Return nothing for "
+                    "normal (no-alert) runs."
+                ),
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "cron_name": {
+                            "type": "string",
+                            "description": "Name/slug of the cron to modify",
+                        },
+                        "new_cron_expression": {
+                            "type": "string",
+                            "description": "New cron expression (if changing schedule)",
+                        },
+                        "new_title": {
+                            "type": "string",
+                            "description": "New title (if changing)",
+                        },
+                        "new_description": {
+                            "type": "string",
+                            "description": "New task instructions (if changing, agent type only)",
+                        },
+                        "new_timezone": {
+                            "type": "string",
+                            "description": "New IANA timezone (if changing)",
+                        },
+                        "new_type": {
+                            "type": "string",
+                            "enum": ["agent", "script"],
+                            "description": (
+                                "Change execution model. 'agent' = LLM-driven (expensive), "
+                                "'script' = Python script (free, no LLM cost). "
+                                "When switching to 'script', you MUST also provide script_code."
+                            ),
+                        },
+                        "script_code": {
+                            "type": "string",
+                            "description": (
+                                "Python source code for the script (required when new_type='script', "
+                                "or to update an existing script). The script runs in the workspace "
+                                "directory with WORKSPACE_ID and WORKSPACE_ROOT env vars available. "
+                                "Print output to stdout to deliver it to Slack. Print nothing (or "
+                                "return SKIP) for a normal no-alert run. The script can use any "
+                                "standard library or pre-installed packages (pymongo, requests, etc)."
+                            ),
+                        },
+                    },
+                    "required": ["cron_name"],
+                },
+            },
+        },
+        {
+            "type": "function",
+            "function": {
+                "name": "lucy_trigger_cron",
+                "description": (
+                    "Immediately trigger a scheduled task to run right "
+                    "now, regardless of its schedule. Useful for testing "
+                    "or when a user asks 'run my X task now'."
+                ),
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "cron_name": {
+                            "type": "string",
+                            "description": "Name/slug of the cron to trigger",
+                        },
+                    },
+                    "required": ["cron_name"],
+                },
+            },
+        },
+    ]
+
+
+def _heartbeat_tool_definitions() -> list[dict[str, Any]]:
+    return [
+        {
+            "type": "function",
+            "function": {
+                "name": "lucy_create_heartbeat",
+                "description": (
+                    "Create a heartbeat monitor that checks a condition "
+                    "at a set interval and alerts immediately when triggered. "
+                    "Use this instead of cron jobs when the user needs "
+                    "INSTANT alerting (e.g. 'tell me as soon as this page "
+                    "goes live', 'alert me if the API goes down'). "
+                    "Heartbeats check every 30s-5min and fire alerts "
+                    "the moment a condition is met. Condition types:\n"
+                    "- api_health: checks if a URL returns a healthy "
+                    "HTTP status (config: {url, expected_status})\n"
+                    "- page_content: checks if a page contains or lacks "
+                    "specific text (config: {url, contains, not_contains, regex})\n"
+                    "- metric_threshold: checks a JSON API value against "
+                    "a threshold (config: {url, json_path, operator, threshold})\n"
+                    "- custom: runs a Python script that returns "
+                    "{triggered: true/false} (config: {script_path})"
+                ),
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "name": {
+                            "type": "string",
+                            "description": (
+                                "Short descriptive name for this monitor "
+                                "(e.g. 'api-health-check', 'product-availability')"
+                            ),
+                        },
+                        "condition_type": {
+                            "type": "string",
+                            "enum": [
+                                "api_health",
+                                "page_content",
+                                "metric_threshold",
+                                "custom",
+                            ],
+                            "description": "Type of condition to check",
+                        },
+                        "condition_config": {
+                            "type": "object",
+                            "description": (
+                                "Configuration for the condition. "
+                                "Depends on condition_type. Examples:\n"
+                                'api_health: {"url": "https://...", "expected_status": 200}\n'  # noqa: E501
+                                'page_content: {"url": "https://...", "contains": "In Stock"}\n'  # noqa: E501
+                                'metric_threshold: {"url": "https://api.../metrics", '
+                                '"json_path": "data.error_rate", "operator": ">", '
+                                '"threshold": 5.0}\n'
+                                'custom: {"script_path": "scripts/check.py"}'
+                            ),
+                        },
+                        "check_interval_seconds": {
+                            "type": "integer",
+                            "description": (
+                                "How often to check (seconds). Default 300 (5 min). "
+                                "Minimum 30. Use 60-120 for urgent monitors, "
+                                "300-600 for standard monitors."
+                            ),
+                        },
+                        "alert_channel_id": {
+                            "type": "string",
+                            "description": (
+                                "Slack channel ID to post alerts to. "
+                                "If omitted, uses the current channel."
+                            ),
+                        },
+                        "alert_template": {
+                            "type": "string",
+                            "description": (
+                                "Alert message template. Use {name} and "
+                                "{detail} placeholders. Default: "
+                                "'Condition triggered: {name}'"
+                            ),
+                        },
+                        "alert_cooldown_seconds": {
+                            "type": "integer",
+                            "description": (
+                                "Minimum seconds between alerts to prevent "
+                                "spam. Default 3600 (1 hour). Use 300 for "
+                                "critical monitors."
+                            ),
+                        },
+                        "description": {
+                            "type": "string",
+                            "description": "Human-readable description of what this monitors",  # noqa: E501
+                        },
+                    },
+                    "required": ["name", "condition_type", "condition_config"],
+                },
+            },
+        },
+        {
+            "type": "function",
+            "function": {
+                "name": "lucy_delete_heartbeat",
+                "description": (
+                    "Delete a heartbeat monitor by name. Stops monitoring immediately."
+                ),
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "name": {
+                            "type": "string",
+                            "description": "Name of the heartbeat monitor to delete",
+                        },
+                    },
+                    "required": ["name"],
+                },
+            },
+        },
+        {
+            "type": "function",
+            "function": {
+                "name": "lucy_list_heartbeats",
+                "description": (
+                    "List all heartbeat monitors for this workspace. "
+                    "Shows name, condition, interval, status, and statistics."
+                ),
+                "parameters": {
+                    "type": "object",
+                    "properties": {},
+                },
+            },
+        },
+    ]
+
+
+def _integration_tool_definitions() -> list[dict[str, Any]]:
+    return [
+        {
+            "type": "function",
+            "function": {
+                "name": "lucy_resolve_custom_integration",
+                "description": (
+                    "Research a service and find the best integration path. "
+                    "Call this IMMEDIATELY when COMPOSIO_MANAGE_CONNECTIONS "
+                    "cannot find a service — no user consent needed to research. "
+                    "The tool runs grounded web research to discover whether the "
+                    "service has: (1) MCP support (preferred), (2) an OpenAPI "
+                    "spec, or (3) a REST API for a custom wrapper. It then "
+                    "attempts the best path automatically and returns specific "
+                    "findings. For MCP services it returns setup instructions; "
+                    "for API services it builds and deploys a wrapper. "
+                    "NEVER ask the user 'want me to give it a shot?' before "
+                    "calling this — do the research first, then present the "
+                    "specific option found. After it succeeds and needs an API "
+                    "key, ask the user and store it with lucy_store_api_key. "
+                    "NEVER use Bright Data, web scraping, or any workaround."
+                ),
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "services": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": (
+                                "List of service names to attempt custom "
+                                "integration for (e.g. ['Clerk', 'Polar'])"
+                            ),
+                        },
+                    },
+                    "required": ["services"],
+                },
+            },
+        },
+        {
+            "type": "function",
+            "function": {
+                "name": "lucy_delete_custom_integration",
+                "description": (
+                    "Delete a custom integration that was previously "
+                    "built. Removes the wrapper code, tools, and "
+                    "stored API key. ALWAYS ask the user for "
+                    "confirmation before calling this with "
+                    "confirmed=true. First call with confirmed=false "
+                    "to get a summary of what will be removed."
+                ),
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "service_slug": {
+                            "type": "string",
+                            "description": (
+                                "The slug of the integration to delete "
+                                "(e.g. 'polarsh', 'clerk')"
+                            ),
+                        },
+                        "confirmed": {
+                            "type": "boolean",
+                            "description": (
+                                "Set to true only after the user has "
+                                "explicitly confirmed they want to "
+                                "delete. Set to false for a preview."
+                            ),
+                        },
+                    },
+                    "required": ["service_slug"],
+                },
+            },
+        },
+        {
+            "type": "function",
+            "function": {
+                "name": "lucy_connect_mcp",
+                "description": (
+                    "Connect to a service that exposes an MCP (Model Context Protocol) "
+                    "server over HTTP/SSE. Call this after the user provides their MCP URL. "  # noqa: E501
+                    "On success, new mcp_{service}_* tools will be available for future "
+                    "requests. Use when: (1) the user pastes an MCP URL, OR (2) "
+                    "lucy_resolve_custom_integration returns status=needs_user_mcp_url. "
+                    "Do NOT guess MCP URLs — always use a URL provided by the user or "
+                    "returned by the resolver."
+                ),
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "service": {
+                            "type": "string",
+                            "description": (
+                                "Short slug for the service, e.g. 'craft', 'notion', 'linear'. "  # noqa: E501
+                                "Used to prefix the discovered tools as mcp_{service}_*."
+                            ),
+                        },
+                        "mcp_url": {
+                            "type": "string",
+                            "description": (
+                                "The HTTP or SSE URL of the MCP server, as provided by the user "  # noqa: E501
+                                "or returned by the service settings page."
+                            ),
+                        },
+                    },
+                    "required": ["service", "mcp_url"],
+                },
+            },
+        },
+        {
+            "type": "function",
+            "function": {
+                "name": "lucy_disconnect_mcp",
+                "description": (
+                    "Remove an active MCP connection. Deletes the stored URL and cached "
+                    "tool schemas for the service. The mcp_{service}_* tools will no "
+                    "longer be available after disconnection. Always confirm with the "
+                    "user before calling this."
+                ),
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "service": {
+                            "type": "string",
+                            "description": "Service slug to disconnect, e.g. 'craft'.",
+                        },
+                    },
+                    "required": ["service"],
+                },
+            },
+        },
+        {
+            "type": "function",
+            "function": {
+                "name": "lucy_list_mcp_connections",
+                "description": (
+                    "List all active MCP connections for this workspace. "
+                    "Returns each service name, the number of available tools, "
+                    "and when the connection was established. Call this when "
+                    "the user asks what MCP integrations are connected."
+                ),
+                "parameters": {
+                    "type": "object",
+                    "properties": {},
+                },
+            },
+        },
+        {
+            "type": "function",
+            "function": {
+                "name": "lucy_refresh_mcp",
+                "description": (
+                    "Re-discover tools for an existing MCP connection. Use this when "
+                    "the user says the service added new capabilities, or when tool "
+                    "calls are failing with 'unknown tool' errors from the MCP server. "
+                    "Re-connects to the MCP server and updates the cached tool schemas."
+                ),
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "service": {
+                            "type": "string",
+                            "description": "Service slug to refresh, e.g. 'craft'.",
+                        },
+                    },
+                    "required": ["service"],
+                },
+            },
+        },
+    ]
+
+
+def _delegation_tool_definitions() -> list[dict[str, Any]]:
+    from lucy.core.sub_agents import REGISTRY as _SUB_REGISTRY
+
+    return [
+        {
+            "type": "function",
+            "function": {
+                "name": f"delegate_to_{agent_type}_agent",
+                "description": _DELEGATION_DESCRIPTIONS.get(
+                    agent_type,
+                    f"Delegate a task to the {agent_type} specialist.",
+                ),
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "task": {
+                            "type": "string",
+                            "description": (
+                                "Clear description of what to accomplish. "
+                                "Include all relevant context."
+                            ),
+                        },
+                    },
+                    "required": ["task"],
+                },
+            },
+        }
+        for agent_type in _SUB_REGISTRY
+    ]
+
+
+# ── Handlers (one per tool module) ───────────────────────────────────────
+
+
+async def _run_history_tool(
+    tool_name: str, parameters: dict[str, Any], env: ToolCallEnv
+) -> dict[str, Any]:
+    from lucy.workspace.filesystem import get_workspace
+    from lucy.workspace.history_search import execute_history_tool
+
+    ws = get_workspace(env.workspace_id)
+    return {"result": await execute_history_tool(ws, tool_name, parameters)}
+
+
+async def _run_file_tool(
+    tool_name: str, parameters: dict[str, Any], env: ToolCallEnv
+) -> dict[str, Any]:
+    from lucy.tools.file_generator import execute_file_tool
+
+    return await execute_file_tool(
+        tool_name=tool_name,
+        parameters=parameters,
+        slack_client=env.slack_client,
+        channel_id=env.channel_id,
+        thread_ts=env.thread_ts,
+        workspace_id=env.workspace_id,
+    )
+
+
+async def _run_slack_proactive_tool(
+    tool_name: str, parameters: dict[str, Any], env: ToolCallEnv
+) -> dict[str, Any]:
+    from lucy.tools.slack_proactive import execute_slack_proactive_tool
+
+    return await execute_slack_proactive_tool(tool_name, parameters, env.slack_client)
+
+
+async def _run_spaces_tool(
+    tool_name: str, parameters: dict[str, Any], env: ToolCallEnv
+) -> dict[str, Any]:
+    from lucy.tools.spaces import execute_spaces_tool
+
+    return await execute_spaces_tool(tool_name, parameters, env.workspace_id)
+
+
+async def _run_email_tool(
+    tool_name: str, parameters: dict[str, Any], env: ToolCallEnv
+) -> dict[str, Any]:
+    from lucy.tools.email_tools import execute_email_tool
+
+    return await execute_email_tool(tool_name, parameters)
+
+
+async def _run_web_search_tool(
+    tool_name: str, parameters: dict[str, Any], env: ToolCallEnv
+) -> dict[str, Any]:
+    from lucy.tools.web_search import execute_web_search
+
+    return await execute_web_search(parameters)
+
+
+async def _run_service_tool(
+    tool_name: str, parameters: dict[str, Any], env: ToolCallEnv
+) -> dict[str, Any]:
+    from lucy.tools.services import execute_service_tool
+
+    return await execute_service_tool(tool_name, parameters)
+
+
+async def _run_code_tool(
+    tool_name: str, parameters: dict[str, Any], env: ToolCallEnv
+) -> dict[str, Any]:
+    from lucy.tools.code_executor import execute_code_tool
+
+    return await execute_code_tool(tool_name, parameters, env.workspace_id, env.thread_ts)
+
+
+async def _run_gateway_tool(
+    tool_name: str, parameters: dict[str, Any], env: ToolCallEnv
+) -> dict[str, Any]:
+    from lucy.tools.gateway import execute_gateway_tool
+
+    return await execute_gateway_tool(tool_name, parameters)
+
+
+# ── Groups and per-intent subsets ────────────────────────────────────────
+
+
+@dataclass(frozen=True)
+class _ToolGroup:
+    name: str
+    definitions: Callable[[], list[dict[str, Any]]]
+    handler: ToolHandler | None = None
+    enabled: Callable[[], bool] = lambda: True
+    # Tool names in this group that are dispatched elsewhere (by the agent).
+    unhandled: frozenset[str] = frozenset()
+
+
+def _gateway_configured() -> bool:
+    return bool(settings.openclaw_base_url and settings.openclaw_api_key)
+
+
+def _tool_groups() -> list[_ToolGroup]:
+    """All static groups, in the order their schemas are sent to the LLM."""
+    from lucy.tools.code_executor import get_code_tool_definitions
+    from lucy.tools.email_tools import get_email_tool_definitions
+    from lucy.tools.file_generator import get_file_tool_definitions
+    from lucy.tools.gateway import get_gateway_tool_definitions
+    from lucy.tools.services import get_services_tool_definitions
+    from lucy.tools.slack_proactive import get_slack_proactive_tool_definitions
+    from lucy.tools.spaces import get_spaces_tool_definitions
+    from lucy.tools.web_search import get_web_search_tool_definitions
+    from lucy.workspace.history_search import get_history_tool_definitions
+
+    return [
+        _ToolGroup("history", get_history_tool_definitions, _run_history_tool),
+        _ToolGroup(
+            "files",
+            get_file_tool_definitions,
+            _run_file_tool,
+            unhandled=frozenset({"lucy_store_api_key"}),
+        ),
+        _ToolGroup(
+            "email",
+            get_email_tool_definitions,
+            _run_email_tool,
+            enabled=lambda: bool(settings.agentmail_enabled and settings.agentmail_api_key),
+        ),
+        _ToolGroup(
+            "spaces",
+            get_spaces_tool_definitions,
+            _run_spaces_tool,
+            enabled=lambda: bool(settings.spaces_enabled),
+        ),
+        _ToolGroup("web_search", get_web_search_tool_definitions, _run_web_search_tool),
+        _ToolGroup("code", get_code_tool_definitions, _run_code_tool),
+        _ToolGroup(
+            "services",
+            get_services_tool_definitions,
+            _run_service_tool,
+            enabled=_gateway_configured,
+        ),
+        _ToolGroup(
+            "gateway",
+            get_gateway_tool_definitions,
+            _run_gateway_tool,
+            enabled=_gateway_configured,
+        ),
+        _ToolGroup("slack", get_slack_proactive_tool_definitions, _run_slack_proactive_tool),
+        _ToolGroup("crons", _cron_tool_definitions),
+        _ToolGroup("heartbeats", _heartbeat_tool_definitions),
+        _ToolGroup("integrations", _integration_tool_definitions),
+        _ToolGroup("delegation", _delegation_tool_definitions),
+    ]
+
+
+# Groups each intent actually needs. Intents not listed here (and any
+# intent that can continue earlier tool work — confirmation, followup)
+# get every enabled group. Pruning is deliberately conservative: it only
+# drops groups that are irrelevant to the intent, never anything a
+# reasonable request of that kind could call.
+_LIGHT_GROUPS = frozenset({"history", "files", "web_search", "slack", "crons", "heartbeats"})
+_NO_BUILDER_GROUPS = frozenset(
+    {
+        "history", "files", "email", "web_search", "code", "gateway",
+        "slack", "crons", "heartbeats", "integrations", "delegation",
+    }
+)
+
+INTENT_TOOL_GROUPS: dict[str, frozenset[str]] = {
+    "chat": _LIGHT_GROUPS,
+    "lookup": _LIGHT_GROUPS,
+    "monitoring": _NO_BUILDER_GROUPS | {"services"},
+    "reasoning": _NO_BUILDER_GROUPS,
+    "document": _NO_BUILDER_GROUPS,
+    "data": _NO_BUILDER_GROUPS,
+}
+
+# Catch-all key for intents without an explicit entry.
+_ALL_INTENTS = "*"
+
+
+class ToolRegistry:
+    """Static tool schemas, per-intent subsets and the dispatch table.
+
+    Built once per process by ``get_tool_registry()``; every accessor is
+    a dict lookup.
+    """
+
+    def __init__(self) -> None:
+        self._handlers: dict[str, ToolHandler] = {}
+        group_tools: dict[str, list[dict[str, Any]]] = {}
+        order: list[str] = []
+
+        for group in _tool_groups():
+            definitions = group.definitions()
+            for tool in definitions:
+                name = tool["function"]["name"]
+                if group.handler and name not in group.unhandled:
+                    self._handlers[name] = group.handler
+            if group.enabled():
+                group_tools[group.name] = definitions
+                order.append(group.name)
+
+        self._all = self._freeze(_ALL_INTENTS, [t for g in order for t in group_tools[g]])
+        self._by_intent: dict[str, ToolSet] = {}
+        for intent, wanted in INTENT_TOOL_GROUPS.items():
+            self._by_intent[intent] = self._freeze(
+                intent,
+                [t for g in order if g in wanted for t in group_tools[g]],
+            )
+
+        logger.info(
+            "tool_registry_built",
+            total_tools=len(self._all.tools),
+            handlers=len(self._handlers),
+            intent_sizes={k: len(v.tools) for k, v in self._by_intent.items()},
+        )
+
+    @staticmethod
+    def _freeze(intent: str, tools: list[dict[str, Any]]) -> ToolSet:
+        return ToolSet(
+            intent=intent,
+            tools=tuple(tools),
+            names=frozenset(t["function"]["name"] for t in tools),
+            json=serialize_tools(tools),
+        )
+
+    @property
+    def all_tools(self) -> ToolSet:
+        """Every enabled static tool, regardless of intent."""
+        return self._all
+
+    def tool_set(self, intent: str) -> ToolSet:
+        """Frozen tool subset for a router intent."""
+        return self._by_intent.get(intent, self._all)
+
+    def handler_for(self, tool_name: str) -> ToolHandler | None:
+        """Dispatch target for a module-backed ``lucy_*`` tool, if any."""
+        return self._handlers.get(tool_name)
+
+
+_registry: ToolRegistry | None = None
+
+
+def get_tool_registry() -> ToolRegistry:
+    """Get or build the process-wide tool registry."""
+    global _registry
+    if _registry is None:
+        _registry = ToolRegistry()
+    return _registry
@@ -0,0 +1,283 @@
+"""Pre-forked worker process for local Python execution.
+
+Started by ``lucy.workspace.python_pool`` as ``python3 _python_worker.py
+<preload>`` with the sanitized subprocess environment. It imports the
+modules in <preload> once, then reads one JSON job per line from stdin.
+Each job runs in a fresh child forked from this process, so user code
+starts with the heavy imports already loaded but shares no state with
+other jobs. One JSON reply per job goes back on the original stdout,
+after a ``{"started": true}`` line sent just before the job's child is
+forked; a job with ``"stream": true`` also gets ``{"chunk", "stream"}``
+lines carrying its output as it is produced, instead of buffering it.
+
+With ``--session <memory_mb>`` (``lucy.workspace.python_sessions``) the
+worker is a stateful kernel instead: jobs run in-process in one
+persistent ``__main__`` namespace, so later jobs see earlier variables.
+The caller enforces timeouts by killing the kernel's process group.
+
+This file must not import anything from ``lucy``: the worker runs
+outside the app's environment and must stay standalone.
+"""
+
+import atexit
+import builtins
+import codecs
+import importlib
+import json
+import os
+import random
+import select
+import signal
+import sys
+import tempfile
+import time
+import traceback
+import types
+
+_READ_CHUNK = 65536
+_current_child = 0
+
+
+def main() -> None:
+    proto = os.fdopen(os.dup(1), "w", buffering=1)
+    # Anything printed by preloads (or by us) must not corrupt the protocol.
+    os.dup2(2, 1)
+    signal.signal(signal.SIGTERM, _on_term)
+
+    loaded = []
+    for name in filter(None, (sys.argv[1] if len(sys.argv) > 1 else "").split(",")):
+        try:
+            importlib.import_module(name)
+            loaded.append(name)
+        except Exception:
+            pass
+    if len(sys.argv) > 3 and sys.argv[2] == "--session":
+        _serve_session(proto, int(sys.argv[3]), loaded)
+        return
+    proto.write(json.dumps({"ready": True, "preloaded": loaded}) + "\n")
+
+    for line in sys.stdin:
+        try:
+            reply = _run_job(json.loads(line), proto)
+        except Exception as e:
+            reply = {"error": f"{type(e).__name__}: {e}"}
+        proto.write(json.dumps(reply) + "\n")
+
+
+def _on_term(_signum: int, _frame: object) -> None:
+    if _current_child:
+        try:
+            os.killpg(_current_child, signal.SIGKILL)
+        except OSError:
+            pass
+    os._exit(0)
+
+
+def _run_job(job: dict, proto: object) -> dict:
+    global _current_child
+
+    out_r, out_w = os.pipe()
+    err_r, err_w = os.pipe()
+    sys.stdout.flush()
+    sys.stderr.flush()
+    # Sent before the fork: once the child exists the job may have side
+    # effects (or kill us), and the pool must then not rerun it.
+    proto.write(json.dumps({"started": True}) + "\n")
+    pid = os.fork()
+    if pid == 0:
+        os.close(out_r)
+        os.close(err_r)
+        _child(job, out_w, err_w)
+    _current_child = pid
+    os.close(out_w)
+    os.close(err_w)
+
+    cap = int(job["max_bytes"])
+    deadline = time.monotonic() + float(job["timeout"])
+    bufs = {out_r: bytearray(), err_r: bytearray()}
+    stream = bool(job.get("stream"))
+    names = {out_r: "stdout", err_r: "stderr"}
+    decoders = {fd: codecs.getincrementaldecoder("utf-8")(errors="replace") for fd in names}
+    open_fds = [out_r, err_r]
+    status = None
+    timed_out = False
+    try:
+        while open_fds:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                timed_out = True
+                break
+            ready, _, _ = select.select(open_fds, [], [], min(remaining, 0.05))
+            for fd in ready:
+                chunk = os.read(fd, _READ_CHUNK)
+                if stream:
+                    text = decoders[fd].decode(chunk, final=not chunk)
+                    if text:
+                        proto.write(json.dumps({"chunk": text, "stream": names[fd]}) + "\n")
+                if not chunk:
+                    open_fds.remove(fd)
+                    continue
+                if stream:
+                    continue
+                buf = bufs[fd]
+                if len(buf) < cap:
+                    buf += chunk[: cap - len(buf)]
+            if not ready:
+                # Done even if a background grandchild still holds the pipes.
+                done, status = os.waitpid(pid, os.WNOHANG)
+                if done:
+                    break
+        while status is None and not timed_out:
+            done, status = os.waitpid(pid, os.WNOHANG)
+            if done:
+                break
+            status = None
+            if time.monotonic() >= deadline:
+                timed_out = True
+                break
+            time.sleep(0.01)
+    finally:
+        try:
+            os.killpg(pid, signal.SIGKILL)
+        except OSError:
+            pass
+        if status is None:
+            _, status = os.waitpid(pid, 0)
+        _current_child = 0
+        for fd in (out_r, err_r):
+            os.close(fd)
+
+    return {
+        "stdout": bufs[out_r].decode("utf-8", errors="replace"),
+        "stderr": bufs[err_r].decode("utf-8", errors="replace"),
+        "exit_code": os.waitstatus_to_exitcode(status),
+        "timed_out": timed_out,
+    }
+
+
+def _child(job: dict, out_w: int, err_w: int) -> None:
+    """Run one job the way ``python3 -c`` would, then exit. Never returns."""
+    exit_code = 0
+    try:
+        os.setsid()
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        devnull = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(devnull, 0)
+        os.close(devnull)
+        os.dup2(out_w, 1)
+        os.dup2(err_w, 2)
+        os.close(out_w)
+        os.close(err_w)
+        # The parent's stdin buffer may hold queued jobs; never expose it.
+        sys.stdin = open(os.devnull)
+        os.chdir(job["cwd"])
+        sys.path[0] = ""
+        sys.argv = ["-c"]
+        # Forked children would otherwise share the parent's PRNG state.
+        random.seed()
+        if "numpy" in sys.modules:
+            sys.modules["numpy"].random.seed()
+        exit_code = _exec_main(job["code"], _fresh_main())
+    except BaseException as e:
+        traceback.print_exception(type(e), e, e.__traceback__)
+        exit_code = 1
+    finally:
+        try:
+            atexit._run_exitfuncs()
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(exit_code)
+
+
+def _fresh_main() -> types.ModuleType:
+    main = types.ModuleType("__main__")
+    main.__dict__["__builtins__"] = builtins
+    sys.modules["__main__"] = main
+    return main
+
+
+def _exec_main(code: str, main: types.ModuleType) -> int:
+    """Exec ``code`` in ``main`` and return the exit code ``python3 -c`` would."""
+    try:
+        exec(compile(code, "<string>", "exec"), main.__dict__)
+    except SystemExit as e:
+        if e.code is None:
+            return 0
+        if isinstance(e.code, int):
+            return e.code
+        print(e.code, file=sys.stderr)
+        return 1
+    except BaseException as e:
+        tb = e.__traceback__.tb_next if e.__traceback__ else None
+        traceback.print_exception(type(e), e, tb)
+        return 1
+    return 0
+
+
+# ── Session (stateful kernel) mode ──────────────────────────────────────
+
+
+def _serve_session(proto: object, memory_mb: int, loaded: list[str]) -> None:
+    if memory_mb > 0:
+        import resource
+
+        limit = memory_mb * 1024 * 1024
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        if hard != resource.RLIM_INFINITY:
+            limit = min(limit, hard)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+    # Jobs arrive on the real stdin; user code only ever sees /dev/null.
+    jobs = os.fdopen(os.dup(0), "r")
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, 0)
+    os.close(devnull)
+    sys.stdin = open(os.devnull)
+    sys.argv = ["-c"]
+    sys.path[0] = ""
+    main = _fresh_main()
+    proto.write(json.dumps({"ready": True, "preloaded": loaded}) + "\n")
+
+    for line in jobs:
+        try:
+            reply = _run_in_session(json.loads(line), main)
+        except Exception as e:
+            reply = {"error": f"{type(e).__name__}: {e}"}
+        proto.write(json.dumps(reply) + "\n")
+
+
+def _run_in_session(job: dict, main: types.ModuleType) -> dict:
+    cap = int(job["max_bytes"])
+    os.chdir(job["cwd"])
+    with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        saved = os.dup(1), os.dup(2)
+        os.dup2(out.fileno(), 1)
+        os.dup2(err.fileno(), 2)
+        try:
+            exit_code = _exec_main(job["code"], main)
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os.dup2(saved[0], 1)
+            os.dup2(saved[1], 2)
+            os.close(saved[0])
+            os.close(saved[1])
+        out.seek(0)
+        err.seek(0)
+        stdout, stderr = out.read(cap), err.read(cap)
+
+    return {
+        "stdout": stdout.decode("utf-8", errors="replace"),
+        "stderr": stderr.decode("utf-8", errors="replace"),
+        "exit_code": exit_code,
+        "timed_out": False,
+        "names": sorted(k for k in main.__dict__ if not k.startswith("__")),
+    }
+
+
+if __name__ == "__main__":
+    main()
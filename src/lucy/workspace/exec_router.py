@@ -0,0 +1,410 @@
+"""Health-aware routing across code execution backends.
+
+``executor`` used to try gateway → local subprocess → Composio strictly in
+sequence. That made every call pay a gateway timeout while the gateway was
+down, and a user-code error in the local run still triggered a Composio
+round trip. The router changes this:
+
+- Each backend has a ``CircuitBreaker`` plus EWMA latency and success
+  rate. Only *backend* failures count: an unreachable gateway, a spawn
+  error. Code that exits non-zero counts as a healthy backend.
+- ``plan()`` orders the healthy backends by their configured priority.
+  A backend whose breaker is open is skipped without being called, until
+  its cooldown probe.
+- The next backend is tried only after a backend failure, never after a
+  user-code error.
+- With ``exec_race_readonly``, Python that ``is_read_only`` judges
+  side-effect free runs on gateway and local at once. The first usable
+  result wins and the other run is cancelled.
+"""
+
+from __future__ import annotations
+
+import ast
+import asyncio
+import time
+from collections.abc import Awaitable, Callable, Sequence
+from typing import TYPE_CHECKING, Any
+
+import structlog
+
+from lucy.infra.circuit_breaker import CircuitBreaker
+
+if TYPE_CHECKING:
+    from lucy.workspace.executor import ExecutionResult
+
+logger = structlog.get_logger()
+
+Attempt = Callable[[], Awaitable["ExecutionResult | None"]]
+
+_EWMA_ALPHA = 0.2
+_MIN_SUCCESS_RATE = 0.5  # Below this a backend sorts after healthier ones
+
+
+class BackendHealth:
+    """Rolling health of one execution backend."""
+
+    __slots__ = ("name", "breaker", "latency_ms", "success_rate", "calls", "failures")
+
+    def __init__(self, name: str, breaker: CircuitBreaker) -> None:
+        self.name = name
+        self.breaker = breaker
+        self.latency_ms = 0.0
+        self.success_rate = 1.0
+        self.calls = 0
+        self.failures = 0
+
+    def record(self, ok: bool, elapsed_ms: float) -> None:
+        self.calls += 1
+        if self.calls == 1:
+            self.latency_ms = elapsed_ms
+        else:
+            self.latency_ms += _EWMA_ALPHA * (elapsed_ms - self.latency_ms)
+        self.success_rate += _EWMA_ALPHA * ((1.0 if ok else 0.0) - self.success_rate)
+        if ok:
+            self.breaker.record_success()
+        else:
+            self.failures += 1
+            self.breaker.record_failure()
+
+
+class ExecutionRouter:
+    """Picks and falls through execution backends by health."""
+
+    def __init__(self, failure_threshold: int = 3, cooldown_s: float = 30.0) -> None:
+        self.failure_threshold = failure_threshold
+        self.cooldown_s = cooldown_s
+        self._health: dict[str, BackendHealth] = {}
+
+    def health(self, name: str) -> BackendHealth:
+        h = self._health.get(name)
+        if h is None:
+            breaker = CircuitBreaker(f"exec_{name}", self.failure_threshold, self.cooldown_s)
+            h = self._health[name] = BackendHealth(name, breaker)
+        return h
+
+    def plan(self, backends: Sequence[str]) -> list[str]:
+        """Backends worth trying, best first; ``backends`` is priority order."""
+        usable = [b for b in backends if not self.health(b).breaker.is_open]
+        return sorted(usable, key=lambda b: self.health(b).success_rate < _MIN_SUCCESS_RATE)
+
+    async def run(
+        self,
+        attempts: dict[str, Attempt],
+        race: Sequence[str] = (),
+    ) -> tuple[str | None, ExecutionResult | None]:
+        """Run the first usable backend in ``attempts`` (priority order).
+
+        ``race`` names backends to start together when they lead the plan.
+        Returns (backend, result), or (None, last failed result) when
+        every backend failed or was skipped.
+        """
+        order = self.plan(list(attempts))
+        last: ExecutionResult | None = None
+        racers = [b for b in order[: len(race)] if b in race]
+        if len(racers) > 1:
+            name, result = await self._race(racers, attempts)
+            if name is not None:
+                return name, result
+            last = result
+            order = [b for b in order if b not in racers]
+
+        for name in order:
+            result = await self._attempt(name, attempts[name])
+            if _usable(result):
+                return name, result
+            last = result or last
+        return None, last
+
+    async def _attempt(self, name: str, attempt: Attempt) -> ExecutionResult | None:
+        h = self.health(name)
+        if not h.breaker.should_allow_request():
+            return None
+        t0 = time.monotonic()
+        try:
+            result = await attempt()
+        except asyncio.CancelledError:
+            # Lost a race (or caller cancelled); says nothing about health.
+            h.breaker.release_probe()
+            raise
+        ok = _usable(result)
+        h.record(ok, (time.monotonic() - t0) * 1000)
+        if not ok:
+            logger.info("exec_backend_failed", backend=name, success_rate=round(h.success_rate, 2))
+        return result
+
+    async def _race(
+        self, names: list[str], attempts: dict[str, Attempt],
+    ) -> tuple[str | None, ExecutionResult | None]:
+        tasks = {
+            asyncio.create_task(self._attempt(name, attempts[name])): name for name in names
+        }
+        last: ExecutionResult | None = None
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    result = task.result()
+                    if _usable(result):
+                        logger.debug("exec_race_won", backend=tasks[task], racers=names)
+                        return tasks[task], result
+                    last = result or last
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        return None, last
+
+    def get_stats(self) -> dict[str, dict[str, Any]]:
+        return {
+            name: {
+                "open": h.breaker.is_open,
+                "latency_ms": round(h.latency_ms),
+                "success_rate": round(h.success_rate, 3),
+                "calls": h.calls,
+                "failures": h.failures,
+            }
+            for name, h in self._health.items()
+        }
+
+
+def _usable(result: ExecutionResult | None) -> bool:
+    return result is not None and not result.backend_failed
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# READ-ONLY DETECTION
+# ═══════════════════════════════════════════════════════════════════════════
+
+# An allowlist: code is read-only only if every module it imports, and every
+# module function it touches, is listed here. A value of None allows the whole
+# module; otherwise only the listed top-level names. Methods called on objects
+# cannot be typed statically, so those are checked against _WRITE_NAMES below.
+_READ_MODULES: dict[str, frozenset[str] | None] = {
+    **dict.fromkeys((
+        "base64", "bisect", "calendar", "collections", "copy", "dataclasses", "datetime",
+        "decimal", "difflib", "enum", "fnmatch", "fractions", "functools", "glob", "hashlib",
+        "heapq", "html", "itertools", "math", "numpy", "operator", "os.path", "pprint",
+        "random", "re", "statistics", "string", "textwrap", "time", "typing", "unicodedata",
+        "urllib.parse", "uuid", "zoneinfo",
+    )),
+    "csv": frozenset({"reader", "DictReader", "Sniffer", "Error"}),
+    "httpx": frozenset({"get", "head", "options", "Client", "AsyncClient", "Timeout",
+                        "HTTPError", "HTTPStatusError", "RequestError", "TimeoutException"}),
+    "io": frozenset({"StringIO", "BytesIO"}),
+    "json": frozenset({"loads", "dumps", "load", "JSONDecodeError"}),
+    "openpyxl": frozenset({"load_workbook"}),
+    "os": frozenset({
+        "getcwd", "listdir", "scandir", "walk", "stat", "lstat", "getenv", "environ",
+        "path", "sep", "linesep", "pathsep", "curdir", "pardir", "devnull", "name",
+        "cpu_count",
+    }),
+    "pandas": frozenset({
+        "DataFrame", "Series", "Timestamp", "Timedelta", "concat", "merge", "cut", "qcut",
+        "crosstab", "pivot_table", "date_range", "to_datetime", "to_numeric", "isna",
+        "notna", "json_normalize", "read_csv", "read_excel", "read_json", "read_parquet",
+        "read_table", "read_html", "set_option",
+    }),
+    "pathlib": frozenset({"Path", "PurePath", "PurePosixPath"}),
+    "requests": frozenset({"get", "head", "options", "RequestException", "HTTPError"}),
+    "sys": frozenset({"argv", "version", "version_info", "platform", "maxsize", "getsizeof",
+                      "stdin", "stdout", "stderr", "exit"}),
+    "urllib.request": frozenset({"urlopen", "Request"}),
+}
+# Method and function names that write, delete, send or spawn, wherever they
+# are called. Prefixes catch families (save*, dump*, to_csv, execute*, ...).
+_WRITE_NAMES = frozenset({
+    "touch", "mkdir", "makedirs", "rmdir", "removedirs", "remove", "unlink", "rename",
+    "renames", "rmtree", "copyfile", "copytree", "move", "chmod", "chown",
+    "symlink_to", "hardlink_to", "link", "symlink", "truncate", "tofile", "memmap",
+    "open_memmap",
+    "system", "popen", "kill", "post", "put", "patch", "delete", "request", "stream",
+    "commit", "rollback", "savefig",
+})
+_WRITE_PREFIXES = ("write", "save", "dump", "execute", "send", "upload", "spawn")
+# to_* methods that only ever return a value; to_string/to_markdown write
+# when given a buffer.
+_PURE_TO = frozenset({
+    "to_dict", "to_list", "to_numpy", "to_records", "to_frame", "to_datetime",
+    "to_numeric", "to_pydatetime", "to_timestamp", "to_period", "to_series",
+})
+_BUFFERED_TO = frozenset({"to_string", "to_markdown"})
+_UNSAFE_CALLS = frozenset({
+    "exec", "eval", "compile", "__import__", "getattr", "setattr", "delattr", "breakpoint",
+})
+# Dunders that stay harmless; any other reaches builtins or internals.
+_SAFE_DUNDERS = frozenset({"__name__", "__doc__", "__file__", "__init__", "__class__"})
+_READ_MODES = frozenset({"r", "rb", "rt", "br", "tr"})
+
+
+def is_read_only(code: str) -> bool:
+    """True when ``code`` provably only reads, so running it twice is harmless.
+
+    Anything not on the allowlists (an unknown module, a module function
+    not listed for it, a write-like method name) makes the answer False.
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return False
+
+    aliases: dict[str, str] = {}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                if not _module_allowed(alias.name):
+                    return False
+                if alias.asname:
+                    aliases[alias.asname] = alias.name
+                else:
+                    top = alias.name.split(".")[0]
+                    aliases[top] = top
+        elif isinstance(node, ast.ImportFrom):
+            if node.level or not node.module:
+                return False
+            for alias in node.names:
+                dotted = f"{node.module}.{alias.name}"
+                if alias.name == "*" or not _module_allowed(dotted):
+                    return False
+                aliases[alias.asname or alias.name] = dotted
+
+    paths = _path_names(tree, aliases)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name | ast.Attribute):
+            name = node.id if isinstance(node, ast.Name) else node.attr
+            if _is_dunder(name) and name not in _SAFE_DUNDERS:
+                return False
+        if isinstance(node, ast.Attribute):
+            dotted = _dotted(node, aliases)
+            if dotted is not None and not _module_allowed(dotted):
+                return False
+        elif isinstance(node, ast.Call) and not _call_allowed(node, aliases, paths):
+            return False
+    return True
+
+
+def _is_dunder(name: str) -> bool:
+    return len(name) > 4 and name.startswith("__") and name.endswith("__")
+
+
+def _module_allowed(dotted: str) -> bool:
+    """Whether importing or using ``dotted`` (``module.name...``) only reads."""
+    parts = dotted.split(".")
+    for i in range(len(parts), 0, -1):
+        module = ".".join(parts[:i])
+        if module in _READ_MODULES:
+            if i == len(parts):
+                return True
+            names = _READ_MODULES[module]
+            return (names is None or parts[i] in names) and not _is_write_name(parts[-1])
+    return False
+
+
+def _dotted(node: ast.expr, aliases: dict[str, str]) -> str | None:
+    """``np.linalg.norm`` -> ``numpy.linalg.norm``; None unless rooted at an import."""
+    attrs: list[str] = []
+    while isinstance(node, ast.Attribute):
+        attrs.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name) or node.id not in aliases:
+        return None
+    return ".".join([aliases[node.id], *reversed(attrs)])
+
+
+def _is_write_name(name: str) -> bool:
+    if name in _WRITE_NAMES:
+        return True
+    if name.startswith("to_"):
+        return name not in _PURE_TO and name not in _BUFFERED_TO
+    # json.dumps / pickle.dumps return a string instead of writing.
+    return name.startswith(_WRITE_PREFIXES) and name != "dumps"
+
+
+def _path_names(tree: ast.AST, aliases: dict[str, str]) -> set[str]:
+    """Variables assigned a ``pathlib`` path (``p = Path(x)``, ``q = p / "y"``)."""
+    names: set[str] = set()
+    for node in ast.walk(tree):
+        if (
+            isinstance(node, ast.Assign)
+            and _is_path(node.value, aliases, names)
+        ):
+            names.update(t.id for t in node.targets if isinstance(t, ast.Name))
+    return names
+
+
+def _is_path(node: ast.expr, aliases: dict[str, str], names: set[str]) -> bool:
+    if isinstance(node, ast.Name):
+        return node.id in names
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Div):
+        return _is_path(node.left, aliases, names)
+    if isinstance(node, ast.Call):
+        func = node.func
+        target = (
+            aliases.get(func.id) if isinstance(func, ast.Name) else _dotted(func, aliases)
+        )
+        return bool(target and target.startswith("pathlib."))
+    return False
+
+
+def _call_allowed(call: ast.Call, aliases: dict[str, str], paths: set[str]) -> bool:
+    func = call.func
+    if isinstance(func, ast.Name):
+        if func.id in _UNSAFE_CALLS:
+            return False
+        target = aliases.get(func.id, func.id)
+        if target == "open":
+            return _read_mode(call, 1)
+        return _urlopen_allowed(call) if target == "urllib.request.urlopen" else True
+    if not isinstance(func, ast.Attribute):
+        # table["fn"](), make()(): the callee can't be known.
+        return False
+    if _is_write_name(func.attr):
+        return False
+    if func.attr == "replace" and _is_path(func.value, aliases, paths):
+        # Path.replace moves a file; str/DataFrame.replace is a pure value op.
+        return False
+    if func.attr in _BUFFERED_TO:
+        return not call.args and not any(kw.arg == "buf" for kw in call.keywords)
+    dotted = _dotted(func, aliases)
+    if func.attr == "open":
+        # io.open(file, mode) / Path(...).open(mode)
+        return _read_mode(call, 1 if dotted else 0)
+    if dotted in ("urllib.request.urlopen", "urllib.request.Request"):
+        return _urlopen_allowed(call)
+    return True
+
+
+def _read_mode(call: ast.Call, position: int) -> bool:
+    mode: ast.expr | None = call.args[position] if len(call.args) > position else None
+    for kw in call.keywords:
+        if kw.arg == "mode":
+            mode = kw.value
+    if mode is None:
+        return True
+    return isinstance(mode, ast.Constant) and mode.value in _READ_MODES
+
+
+def _urlopen_allowed(call: ast.Call) -> bool:
+    """A request body (``data``) makes urlopen/Request a POST."""
+    return len(call.args) < 2 and not any(kw.arg in ("data", "method") for kw in call.keywords)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# SINGLETON
+# ═══════════════════════════════════════════════════════════════════════════
+
+_router: ExecutionRouter | None = None
+
+
+def get_execution_router() -> ExecutionRouter:
+    """Get or create the singleton ExecutionRouter."""
+    global _router
+    if _router is None:
+        from lucy.config import settings
+
+        _router = ExecutionRouter(
+            failure_threshold=settings.exec_breaker_failures,
+            cooldown_s=settings.exec_breaker_cooldown_s,
+        )
+    return _router
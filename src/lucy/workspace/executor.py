@@ -6,7 +6,10 @@ Three execution paths, tried in priority order:
    Persistent filesystem, background process support, no cold-start penalty.
    Supports foreground commands and long-running background jobs.
 2. **Local subprocess** — runs in the Lucy server process, restricted to the
-   workspace scripts/ directory. Secrets-stripped environment.
+   workspace scripts/ directory. Secrets-stripped environment. Python runs
+   in a fork of a warm, preloaded worker when one is idle (python_pool).
+   Output is streamed as it is produced (output_stream), which feeds the
+   Slack progress update and stops runs stuck repeating one fatal error.
 3. **Composio sandbox** (last resort) — ephemeral Docker container on Composio's
    infrastructure. Stateless, no installed packages persist between calls.
    Used only when both Gateway and local subprocess are unavailable.
@@ -22,10 +25,13 @@ from __future__ import annotations
 import asyncio
 import os
 import time
+from collections.abc import Awaitable, Callable
 from dataclasses import dataclass
+from pathlib import Path
 
 import structlog
 
+from lucy.infra.costs import get_cost_recorder
 from lucy.workspace.filesystem import get_workspace
 
 logger = structlog.get_logger()
@@ -33,6 +39,9 @@ logger = structlog.get_logger()
 MAX_OUTPUT_CHARS = 200_000
 SUBPROCESS_TIMEOUT = 60
 
+# Router backend name → cost provider for runs on remote compute.
+_REMOTE_PROVIDERS = {"gateway": "openclaw", "composio": "composio"}
+
 
 @dataclass
 class ExecutionResult:
@@ -44,6 +53,19 @@ class ExecutionResult:
     exit_code: int = 0
     elapsed_ms: int = 0
     method: str = ""
+    # The backend itself failed (couldn't spawn, unreachable) — as opposed
+    # to the code failing. Only these fall through to the next backend.
+    backend_failed: bool = False
+
+
+def _record_sandbox_cost(workspace_id: str, provider: str, result: ExecutionResult) -> None:
+    """Queue a cost row for a run on remote compute (local runs are free)."""
+    get_cost_recorder().record_sandbox_run(
+        workspace_id=workspace_id,
+        provider=provider,
+        elapsed_ms=result.elapsed_ms,
+        method=result.method,
+    )
 
 
 async def execute_python(
@@ -53,36 +75,68 @@ async def execute_python(
 ) -> ExecutionResult:
     """Execute Python code, preferring the OpenClaw Gateway.
 
-    Priority: Gateway → local subprocess → Composio sandbox (last resort).
+    Priority: Gateway → local subprocess → Composio sandbox (last resort),
+    skipping backends the router currently sees as down (see exec_router).
 
     Args:
         workspace_id: Workspace context for local fallback CWD.
         code: Python source code to run.
         timeout: Max execution time in seconds.
     """
-    t0 = time.monotonic()
+    from lucy.config import settings
+    from lucy.workspace.exec_router import is_read_only
 
-    # 1. OpenClaw Gateway (your VPS — persistent, fast)
-    result = await _execute_via_gateway(f"python3 -c {_shell_quote(code)}", timeout)
-    if result is not None:
-        result.elapsed_ms = round((time.monotonic() - t0) * 1000)
-        result.method = "gateway_python"
+    async def gateway() -> ExecutionResult | None:
+        result = await _execute_via_gateway(f"python3 -c {_shell_quote(code)}", timeout)
+        if result is not None:
+            result.method = "gateway_python"
         return result
 
-    # 2. Local subprocess (secrets-stripped, sandboxed to workspace)
-    result = await _execute_local_python(workspace_id, code, timeout)
-    result.elapsed_ms = round((time.monotonic() - t0) * 1000)
-    if result.success:
-        return result
-
-    # 3. Composio sandbox (last resort — stateless, external)
-    composio_result = await _execute_via_composio(
-        workspace_id, code, language="python", timeout=timeout
+    race = ("gateway", "local") if settings.exec_race_readonly and is_read_only(code) else ()
+    return await _route(
+        workspace_id,
+        {
+            # 1. OpenClaw Gateway (your VPS — persistent, fast)
+            "gateway": gateway,
+            # 2. Local subprocess (secrets-stripped, sandboxed to workspace)
+            "local": lambda: _execute_local_python(workspace_id, code, timeout),
+            # 3. Composio sandbox (last resort — stateless, external)
+            "composio": lambda: _execute_via_composio(
+                workspace_id, code, language="python", timeout=timeout
+            ),
+        },
+        race=race,
     )
-    if composio_result is not None:
-        composio_result.elapsed_ms = round((time.monotonic() - t0) * 1000)
-        return composio_result
 
+
+async def execute_python_session(
+    workspace_id: str,
+    thread_ts: str,
+    code: str,
+    timeout: int = SUBPROCESS_TIMEOUT,
+) -> ExecutionResult | None:
+    """Execute Python in the thread's persistent session kernel.
+
+    Always local (see python_sessions). Returns None when sessions are
+    disabled or no kernel is available; callers then use execute_python.
+    """
+    from lucy.workspace.python_sessions import get_python_sessions
+
+    sessions = get_python_sessions()
+    if sessions is None:
+        return None
+    t0 = time.monotonic()
+    ws = get_workspace(workspace_id)
+    result = await sessions.run(workspace_id, thread_ts, code, cwd=str(ws.root), timeout=timeout)
+    if result is not None:
+        result.elapsed_ms = round((time.monotonic() - t0) * 1000)
+        logger.info(
+            "local_python_executed",
+            workspace_id=workspace_id,
+            exit_code=result.exit_code,
+            output_len=len(result.output),
+            session=True,
+        )
     return result
 
 
@@ -93,30 +147,43 @@ async def execute_bash(
 ) -> ExecutionResult:
     """Execute a bash command, preferring the OpenClaw Gateway.
 
-    Priority: Gateway → local subprocess → Composio sandbox (last resort).
+    Priority: Gateway → local subprocess → Composio sandbox (last resort),
+    skipping backends the router currently sees as down.
     """
-    t0 = time.monotonic()
-
-    # 1. OpenClaw Gateway (your VPS)
-    result = await _execute_via_gateway(command, timeout)
-    if result is not None:
-        result.elapsed_ms = round((time.monotonic() - t0) * 1000)
-        return result
+    return await _route(
+        workspace_id,
+        {
+            "gateway": lambda: _execute_via_gateway(command, timeout),
+            "local": lambda: _execute_local_bash(command, timeout, workspace_id=workspace_id),
+            "composio": lambda: _execute_via_composio(
+                workspace_id, command, language="bash", timeout=timeout
+            ),
+        },
+    )
 
-    # 2. Local subprocess (restricted env, no secrets)
-    result = await _execute_local_bash(command, timeout, workspace_id=workspace_id)
-    result.elapsed_ms = round((time.monotonic() - t0) * 1000)
-    if result.success:
-        return result
 
-    # 3. Composio sandbox (last resort)
-    composio_result = await _execute_via_composio(
-        workspace_id, command, language="bash", timeout=timeout
-    )
-    if composio_result is not None:
-        composio_result.elapsed_ms = round((time.monotonic() - t0) * 1000)
-        return composio_result
+async def _route(
+    workspace_id: str,
+    attempts: dict[str, Callable[[], Awaitable[ExecutionResult | None]]],
+    race: tuple[str, ...] = (),
+) -> ExecutionResult:
+    """Run ``attempts`` through the execution router and account for cost."""
+    from lucy.workspace.exec_router import get_execution_router
 
+    t0 = time.monotonic()
+    backend, result = await get_execution_router().run(attempts, race=race)
+    if result is None:
+        result = ExecutionResult(
+            success=False,
+            output="",
+            error="No execution backend is available right now.",
+            exit_code=1,
+            method="unavailable",
+            backend_failed=True,
+        )
+    result.elapsed_ms = round((time.monotonic() - t0) * 1000)
+    if backend in _REMOTE_PROVIDERS:
+        _record_sandbox_cost(workspace_id, _REMOTE_PROVIDERS[backend], result)
     return result
 
 
@@ -130,7 +197,6 @@ async def execute_workspace_script(
 
     The script_path is relative to the workspace root (e.g. "scripts/collect.py").
     """
-    t0 = time.monotonic()
     ws = get_workspace(workspace_id)
     full_path = ws._resolve(script_path)
 
@@ -153,54 +219,56 @@ async def execute_workspace_script(
             method="local",
         )
 
-    code = full_path.read_text("utf-8")
-
-    # 1. OpenClaw Gateway
-    gateway_result = await _execute_via_gateway(
-        f"python3 {_shell_quote(str(full_path))}{' ' + ' '.join(args) if args else ''}",
-        timeout,
+    return await _route(
+        workspace_id,
+        {
+            # 1. OpenClaw Gateway
+            "gateway": lambda: _execute_via_gateway(
+                f"python3 {_shell_quote(str(full_path))}{' ' + ' '.join(args) if args else ''}",
+                timeout,
+            ),
+            # 2. Local subprocess fallback
+            "local": lambda: _execute_local_script(
+                workspace_id, ws.root, full_path, args, timeout,
+            ),
+        },
     )
-    if gateway_result is not None:
-        gateway_result.elapsed_ms = round((time.monotonic() - t0) * 1000)
-        return gateway_result
 
-    # 2. Local subprocess fallback
-    cmd = ["python3", str(full_path)] + (args or [])
+
+async def _execute_local_script(
+    workspace_id: str,
+    root: Path,
+    full_path: Path,
+    args: list[str] | None,
+    timeout: int,
+) -> ExecutionResult:
+    from lucy.workspace.output_stream import OutputSink, pump_process
+
+    # -u: stream output as it is produced rather than at exit.
+    cmd = ["python3", "-u", str(full_path)] + (args or [])
+    sink = OutputSink(workspace_id, "script")
     try:
         proc = await asyncio.create_subprocess_exec(
             *cmd,
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.PIPE,
-            cwd=str(ws.root),
-        )
-        try:
-            stdout, stderr = await asyncio.wait_for(
-                proc.communicate(), timeout=timeout
-            )
-        except TimeoutError:
-            proc.kill()
-            await proc.wait()
-            raise
-
-        output = stdout.decode("utf-8", errors="replace")[:MAX_OUTPUT_CHARS]
-        err = stderr.decode("utf-8", errors="replace")[:MAX_OUTPUT_CHARS]
-        return ExecutionResult(
-            success=proc.returncode == 0,
-            output=output,
-            error=err,
-            exit_code=proc.returncode or 0,
-            elapsed_ms=round((time.monotonic() - t0) * 1000),
-            method="local_script",
+            cwd=str(root),
         )
+        await pump_process(proc, sink, timeout)
+        return sink.to_result(proc.returncode, "local_script")
     except TimeoutError:
+        return sink.to_result(124, "local_script", f"Script timed out after {timeout}s")
+    except OSError as e:
         return ExecutionResult(
             success=False,
             output="",
-            error=f"Script timed out after {timeout}s",
-            exit_code=124,
-            elapsed_ms=round((time.monotonic() - t0) * 1000),
+            error=str(e),
+            exit_code=1,
             method="local_script",
+            backend_failed=True,
         )
+    finally:
+        sink.close()
 
 
 # ── OpenClaw Gateway (primary execution path) ─────────────────────────
@@ -334,6 +402,9 @@ def _sanitized_subprocess_env() -> dict[str, str]:
         safe[key] = value
     # Ensure clean Python environment
     safe["PYTHONDONTWRITEBYTECODE"] = "1"
+    # Output is streamed as it is produced (output_stream); don't let it
+    # sit in a block buffer until exit.
+    safe["PYTHONUNBUFFERED"] = "1"
     safe.pop("PYTHONSTARTUP", None)
     safe.pop("PYTHONPATH", None)
     return safe
@@ -344,8 +415,35 @@ async def _execute_local_python(
     code: str,
     timeout: int = SUBPROCESS_TIMEOUT,
 ) -> ExecutionResult:
-    """Execute Python via local subprocess."""
+    """Execute Python locally, in a warm pooled worker when one is idle.
+
+    Output is streamed into an OutputSink either way, so progress is
+    visible while it runs and a run stuck repeating one error stops early.
+    """
+    from lucy.workspace.output_stream import OutputSink, pump_process
+    from lucy.workspace.python_pool import get_python_pool
+
     ws = get_workspace(workspace_id)
+    pool = get_python_pool()
+    if pool is not None:
+        sink = OutputSink(workspace_id, "Python script")
+        try:
+            result = await pool.run(code, cwd=str(ws.root), timeout=timeout, sink=sink)
+        finally:
+            sink.close()
+        # None means the job never started, so the cold path can't repeat it.
+        if result is not None:
+            logger.info(
+                "local_python_executed",
+                workspace_id=workspace_id,
+                exit_code=result.exit_code,
+                output_len=len(result.output),
+                pooled=True,
+                stopped_early=sink.stopped,
+            )
+            return result
+
+    sink = OutputSink(workspace_id, "Python script")
     try:
         proc = await asyncio.create_subprocess_exec(
             "python3", "-c", code,
@@ -354,40 +452,19 @@ async def _execute_local_python(
             cwd=str(ws.root),
             env=_sanitized_subprocess_env(),
         )
-        try:
-            stdout, stderr = await asyncio.wait_for(
-                proc.communicate(), timeout=timeout
-            )
-        except TimeoutError:
-            proc.kill()
-            await proc.wait()
-            raise
-
-        output = stdout.decode("utf-8", errors="replace")[:MAX_OUTPUT_CHARS]
-        err = stderr.decode("utf-8", errors="replace")[:MAX_OUTPUT_CHARS]
+        await pump_process(proc, sink, timeout)
 
         logger.info(
             "local_python_executed",
             workspace_id=workspace_id,
             exit_code=proc.returncode,
-            output_len=len(output),
-        )
-        return ExecutionResult(
-            success=proc.returncode == 0,
-            output=output,
-            error=err,
-            exit_code=proc.returncode or 0,
-            method="local_python",
+            output_len=sink.output_len,
+            stopped_early=sink.stopped,
         )
+        return sink.to_result(proc.returncode, "local_python")
 
     except TimeoutError:
-        return ExecutionResult(
-            success=False,
-            output="",
-            error=f"Execution timed out after {timeout}s",
-            exit_code=124,
-            method="local_python",
-        )
+        return sink.to_result(124, "local_python", f"Execution timed out after {timeout}s")
     except Exception as e:
         return ExecutionResult(
             success=False,
@@ -395,7 +472,10 @@ async def _execute_local_python(
             error=str(e),
             exit_code=1,
             method="local_python",
+            backend_failed=True,
         )
+    finally:
+        sink.close()
 
 
 async def _execute_local_bash(
@@ -404,11 +484,14 @@ async def _execute_local_bash(
     *,
     workspace_id: str | None = None,
 ) -> ExecutionResult:
-    """Execute a bash command via local subprocess."""
+    """Execute a bash command via local subprocess, streaming its output."""
+    from lucy.workspace.output_stream import OutputSink, pump_process
+
     cwd: str | None = None
     if workspace_id:
         ws = get_workspace(workspace_id)
         cwd = str(ws.root)
+    sink = OutputSink(workspace_id, "command")
     try:
         proc = await asyncio.create_subprocess_shell(
             command,
@@ -417,34 +500,11 @@ async def _execute_local_bash(
             cwd=cwd,
             env=_sanitized_subprocess_env(),
         )
-        try:
-            stdout, stderr = await asyncio.wait_for(
-                proc.communicate(), timeout=timeout
-            )
-        except TimeoutError:
-            proc.kill()
-            await proc.wait()
-            raise
-
-        output = stdout.decode("utf-8", errors="replace")[:MAX_OUTPUT_CHARS]
-        err = stderr.decode("utf-8", errors="replace")[:MAX_OUTPUT_CHARS]
-
-        return ExecutionResult(
-            success=proc.returncode == 0,
-            output=output,
-            error=err,
-            exit_code=proc.returncode or 0,
-            method="local_bash",
-        )
+        await pump_process(proc, sink, timeout)
+        return sink.to_result(proc.returncode, "local_bash")
 
     except TimeoutError:
-        return ExecutionResult(
-            success=False,
-            output="",
-            error=f"Command timed out after {timeout}s",
-            exit_code=124,
-            method="local_bash",
-        )
+        return sink.to_result(124, "local_bash", f"Command timed out after {timeout}s")
     except Exception as e:
         return ExecutionResult(
             success=False,
@@ -452,4 +512,7 @@ async def _execute_local_bash(
             error=str(e),
             exit_code=1,
             method="local_bash",
+            backend_failed=True,
         )
+    finally:
+        sink.close()
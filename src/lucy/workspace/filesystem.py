@@ -17,6 +17,7 @@ from __future__ import annotations
 import asyncio
 import json
 import shutil
+import stat
 from datetime import UTC, datetime
 from pathlib import Path
 from typing import Any
@@ -82,6 +83,20 @@ class WorkspaceFS:
         async with aiofiles.open(path, encoding="utf-8") as f:
             return await f.read()
 
+    async def file_version(self, relative_path: str) -> tuple[int, int] | None:
+        """(mtime_ns, size) of a workspace file, or None if it isn't one.
+
+        Lets callers skip re-reading a file that hasn't changed.
+        """
+        path = self._resolve(relative_path)
+        try:
+            st = await aiofiles.os.stat(path)
+        except OSError:
+            return None
+        if not stat.S_ISREG(st.st_mode):
+            return None
+        return st.st_mtime_ns, st.st_size
+
     async def write_file(self, relative_path: str, content: str) -> Path:
         """Write content to a file atomically (write tmp → rename)."""
         path = self._resolve(relative_path)
@@ -32,6 +32,7 @@ from typing import Any
 
 import structlog
 
+from lucy.pipeline.features import Feature, extract_features
 from lucy.workspace.filesystem import WorkspaceFS
 
 logger = structlog.get_logger()
@@ -50,83 +51,9 @@ def _get_workspace_lock(workspace_id: str) -> asyncio.Lock:
 # MEMORY EXTRACTION — What should be remembered?
 # ═══════════════════════════════════════════════════════════════════════════
 
-_REMEMBER_SIGNALS = re.compile(
-    r"\b(?:"
-    r"remember|note that|keep in mind|fyi|for your reference|"
-    r"going forward|from now on|always|never|our (?:target|goal|kpi)|"
-    r"my (?:name|role|email|timezone|preference)|"
-    r"we use|we switched to|our stack|we're moving to|"
-    r"our (?:company|team|product) (?:use[sd]?|is|has|runs?)|"
-    r"(?:new|updated?) (?:target|goal|deadline|process)|"
-    r"i(?:'m| am) (?:the|a|responsible for)|"
-    r"(?:my|our) (?:mrr|revenue|arr|budget|runway) is|"
-    r"my (?:boss|manager|lead|cto|ceo|coo|vp|director|head|supervisor|report|pm|po|owner) is|"
-    r"(?:he|she|they)(?:'s| is| are) (?:my|our|the) (?:boss|manager|lead|head|director)|"
-    r"(?:reports?|reports to|manages?|leads?|runs?) (?:the |our )?(?:team|department|eng|product|design|sales|marketing)"  # noqa: E501
-    r")\b",
-    re.IGNORECASE,
-)
-
-_COMPANY_SIGNALS = re.compile(
-    r"\b(?:"
-    r"our company|we(?:'re| are) (?:a|an)|our product|our service|"
-    r"our (?:mrr|arr|revenue|valuation|headcount|team size)|"
-    r"we (?:use|switched to|moved to|migrated to)|our stack|"
-    r"we(?:'re| are) (?:based|located)|"
-    r"our (?:clients?|customers?)|(?:founded|started) in"
-    r")\b",
-    re.IGNORECASE,
-)
-
-_TEAM_SIGNALS = re.compile(
-    r"\b(?:"
-    r"i(?:'m| am) (?:the|a|an|responsible)|"
-    r"(?:he|she|they)(?:'s| is| are) (?:the|our|a)|"
-    r"(?:works?|working) on|reports? to|"
-    r"new (?:hire|team member|employee)|"
-    r"(?:joined|leaving|left) (?:the )?(?:team|company)|"
-    r"my (?:team lead|tech lead|engineering lead|product lead|design lead|"
-    r"manager|direct manager|skip|skip.level|project manager|product manager|"
-    r"program manager|account manager|pm|po|eng lead|head of (?:eng|product|design|sales|marketing))|"  # noqa: E501
-    r"(?:head|lead|manager|director|vp|chief) of (?:eng(?:ineering)?|product|design|sales|marketing|growth|ops)|"  # noqa: E501
-    r"[A-Z][a-z]+ (?:manages?|leads?|runs?) (?:the )?(?:team|eng(?:ineering)?|product|design|sales|marketing)|"  # noqa: E501
-    r"is (?:our|the) (?:cto|ceo|coo|vp|head of \w+|founder|co.?founder|director)"
-    r")\b",
-    re.IGNORECASE,
-)
-
-
-_PREFERENCE_SIGNALS = re.compile(
-    r"\b(?:"
-    r"i (?:prefer|like|want|need)|"
-    r"(?:please )?(?:always|never) (?:use|include|add|format)|"
-    r"my (?:preferred|favorite|default)|"
-    r"(?:use|format|write|send) (?:it |things )?in|"
-    r"(?:don't|do not|stop) (?:use|include|add|send)|"
-    r"(?:tone|style|voice|format) should be"
-    r")\b",
-    re.IGNORECASE,
-)
-
-_DECISION_SIGNALS = re.compile(
-    r"\b(?:"
-    r"(?:we|i) decided|(?:let's|we'll) go with|"
-    r"(?:final|approved|confirmed) (?:decision|choice|plan)|"
-    r"(?:we're|we are) going (?:to|with)|"
-    r"(?:the plan is|decision made|settled on|chose|picked)"
-    r")\b",
-    re.IGNORECASE,
-)
-
-_PROJECT_SIGNALS = re.compile(
-    r"\b(?:"
-    r"(?:the|our|this) project|deadline (?:is|was)|"
-    r"(?:launch|ship|release|deploy) (?:date|by|on|is)|"
-    r"(?:sprint|milestone|phase|roadmap)|"
-    r"(?:working on|building|developing|shipping)"
-    r")\b",
-    re.IGNORECASE,
-)
+# The signal patterns (remember, company, team, preference, decision,
+# project, hypothetical) live in pipeline/features.py, which matches them
+# together with the router's patterns in one pass per message.
 
 
 def _has_hypothetical_signals(message: str) -> bool:
@@ -150,17 +77,6 @@ def _has_hypothetical_signals(message: str) -> bool:
     return bool(_HYPO_PATTERN.search(text_without_emails))
 
 
-# Keep the compiled pattern for legacy code paths that use it directly,
-# but the public API should use _has_hypothetical_signals().
-_HYPOTHETICAL_SIGNALS = re.compile(
-    r"\b(?:"
-    r"(?:what if|imagine|hypothetically|suppose|let's say|pretend|"
-    r"for example|e\.g\.|test|testing|dummy|fake|sample|mock|"
-    r"i'll ask (?:about )?this later|ask (?:me|you) (?:about )?(?:this|it) later)"
-    r")\b",
-    re.IGNORECASE,
-)
-
 # ── Structured fact extractors ────────────────────────────────────────────
 # Patterns to extract concrete facts from messages for richer categorization
 _FACT_EXTRACTORS: list[tuple[re.Pattern[str], str, str]] = [
@@ -337,6 +253,17 @@ MEMORY_CATEGORIES: dict[str, str] = {
 }
 
 
+# Any of these marks a message as possibly worth remembering.
+_PERSIST_SIGNALS = (
+    Feature.REMEMBER
+    | Feature.PREFERENCE
+    | Feature.DECISION
+    | Feature.PROJECT
+    | Feature.TEAM
+    | Feature.COMPANY
+)
+
+
 def should_persist_memory(message: str) -> bool:
     """Quick check: does this message contain facts worth persisting?
 
@@ -349,29 +276,14 @@ def should_persist_memory(message: str) -> bool:
     # Questions are requests for information, not statements of fact.
     if text.endswith("?"):
         return False
-    # Common interrogative openings
-    if re.match(
-        r"^(?:what|where|when|who|how|why|which|can you|could you|do you|did you|is there|are there)\b",  # noqa: E501
-        text,
-        re.IGNORECASE,
-    ):
+    features = extract_features(text)
+    if Feature.QUESTION_OPENING in features:
         return False
 
-    if not _REMEMBER_SIGNALS.search(message):
-        # Also check category-specific signals not covered by _REMEMBER_SIGNALS
-        if not any(
-            sig.search(message)
-            for sig in (
-                _PREFERENCE_SIGNALS,
-                _DECISION_SIGNALS,
-                _PROJECT_SIGNALS,
-                _TEAM_SIGNALS,
-                _COMPANY_SIGNALS,
-            )
-        ):
-            return False
+    if not features.bits & _PERSIST_SIGNALS:
+        return False
 
-    if _HYPOTHETICAL_SIGNALS.search(message):
+    if Feature.HYPOTHETICAL in features:
         return False
 
     return True
@@ -382,9 +294,10 @@ def classify_memory_target(message: str) -> str:
 
     Returns: "company", "team", or "session".
     """
-    if _COMPANY_SIGNALS.search(message):
+    features = extract_features(message)
+    if Feature.COMPANY in features:
         return "company"
-    if _TEAM_SIGNALS.search(message):
+    if Feature.TEAM in features:
         return "team"
     return "session"
 
@@ -395,13 +308,14 @@ def classify_memory_category(message: str) -> str:
     Returns one of: user_preferences, project_context, decisions,
     facts, general.
     """
-    if _PREFERENCE_SIGNALS.search(message):
+    features = extract_features(message)
+    if Feature.PREFERENCE in features:
         return "user_preferences"
-    if _DECISION_SIGNALS.search(message):
+    if Feature.DECISION in features:
         return "decisions"
-    if _PROJECT_SIGNALS.search(message):
+    if Feature.PROJECT in features:
         return "project_context"
-    if _COMPANY_SIGNALS.search(message) or _TEAM_SIGNALS.search(message):
+    if Feature.COMPANY in features or Feature.TEAM in features:
         return "facts"
     return "general"
 
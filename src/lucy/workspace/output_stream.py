@@ -0,0 +1,275 @@
+"""Streaming stdout/stderr for local code execution.
+
+The local executors used to call ``proc.communicate()``. That gave no
+signal until the process exited, and it kept only the first
+``MAX_OUTPUT_CHARS`` of output, which drops the traceback at the end of a
+noisy run. Now output is consumed as it arrives:
+
+- ``stream_process()`` is an async iterator of ``OutputChunk``s from a
+  subprocess's pipes. It has an overall deadline.
+- ``OutputSink`` collects the chunks into a ``HeadTailBuffer`` per stream,
+  keeping the first and last half of the budget.
+- While it runs, a sink publishes the latest output line for its workspace.
+  ``latest_output()`` reads it, so the Slack progress update can say what
+  a long script is doing.
+- ``FailureWatch`` reads stderr line by line. When the same fatal error
+  (``code_validator.fatal_error_kind``) or ``command not found`` shows up
+  ``exec_early_stop_repeats`` times with no stdout in between, the run is
+  killed and reported as stopped early. Without this, a failing loop used
+  its whole timeout.
+
+  From outside the process, a traceback a script caught and logged looks
+  the same as one that ended it. A script that logs handled errors and
+  only prints its result at the end would be killed. Early stops are
+  therefore off unless ``exec_early_stop_repeats`` is set.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import codecs
+import re
+import time
+from collections import Counter, deque
+from collections.abc import AsyncIterator
+from contextlib import aclosing, suppress
+from typing import NamedTuple
+
+from lucy.config import settings
+from lucy.tools.code_validator import fatal_error_kind
+from lucy.workspace.executor import MAX_OUTPUT_CHARS, ExecutionResult
+
+_READ_CHUNK = 65536
+_MAX_PARTIAL_LINE = 4096
+_MAX_SHOWN_LINE = 200
+_COMMAND_NOT_FOUND_RE = re.compile(r":\s*(\S+): (?:command )?not found$")
+
+
+class OutputChunk(NamedTuple):
+    stream: str  # "stdout" | "stderr"
+    text: str
+
+
+class HeadTailBuffer:
+    """Bounded text buffer that keeps the head and tail of a stream."""
+
+    def __init__(self, limit: int) -> None:
+        self.head_limit = limit // 2
+        self.tail_limit = limit - self.head_limit
+        self.total = 0
+        self._head: list[str] = []
+        self._head_len = 0
+        self._tail: deque[str] = deque()
+        self._tail_len = 0
+
+    def append(self, text: str) -> None:
+        self.total += len(text)
+        room = self.head_limit - self._head_len
+        if room > 0:
+            self._head.append(text[:room])
+            self._head_len += min(room, len(text))
+            text = text[room:]
+        if not text:
+            return
+        self._tail.append(text)
+        self._tail_len += len(text)
+        while len(self._tail) > 1 and self._tail_len - len(self._tail[0]) >= self.tail_limit:
+            self._tail_len -= len(self._tail.popleft())
+
+    def getvalue(self) -> str:
+        head = "".join(self._head)
+        tail = "".join(self._tail)[-self.tail_limit:] if self.tail_limit else ""
+        omitted = self.total - len(head) - len(tail)
+        if omitted <= 0:
+            return head + tail
+        return f"{head}\n... [{omitted} chars omitted] ...\n{tail}"
+
+
+class FailureWatch:
+    """Spots a job that keeps failing the same way while it is still running."""
+
+    def __init__(self, repeats: int) -> None:
+        self.repeats = repeats
+        self._seen: Counter[str] = Counter()
+
+    def progress(self) -> None:
+        """The job printed output, so it is not stuck: start counting again."""
+        self._seen.clear()
+
+    def feed_line(self, line: str) -> str | None:
+        """Return a stop reason once an error kind reaches ``repeats``."""
+        if self.repeats <= 0:
+            return None
+        kind = fatal_error_kind(line)
+        if kind is None:
+            match = _COMMAND_NOT_FOUND_RE.search(line.rstrip())
+            kind = f"command not found ({match.group(1)})" if match else None
+        if kind is None:
+            return None
+        self._seen[kind] += 1
+        if self._seen[kind] >= self.repeats:
+            return f"{kind} repeated {self._seen[kind]} times"
+        return None
+
+
+class OutputSink:
+    """Collects one run's output, publishes progress, and decides early stops."""
+
+    def __init__(
+        self,
+        workspace_id: str | None,
+        label: str,
+        limit: int = MAX_OUTPUT_CHARS,
+        repeats: int | None = None,
+    ) -> None:
+        self.workspace_id = workspace_id
+        self.label = label
+        self.started_at = time.monotonic()
+        self.updated_at = self.started_at
+        self.last_line = ""
+        self.stopped: str | None = None
+        self._buffers = {"stdout": HeadTailBuffer(limit), "stderr": HeadTailBuffer(limit)}
+        self._partial = {"stdout": "", "stderr": ""}
+        self._watch = FailureWatch(
+            settings.exec_early_stop_repeats if repeats is None else repeats
+        )
+        if workspace_id:
+            _live.setdefault(workspace_id, []).append(self)
+
+    def feed(self, stream: str, text: str) -> str | None:
+        """Add a chunk; returns the stop reason if the run should be killed."""
+        self._buffers[stream].append(text)
+        lines = (self._partial[stream] + text).replace("\r", "\n").split("\n")
+        self._partial[stream] = lines.pop()[-_MAX_PARTIAL_LINE:]
+        for line in lines:
+            if line.strip():
+                self.last_line = line.strip()[:_MAX_SHOWN_LINE]
+                self.updated_at = time.monotonic()
+            if stream == "stdout":
+                if line.strip():
+                    self._watch.progress()
+            elif self.stopped is None:
+                self.stopped = self._watch.feed_line(line)
+        return self.stopped
+
+    @property
+    def output_len(self) -> int:
+        return self._buffers["stdout"].total
+
+    def text(self, stream: str) -> str:
+        return self._buffers[stream].getvalue()
+
+    def to_result(self, exit_code: int | None, method: str, note: str = "") -> ExecutionResult:
+        """Build the ExecutionResult; ``note`` (e.g. a timeout) marks failure."""
+        if self.stopped:
+            elapsed = round(time.monotonic() - self.started_at)
+            note = f"Stopped early after {elapsed}s: {self.stopped}."
+            exit_code = 1
+        error = self.text("stderr")
+        if note:
+            error = f"{note}\n{error}" if error else note
+        return ExecutionResult(
+            success=exit_code == 0 and not note,
+            output=self.text("stdout"),
+            error=error,
+            exit_code=exit_code or 0,
+            method=method,
+        )
+
+    def close(self) -> None:
+        sinks = _live.get(self.workspace_id or "")
+        if sinks and self in sinks:
+            sinks.remove(self)
+            if not sinks:
+                del _live[self.workspace_id]
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# SUBPROCESS STREAMING
+# ═══════════════════════════════════════════════════════════════════════════
+
+async def stream_process(
+    proc: asyncio.subprocess.Process, timeout: float,
+) -> AsyncIterator[OutputChunk]:
+    """Yield ``proc``'s output as it arrives, until both pipes close.
+
+    Raises TimeoutError once ``timeout`` seconds have passed; the caller
+    owns the process and must kill it.
+    """
+    queue: asyncio.Queue[OutputChunk | None] = asyncio.Queue(maxsize=64)
+    pumps = [
+        asyncio.create_task(_pump(name, reader, queue))
+        for name, reader in (("stdout", proc.stdout), ("stderr", proc.stderr))
+        if reader is not None
+    ]
+    open_pipes = len(pumps)
+    deadline = time.monotonic() + timeout
+    try:
+        while open_pipes:
+            chunk = await asyncio.wait_for(queue.get(), deadline - time.monotonic())
+            if chunk is None:
+                open_pipes -= 1
+            else:
+                yield chunk
+    finally:
+        for pump in pumps:
+            pump.cancel()
+        await asyncio.gather(*pumps, return_exceptions=True)
+
+
+async def _pump(
+    name: str, reader: asyncio.StreamReader, queue: asyncio.Queue[OutputChunk | None],
+) -> None:
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    try:
+        while chunk := await reader.read(_READ_CHUNK):
+            text = decoder.decode(chunk)
+            if text:
+                await queue.put(OutputChunk(name, text))
+        text = decoder.decode(b"", final=True)
+        if text:
+            await queue.put(OutputChunk(name, text))
+    except (OSError, ValueError):
+        pass
+    await queue.put(None)
+
+
+async def pump_process(
+    proc: asyncio.subprocess.Process, sink: OutputSink, timeout: float,
+) -> None:
+    """Feed ``proc``'s output into ``sink`` until it exits.
+
+    Kills the process if the sink asks for an early stop. Raises
+    TimeoutError when ``timeout`` runs out. On that, or on cancellation
+    (e.g. losing an execution race), the process is killed and reaped
+    before the exception propagates.
+    """
+    deadline = time.monotonic() + timeout
+    try:
+        async with aclosing(stream_process(proc, timeout)) as chunks:
+            async for chunk in chunks:
+                if sink.feed(chunk.stream, chunk.text):
+                    break
+        if sink.stopped and proc.returncode is None:
+            proc.kill()
+        await asyncio.wait_for(proc.wait(), max(0.0, deadline - time.monotonic()))
+    except BaseException:
+        if proc.returncode is None:
+            with suppress(ProcessLookupError):
+                proc.kill()
+            # Shielded so a second cancel can't leave the child unreaped.
+            await asyncio.shield(proc.wait())
+        raise
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# LIVE PROGRESS
+# ═══════════════════════════════════════════════════════════════════════════
+
+_live: dict[str, list[OutputSink]] = {}
+
+
+def latest_output(workspace_id: str) -> OutputSink | None:
+    """The workspace's running execution that printed most recently, if any."""
+    sinks = [s for s in _live.get(workspace_id, ()) if s.last_line]
+    return max(sinks, key=lambda s: s.updated_at, default=None)
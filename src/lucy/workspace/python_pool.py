@@ -0,0 +1,314 @@
+"""Warm worker pool for local Python execution.
+
+Running ``python3 -c`` per call pays interpreter startup plus the pandas /
+openpyxl / httpx imports on every execution, including auto-retries. The
+pool keeps a few long-lived worker processes (``_python_worker.py``) that
+import those modules once. Each job runs in a fresh fork of a worker, so
+jobs never see each other's globals, monkeypatches or working directory.
+
+Workers are spawned with the same sanitized environment as the cold path
+and enforce the same timeout and output caps. A worker is replaced after
+``python_pool_max_jobs`` jobs or ``python_pool_max_age_s`` seconds, so
+packages installed mid-session are eventually reflected in preloads, and
+after any protocol failure. Workers exit on their own when Lucy does
+(stdin EOF).
+
+``run()`` never waits for a worker: when none is idle (or warm yet), or
+the worker failed before the job started, it returns None and the caller
+uses the cold subprocess path. A worker that fails once the job has
+started yields a failed result instead, since rerunning the code could
+repeat its side effects. Given an ``OutputSink`` it streams the job's
+output into it, and kills the worker (which takes the job's process
+group with it) if the sink stops the run.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import structlog
+
+from lucy.workspace.executor import MAX_OUTPUT_CHARS, ExecutionResult, _sanitized_subprocess_env
+
+if TYPE_CHECKING:
+    from lucy.workspace.output_stream import OutputSink
+
+logger = structlog.get_logger()
+
+_WORKER_SCRIPT = Path(__file__).with_name("_python_worker.py")
+_SPAWN_TIMEOUT_S = 60.0
+_REPLY_GRACE_S = 5.0
+_STREAM_LIMIT = 8 * 1024 * 1024
+
+
+class _Worker:
+    def __init__(self, proc: asyncio.subprocess.Process) -> None:
+        self.proc = proc
+        self.jobs = 0
+        self.started_at = time.monotonic()
+        self.killed = False
+        self.failed = False
+
+    def kill(self) -> None:
+        self.killed = True
+        if self.proc.returncode is None:
+            # SIGTERM lets the worker kill its in-flight job's process group.
+            self.proc.terminate()
+
+
+class PythonWorkerPool:
+    """A fixed number of warm, fork-per-job Python workers."""
+
+    def __init__(
+        self,
+        size: int,
+        max_jobs: int = 200,
+        max_age_s: float = 900.0,
+        preload: list[str] | None = None,
+    ) -> None:
+        self.size = size
+        self.max_jobs = max_jobs
+        self.max_age_s = max_age_s
+        self.preload = list(preload or [])
+        self._idle: list[_Worker] = []
+        self._busy = 0
+        self._spawning = 0
+        self._closed = False
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._stats = {"pooled": 0, "missed": 0, "failed": 0, "recycled": 0}
+
+    # ── Lifecycle ───────────────────────────────────────────────────────
+
+    def warm(self) -> None:
+        """Start spawning workers until the pool is back at full size."""
+        if self._closed:
+            return
+        missing = self.size - len(self._idle) - self._busy - self._spawning
+        for _ in range(max(0, missing)):
+            self._spawning += 1
+            task = asyncio.create_task(self._spawn())
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def wait_ready(self, timeout: float = _SPAWN_TIMEOUT_S) -> bool:
+        """Warm the pool and wait until at least one worker is idle."""
+        self.warm()
+        deadline = time.monotonic() + timeout
+        while not self._idle and time.monotonic() < deadline:
+            if not self._spawning and not self._busy:
+                return False
+            await asyncio.sleep(0.02)
+        return bool(self._idle)
+
+    async def close(self) -> None:
+        self._closed = True
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.kill()
+        await asyncio.gather(*(w.proc.wait() for w in idle), return_exceptions=True)
+
+    async def _spawn(self) -> None:
+        proc: asyncio.subprocess.Process | None = None
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                "python3", str(_WORKER_SCRIPT), ",".join(self.preload),
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+                env=_sanitized_subprocess_env(),
+                limit=_STREAM_LIMIT,
+            )
+            line = await asyncio.wait_for(proc.stdout.readline(), _SPAWN_TIMEOUT_S)
+            hello = json.loads(line) if line else {}
+            if not hello.get("ready"):
+                raise RuntimeError("worker exited before becoming ready")
+        except asyncio.CancelledError:
+            if proc is not None and proc.returncode is None:
+                proc.kill()
+            raise
+        except Exception as e:
+            if proc is not None and proc.returncode is None:
+                proc.kill()
+            logger.warning("python_pool_spawn_failed", error=str(e))
+            return
+        finally:
+            self._spawning -= 1
+
+        if self._closed:
+            proc.kill()
+            return
+        self._idle.append(_Worker(proc))
+        logger.debug("python_pool_worker_ready", pid=proc.pid, preloaded=hello["preloaded"])
+
+    def _retire(self, worker: _Worker) -> None:
+        worker.kill()
+        self._stats["recycled"] += 1
+        task = asyncio.create_task(worker.proc.wait())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    # ── Execution ───────────────────────────────────────────────────────
+
+    async def run(
+        self,
+        code: str,
+        cwd: str,
+        timeout: float,
+        sink: OutputSink | None = None,
+    ) -> ExecutionResult | None:
+        """Run ``code`` in a fresh fork of a warm worker.
+
+        Returns None when no worker is idle or the worker failed before
+        the job started; the caller should then fall back to a cold
+        subprocess. A worker failure after that is a failed result.
+        """
+        self._idle = [w for w in self._idle if w.proc.returncode is None]
+        self.warm()
+        if not self._idle:
+            self._stats["missed"] += 1
+            return None
+
+        worker = self._idle.pop()
+        self._busy += 1
+        result: ExecutionResult | None = None
+        try:
+            result = await self._run_on(worker, code, cwd, timeout, sink)
+            return result
+        finally:
+            self._busy -= 1
+            fresh = (
+                not worker.killed
+                and worker.jobs < self.max_jobs
+                and time.monotonic() - worker.started_at < self.max_age_s
+            )
+            if result is not None and fresh and not worker.failed and not self._closed:
+                self._idle.append(worker)
+            else:
+                self._retire(worker)
+            if result is None or worker.failed:
+                self._stats["failed"] += 1
+            else:
+                self._stats["pooled"] += 1
+            self.warm()
+
+    async def _run_on(
+        self,
+        worker: _Worker,
+        code: str,
+        cwd: str,
+        timeout: float,
+        sink: OutputSink | None,
+    ) -> ExecutionResult | None:
+        job = {
+            "code": code,
+            "cwd": cwd,
+            "timeout": timeout,
+            # Bytes, generous enough that the char cap below decides.
+            "max_bytes": MAX_OUTPUT_CHARS * 4,
+            "stream": sink is not None,
+        }
+        deadline = time.monotonic() + timeout + _REPLY_GRACE_S
+        started = False
+        try:
+            worker.proc.stdin.write(json.dumps(job).encode() + b"\n")
+            await worker.proc.stdin.drain()
+            while True:
+                line = await asyncio.wait_for(
+                    worker.proc.stdout.readline(), deadline - time.monotonic(),
+                )
+                reply = json.loads(line) if line else {"error": "worker exited"}
+                if "started" in reply:
+                    started = True
+                    continue
+                if "chunk" not in reply:
+                    break
+                if sink.feed(reply["stream"], reply["chunk"]):
+                    worker.kill()
+                    return sink.to_result(None, "local_python")
+        except (OSError, ValueError, TimeoutError) as e:
+            reply = {"error": f"{type(e).__name__}: {e}"}
+        finally:
+            worker.jobs += 1
+
+        if "error" in reply:
+            logger.warning(
+                "python_pool_job_failed",
+                pid=worker.proc.pid,
+                error=reply["error"],
+                started=started,
+            )
+            if not started:
+                return None
+            worker.failed = True
+            note = (
+                f"Python worker failed partway through the run ({reply['error']}). "
+                "Not rerun, since the code may already have had side effects."
+            )
+            if sink is not None:
+                return sink.to_result(1, "local_python", note)
+            return ExecutionResult(
+                success=False, output="", error=note, exit_code=1, method="local_python",
+            )
+        if sink is not None:
+            note = f"Execution timed out after {timeout}s" if reply["timed_out"] else ""
+            return sink.to_result(124 if note else reply["exit_code"], "local_python", note)
+        if reply["timed_out"]:
+            return ExecutionResult(
+                success=False,
+                output="",
+                error=f"Execution timed out after {timeout}s",
+                exit_code=124,
+                method="local_python",
+            )
+        return ExecutionResult(
+            success=reply["exit_code"] == 0,
+            output=reply["stdout"][:MAX_OUTPUT_CHARS],
+            error=reply["stderr"][:MAX_OUTPUT_CHARS],
+            exit_code=reply["exit_code"] or 0,
+            method="local_python",
+        )
+
+    def get_stats(self) -> dict[str, int]:
+        return {
+            "size": self.size,
+            "idle": len(self._idle),
+            "busy": self._busy,
+            "spawning": self._spawning,
+            **self._stats,
+        }
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# SINGLETON
+# ═══════════════════════════════════════════════════════════════════════════
+
+_pool: PythonWorkerPool | None = None
+
+
+def get_python_pool() -> PythonWorkerPool | None:
+    """Get or create the singleton pool; None when pooling is disabled."""
+    global _pool
+    if _pool is None:
+        from lucy.config import settings
+
+        if not settings.python_pool_enabled or not hasattr(os, "fork"):
+            return None
+        if sys.platform == "darwin":
+            # Forking after ObjC/Accelerate init is unsafe on macOS.
+            return None
+        _pool = PythonWorkerPool(
+            size=max(1, settings.python_pool_size),
+            max_jobs=settings.python_pool_max_jobs,
+            max_age_s=settings.python_pool_max_age_s,
+            preload=[m.strip() for m in settings.python_pool_preload.split(",") if m.strip()],
+        )
+    return _pool
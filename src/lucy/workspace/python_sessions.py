@@ -0,0 +1,272 @@
+"""Stateful per-thread Python sessions for multi-step analysis.
+
+``lucy_execute_python`` normally runs every call in a fresh interpreter, so
+an analysis spread over several turns re-downloads and re-parses the same
+data on each call. With ``python_sessions_enabled`` the LLM can pass
+``session: true`` to run the code in a kernel keyed by (workspace_id,
+thread_ts) instead. The kernel is a long-lived ``_python_worker.py
+--session`` process, and variables, imports and loaded DataFrames survive
+between calls in that thread.
+
+Kernels always run locally, even when the gateway is configured. Bounds:
+
+- ``python_session_max`` live kernels in total. Opening one more evicts
+  the least recently used idle kernel. If every kernel is busy, the call
+  runs stateless.
+- ``python_session_idle_s``: an idle kernel is shut down by a reaper task.
+- ``python_session_memory_mb``: RLIMIT_AS inside the kernel. User code
+  gets a MemoryError and the session survives.
+- A timeout kills the kernel's process group, which loses the session
+  state. The caller is told so.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import signal
+import time
+from collections import OrderedDict
+
+import structlog
+
+from lucy.workspace.executor import MAX_OUTPUT_CHARS, ExecutionResult, _sanitized_subprocess_env
+from lucy.workspace.python_pool import _SPAWN_TIMEOUT_S, _STREAM_LIMIT, _WORKER_SCRIPT
+
+logger = structlog.get_logger()
+
+SessionKey = tuple[str, str]
+
+
+class PythonSession:
+    """One stateful kernel bound to a Slack thread."""
+
+    def __init__(self, key: SessionKey, proc: asyncio.subprocess.Process) -> None:
+        self.key = key
+        self.proc = proc
+        self.lock = asyncio.Lock()
+        self.names: frozenset[str] = frozenset()
+        self.runs = 0
+        self.last_used = time.monotonic()
+
+    @property
+    def alive(self) -> bool:
+        return self.proc.returncode is None
+
+    def kill(self) -> None:
+        if self.alive:
+            try:
+                os.killpg(self.proc.pid, signal.SIGKILL)
+            except OSError:
+                self.proc.kill()
+
+
+class PythonSessionManager:
+    """Owns every live session kernel and enforces the session limits."""
+
+    def __init__(
+        self,
+        max_sessions: int = 8,
+        idle_s: float = 900.0,
+        memory_mb: int = 2048,
+        preload: list[str] | None = None,
+    ) -> None:
+        self.max_sessions = max_sessions
+        self.idle_s = idle_s
+        self.memory_mb = memory_mb
+        self.preload = list(preload or [])
+        self._sessions: OrderedDict[SessionKey, PythonSession] = OrderedDict()
+        self._open_lock = asyncio.Lock()
+        self._reaper: asyncio.Task[None] | None = None
+        self._stats = {"created": 0, "evicted_idle": 0, "evicted_lru": 0, "lost": 0, "full": 0}
+
+    def known_names(self, workspace_id: str, thread_ts: str) -> frozenset[str]:
+        """Names defined in the thread's session so far (empty if none)."""
+        session = self._sessions.get((workspace_id, thread_ts))
+        return session.names if session is not None and session.alive else frozenset()
+
+    async def run(
+        self,
+        workspace_id: str,
+        thread_ts: str,
+        code: str,
+        cwd: str,
+        timeout: float,
+    ) -> ExecutionResult | None:
+        """Run ``code`` in the thread's session kernel, creating it if needed.
+
+        Returns None when no kernel can be had (cap reached with every
+        kernel busy, or spawn failure); the caller should run stateless.
+        """
+        key = (workspace_id, thread_ts)
+        self._evict_idle()
+        async with self._open_lock:
+            session = self._sessions.get(key)
+            if session is None or not session.alive:
+                if session is not None:
+                    self._drop(session)
+                session = await self._open(key)
+                if session is None:
+                    return None
+            self._sessions.move_to_end(key)
+
+        async with session.lock:
+            result = await self._run_on(session, code, cwd, timeout)
+            session.last_used = time.monotonic()
+        if result is None:
+            self._stats["lost"] += 1
+            self._drop(session)
+        return result
+
+    async def _open(self, key: SessionKey) -> PythonSession | None:
+        if len(self._sessions) >= self.max_sessions:
+            victim = next((s for s in self._sessions.values() if not s.lock.locked()), None)
+            if victim is None:
+                self._stats["full"] += 1
+                return None
+            self._stats["evicted_lru"] += 1
+            self._drop(victim)
+
+        proc: asyncio.subprocess.Process | None = None
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                "python3", str(_WORKER_SCRIPT), ",".join(self.preload),
+                "--session", str(self.memory_mb),
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+                env=_sanitized_subprocess_env(),
+                limit=_STREAM_LIMIT,
+                start_new_session=True,
+            )
+            line = await asyncio.wait_for(proc.stdout.readline(), _SPAWN_TIMEOUT_S)
+            if not line or not json.loads(line).get("ready"):
+                raise RuntimeError("kernel exited before becoming ready")
+        except Exception as e:
+            if proc is not None and proc.returncode is None:
+                proc.kill()
+            logger.warning("python_session_spawn_failed", error=str(e))
+            return None
+
+        session = PythonSession(key, proc)
+        self._sessions[key] = session
+        self._stats["created"] += 1
+        self._ensure_reaper()
+        logger.info(
+            "python_session_started",
+            workspace_id=key[0],
+            thread_ts=key[1],
+            pid=proc.pid,
+            live=len(self._sessions),
+        )
+        return session
+
+    async def _run_on(
+        self, session: PythonSession, code: str, cwd: str, timeout: float,
+    ) -> ExecutionResult | None:
+        job = {"code": code, "cwd": cwd, "max_bytes": MAX_OUTPUT_CHARS * 4}
+        try:
+            session.proc.stdin.write(json.dumps(job).encode() + b"\n")
+            await session.proc.stdin.drain()
+            line = await asyncio.wait_for(session.proc.stdout.readline(), timeout)
+        except asyncio.CancelledError:
+            # The kernel is still busy with this job; its reply would be
+            # read as the answer to the next one.
+            self._drop(session)
+            raise
+        except TimeoutError:
+            self._drop(session)
+            return ExecutionResult(
+                success=False,
+                output="",
+                error=(
+                    f"Execution timed out after {timeout}s. The session was reset: "
+                    f"variables from earlier calls in this thread are gone."
+                ),
+                exit_code=124,
+                method="local_python_session",
+            )
+        except (OSError, ValueError) as e:
+            logger.warning("python_session_job_failed", pid=session.proc.pid, error=str(e))
+            return None
+
+        reply = json.loads(line) if line else {"error": "kernel exited"}
+        if "error" in reply:
+            logger.warning("python_session_job_failed", pid=session.proc.pid, error=reply["error"])
+            return None
+        session.runs += 1
+        session.names = frozenset(reply["names"])
+        return ExecutionResult(
+            success=reply["exit_code"] == 0,
+            output=reply["stdout"][:MAX_OUTPUT_CHARS],
+            error=reply["stderr"][:MAX_OUTPUT_CHARS],
+            exit_code=reply["exit_code"] or 0,
+            method="local_python_session",
+        )
+
+    # ── Eviction ────────────────────────────────────────────────────────
+
+    def _drop(self, session: PythonSession) -> None:
+        if self._sessions.get(session.key) is session:
+            del self._sessions[session.key]
+        session.kill()
+
+    def _evict_idle(self) -> None:
+        cutoff = time.monotonic() - self.idle_s
+        for session in list(self._sessions.values()):
+            if session.last_used < cutoff and not session.lock.locked():
+                self._stats["evicted_idle"] += 1
+                logger.info(
+                    "python_session_evicted",
+                    workspace_id=session.key[0],
+                    thread_ts=session.key[1],
+                    runs=session.runs,
+                )
+                self._drop(session)
+
+    def _ensure_reaper(self) -> None:
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.create_task(self._reap_loop())
+
+    async def _reap_loop(self) -> None:
+        while self._sessions:
+            await asyncio.sleep(max(1.0, min(60.0, self.idle_s / 4)))
+            self._evict_idle()
+
+    async def close(self) -> None:
+        if self._reaper is not None:
+            self._reaper.cancel()
+            await asyncio.gather(self._reaper, return_exceptions=True)
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        for session in sessions:
+            session.kill()
+        await asyncio.gather(*(s.proc.wait() for s in sessions), return_exceptions=True)
+
+    def get_stats(self) -> dict[str, int]:
+        return {"live": len(self._sessions), **self._stats}
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# SINGLETON
+# ═══════════════════════════════════════════════════════════════════════════
+
+_manager: PythonSessionManager | None = None
+
+
+def get_python_sessions() -> PythonSessionManager | None:
+    """Get or create the singleton session manager; None when sessions are off."""
+    global _manager
+    if _manager is None:
+        from lucy.config import settings
+
+        if not settings.python_sessions_enabled:
+            return None
+        _manager = PythonSessionManager(
+            max_sessions=max(1, settings.python_session_max),
+            idle_s=settings.python_session_idle_s,
+            memory_mb=settings.python_session_memory_mb,
+            preload=[m.strip() for m in settings.python_pool_preload.split(",") if m.strip()],
+        )
+    return _manager
@@ -10,7 +10,6 @@ Skills are plain markdown files with YAML frontmatter:
 
 from __future__ import annotations
 
-import re
 from dataclasses import dataclass
 
 import structlog
@@ -22,75 +21,6 @@ logger = structlog.get_logger()
 
 FRONTMATTER_DELIMITER = "---"
 
-# ═══════════════════════════════════════════════════════════════════════════
-# INTENT → SKILL MAPPING
-# ═══════════════════════════════════════════════════════════════════════════
-
-_SKILL_TRIGGERS: dict[str, list[str]] = {
-    "pdf-creation": [
-        r"\bpdf\b", r"\breport\b", r"\bdocument\b", r"\binvoice\b",
-        r"\bgenerate.*(?:doc|file)\b",
-    ],
-    "excel-editing": [
-        r"\bexcel\b", r"\bxlsx?\b", r"\bspreadsheet\b",
-        r"\bworkbook\b", r"\bcsv.*format\b",
-    ],
-    "docx-editing": [
-        r"\bdocx?\b", r"\bword\s*(?:doc|file)?\b", r"\bproposal\b",
-        r"\bletter\b", r"\bmemo\b",
-    ],
-    "pptx-editing": [
-        r"\bpptx?\b", r"\bpowerpoint\b", r"\bslide\b", r"\bpresentation\b",
-        r"\bdeck\b", r"\bpitch\b",
-    ],
-    "codebase-engineering": [
-        r"\bgit(?:hub)?\b", r"\bpull\s*request\b", r"\bPR\b", r"\bcommit\b",
-        r"\bbranch\b", r"\brepository\b", r"\brepo\b", r"\bcode\s*review\b",
-        r"\bmerge\b", r"\bdeploy\b",
-    ],
-    "scheduled-crons": [
-        r"\bschedule\b", r"\bcron\b", r"\brecurring\b", r"\bautomate\b",
-        r"\bevery\s*(?:day|week|hour|morning)\b",
-    ],
-    "integrations": [
-        r"\bintegrat(?:e|ion)s?\b", r"\bconnect(?:ed|ions?)?\b",
-        r"\bauthoriz\b", r"\bOAuth\b",
-        r"\btools?\b", r"\bservices?\b", r"\bapps?\b",
-        r"\bwhat.+(?:have|connected|available)\b",
-    ],
-    "slack-admin": [
-        r"\bchannel\b", r"\binvite\b", r"\bworkspace\b",
-        r"\bslack\s*(?:user|member)\b",
-    ],
-    "company": [
-        r"\b(?:our|the)\s+(?:company|team|product|business)\b",
-        r"\bwho\s+(?:are\s+we|is)\b",
-        r"\bwhat\s+do\s+(?:we|you)\s+(?:do|know)\b",
-    ],
-    "spaces": [
-        r"\bspace\b", r"\blanding\s*page\b", r"\bmini[- ]site\b",
-        r"\bpublic\s+page\b",
-    ],
-    "skill-creation": [
-        r"\bcreate\s+(?:a\s+)?(?:new\s+)?skill\b", r"\bnew\s+skill\b",
-        r"\bsave\s+(?:this|what\s+(?:you|we)\s+learned)\b",
-        r"\bremember\s+how\s+to\b",
-    ],
-    "thread-orchestration": [
-        r"\bthread\b", r"\borchestrat\b", r"\bparallel\s+task\b",
-        r"\bmultiple\s+(?:tasks?|agents?)\b",
-    ],
-    "async-workflows": [
-        r"\basync\b", r"\bbackground\s+task\b", r"\blong[- ]running\b",
-        r"\bwhen\s+(?:it'?s?\s+done|finished|complete)\b",
-    ],
-}
-
-_COMPILED_TRIGGERS: dict[str, list[re.Pattern[str]]] = {
-    skill: [re.compile(p, re.IGNORECASE) for p in patterns]
-    for skill, patterns in _SKILL_TRIGGERS.items()
-}
-
 _MAX_INJECTED_SKILLS = 5
 _MAX_SKILL_CONTENT_CHARS = 24_000
 _MIN_REMAINING_FOR_TRUNCATION = 500
@@ -219,13 +149,12 @@ def detect_relevant_skills(message: str) -> list[str]:
     """Detect which skills are relevant based on message content.
 
     Returns up to _MAX_INJECTED_SKILLS skill names sorted by match count.
+    The trigger patterns live in pipeline/features.py.
     """
-    scores: dict[str, int] = {}
+    # Deferred: lucy.pipeline imports this module via prompt.py.
+    from lucy.pipeline.features import extract_features
 
-    for skill_name, patterns in _COMPILED_TRIGGERS.items():
-        match_count = sum(1 for p in patterns if p.search(message))
-        if match_count > 0:
-            scores[skill_name] = match_count
+    scores = extract_features(message).skill_scores
 
     ranked = sorted(scores.keys(), key=lambda s: scores[s], reverse=True)
     selected = ranked[:_MAX_INJECTED_SKILLS]
@@ -48,26 +48,14 @@ def _is_question(text: str) -> bool:
 
 
 async def get_last_heartbeat_time(ws: WorkspaceFS) -> datetime | None:
-    """Parse execution.log to find the timestamp of the last successful heartbeat.
+    """Timestamp of the last successful heartbeat cron run.
 
-    Returns None if no successful run has been logged yet.
+    Returns None if no successful run has been recorded yet.
     """
-    log_content = await ws.read_file("crons/heartbeat/execution.log")
-    if not log_content:
-        return None
-
-    # Log format: ## 2026-02-28T18:30:00+00:00 (elapsed: 12340ms, status: delivered)
-    # or:         ## 2026-02-28T18:30:00+00:00 (elapsed: 1240ms, status: skipped)
-    # Walk backwards to find the most recent non-FAILED run
-    for line in reversed(log_content.splitlines()):
-        m = re.match(r"^## (\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}[+\-\d:]+)", line)
-        if m and "FAILED" not in line:
-            try:
-                return datetime.fromisoformat(m.group(1))
-            except ValueError:
-                continue
+    from lucy.crons.history import get_history_store
 
-    return None
+    last = get_history_store().last_run(ws, "heartbeat", ok_only=True)
+    return last.at if last else None
 
 
 async def get_channel_summary(
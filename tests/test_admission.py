@@ -0,0 +1,163 @@
+"""Agent admission control: priority classes, reserved slots, fairness, shedding.
+
+Run: pytest tests/test_admission.py -v
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from lucy.infra.admission import (
+    AdmissionController,
+    AdmissionRejectedError,
+    ClassPolicy,
+    Priority,
+    priority_for,
+)
+
+
+async def _settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class _Recorder:
+    """Starts waiters and records the order in which they are admitted."""
+
+    def __init__(self, ctrl: AdmissionController) -> None:
+        self.ctrl = ctrl
+        self.order: list[str] = []
+        self.tasks: list[asyncio.Task[None]] = []
+
+    async def start(self, label: str, priority: Priority, workspace_id: str = "ws") -> None:
+        async def run() -> None:
+            await self.ctrl.acquire(priority, workspace_id)
+            self.order.append(label)
+
+        self.tasks.append(asyncio.create_task(run()))
+        await _settle()
+
+
+@pytest.fixture
+async def recorders():
+    made: list[_Recorder] = []
+
+    def make(ctrl: AdmissionController) -> _Recorder:
+        made.append(_Recorder(ctrl))
+        return made[-1]
+
+    yield make
+    tasks = [t for rec in made for t in rec.tasks]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class TestPriorityFor:
+    def test_intents(self) -> None:
+        assert priority_for("chat") == Priority.FAST
+        assert priority_for("lookup") == Priority.FAST
+        assert priority_for("tool_use") == Priority.INTERACTIVE
+        assert priority_for("data") == Priority.HEAVY
+
+    def test_trigger_wins_over_intent(self) -> None:
+        assert priority_for("chat", trigger="cron") == Priority.CRON
+        assert priority_for("chat", trigger="background") == Priority.BACKGROUND
+        assert priority_for("", trigger="resume") == Priority.RESUME
+
+
+class TestAdmission:
+    async def test_immediate_when_free(self) -> None:
+        ctrl = AdmissionController(2)
+        async with ctrl.slot(Priority.HEAVY, "ws"):
+            assert ctrl.in_use == 1
+        assert ctrl.in_use == 0
+
+    async def test_reserved_slots_only_for_interactive(self, recorders) -> None:
+        ctrl = AdmissionController(3, reserved=1)
+        await ctrl.acquire(Priority.HEAVY, "a")
+        await ctrl.acquire(Priority.HEAVY, "b")
+        rec = recorders(ctrl)
+        await rec.start("heavy", Priority.HEAVY)
+        assert rec.order == []
+        await rec.start("chat", Priority.FAST)
+        assert rec.order == ["chat"]
+
+    async def test_fast_jumps_ahead_of_queued_heavy(self, recorders) -> None:
+        ctrl = AdmissionController(1)
+        await ctrl.acquire(Priority.HEAVY, "ws")
+        rec = recorders(ctrl)
+        await rec.start("heavy", Priority.HEAVY)
+        await rec.start("cron", Priority.CRON)
+        await rec.start("chat", Priority.FAST)
+        for _ in range(3):
+            ctrl.release("ws")
+            await _settle()
+        assert rec.order == ["chat", "heavy", "cron"]
+
+    async def test_weights_share_slots_without_starvation(self, recorders) -> None:
+        policies = {
+            Priority.FAST: ClassPolicy(weight=3, slo_s=1),
+            Priority.CRON: ClassPolicy(weight=1, slo_s=1),
+        }
+        ctrl = AdmissionController(1, policies=policies)
+        await ctrl.acquire(Priority.FAST, "ws")
+        rec = recorders(ctrl)
+        for i in range(6):
+            await rec.start(f"f{i}", Priority.FAST)
+            await rec.start(f"c{i}", Priority.CRON)
+        for _ in range(8):
+            ctrl.release("ws")
+            await _settle()
+        assert sum(label.startswith("c") for label in rec.order) == 2
+        assert rec.order.index("c0") < 4
+
+    async def test_workspace_fair_share_within_class(self, recorders) -> None:
+        ctrl = AdmissionController(2)
+        await ctrl.acquire(Priority.INTERACTIVE, "busy")
+        await ctrl.acquire(Priority.INTERACTIVE, "busy")
+        rec = recorders(ctrl)
+        await rec.start("busy-2", Priority.INTERACTIVE, "busy")
+        await rec.start("quiet", Priority.INTERACTIVE, "quiet")
+        ctrl.release("busy")
+        await _settle()
+        assert rec.order == ["quiet"]
+
+    async def test_shed_after_limit(self) -> None:
+        policies = {
+            Priority.FAST: ClassPolicy(weight=1, slo_s=1),
+            Priority.CRON: ClassPolicy(weight=1, slo_s=0.01, shed_after_s=0.02),
+        }
+        ctrl = AdmissionController(1, policies=policies)
+        await ctrl.acquire(Priority.FAST, "ws")
+        with pytest.raises(AdmissionRejectedError):
+            await ctrl.acquire(Priority.CRON, "ws")
+        assert ctrl.queued == 0
+        stats = ctrl.get_stats()["classes"]["cron"]
+        assert stats["shed"] == 1
+
+    async def test_cancelled_waiter_leaves_queue(self) -> None:
+        ctrl = AdmissionController(1)
+        await ctrl.acquire(Priority.FAST, "ws")
+        waiter = asyncio.create_task(ctrl.acquire(Priority.HEAVY, "ws"))
+        await _settle()
+        waiter.cancel()
+        await _settle()
+        assert ctrl.queued == 0
+        ctrl.release("ws")
+        assert ctrl.in_use == 0
+
+    async def test_stats_report_queue_depth_and_slo(self, recorders) -> None:
+        policies = {Priority.HEAVY: ClassPolicy(weight=1, slo_s=0.0)}
+        ctrl = AdmissionController(1, policies=policies)
+        await ctrl.acquire(Priority.HEAVY, "ws")
+        rec = recorders(ctrl)
+        await rec.start("h", Priority.HEAVY)
+        assert ctrl.get_stats()["classes"]["heavy"]["queued"] == 1
+        ctrl.release("ws")
+        await _settle()
+        stats = ctrl.get_stats()
+        assert stats["in_use"] == 1
+        assert stats["classes"]["heavy"]["slo_breaches"] == 1
@@ -0,0 +1,143 @@
+"""LLM spend budgets: counters, levels, reconciliation, tier downgrades.
+
+Run: pytest tests/test_budgets.py -v
+"""
+
+from __future__ import annotations
+
+from lucy.core.openclaw import OpenClawResponse
+from lucy.infra.budgets import BudgetEngine, BudgetLevel, _Counter
+from lucy.pipeline.router import MODEL_TIERS, ModelChoice, budget_tier
+
+_WS = "ws-1"
+
+
+def _engine(**kw) -> BudgetEngine:
+    kw.setdefault("reconcile_interval_s", 0)
+    return BudgetEngine(**kw)
+
+
+class TestBudgetEngine:
+    def test_unlimited_by_default(self) -> None:
+        engine = _engine()
+        engine.charge(_WS, "U1", usd=1_000.0, tokens=10**9)
+        assert engine.level(_WS, "U1") == BudgetLevel.OK
+
+    def test_levels_follow_workspace_usd(self) -> None:
+        engine = _engine(workspace_usd=10.0, soft_ratio=0.8)
+        engine.charge(_WS, None, usd=5.0, tokens=0)
+        assert engine.level(_WS) == BudgetLevel.OK
+        engine.charge(_WS, None, usd=3.5, tokens=0)
+        assert engine.level(_WS) == BudgetLevel.SOFT
+        engine.charge(_WS, None, usd=2.0, tokens=0)
+        assert engine.level(_WS) == BudgetLevel.EXHAUSTED
+        assert engine.level("other-ws") == BudgetLevel.OK
+
+    def test_token_limit_and_user_limit(self) -> None:
+        engine = _engine(workspace_tokens=1_000, user_usd=1.0)
+        engine.charge(_WS, "U1", usd=0.9, tokens=100)
+        assert engine.level(_WS) == BudgetLevel.OK
+        assert engine.level(_WS, "U1") == BudgetLevel.SOFT
+        assert engine.level(_WS, "U2") == BudgetLevel.OK
+        engine.charge(_WS, "U2", usd=0.0, tokens=900)
+        assert engine.level(_WS, "U2") == BudgetLevel.EXHAUSTED
+
+    def test_counters_reset_on_new_day(self) -> None:
+        engine = _engine(workspace_usd=1.0)
+        engine._workspaces[_WS] = _Counter(day=1, usd=50.0)
+        assert engine.level(_WS) == BudgetLevel.OK
+        assert engine.spend(_WS) == (0.0, 0)
+
+    def test_absorb_keeps_the_larger_figure(self) -> None:
+        engine = _engine(workspace_usd=10.0)
+        engine.charge(_WS, None, usd=2.0, tokens=10)
+        engine.absorb({_WS: (9.0, 5), "ws-2": (1.0, 1)})
+        assert engine.spend(_WS) == (9.0, 10)
+        assert engine.spend("ws-2") == (1.0, 1)
+
+    def test_overrides_replace_defaults(self) -> None:
+        engine = _engine(workspace_usd=100.0)
+        engine.set_overrides({_WS: (1.0, 0)})
+        engine.charge(_WS, None, usd=1.0, tokens=0)
+        assert engine.level(_WS) == BudgetLevel.EXHAUSTED
+
+    async def test_override_without_defaults_is_enforced(self, monkeypatch) -> None:
+        from contextlib import asynccontextmanager
+
+        from lucy.db import session as db
+
+        results: list[list[tuple]] = [[], [(_WS, {"llm_daily_budget_usd": 1.0})], [(_WS, 2.0, 10)]]
+        queries: list[str] = []
+
+        class _Session:
+            async def execute(self, stmt):
+                queries.append(str(stmt))
+                return results.pop(0)
+
+        @asynccontextmanager
+        async def session():
+            yield _Session()
+
+        monkeypatch.setattr(db, "db_session", session)
+        looping = BudgetEngine(reconcile_interval_s=60)
+        looping.level(_WS)
+        assert looping._task is not None
+        await looping.stop()
+
+        engine = _engine()
+        await engine.reconcile()
+        assert len(queries) == 1  # no defaults and no overrides: rollups skipped
+        await engine.reconcile()
+        assert engine.level(_WS) == BudgetLevel.EXHAUSTED
+        assert engine.level("other-ws") == BudgetLevel.OK
+        assert "cost_daily_rollups" in queries[-1]
+
+
+class TestBudgetRouting:
+    def test_tier_downgrades(self) -> None:
+        assert budget_tier("frontier", BudgetLevel.OK) == "frontier"
+        assert budget_tier("frontier", BudgetLevel.SOFT) == "default"
+        assert budget_tier("research", BudgetLevel.SOFT) == "default"
+        assert budget_tier("fast", BudgetLevel.SOFT) == "fast"
+        assert budget_tier("default", BudgetLevel.EXHAUSTED) == "fast"
+
+    def test_apply_budget_keeps_intent_and_modules(self, monkeypatch) -> None:
+        from lucy.pipeline import router
+
+        engine = _engine(workspace_usd=1.0)
+        engine.charge(_WS, None, usd=0.9, tokens=0)
+        monkeypatch.setattr(router, "get_budget_engine", lambda: engine)
+        choice = ModelChoice(
+            intent="reasoning", model=MODEL_TIERS["research"], tier="research",
+            prompt_modules=["research"],
+        )
+        downgraded = router.apply_budget(choice, _WS)
+        assert downgraded.tier == "default"
+        assert downgraded.model == MODEL_TIERS["default"]
+        assert downgraded.intent == "reasoning"
+        assert downgraded.prompt_modules == ["research"]
+        assert router.budget_model(MODEL_TIERS["frontier"], _WS) == MODEL_TIERS["default"]
+        assert router.budget_model("acme/unlisted", "ws-free") == "acme/unlisted"
+
+    async def test_subagents_are_downgraded(self, monkeypatch) -> None:
+        from lucy.core import sub_agents
+        from lucy.pipeline import router
+
+        engine = _engine(user_usd=1.0)
+        engine.charge(_WS, "U1", usd=1.0, tokens=0)
+        monkeypatch.setattr(router, "get_budget_engine", lambda: engine)
+        models: list[str] = []
+
+        class _Client:
+            async def chat_completion(self, messages, config):
+                models.append(config.model)
+                return OpenClawResponse(content="done")
+
+        async def client() -> _Client:
+            return _Client()
+
+        monkeypatch.setattr(sub_agents, "get_openclaw_client", client)
+        spec = sub_agents.REGISTRY["research"]
+        await sub_agents.run_subagent("look", spec, _WS, {}, user_id="U1")
+        await sub_agents.run_subagent("look", spec, _WS, {}, user_id="U2")
+        assert models == [MODEL_TIERS["fast"], spec.model]
@@ -449,3 +449,85 @@ except Exception as e:
             "print(f\"Result: {data['key']}\")"
         )
         assert result.valid
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# CACHES
+# ═══════════════════════════════════════════════════════════════════════════
+
+class _Workspace:
+    """The two WorkspaceFS reads validate_python_file relies on."""
+
+    def __init__(self, root):
+        self.root = root
+        self.reads = []
+
+    async def file_version(self, relative_path):
+        try:
+            st = (self.root / relative_path).stat()
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    async def read_file(self, relative_path):
+        self.reads.append(relative_path)
+        return (self.root / relative_path).read_text()
+
+
+class TestValidationCache:
+    """Memoized validation, module probing and unchanged-script skipping."""
+
+    def test_repeat_validation_skips_analysis(self, monkeypatch):
+        code = "total = 0\nfor n in range(10):\n    total += n\nprint(total)\n# cache-1"
+        first = validate_python(code)
+        monkeypatch.setattr(_mod, "_ScopeAnalyzer", None)  # would fail if re-run
+        second = validate_python(code)
+        assert second.valid == first.valid and second is not first
+
+    def test_cached_result_is_a_copy(self):
+        code = "print(undefined_name_cache_2)"
+        validate_python(code).issues.clear()
+        assert validate_python(code).issues
+
+    def test_options_are_part_of_the_key(self):
+        code = "print(df_cache_3)"
+        assert not validate_python(code).valid
+        assert validate_python(code, session_names=frozenset({"df_cache_3"})).valid
+
+    def test_import_issues_are_not_cached(self):
+        code = "import not_a_real_module_cache_4"
+        assert not validate_python(code).valid
+        assert not _mod._validation_cache.get(_mod._validation_key(code, True, None))
+
+    def test_module_table_answers_without_probing(self, monkeypatch):
+        _mod.warm_module_table()
+        calls = []
+        monkeypatch.setattr(_mod.importlib.util, "find_spec", lambda n: calls.append(n))
+        assert _mod._is_module_available("pytest")
+        assert not _mod._is_module_available("not_a_real_module_cache_5")
+        assert calls == ["not_a_real_module_cache_5"]
+
+    def test_module_installed_mid_session_is_seen_at_once(self, monkeypatch):
+        installed = set()
+        monkeypatch.setattr(
+            _mod.importlib.util, "find_spec", lambda n: object() if n in installed else None,
+        )
+        assert not _mod._is_module_available("late_install_cache_7")
+        installed.add("late_install_cache_7")
+        assert _mod._is_module_available("late_install_cache_7")
+        installed.clear()
+        assert _mod._is_module_available("late_install_cache_7")
+
+    async def test_unchanged_script_is_not_reread(self, tmp_path):
+        ws = _Workspace(tmp_path)
+        (tmp_path / "collect.py").write_text("print('ok')\n")
+        assert (await _mod.validate_python_file(ws, "collect.py")).valid
+        assert (await _mod.validate_python_file(ws, "collect.py")).valid
+        assert ws.reads == ["collect.py"]
+
+        (tmp_path / "collect.py").write_text("print(oops_cache_6)\n")
+        assert not (await _mod.validate_python_file(ws, "collect.py")).valid
+        assert ws.reads == ["collect.py", "collect.py"]
+
+    async def test_missing_script_returns_none(self, tmp_path):
+        assert await _mod.validate_python_file(_Workspace(tmp_path), "missing.py") is None
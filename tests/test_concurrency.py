@@ -0,0 +1,90 @@
+"""Event dedup set and per-thread lock table used by the Slack handlers.
+
+Run: pytest tests/test_concurrency.py -v
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from lucy.infra.concurrency import ShardedLockTable, TTLSet
+
+
+class TestTTLSet:
+    def test_add_reports_duplicates(self) -> None:
+        seen = TTLSet(30)
+        assert seen.add("a", now=0)
+        assert not seen.add("a", now=10)
+        assert "a" in seen.entries
+
+    def test_expired_keys_are_purged_in_order(self) -> None:
+        seen = TTLSet(30)
+        for i in range(5):
+            seen.add(f"k{i}", now=i)
+        assert seen.purge(now=32) == 3
+        assert list(seen.entries) == ["k3", "k4"]
+
+    def test_key_can_be_seen_again_after_ttl(self) -> None:
+        seen = TTLSet(30)
+        seen.add("a", now=0)
+        assert seen.add("a", now=31)
+
+    def test_size_stays_bounded_under_steady_traffic(self) -> None:
+        seen = TTLSet(30)
+        for i in range(10_000):
+            seen.add(str(i), now=i * 0.1)
+        assert len(seen) <= 301
+
+
+class TestShardedLockTable:
+    def test_same_key_same_lock(self) -> None:
+        table = ShardedLockTable(shards=4, idle_ttl_s=300)
+        assert table.get("t1", now=0) is table.get("t1", now=1)
+        assert table.get("t1", now=1) is not table.get("t2", now=1)
+
+    def test_idle_locks_expire(self) -> None:
+        table = ShardedLockTable(shards=1, idle_ttl_s=60, wheel_slots=6)
+        first = table.get("t1", now=0)
+        table.get("other", now=100)
+        assert len(table) == 1
+        assert table.get("t1", now=100) is not first
+
+    def test_recently_used_locks_survive(self) -> None:
+        table = ShardedLockTable(shards=1, idle_ttl_s=60, wheel_slots=6)
+        first = table.get("t1", now=0)
+        table.get("t1", now=50)
+        table.get("other", now=80)
+        assert table.get("t1", now=80) is first
+
+    async def test_held_locks_never_expire(self) -> None:
+        table = ShardedLockTable(shards=1, idle_ttl_s=60, wheel_slots=6)
+        lock = table.get("t1", now=0)
+        await lock.acquire()
+        table.get("other", now=500)
+        assert table.get("t1", now=500) is lock
+        lock.release()
+        table.get("other", now=1000)
+        assert table.get("t1", now=1000) is not lock
+
+    def test_table_size_tracks_active_threads(self) -> None:
+        table = ShardedLockTable(shards=8, idle_ttl_s=60)
+        for i in range(5_000):
+            table.get(f"thread-{i}", now=float(i))
+        # Live keys are the last ~60s of traffic; each shard only expires
+        # when touched, so allow a few ticks of slack per shard.
+        assert len(table) < 100
+
+
+class TestHandlerDedup:
+    @pytest.fixture(autouse=True)
+    def _fresh(self, monkeypatch) -> None:
+        from lucy.slack import handlers
+
+        monkeypatch.setattr(handlers, "_event_dedup", TTLSet(30))
+
+    async def test_first_claim_wins(self) -> None:
+        from lucy.slack.handlers import _claim_event
+
+        assert await _claim_event("T1:1.0")
+        assert not await _claim_event("T1:1.0")
+        assert await _claim_event("T2:1.0")
@@ -0,0 +1,217 @@
+"""Coordination backend and the state ported onto it (HITL, cooldowns, caches).
+
+Only the in-memory backend runs here; the Postgres backend implements the
+same operations as single statements against coordination_leases.
+
+Run: pytest tests/test_coordination.py -v
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any
+
+import pytest
+
+from lucy.infra import coordination
+from lucy.infra.coordination import ALL_KEYS, MemoryCoordination, get_coordination
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def backend(monkeypatch) -> MemoryCoordination:
+    fresh = MemoryCoordination()
+    monkeypatch.setattr(coordination, "_backend", fresh)
+    return fresh
+
+
+@pytest.fixture
+def clock(backend) -> _Clock:
+    clock = _Clock()
+    backend.clock = clock
+    return clock
+
+
+class TestMemoryBackend:
+    async def test_claim_is_exclusive_until_expiry(self, backend, clock) -> None:
+        assert await backend.claim("k", 10)
+        assert not await backend.claim("k", 10)
+        clock.now += 11
+        assert await backend.claim("k", 10)
+
+    async def test_release_frees_claim(self, backend) -> None:
+        await backend.claim("k", 10)
+        await backend.release("k")
+        assert await backend.claim("k", 10)
+
+    async def test_take_returns_value_once(self, backend) -> None:
+        await backend.put("k", {"a": 1}, 10)
+        assert await backend.take("k") == {"a": 1}
+        assert await backend.take("k") is None
+
+    async def test_get_and_exists_respect_ttl(self, backend, clock) -> None:
+        await backend.put("k", "v", 5)
+        assert await backend.get("k") == "v"
+        clock.now += 6
+        assert await backend.get("k") is None
+        assert not await backend.exists("k")
+
+    async def test_scan_by_prefix(self, backend, clock) -> None:
+        await backend.put("hitl:a", 1, 10)
+        await backend.put("hitl:b", 2, 1)
+        await backend.put("other", 3, 10)
+        clock.now += 2
+        assert await backend.scan("hitl:") == {"hitl:a": 1}
+
+    async def test_expired_entries_are_purged(self, backend, clock) -> None:
+        for i in range(100):
+            await backend.put(f"k{i}", i, 1)
+        clock.now += 2
+        await backend.put("fresh", 0, 10)
+        assert list(backend._entries) == ["fresh"]
+
+    async def test_notify_reaches_listeners(self, backend) -> None:
+        seen: list[str] = []
+        backend.listen("topic", seen.append)
+        await backend.notify("topic", "T1")
+        await backend.notify("other", "T2")
+        assert seen == ["T1"]
+
+    def test_default_backend_is_local(self) -> None:
+        assert not get_coordination().shared
+
+    def test_incomplete_backend_fails_at_construction(self) -> None:
+        class _NoScan(MemoryCoordination):
+            scan = coordination.CoordinationBackend.scan
+
+        with pytest.raises(TypeError, match="scan"):
+            _NoScan()
+
+
+class TestHitl:
+    @pytest.fixture(autouse=True)
+    def _isolated(self, backend, tmp_path, monkeypatch) -> None:
+        from lucy.config import settings
+        from lucy.slack import hitl
+
+        monkeypatch.setattr(settings, "workspace_root", tmp_path)
+        monkeypatch.setattr(hitl, "_CLEANUP_INTERVAL_S", 0.0)
+
+    async def test_resolve_runs_once(self) -> None:
+        from lucy.slack.hitl import create_pending_action, resolve_pending_action
+
+        action_id = await create_pending_action("GMAIL_SEND", {"to": "a"}, "Send", "ws1", "U1")
+        first, second = await asyncio.gather(
+            resolve_pending_action(action_id, approved=True),
+            resolve_pending_action(action_id, approved=True),
+        )
+        assert [a for a in (first, second) if a] == [first or second]
+        assert (first or second)["requesting_user_id"] == "U1"
+
+    async def test_metadata_without_resolving(self) -> None:
+        from lucy.slack.hitl import create_pending_action, get_pending_action_metadata
+
+        action_id = await create_pending_action("X_DELETE", {}, "Delete", "ws1")
+        assert (await get_pending_action_metadata(action_id))["tool_name"] == "X_DELETE"
+        assert await get_pending_action_metadata(action_id) is not None
+
+    async def test_expired_action_fires_callback_once(self, backend, monkeypatch) -> None:
+        from lucy.slack import hitl
+
+        expired: list[dict[str, Any]] = []
+
+        async def on_expired(action: dict[str, Any]) -> None:
+            expired.append(action)
+
+        monkeypatch.setattr(hitl, "_expiry_callbacks", [on_expired])
+        action_id = await hitl.create_pending_action("X_DELETE", {}, "Delete", "ws1")
+        backend._entries[f"hitl:{action_id}"].value["wall_created_at"] -= (
+            hitl.PENDING_TTL_SECONDS + 1
+        )
+        await hitl._cleanup_expired()
+        await hitl._cleanup_expired()
+        await asyncio.sleep(0)
+        assert len(expired) == 1
+        assert await hitl.resolve_pending_action(action_id, approved=True) is None
+
+    async def test_disk_fallback_after_restart(self, backend) -> None:
+        from lucy.slack.hitl import create_pending_action, resolve_pending_action
+
+        action_id = await create_pending_action("X_SEND", {}, "Send", "ws1")
+        backend._entries.clear()
+        assert await resolve_pending_action(action_id, approved=True) is not None
+
+
+class TestPortedState:
+    async def test_implicit_cooldown(self, backend, clock) -> None:
+        from lucy.slack.implicit_mention import _check_rate_limit, _record_trigger
+
+        assert not await _check_rate_limit("C1")
+        await _record_trigger("C1")
+        assert await _check_rate_limit("C1")
+        assert not await _check_rate_limit("C2")
+        clock.now += 31
+        assert not await _check_rate_limit("C1")
+
+    async def test_token_invalidation_is_broadcast(self) -> None:
+        from lucy.core import token_store
+
+        token_store._cache["T1"] = ("xoxb-1", time.monotonic() + 60)
+        token_store._cache["T2"] = ("xoxb-2", time.monotonic() + 60)
+        await get_coordination().notify("slack_token", "T1")
+        assert "T1" not in token_store._cache
+        assert "T2" in token_store._cache
+        await get_coordination().notify("slack_token", ALL_KEYS)
+        assert token_store._cache == {}
+
+    def test_response_cache_key_is_process_independent(self) -> None:
+        from lucy.core.openclaw import _cache_key
+
+        messages = [{"role": "user", "content": "classify: jira"}]
+        key = _cache_key(messages, "m", "system", "ws")
+        assert key.startswith("llm:") and len(key) == 36
+        assert key == _cache_key(messages, "m", "system", "ws")
+        assert key != _cache_key(messages, "m", "other", "ws")
+
+    async def test_connection_siblings_and_single_resume(self, backend) -> None:
+        from lucy.integrations import connection_watcher as cw
+
+        def pending(slug: str) -> cw.PendingConnection:
+            return cw.PendingConnection("ws", slug, slug.title(), "C1", "1.0", "do it")
+
+        await backend.claim("watch:ws:gmail:1.0", 60, value={"display_name": "Gmail"})
+        await backend.claim("watch:ws:jira:1.0", 60, value={"display_name": "Jira"})
+        await backend.claim("watch:ws:jira:2.0", 60, value={"display_name": "Jira"})
+        assert await cw._get_sibling_watches(pending("gmail")) == ["Jira"]
+
+        resumed: list[str] = []
+
+        async def fake_resume(p, say_fn, client) -> None:
+            resumed.append(p.toolkit_slug)
+
+        async def say(**kwargs: Any) -> None:
+            return None
+
+        class _Composio:
+            async def invalidate_cache(self, workspace_id: str) -> None:
+                return None
+
+        import lucy.integrations.composio_client as cc
+
+        await backend.release("watch:ws:jira:1.0")
+        cw_resume, cc_get = cw._resume_original_task, cc.get_composio_client
+        cw._resume_original_task, cc.get_composio_client = fake_resume, lambda: _Composio()
+        try:
+            await cw._handle_connection_success(pending("gmail"), say, None)
+            await cw._handle_connection_success(pending("gmail"), say, None)
+        finally:
+            cw._resume_original_task, cc.get_composio_client = cw_resume, cc_get
+        assert resumed == ["gmail"]
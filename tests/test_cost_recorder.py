@@ -0,0 +1,101 @@
+"""Batched cost recorder: pricing, rollups, backpressure, flushing.
+
+Run: pytest tests/test_cost_recorder.py -v
+"""
+
+from __future__ import annotations
+
+import asyncio
+import uuid
+from decimal import Decimal
+
+from lucy.infra.costs import CostEvent, CostRecorder, price_llm_call, rollup
+
+_WS = str(uuid.uuid4())
+
+
+class _CapturingRecorder(CostRecorder):
+    """Recorder that keeps batches in memory instead of writing to Postgres."""
+
+    def __init__(self, **kw) -> None:
+        super().__init__(**kw)
+        self.batches: list[list[CostEvent]] = []
+
+    async def _write(self, batch: list[CostEvent]) -> None:
+        self.batches.append(batch)
+
+
+def _event(component: str = "llm_call", cost: str = "0.01") -> CostEvent:
+    return CostEvent(
+        workspace_id=uuid.UUID(_WS), component=component, provider="openrouter",
+        cost_usd=Decimal(cost), input_tokens=100, cached_input_tokens=60, output_tokens=5,
+    )
+
+
+class TestPricing:
+    def test_cached_tokens_billed_at_cached_rate(self) -> None:
+        full = price_llm_call("minimax/minimax-m2.5", 1_000_000, 0, 0)
+        cached = price_llm_call("minimax/minimax-m2.5", 1_000_000, 1_000_000, 0)
+        assert full == Decimal("0.300000")
+        assert cached == Decimal("0.030000")
+
+    def test_longest_prefix_wins_and_unknown_uses_default(self) -> None:
+        assert price_llm_call("google/gemini-2.5-flash-lite", 0, 0, 1_000_000) == Decimal("2.5")
+        assert price_llm_call("acme/unknown", 1_000_000, 0, 0) == Decimal("1")
+
+    def test_reported_cost_wins(self) -> None:
+        rec = _CapturingRecorder()
+        rec.record_llm_call(
+            workspace_id=_WS, model="m", intent="chat",
+            usage={"prompt_tokens": 10, "completion_tokens": 1, "cost": 0.5},
+        )
+        assert rec._queue.get_nowait().cost_usd == Decimal("0.5")
+
+    def test_non_uuid_workspace_is_skipped(self) -> None:
+        rec = _CapturingRecorder()
+        assert not rec.record_llm_call(
+            workspace_id="T0123", model="m", intent="chat", usage={"prompt_tokens": 1},
+        )
+        assert rec._queue.qsize() == 0
+
+
+class TestRollup:
+    def test_batch_aggregates_per_component(self) -> None:
+        rows = rollup([_event(), _event(), _event("sandbox", "0.002")])
+        by_component = {r["component"]: r for r in rows}
+        assert by_component["llm_call"]["calls"] == 2
+        assert by_component["llm_call"]["cached_input_tokens"] == 120
+        assert by_component["llm_call"]["cost_usd"] == Decimal("0.02")
+        assert by_component["sandbox"]["calls"] == 1
+
+
+class TestCostRecorder:
+    def test_full_queue_drops_instead_of_blocking(self) -> None:
+        rec = _CapturingRecorder(max_queue=2)
+        results = [rec.record(_event()) for _ in range(5)]
+        assert results == [True, True, False, False, False]
+        assert rec.dropped == 3
+
+    async def test_flushes_when_batch_is_full(self) -> None:
+        rec = _CapturingRecorder(batch_rows=3, flush_interval_s=60)
+        for _ in range(3):
+            rec.record(_event())
+        await asyncio.sleep(0.01)
+        assert [len(b) for b in rec.batches] == [3]
+        await rec.stop()
+
+    async def test_flushes_partial_batch_after_interval(self) -> None:
+        rec = _CapturingRecorder(batch_rows=100, flush_interval_s=0.02)
+        rec.record(_event())
+        await asyncio.sleep(0.1)
+        assert [len(b) for b in rec.batches] == [1]
+        await rec.stop()
+
+    async def test_stop_writes_pending_events(self) -> None:
+        rec = _CapturingRecorder(batch_rows=100, flush_interval_s=60)
+        for _ in range(4):
+            rec.record(_event())
+        await asyncio.sleep(0)
+        await rec.stop()
+        assert sum(len(b) for b in rec.batches) == 4
+        assert rec.written == 4
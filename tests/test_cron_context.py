@@ -0,0 +1,95 @@
+"""Cached cron context bundle: stat-revalidated files and TTL fragments.
+
+Run: pytest tests/test_cron_context.py -v
+"""
+
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from lucy.crons.context import CronContextBundle
+from lucy.workspace.filesystem import WorkspaceFS
+
+
+@pytest.fixture
+def ws(tmp_path) -> WorkspaceFS:
+    return WorkspaceFS("ws-1", tmp_path)
+
+
+class _Bundle(CronContextBundle):
+    """Bundle with a canned connected-apps lookup."""
+
+    def __init__(self) -> None:
+        super().__init__(integrations_ttl_s=300, channel_summary_ttl_s=60)
+        self.app_calls = 0
+
+    async def _fetch_connected_apps(self, workspace_id: str) -> list[str]:
+        self.app_calls += 1
+        return ["github", "linear"]
+
+
+@pytest.fixture
+def bundle() -> _Bundle:
+    return _Bundle()
+
+
+class TestCronContextBundle:
+    async def test_unchanged_files_are_read_once(self, ws, bundle) -> None:
+        await ws.write_file("company/SKILL.md", "Acme makes anvils")
+        await ws.write_file("crons/daily/LEARNINGS.md", "- use the v2 API")
+        for _ in range(30):
+            block = await bundle.workspace_context(ws)
+            learnings = await bundle.learnings(ws, "daily")
+        assert "[Company Context]\nAcme makes anvils" in block
+        assert "[Connected Integrations]\ngithub, linear" in block
+        assert "[Team Directory]" not in block
+        assert learnings == "- use the v2 API"
+        assert bundle.reads == 2
+        assert bundle.app_calls == 1
+
+    async def test_edited_file_is_picked_up(self, ws, bundle) -> None:
+        await ws.write_file("team/SKILL.md", "Ana - eng")
+        assert "Ana - eng" in await bundle.workspace_context(ws)
+        await ws.write_file("team/SKILL.md", "Ana - eng\nBo - design")
+        assert "Bo - design" in await bundle.workspace_context(ws)
+
+    async def test_deleted_and_created_files(self, ws, bundle) -> None:
+        assert await bundle.learnings(ws, "daily") is None
+        await ws.write_file("crons/daily/LEARNINGS.md", "first")
+        assert await bundle.learnings(ws, "daily") == "first"
+        os.remove(ws.root / "crons/daily/LEARNINGS.md")
+        assert await bundle.learnings(ws, "daily") is None
+
+    async def test_block_matches_previous_layout(self, ws, bundle) -> None:
+        await ws.write_file("company/SKILL.md", " Acme \n")
+        await ws.write_file("team/SKILL.md", "Ana")
+        block = await bundle.workspace_context(ws)
+        assert block == (
+            "\n[Company Context]\nAcme\n"
+            "\n[Team Directory]\nAna\n"
+            "\n[Connected Integrations]\ngithub, linear"
+        )
+
+    async def test_invalidate_forgets_workspace(self, ws, bundle) -> None:
+        await ws.write_file("company/SKILL.md", "Acme")
+        await bundle.workspace_context(ws)
+        bundle.invalidate("ws-1")
+        await bundle.workspace_context(ws)
+        assert bundle.reads == 2
+        assert bundle.app_calls == 2
+
+    async def test_least_recent_workspace_is_evicted(self, tmp_path) -> None:
+        bundle = CronContextBundle(max_workspaces=2)
+        spaces = [WorkspaceFS(f"ws-{i}", tmp_path / str(i)) for i in range(3)]
+        for ws in spaces:
+            await ws.write_file("company/SKILL.md", ws.workspace_id)
+        await bundle.read(spaces[0], "company/SKILL.md")
+        await bundle.read(spaces[1], "company/SKILL.md")
+        await bundle.read(spaces[0], "company/SKILL.md")
+        await bundle.read(spaces[2], "company/SKILL.md")
+        assert list(bundle._workspaces) == ["ws-0", "ws-2"]
+        assert await bundle.read(spaces[0], "company/SKILL.md") == "ws-0"
+        assert await bundle.read(spaces[1], "company/SKILL.md") == "ws-1"
+        assert bundle.reads == 4
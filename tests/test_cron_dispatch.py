@@ -0,0 +1,208 @@
+"""Cron dispatch queue: worker pool, workspace quotas, priority, spread.
+
+Run: pytest tests/test_cron_dispatch.py -v
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+
+from lucy.crons.dispatch import CronDispatcher, start_offset
+
+
+@dataclass
+class _Cron:
+    path: str
+    workspace_dir: str = "ws"
+    type: str = "agent"
+
+    @property
+    def job_id(self) -> str:
+        return f"{self.workspace_dir}:{self.path}"
+
+
+class _Runs:
+    """Run target that blocks until released and records start order."""
+
+    def __init__(self) -> None:
+        self.started: list[tuple[str, str, int]] = []
+        self.release = asyncio.Event()
+
+    async def __call__(self, workspace_id: str, cron: _Cron, attempt: int) -> None:
+        self.started.append((workspace_id, cron.path, attempt))
+        await self.release.wait()
+
+
+async def _settle() -> None:
+    for _ in range(20):
+        await asyncio.sleep(0)
+
+
+class TestCronDispatcher:
+    async def test_worker_pool_bounds_concurrency(self) -> None:
+        runs = _Runs()
+        d = CronDispatcher(runs, workers=2, per_workspace=10)
+        for i in range(5):
+            d.submit(f"ws{i}", _Cron(f"/c{i}", f"ws{i}"))
+        await _settle()
+        assert len(runs.started) == 2
+        runs.release.set()
+        await _settle()
+        assert len(runs.started) == 5
+        await d.stop()
+
+    async def test_workspace_quota_lets_other_tenants_through(self) -> None:
+        runs = _Runs()
+        d = CronDispatcher(runs, workers=3, per_workspace=1)
+        for i in range(3):
+            d.submit("busy", _Cron(f"/c{i}", "busy"))
+        d.submit("quiet", _Cron("/q", "quiet"))
+        await _settle()
+        assert sorted(ws for ws, _, _ in runs.started) == ["busy", "quiet"]
+        runs.release.set()
+        await d.stop()
+
+    async def test_scripts_start_before_agents_and_retries_last(self) -> None:
+        runs = _Runs()
+        d = CronDispatcher(runs, workers=1, per_workspace=5)
+        d.submit("a", _Cron("/retry", "a"), attempt=2)
+        d.submit("b", _Cron("/agent", "b"))
+        d.submit("c", _Cron("/script", "c", type="script"))
+        runs.release.set()
+        await _settle()
+        assert [p for _, p, _ in runs.started] == ["/script", "/agent", "/retry"]
+        await d.stop()
+
+    async def test_interactive_work_takes_cron_slots(self) -> None:
+        runs = _Runs()
+        d = CronDispatcher(runs, workers=3, per_workspace=5, min_workers=1)
+        async with d.interactive(), d.interactive():
+            assert d.capacity() == 1
+            for i in range(3):
+                d.submit("ws", _Cron(f"/c{i}"))
+            await _settle()
+            assert len(runs.started) == 1
+        await _settle()
+        assert len(runs.started) == 3
+        runs.release.set()
+        await d.stop()
+
+    async def test_duplicate_fire_is_coalesced(self) -> None:
+        runs = _Runs()
+        d = CronDispatcher(runs, workers=1)
+        cron = _Cron("/daily")
+        assert d.submit("ws", cron) is True
+        await _settle()
+        assert d.submit("ws", cron) is False
+        assert d.submit("ws", cron, attempt=2, delay_s=60) is True
+        assert d.get_stats()["delayed"] == 1
+        runs.release.set()
+        await d.stop()
+
+    async def test_delayed_jobs_wait_until_due(self) -> None:
+        runs = _Runs()
+        d = CronDispatcher(runs, workers=1)
+        d.submit("ws", _Cron("/later"), delay_s=0.05)
+        await _settle()
+        assert runs.started == []
+        runs.release.set()
+        await asyncio.sleep(0.1)
+        assert runs.started == [("ws", "/later", 1)]
+        await d.stop()
+
+    async def test_trigger_now_goes_through_the_queue(self, monkeypatch) -> None:
+        from lucy.crons.scheduler import CronScheduler
+
+        runs = _Runs()
+        scheduler = CronScheduler()
+        cron = _Cron("/daily")
+
+        async def load(workspace_id: str) -> list[_Cron]:
+            return [cron]
+
+        async def run(workspace_id, cron, first_attempt=1, requeue=False) -> None:
+            await runs(workspace_id, cron, first_attempt)
+
+        monkeypatch.setattr(scheduler, "_load_crons", load)
+        monkeypatch.setattr(scheduler, "_run_cron", run)
+        assert await scheduler.trigger_now("ws", "/daily") is True
+        await _settle()
+        assert await scheduler.trigger_now("ws", "/daily") is True
+        assert await scheduler.trigger_now("ws", "/missing") is False
+        await _settle()
+        assert runs.started == [("ws", "/daily", 1)]
+        assert scheduler.dispatcher.get_stats()["coalesced"] == 1
+        runs.release.set()
+        await scheduler.dispatcher.stop()
+
+    async def test_trigger_goes_to_the_worker_when_crons_run_elsewhere(
+        self, monkeypatch,
+    ) -> None:
+        from types import SimpleNamespace
+
+        from lucy.config import settings
+        from lucy.core import task_queue
+        from lucy.crons.scheduler import CRON_TRIGGER_TASK, CronScheduler
+
+        front, worker = CronScheduler(), CronScheduler()
+        cron = _Cron("/daily")
+        enqueued: list[tuple[str, str, dict[str, str]]] = []
+        submitted: list[tuple[str, str]] = []
+
+        async def load(workspace_id: str) -> list[_Cron]:
+            return [cron]
+
+        async def enqueue(workspace_id, task_type, payload, **kw):
+            enqueued.append((workspace_id, task_type, payload))
+
+        monkeypatch.setattr(settings, "cron_run_in_process", False)
+        monkeypatch.setattr(
+            task_queue, "get_task_queue", lambda: SimpleNamespace(enqueue=enqueue),
+        )
+        for scheduler in (front, worker):
+            monkeypatch.setattr(scheduler, "_load_crons", load)
+        monkeypatch.setattr(
+            worker.dispatcher, "submit", lambda ws, c, **kw: submitted.append((ws, c.path)),
+        )
+        assert await front.trigger_now("ws", "/daily") is True
+        assert enqueued == [("ws", CRON_TRIGGER_TASK, {"cron_path": "/daily"})]
+        assert front.dispatcher.get_stats()["queued"] == 0
+
+        task = SimpleNamespace(workspace_id="ws", payload={"cron_path": "/daily"})
+        await worker.run_triggered(task, None)
+        assert submitted == [("ws", "/daily")]
+
+    async def test_listing_reads_the_workspace_when_not_scheduling(
+        self, monkeypatch,
+    ) -> None:
+        from lucy.crons.scheduler import CronConfig, CronScheduler
+
+        scheduler = CronScheduler()
+        cron = CronConfig(
+            path="/daily", cron="0 9 * * *", title="Daily digest", description="Sum up",
+            workspace_dir="ws",
+        )
+
+        async def load(workspace_id: str) -> list[CronConfig]:
+            return [cron]
+
+        monkeypatch.setattr(scheduler, "_load_crons", load)
+        [job] = await scheduler.list_workspace_jobs("ws")
+        assert job["name"] == "Daily digest"
+        assert job["schedule"] == "0 9 * * *"
+        assert job["next_run"]
+
+
+class TestStartOffset:
+    def test_offset_is_stable_and_within_window(self) -> None:
+        a = start_offset("ws:/daily-report", 30.0)
+        assert a == start_offset("ws:/daily-report", 30.0)
+        assert 0.0 <= a < 30.0
+
+    def test_offsets_spread_crons_sharing_a_minute(self) -> None:
+        offsets = {round(start_offset(f"ws:/cron-{i}", 30.0)) for i in range(20)}
+        assert len(offsets) > 5
+
+    def test_zero_window_disables_spread(self) -> None:
+        assert start_offset("ws:/x", 0) == 0.0
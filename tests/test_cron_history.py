@@ -0,0 +1,108 @@
+"""Cron execution history store: sidecar index, dependency checks, legacy logs.
+
+Run: pytest tests/test_cron_history.py -v
+"""
+
+from __future__ import annotations
+
+import json
+from datetime import UTC, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from lucy.crons.history import (
+    FAILED,
+    CronHistoryStore,
+    CronRun,
+    append_execution_log,
+    parse_execution_log,
+)
+from lucy.workspace.filesystem import WorkspaceFS
+
+
+@pytest.fixture
+def ws(tmp_path) -> WorkspaceFS:
+    return WorkspaceFS("ws-1", tmp_path)
+
+
+def _run(status: str = "delivered", ago: timedelta = timedelta(0)) -> CronRun:
+    return CronRun(ts=(datetime.now(UTC) - ago).isoformat(), status=status, elapsed_ms=10)
+
+
+class TestHistoryStore:
+    async def test_record_writes_jsonl_and_index(self, ws) -> None:
+        store = CronHistoryStore()
+        await store.record(ws, "report", _run())
+        await store.record(ws, "report", _run(FAILED))
+        lines = (ws.root / "crons/report/history.jsonl").read_text().splitlines()
+        assert [json.loads(x)["status"] for x in lines] == ["delivered", FAILED]
+        index = json.loads((ws.root / "crons/report/history_index.json").read_text())
+        assert index["runs"] == 2
+        assert index["failures"] == 1
+        assert index["last"]["status"] == FAILED
+        assert index["last_ok"]["status"] == "delivered"
+
+    async def test_ran_today(self, ws) -> None:
+        store = CronHistoryStore()
+        assert store.ran_today(ws, "fetch") is None
+        await store.record(ws, "fetch", _run(ago=timedelta(days=2)))
+        assert store.ran_today(ws, "fetch") is False
+        await store.record(ws, "fetch", _run())
+        assert store.ran_today(ws, "fetch") is True
+        await store.record(ws, "fetch", _run(FAILED))
+        assert store.ran_today(ws, "fetch") is False
+
+    async def test_ran_today_uses_cron_timezone(self, ws) -> None:
+        store = CronHistoryStore()
+        tz = ZoneInfo("Pacific/Kiritimati")  # UTC+14
+        local_midnight = datetime.now(tz).replace(hour=0, minute=0, second=0, microsecond=0)
+        await store.record(ws, "fetch", CronRun(
+            ts=(local_midnight - timedelta(minutes=1)).astimezone(UTC).isoformat(),
+            status="delivered",
+        ))
+        assert store.ran_today(ws, "fetch", tz) is False
+
+    async def test_summary_reports_failure_rate(self, ws) -> None:
+        store = CronHistoryStore()
+        assert store.summary(ws, "x") is None
+        for status in ("delivered", FAILED, "skipped", FAILED):
+            await store.record(ws, "x", _run(status))
+        summary = store.summary(ws, "x")
+        assert summary["runs"] == 4
+        assert summary["failure_rate"] == 0.5
+        assert summary["last_status"] == FAILED
+
+    async def test_index_written_by_another_process_is_seen(self, ws) -> None:
+        reader, writer = CronHistoryStore(), CronHistoryStore()
+        assert reader.summary(ws, "x") is None
+        await writer.record(ws, "x", _run())
+        assert reader.summary(ws, "x")["runs"] == 1
+
+    async def test_legacy_execution_log_bootstraps_index(self, ws) -> None:
+        await ws.write_file("crons/old/execution.log", (
+            "\n## 2026-10-16T09:00:00+00:00 (elapsed: 1200ms, status: delivered)\nhi\n"
+            "\n## 2026-10-17T09:00:00+00:00 -- FAILED after 3 attempts (900ms)\nboom\n"
+        ))
+        store = CronHistoryStore()
+        last = store.last_run(ws, "old")
+        assert last.status == FAILED
+        assert last.elapsed_ms == 900
+        assert store.last_run(ws, "old", ok_only=True).ts == "2026-10-16T09:00:00+00:00"
+
+
+class TestExecutionLog:
+    def test_parse_execution_log_statuses(self) -> None:
+        runs = parse_execution_log(
+            "## 2026-10-16T09:00:00+00:00 (elapsed: 5ms, status: skipped)"
+            " [succeeded on attempt 2]\nSKIP\n"
+        )
+        assert [(r.status, r.elapsed_ms) for r in runs] == [("skipped", 5)]
+
+    async def test_append_trims_only_when_oversized(self, ws) -> None:
+        entry = "\n## 2026-10-16T09:00:00+00:00 (elapsed: 1ms, status: delivered)\n" + "x" * 900
+        for _ in range(60):
+            await append_execution_log(ws, "big", entry)
+        text = (ws.root / "crons/big/execution.log").read_text()
+        assert len(text) <= 32_768
+        assert text.startswith("\n## ")
@@ -0,0 +1,202 @@
+"""Indexed cron scheduling: shard assignment, fire times, discovery, sweep.
+
+Run: pytest tests/test_cron_index.py -v
+"""
+
+from __future__ import annotations
+
+import json
+import uuid
+from collections import Counter
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from lucy.config import settings
+from lucy.crons import index as cron_index
+from lucy.crons.index import CronIndex, DueCron, next_fire, owns_workspace, shard_for
+from lucy.crons.scheduler import CronConfig, CronScheduler
+
+
+def _cron(expr: str = "0 9 * * *", tz: str = "") -> CronConfig:
+    return CronConfig(
+        path="/report", cron=expr, title="Report", description="Send the report",
+        workspace_dir="ws", timezone=tz,
+    )
+
+
+def _write_task(root, ws_id: str, slug: str, expr: str = "0 9 * * *") -> None:
+    cron_dir = root / ws_id / "crons" / slug
+    cron_dir.mkdir(parents=True)
+    (cron_dir / "task.json").write_text(json.dumps({
+        "path": f"/{slug}", "cron": expr, "title": slug, "description": "do it",
+    }))
+
+
+class _FakeIndex(CronIndex):
+    def __init__(self, due: list[DueCron], claimable: bool = True) -> None:
+        self._due = due
+        self._claimable = claimable
+        self.claims: list[tuple[DueCron, datetime | None]] = []
+
+    async def due(self, now, limit=500):
+        return self._due
+
+    async def claim(self, item, new_next, now):
+        self.claims.append((item, new_next))
+        return self._claimable
+
+
+class TestSharding:
+    def test_shard_is_stable_and_in_range(self) -> None:
+        ws_id = str(uuid.uuid4())
+        assert shard_for(ws_id, 8) == shard_for(ws_id, 8)
+        assert 0 <= shard_for(ws_id, 8) < 8
+        assert shard_for(ws_id, 1) == 0
+
+    def test_shards_are_roughly_even(self) -> None:
+        counts = Counter(shard_for(str(uuid.uuid4()), 4) for _ in range(4000))
+        assert set(counts) == {0, 1, 2, 3}
+        assert min(counts.values()) > 800
+
+    def test_owns_workspace_follows_settings(self, monkeypatch) -> None:
+        ws_id = str(uuid.uuid4())
+        monkeypatch.setattr(settings, "cron_shard_count", 4)
+        monkeypatch.setattr(settings, "cron_shard_index", shard_for(ws_id, 4))
+        assert owns_workspace(ws_id)
+        monkeypatch.setattr(settings, "cron_shard_index", (shard_for(ws_id, 4) + 1) % 4)
+        assert not owns_workspace(ws_id)
+
+
+class TestNextFire:
+    def test_strictly_after(self) -> None:
+        at_nine = datetime(2026, 3, 2, 9, 0, tzinfo=UTC)
+        assert next_fire(_cron(), at_nine) == at_nine + timedelta(days=1)
+
+    def test_uses_cron_timezone(self) -> None:
+        fire = next_fire(_cron(tz="America/New_York"), datetime(2026, 3, 2, tzinfo=UTC))
+        assert fire is not None
+        assert fire.astimezone(UTC).hour == 14
+
+
+class TestDiscovery:
+    async def test_only_owned_uuid_workspaces(self, tmp_path, monkeypatch) -> None:
+        monkeypatch.setattr(settings, "workspace_root", tmp_path)
+        monkeypatch.setattr(settings, "cron_shard_count", 2)
+        monkeypatch.setattr(settings, "cron_shard_index", 0)
+        ids = [str(uuid.uuid4()) for _ in range(20)]
+        for ws_id in ids:
+            (tmp_path / ws_id).mkdir()
+        (tmp_path / "T04SLACKTEAM").mkdir()
+
+        owned = await CronScheduler()._owned_workspaces()
+        assert owned == sorted(i for i in ids if shard_for(i, 2) == 0)
+
+    async def test_discovers_crons_in_parallel(self, tmp_path, monkeypatch) -> None:
+        monkeypatch.setattr(settings, "workspace_root", tmp_path)
+        monkeypatch.setattr(settings, "cron_discovery_concurrency", 3)
+        ids = [str(uuid.uuid4()) for _ in range(6)]
+        for ws_id in ids:
+            _write_task(tmp_path, ws_id, "daily")
+            _write_task(tmp_path, ws_id, "hourly", "0 * * * *")
+
+        discovered = await CronScheduler()._discover_crons(ids)
+        assert set(discovered) == set(ids)
+        for crons in discovered.values():
+            assert [c.path for c in crons] == ["/daily", "/hourly"]
+
+
+class TestSweep:
+    @pytest.fixture
+    def sched(self) -> CronScheduler:
+        sched = CronScheduler()
+        sched.submitted = []
+        sched.dispatcher.submit = lambda ws_id, cron, **kw: sched.submitted.append(
+            (ws_id, cron, kw)
+        )
+        return sched
+
+    def _due(self, late: timedelta) -> DueCron:
+        cron = _cron(expr="* * * * *")
+        return DueCron(uuid.uuid4(), "ws", cron, datetime.now(UTC) - late)
+
+    async def test_claimed_rows_are_dispatched(self, sched, monkeypatch) -> None:
+        fake = _FakeIndex([self._due(timedelta(seconds=5))])
+        monkeypatch.setattr(cron_index, "_index", fake)
+        await sched._run_index_sweep()
+        assert [(ws, kw) for ws, _, kw in sched.submitted] == [("ws", {"spread": True})]
+        assert fake.claims[0][1] > datetime.now(UTC)
+
+    async def test_lost_claim_is_not_dispatched(self, sched, monkeypatch) -> None:
+        fake = _FakeIndex([self._due(timedelta(0))], claimable=False)
+        monkeypatch.setattr(cron_index, "_index", fake)
+        await sched._run_index_sweep()
+        assert sched.submitted == []
+
+    async def test_stale_fire_is_skipped_but_advanced(self, sched, monkeypatch) -> None:
+        fake = _FakeIndex([self._due(timedelta(hours=2))])
+        monkeypatch.setattr(cron_index, "_index", fake)
+        await sched._run_index_sweep()
+        assert sched.submitted == []
+        assert len(fake.claims) == 1
+
+
+class _SqliteSession:
+    """Stands in for ``db_session()``: runs statements on a sync SQLite session."""
+
+    def __init__(self, session) -> None:
+        self.session = session
+
+    async def __aenter__(self) -> _SqliteSession:
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self.session.commit()
+
+    async def execute(self, stmt):
+        return self.session.execute(stmt)
+
+
+@pytest.fixture
+def schedules(monkeypatch):
+    """A ``schedules`` table in in-memory SQLite behind ``db_session``."""
+    from sqlalchemy import create_engine
+    from sqlalchemy.dialects.postgresql import JSONB
+    from sqlalchemy.ext.compiler import compiles
+    from sqlalchemy.orm import Session
+
+    import lucy.db.session
+    from lucy.db.models import Schedule
+
+    compiles(JSONB, "sqlite")(lambda element, compiler, **kw: "JSON")
+    engine = create_engine("sqlite://")
+    Schedule.__table__.create(engine)
+    with Session(engine) as session:
+        monkeypatch.setattr(lucy.db.session, "db_session", lambda: _SqliteSession(session))
+        yield session
+    engine.dispose()
+
+
+class TestDue:
+    async def test_other_shards_backlog_does_not_hide_ours(
+        self, schedules, monkeypatch,
+    ) -> None:
+        from lucy.db.models import Schedule
+
+        monkeypatch.setattr(settings, "cron_shard_count", 2)
+        monkeypatch.setattr(settings, "cron_shard_index", 0)
+        ours = next(w for w in (str(uuid.uuid4()) for _ in range(64)) if shard_for(w, 2) == 0)
+        stalled = next(w for w in (str(uuid.uuid4()) for _ in range(64)) if shard_for(w, 2) == 1)
+        now = datetime(2026, 3, 2, 9, 0)
+        crons = [(stalled, now - timedelta(days=1, seconds=i)) for i in range(20)]
+        crons.append((ours, now - timedelta(minutes=1)))
+        for ws_id, next_run_at in crons:
+            schedules.add(Schedule(
+                workspace_id=uuid.UUID(ws_id), name="/report", cron_expression="0 9 * * *",
+                timezone="", intent_template="Send the report", config=vars(_cron()).copy(),
+                is_active=True, next_run_at=next_run_at, shard_key=cron_index.shard_key(ws_id),
+            ))
+        schedules.commit()
+
+        due = await CronIndex().due(now, limit=10)
+        assert [item.workspace_id for item in due] == [ours]
@@ -0,0 +1,223 @@
+"""Health-aware routing across gateway / local / Composio execution.
+
+Run: pytest tests/test_exec_router.py -v
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from lucy.workspace import exec_router, executor
+from lucy.workspace.exec_router import ExecutionRouter, is_read_only
+from lucy.workspace.executor import ExecutionResult
+
+
+def _ok(output: str = "ok") -> ExecutionResult:
+    return ExecutionResult(success=True, output=output, error="")
+
+
+def _code_error() -> ExecutionResult:
+    return ExecutionResult(success=False, output="", error="NameError", exit_code=1)
+
+
+def _backend_error() -> ExecutionResult:
+    return ExecutionResult(success=False, output="", error="spawn", backend_failed=True)
+
+
+class _Backend:
+    def __init__(self, result: ExecutionResult | None, delay: float = 0.0) -> None:
+        self.result = result
+        self.delay = delay
+        self.calls = 0
+        self.cancelled = False
+
+    async def __call__(self) -> ExecutionResult | None:
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return self.result
+
+
+class TestRouting:
+    async def test_falls_through_on_backend_failure(self) -> None:
+        router = ExecutionRouter()
+        gateway, local = _Backend(None), _Backend(_ok("local"))
+        name, result = await router.run({"gateway": gateway, "local": local})
+        assert name == "local" and result.output == "local"
+        assert gateway.calls == local.calls == 1
+
+    async def test_code_error_does_not_fall_through(self) -> None:
+        router = ExecutionRouter()
+        local, composio = _Backend(_code_error()), _Backend(_ok())
+        name, result = await router.run({"local": local, "composio": composio})
+        assert name == "local" and result.error == "NameError"
+        assert composio.calls == 0
+        assert router.get_stats()["local"]["failures"] == 0
+
+    async def test_open_breaker_is_skipped(self) -> None:
+        router = ExecutionRouter(failure_threshold=2, cooldown_s=60)
+        gateway, local = _Backend(None), _Backend(_ok())
+        for _ in range(3):
+            await router.run({"gateway": gateway, "local": local})
+        assert gateway.calls == 2 and local.calls == 3
+        assert router.plan(["gateway", "local"]) == ["local"]
+        assert router.get_stats()["gateway"]["open"]
+
+    async def test_breaker_probes_after_cooldown(self) -> None:
+        router = ExecutionRouter(failure_threshold=1, cooldown_s=0.05)
+        gateway, local = _Backend(None), _Backend(_ok())
+        await router.run({"gateway": gateway, "local": local})
+        await asyncio.sleep(0.06)
+        gateway.result = _ok("back")
+        name, _ = await router.run({"gateway": gateway, "local": local})
+        assert name == "gateway" and not router.health("gateway").breaker.is_open
+
+    async def test_everything_down_returns_last_failure(self) -> None:
+        router = ExecutionRouter()
+        attempts = {"gateway": _Backend(None), "local": _Backend(_backend_error())}
+        name, result = await router.run(attempts)
+        assert name is None and result.backend_failed
+
+
+class TestRace:
+    async def test_fastest_usable_wins_and_loser_is_cancelled(self) -> None:
+        router = ExecutionRouter()
+        gateway, local = _Backend(_ok("gw"), delay=5), _Backend(_ok("local"))
+        name, result = await router.run(
+            {"gateway": gateway, "local": local}, race=("gateway", "local"),
+        )
+        assert name == "local" and result.output == "local"
+        assert gateway.cancelled
+        assert router.get_stats()["gateway"]["calls"] == 0
+
+    async def test_failed_racer_waits_for_the_other(self) -> None:
+        router = ExecutionRouter()
+        gateway, local = _Backend(_ok("gw"), delay=0.05), _Backend(_backend_error())
+        name, _ = await router.run({"gateway": gateway, "local": local}, race=("gateway", "local"))
+        assert name == "gateway"
+
+
+class TestReadOnly:
+    @pytest.mark.parametrize("code", [
+        "import json\nprint(json.dumps({'a': 1}))",
+        "import pandas as pd\ndf = pd.read_csv('data.csv')\nprint(df.describe())",
+        "with open('notes.txt') as f:\n    print(f.read())",
+        "import httpx\nprint(httpx.get('https://example.com').status_code)",
+        "print('a,b'.replace(',', ';'))",
+        "import json\nwith open('data.json') as f:\n    print(json.dumps(json.load(f)))",
+        "import numpy as np\nprint(np.linalg.norm(np.array([3, 4])))",
+        "import copy\nimport pandas as pd\ndf = pd.DataFrame()\nprint(copy.copy(df.copy()))",
+        "from pathlib import Path\nfor p in Path('.').glob('*.csv'):\n    print(p.read_text())",
+        "import os\nprint(os.listdir('.'), os.path.join('a', 'b'), os.environ.get('HOME'))",
+        "import pandas as pd\nprint(pd.read_csv('a.csv').to_dict('records'))",
+        "import urllib.request\nprint(urllib.request.urlopen('https://example.com').read())",
+        "class A:\n    def __init__(self):\n        super().__init__()\nif __name__ == '__main__':\n    A()",
+    ])
+    def test_read_only(self, code: str) -> None:
+        assert is_read_only(code)
+
+    @pytest.mark.parametrize("code", [
+        "open('out.txt', 'w').write('x')",
+        "import subprocess\nsubprocess.run(['ls'])",
+        "import os\nos.remove('x')",
+        "df.to_csv('out.csv')",
+        "import httpx\nhttpx.post('https://example.com')",
+        "exec('print(1)')",
+        "def broken(:",
+        # Writers a denylist missed: every one of these must count as writing.
+        "import json, pathlib\njson.dump({}, pathlib.Path('p').open('a'))",
+        "import pathlib\nwith pathlib.Path('p').open('w') as f:\n    f.flush()",
+        "import numpy as np\nnp.savetxt('out.txt', [1, 2])",
+        "import os\nos.replace('a', 'b')",
+        "import os\nos.open('p', os.O_WRONLY | os.O_CREAT)",
+        "from os import replace\nreplace('a', 'b')",
+        "from pathlib import Path\np = Path('a')\np.replace('b')",
+        "import sqlite3\nconn = sqlite3.connect('db')\nwith conn:\n    conn.execute('SELECT 1')",
+        "cur.executemany('INSERT INTO t VALUES (?)', rows)",
+        "import urllib.request\nurllib.request.urlopen('https://x.io', data=b'a=1')",
+        "import urllib.request\nurllib.request.urlopen('https://x.io', b'a=1')",
+        "import pickle\nprint(pickle.loads(b''))",
+        "import os\nf = os.remove\nf('x')",
+        "ops = {'rm': print}\nops['rm']('x')",
+        "().__class__.__bases__[0].__subclasses__()",
+        "df.to_string('out.txt')",
+    ])
+    def test_not_read_only(self, code: str) -> None:
+        assert not is_read_only(code)
+
+
+class TestLostRaceKillsProcess:
+    async def test_local_subprocess_is_dead_after_losing(self, monkeypatch, tmp_path) -> None:
+        import os
+
+        from lucy.config import settings
+        from lucy.workspace import python_pool
+
+        monkeypatch.setattr(settings, "workspace_root", tmp_path)
+        monkeypatch.setattr(python_pool, "_pool", None)
+        monkeypatch.setattr(settings, "python_pool_enabled", False)
+        (tmp_path / "ws").mkdir()
+        pid_file = tmp_path / "pid"
+        code = (
+            "import os, time\n"
+            f"open({str(pid_file)!r}, 'w').write(str(os.getpid()))\n"
+            "time.sleep(30)\n"
+        )
+
+        async def local() -> ExecutionResult:
+            return await executor._execute_local_python("ws", code, timeout=30)
+
+        async def gateway() -> ExecutionResult:
+            for _ in range(100):
+                if pid_file.exists() and pid_file.read_text():
+                    break
+                await asyncio.sleep(0.05)
+            return _ok("gw")
+
+        name, _ = await ExecutionRouter().run(
+            {"gateway": gateway, "local": local}, race=("gateway", "local"),
+        )
+        assert name == "gateway"
+        with pytest.raises(ProcessLookupError):
+            os.kill(int(pid_file.read_text()), 0)
+
+
+class TestExecutorIntegration:
+    @pytest.fixture(autouse=True)
+    def _router(self, monkeypatch, tmp_path) -> None:
+        from lucy.config import settings
+
+        monkeypatch.setattr(settings, "workspace_root", tmp_path)
+        (tmp_path / "ws").mkdir()
+        monkeypatch.setattr(exec_router, "_router", ExecutionRouter(failure_threshold=2))
+
+    async def test_down_gateway_is_skipped_after_threshold(self, monkeypatch) -> None:
+        calls = 0
+
+        async def down_gateway(command: str, timeout: int):
+            nonlocal calls
+            calls += 1
+            return None
+
+        monkeypatch.setattr(executor, "_execute_via_gateway", down_gateway)
+        for _ in range(3):
+            result = await executor.execute_python("ws", "print(2 + 2)", timeout=20)
+            assert result.success and result.output.strip() == "4"
+        assert calls == 2
+
+    async def test_user_error_is_not_retried_on_composio(self, monkeypatch) -> None:
+        async def no_gateway(command: str, timeout: int):
+            return None
+
+        async def composio(*args, **kwargs):
+            raise AssertionError("composio should not run for a user-code error")
+
+        monkeypatch.setattr(executor, "_execute_via_gateway", no_gateway)
+        monkeypatch.setattr(executor, "_execute_via_composio", composio)
+        result = await executor.execute_python("ws", "raise ValueError('bad input')", timeout=20)
+        assert not result.success and "ValueError" in result.error
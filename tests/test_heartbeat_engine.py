@@ -0,0 +1,254 @@
+"""Heartbeat evaluation engine: due-time scheduling and bounded evaluation.
+
+Run: pytest tests/test_heartbeat_engine.py -v
+"""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+from typing import Any
+
+import httpx
+import pytest
+
+from lucy.crons import heartbeat
+from lucy.crons.heartbeat import (
+    _eval_api_health,
+    _eval_page_content,
+    _run_evaluator,
+    next_check_time,
+)
+
+T0 = datetime(2026, 10, 18, 12, 0, tzinfo=UTC)
+
+
+def _hb(condition_type: str = "api_health", **config: Any) -> SimpleNamespace:
+    return SimpleNamespace(
+        condition_type=condition_type,
+        condition_config=config,
+        workspace_id="ws-1",
+        last_check_result=None,
+    )
+
+
+class TestNextCheckTime:
+    def test_new_monitor_runs_one_interval_from_now(self) -> None:
+        assert next_check_time(None, 60, T0) == T0 + timedelta(seconds=60)
+
+    def test_stays_on_grid_when_pass_runs_late(self) -> None:
+        due = T0 - timedelta(seconds=25)
+        assert next_check_time(due, 60, T0) == due + timedelta(seconds=60)
+
+    def test_missed_slots_are_skipped_not_replayed(self) -> None:
+        due = T0 - timedelta(seconds=250)
+        nxt = next_check_time(due, 60, T0)
+        assert nxt == due + timedelta(seconds=300)
+        assert nxt > T0
+
+    def test_exactly_on_slot_moves_to_next_slot(self) -> None:
+        assert next_check_time(T0, 60, T0) == T0 + timedelta(seconds=60)
+
+    def test_interval_is_clamped_to_minimum(self) -> None:
+        assert next_check_time(None, 1, T0) == T0 + timedelta(seconds=30)
+
+
+class TestRunEvaluator:
+    async def test_overrun_becomes_triggered_timeout(self, monkeypatch) -> None:
+        async def slow(config: dict[str, Any]) -> dict[str, Any]:
+            await asyncio.sleep(5)
+            return {"triggered": False}
+
+        monkeypatch.setitem(heartbeat._EVALUATORS, "api_health", slow)
+        result = await _run_evaluator(_hb(), asyncio.Semaphore(1), 0.01)
+        assert result["triggered"] is True
+        assert result["error"] == "evaluation_timeout"
+
+    async def test_concurrency_is_bounded_by_semaphore(self, monkeypatch) -> None:
+        active = peak = 0
+
+        async def tracked(config: dict[str, Any]) -> dict[str, Any]:
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return {"triggered": False}
+
+        monkeypatch.setitem(heartbeat._EVALUATORS, "api_health", tracked)
+        sem = asyncio.Semaphore(3)
+        results = await asyncio.gather(*(_run_evaluator(_hb(), sem, 1.0) for _ in range(10)))
+        assert len(results) == 10
+        assert peak == 3
+
+    async def test_custom_checks_receive_workspace_id(self, monkeypatch) -> None:
+        seen: dict[str, Any] = {}
+
+        async def capture(config: dict[str, Any]) -> dict[str, Any]:
+            seen.update(config)
+            return {"triggered": False}
+
+        monkeypatch.setitem(heartbeat._EVALUATORS, "custom", capture)
+        await _run_evaluator(_hb("custom", script_path="x.py"), asyncio.Semaphore(1), 1.0)
+        assert seen == {"script_path": "x.py", "workspace_id": "ws-1"}
+
+    async def test_unexpected_errors_propagate(self, monkeypatch) -> None:
+        async def broken(config: dict[str, Any]) -> dict[str, Any]:
+            raise RuntimeError("boom")
+
+        monkeypatch.setitem(heartbeat._EVALUATORS, "api_health", broken)
+        with pytest.raises(RuntimeError):
+            await _run_evaluator(_hb(), asyncio.Semaphore(1), 1.0)
+
+
+class _Session:
+    """Stands in for AsyncSessionLocal: serves *due* rows, records writes."""
+
+    def __init__(self, due: list[Any]) -> None:
+        self.due = due
+        self.writes: list[tuple[Any, Any]] = []
+
+    def __call__(self) -> _Session:
+        return self
+
+    async def __aenter__(self) -> _Session:
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        return None
+
+    async def execute(self, stmt: Any, params: Any = None) -> Any:
+        if params is None:
+            return SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: self.due))
+        self.writes.append((stmt, params))
+
+    async def commit(self) -> None:
+        return None
+
+
+class TestEvaluateDue:
+    async def test_status_update_is_guarded_by_previous_status(self, monkeypatch) -> None:
+        import lucy.db
+        from lucy.db.models import HeartbeatStatus
+
+        async def healthy(config: dict[str, Any]) -> dict[str, Any]:
+            return {"triggered": False}
+
+        hb = SimpleNamespace(
+            **vars(_hb()), id=1, name="api", next_check_at=T0, last_check_at=T0,
+            check_interval_seconds=60, check_count=3, trigger_count=1, last_alert_at=T0,
+            alert_cooldown_seconds=300, current_status=HeartbeatStatus.TRIGGERED,
+        )
+        session = _Session([hb])
+        monkeypatch.setattr(lucy.db, "AsyncSessionLocal", session)
+        monkeypatch.setitem(heartbeat._EVALUATORS, "api_health", healthy)
+        assert await heartbeat.evaluate_due_heartbeats(None) == 1
+
+        [(stmt, [row])] = session.writes
+        assert "current_status = :previous_status" in str(stmt)
+        assert row["previous_status"] == HeartbeatStatus.TRIGGERED
+        assert row["current_status"] == HeartbeatStatus.HEALTHY
+
+
+@pytest.fixture
+def serve(monkeypatch):
+    """Route the shared evaluator client through a handler; record requests."""
+    seen: list[httpx.Request] = []
+
+    def install(handler):
+        def wrapped(request: httpx.Request) -> httpx.Response:
+            seen.append(request)
+            return handler(request)
+
+        monkeypatch.setattr(
+            heartbeat, "_http_client",
+            httpx.AsyncClient(transport=httpx.MockTransport(wrapped)),
+        )
+        return seen
+
+    return install
+
+
+class _Chunks:
+    """Async byte stream that records how much of it was consumed."""
+
+    def __init__(self, *chunks: bytes) -> None:
+        self.chunks = chunks
+        self.sent = 0
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            self.sent += 1
+            yield chunk
+
+
+class TestConditionalFetch:
+    async def test_validators_and_digest_are_stored(self, serve) -> None:
+        serve(lambda r: httpx.Response(
+            200, headers={"ETag": '"v1"', "Last-Modified": "Sat, 17 Oct 2026 10:00:00 GMT"},
+            text="<h1>In stock</h1>",
+        ))
+        result = await _eval_page_content({"url": "https://x.test", "not_contains": "Sold out"})
+        assert result["triggered"] is False
+        assert result["etag"] == '"v1"'
+        assert result["last_modified"] == "Sat, 17 Oct 2026 10:00:00 GMT"
+        assert len(result["content_digest"]) == 32
+
+    async def test_304_repeats_previous_verdict(self, serve) -> None:
+        seen = serve(lambda r: httpx.Response(304))
+        previous = {
+            "triggered": True, "detail": "Expected text 'In stock' not found on page",
+            "status_code": 200, "etag": '"v1"', "content_digest": "abc",
+        }
+        result = await _eval_page_content(
+            {"url": "https://x.test", "contains": "In stock", "_previous_result": previous}
+        )
+        assert seen[0].headers["If-None-Match"] == '"v1"'
+        assert result["not_modified"] is True
+        assert result["triggered"] is True
+        assert result["content_digest"] == "abc"
+
+    async def test_errors_are_not_used_as_validators(self, serve) -> None:
+        seen = serve(lambda r: httpx.Response(200, text="ok"))
+        previous = {"triggered": True, "error": "timeout", "etag": '"stale"'}
+        await _eval_page_content({"url": "https://x.test", "_previous_result": previous})
+        assert "If-None-Match" not in seen[0].headers
+
+    async def test_stream_stops_once_not_contains_is_found(self, serve) -> None:
+        body = _Chunks(b"<p>Sold ", b"out</p>", b"x" * 1000, b"y" * 1000)
+        serve(lambda r: httpx.Response(200, content=body))
+        result = await _eval_page_content({"url": "https://x.test", "not_contains": "Sold out"})
+        assert result["triggered"] is True
+        assert result["stopped_early"] is True
+        assert "content_digest" not in result
+        assert body.sent == 2
+
+    async def test_stream_stops_once_contains_is_satisfied(self, serve) -> None:
+        body = _Chunks(b"<p>In stock</p>", b"x" * 1000)
+        serve(lambda r: httpx.Response(200, content=body))
+        result = await _eval_page_content({"url": "https://x.test", "contains": "In stock"})
+        assert result["triggered"] is False
+        assert body.sent == 1
+
+    async def test_contains_missing_reads_whole_page(self, serve) -> None:
+        serve(lambda r: httpx.Response(200, content=_Chunks(b"a" * 10, b"b" * 10)))
+        result = await _eval_page_content({"url": "https://x.test", "contains": "zzz"})
+        assert result["triggered"] is True
+        assert result["content_length"] == 20
+
+    async def test_regex_still_sees_whole_body(self, serve) -> None:
+        serve(lambda r: httpx.Response(200, content=_Chunks(b"price: ", b"$42")))
+        result = await _eval_page_content(
+            {"url": "https://x.test", "contains": "price", "regex": r"\$\d+"}
+        )
+        assert result["triggered"] is True
+        assert "$42" in result["detail"]
+
+    async def test_api_health_304_keeps_previous_status(self, serve) -> None:
+        serve(lambda r: httpx.Response(304, headers={"ETag": '"v2"'}))
+        previous = {"triggered": False, "status_code": 200, "etag": '"v1"'}
+        result = await _eval_api_health({"url": "https://x.test", "_previous_result": previous})
+        assert result["triggered"] is False
+        assert result["status_code"] == 200
+        assert result["etag"] == '"v2"'
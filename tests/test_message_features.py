@@ -0,0 +1,113 @@
+"""Shared message features: one scan per message, same verdicts as each pattern.
+
+Run: pytest tests/test_message_features.py -v
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from lucy.pipeline import features
+from lucy.pipeline.fast_path import evaluate_fast_path
+from lucy.pipeline.features import extract_features
+from lucy.pipeline.router import classify_and_route
+from lucy.slack.reactions import classify_reaction
+from lucy.workspace.memory import (
+    classify_memory_category,
+    classify_memory_target,
+    should_persist_memory,
+)
+from lucy.workspace.skills import detect_relevant_skills
+
+_CORPUS_PATH = Path(__file__).parent / "fixtures" / "message_corpus.jsonl"
+_CASES: list[dict[str, Any]] = [
+    json.loads(line) for line in _CORPUS_PATH.read_text().splitlines() if line.strip()
+]
+_ADVERSARIAL = [
+    "",
+    "   ",
+    "h",
+    "  hey  \n",
+    "İNVESTİGATE the ſcheduled ınvoice",
+    "PR #42 needs review, pr is lowercase here",
+    "thanks!!!   ",
+    "e.g. test@example.com is a sample",
+    "research research research compare analyze",
+    "I'm the head of growth and we decided to ship by Friday",
+    "x" * 5000 + " deploy the schedule",
+]
+_TEXTS = [case["text"] for case in _CASES] + _ADVERSARIAL
+_ALL = _TEXTS + [t.upper() for t in _TEXTS] + [t.lower() for t in _TEXTS]
+
+
+def _expected_bits(text: str) -> int:
+    text = text.strip()
+    bits = 0
+    for i, (pattern, bit) in enumerate(features._RULES):
+        if (pattern.match if features._ANCHORED[i] else pattern.search)(text):
+            bits |= bit
+    return bits
+
+
+class TestExtraction:
+    def test_bits_match_each_pattern(self) -> None:
+        for text in _ALL:
+            assert extract_features(text).bits == _expected_bits(text), text[:60]
+
+    def test_research_light_counts_keywords(self) -> None:
+        text = "research research research compare analyze"
+        assert extract_features(text).research_light == len(
+            features._RESEARCH_LIGHT.findall(text)
+        )
+
+    def test_surrounding_whitespace_is_ignored(self) -> None:
+        assert extract_features("  thanks!\n") is extract_features("thanks!")
+
+    def test_skill_scores(self) -> None:
+        scores = extract_features("export the spreadsheet as a pdf report").skill_scores
+        assert scores == {"pdf-creation": 2, "excel-editing": 1}
+
+    def test_every_pattern_has_a_prefilter_or_always_runs(self) -> None:
+        for i in range(len(features._RULES)):
+            bit = 1 << i
+            assert features._ALWAYS & bit or any(m & bit for m in features._UNLOCKS.values())
+
+
+class TestCorpus:
+    @pytest.mark.parametrize("case", _CASES, ids=lambda c: c["text"][:40])
+    def test_labels(self, case: dict[str, Any]) -> None:
+        text = case["text"]
+        depth = case.get("thread_depth", 0)
+        choice = classify_and_route(text, depth, case.get("prev_had_tool_calls", False))
+        fast = evaluate_fast_path(text, depth, depth > 0)
+        reaction = classify_reaction(text)
+        assert (choice.intent, choice.tier) == (case["intent"], case["tier"])
+        assert (fast.reason if fast.is_fast else None) == case["fast_path"]
+        assert (reaction.emoji, reaction.react_only) == (case["reaction"], case["react_only"])
+        assert should_persist_memory(text) == case["persist"]
+        assert detect_relevant_skills(text) == case["skills"]
+
+    def test_memory_classifiers(self) -> None:
+        text = "I'm the head of growth and we decided to ship by Friday"
+        assert classify_memory_target(text) == "team"
+        assert classify_memory_category(text) == "decisions"
+        assert classify_memory_target("our company sells to enterprises") == "company"
+        assert classify_memory_category("our company sells to enterprises") == "facts"
+        assert classify_memory_category("our roadmap has three phases") == "project_context"
+        assert classify_memory_target("just some text") == "session"
+        assert classify_memory_category("just some text") == "general"
+
+    def test_per_message_latency(self) -> None:
+        texts = [case["text"] for case in _CASES]
+        extract = features._extract.__wrapped__
+        started = time.perf_counter()
+        for text in texts:
+            extract(text.strip())
+        per_message_ms = (time.perf_counter() - started) * 1000 / len(texts)
+        # ~0.06 ms here; the bound only catches a prefilter that stopped working.
+        assert per_message_ms < 2.0
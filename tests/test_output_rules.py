@@ -0,0 +1,130 @@
+"""Prefiltered output rule sets: literal extraction and sequential equivalence.
+
+Run: pytest tests/test_output_rules.py -v
+"""
+
+from __future__ import annotations
+
+import re
+from pathlib import Path
+
+import pytest
+
+from lucy.pipeline import content_classifier, output, rules
+from lucy.pipeline.rules import RuleSet, fold, required_literals
+
+_CORPUS = sorted((Path(__file__).parent / "fixtures" / "output_corpus").glob("*.md"))
+_TEXTS = [p.read_text() for p in _CORPUS]
+_ADVERSARIAL = [
+    "",
+    "   ",
+    "COMPOSIO_SEARCH_TOOLS then composio then Composio.dev",
+    "OPENROUTER and ſk_live and DELVE ınto the SEAMLESS robust İntegration",
+    "Bearer abcdefghijklmnopqrstuvwxyz and Bearer short",
+    "**bold** **https://x.io** ****\n\n\n\n# Title\n*https://y.io*",
+    "<https://calendar.|link> and [x](https://ab. ) and <https://ab.>",
+    "I hope this helps!!! Let me know if you have any questions — really.",
+]
+_ALL = _TEXTS + [t.upper() for t in _TEXTS] + _ADVERSARIAL
+
+_RULE_SETS = {
+    "sanitize": output._SANITIZE_RULES,
+    "broken_urls": output._BROKEN_URL_RULES,
+    "markdown": output._MARKDOWN_RULES,
+    "tone": output._TONE_RULES,
+    "regex_deai": output._DEAI_RULES,
+}
+
+
+def _sequential(rules: RuleSet, text: str) -> str:
+    for pattern, repl in rules.rules:
+        text = pattern.sub(repl, text)
+    return text
+
+
+class TestRequiredLiterals:
+    def test_literal_run(self) -> None:
+        assert required_literals(re.compile(r"sk_live_[A-Za-z0-9]{20,}")) == {"sk_live_"}
+
+    def test_alternation_is_any_of(self) -> None:
+        pattern = re.compile(r"\b(?:delve|tapestry)\b", re.IGNORECASE)
+        assert required_literals(pattern) == {"delve", "tapestry"}
+
+    def test_case_sensitive_keeps_case(self) -> None:
+        assert required_literals(re.compile(r"COMPOSIO_\w+")) == {"COMPOSIO_"}
+        assert required_literals(re.compile(r"(?i)\bOpenRouter\b")) == {"openrouter"}
+
+    def test_optional_parts_are_not_required(self) -> None:
+        pattern = re.compile(r"(?:using |via )?COMPOSIO_REMOTE_WORKBENCH")
+        assert required_literals(pattern) == {"COMPOSIO_REMOTE_WORKBENCH"}
+
+    def test_nothing_provable(self) -> None:
+        assert required_literals(re.compile(r"\s+")) is None
+        assert required_literals(re.compile(r"(?:a|\d)")) is None
+
+    def test_fold_matches_re_ignorecase(self) -> None:
+        for char, ascii_char in (("ı", "i"), ("ſ", "s"), ("İ", "i"), ("K", "k")):
+            assert re.search(f"(?i){ascii_char}", char)
+            assert ascii_char in fold(char)
+
+    def test_no_prefilter_without_the_parser(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        assert rules._parser_works()
+        monkeypatch.setattr(rules, "sre_parse", None)
+        assert not rules._parser_works()
+        monkeypatch.setattr(rules, "_PARSER_OK", False)
+        assert required_literals(re.compile(r"COMPOSIO_\w+")) is None
+        chain = RuleSet(output._SANITIZE_RULES.rules)
+        assert chain.live("") == list(range(len(chain.rules)))
+        for text in _ALL:
+            assert chain.sub(text) == _sequential(chain, text)
+
+
+class TestRuleSetEquivalence:
+    @pytest.mark.parametrize("name", sorted(_RULE_SETS))
+    def test_sub_matches_sequential_chain(self, name: str) -> None:
+        rules = _RULE_SETS[name]
+        for text in _ALL:
+            assert rules.sub(text) == _sequential(rules, text)
+
+    def test_skips_rules_without_literals(self) -> None:
+        rules = RuleSet([(re.compile(r"foo\d"), "X"), (re.compile(r"bar"), "foo1")])
+        assert rules.live("nothing here") == []
+        # A later rule can introduce an earlier rule's literal; order still holds.
+        assert rules.sub("bar") == "foo1"
+
+    def test_ai_tells_match_pattern_scan(self) -> None:
+        for text in _ALL:
+            expected = [
+                (m.group(0), weight, category)
+                for pattern, weight, category in output._AI_TELL_PATTERNS
+                for m in pattern.finditer(text)
+            ]
+            assert output._detect_ai_tells(text) == expected
+
+    async def test_deai_without_tells_is_unchanged(self) -> None:
+        text = next(t for p, t in zip(_CORPUS, _TEXTS, strict=True) if p.stem == "plain_answer")
+        assert not output._detect_ai_tells(text)
+        assert await output._deai(text) == text
+
+
+class TestInternalContent:
+    def test_full_line_patterns(self) -> None:
+        for line in ("Self-correction: fixed it", "  Note to self: ping", "RESPONSE_OK"):
+            assert content_classifier._is_internal_line(line)
+        assert not content_classifier._is_internal_line("Remember, the deadline is Friday")
+
+    def test_leaked_planning_is_stripped(self) -> None:
+        text = next(t for p, t in zip(_CORPUS, _TEXTS, strict=True) if p.stem == "leaked_planning")
+        cleaned = content_classifier.strip_internal_content(text)
+        for leaked in ("<planning>", "Self-correction", "Note to self", "RESPONSE_OK",
+                       "Per my instructions"):
+            assert leaked not in cleaned
+        assert "MOB-412" in cleaned and "Want me to assign" in cleaned
+
+    def test_prefiltered_paragraphs_match_full_scan(self) -> None:
+        for text in _ALL:
+            live = content_classifier._META_RULES.live(text)
+            for para in re.split(r"\n\n+", text):
+                assert content_classifier._is_internal_paragraph(para, live) == (
+                    content_classifier._is_internal_paragraph(para)
+                )
@@ -0,0 +1,227 @@
+"""Streaming execution output: head/tail buffering, progress and early stops.
+
+Run: pytest tests/test_output_stream.py -v
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+from lucy.tools.code_validator import fatal_error_kind
+from lucy.workspace import executor, output_stream, python_pool
+from lucy.workspace.output_stream import (
+    FailureWatch,
+    HeadTailBuffer,
+    OutputSink,
+    latest_output,
+    stream_process,
+)
+from lucy.workspace.python_pool import PythonWorkerPool
+
+_LOOPING_FAILURE = (
+    "import time, traceback\n"
+    "for row in range(1000):\n"
+    "    try:\n"
+    "        {}['id']\n"
+    "    except KeyError:\n"
+    "        traceback.print_exc()\n"
+    "    time.sleep(0.05)\n"
+)
+
+
+class TestHeadTailBuffer:
+    def test_small_output_is_kept_whole(self) -> None:
+        buf = HeadTailBuffer(100)
+        buf.append("hello ")
+        buf.append("world")
+        assert buf.getvalue() == "hello world"
+
+    def test_keeps_head_and_tail(self) -> None:
+        buf = HeadTailBuffer(20)
+        for i in range(100):
+            buf.append(f"{i:03d}\n")
+        value = buf.getvalue()
+        assert value.startswith("000\n001\n00")
+        assert value.endswith("098\n099\n")
+        assert "[380 chars omitted]" in value
+
+    def test_single_huge_chunk(self) -> None:
+        buf = HeadTailBuffer(10)
+        buf.append("a" * 5 + "b" * 1000 + "c" * 5)
+        assert buf.getvalue() == "aaaaa\n... [1000 chars omitted] ...\nccccc"
+
+
+class TestFailureWatch:
+    def test_fatal_error_kinds(self) -> None:
+        assert fatal_error_kind("KeyError: 'id'") == "KeyError"
+        assert fatal_error_kind("json.decoder.JSONDecodeError: Expecting value") == (
+            "JSONDecodeError"
+        )
+        assert fatal_error_kind("    raise KeyError('id')") is None
+        assert fatal_error_kind("ValueError: other") is None
+
+    def test_stops_on_repeated_error(self) -> None:
+        watch = FailureWatch(repeats=3)
+        assert watch.feed_line("KeyError: 'id'") is None
+        assert watch.feed_line("NameError: name 'x' is not defined") is None
+        assert watch.feed_line("KeyError: 'id'") is None
+        assert watch.feed_line("KeyError: 'name'") == "KeyError repeated 3 times"
+
+    def test_command_not_found(self) -> None:
+        watch = FailureWatch(repeats=2)
+        assert watch.feed_line("/bin/sh: 1: jq: not found") is None
+        assert "command not found (jq)" in watch.feed_line("/bin/sh: 1: jq: not found")
+
+    def test_disabled(self) -> None:
+        watch = FailureWatch(repeats=0)
+        assert all(watch.feed_line("KeyError: 'id'") is None for _ in range(10))
+
+    def test_stdout_progress_resets_count(self) -> None:
+        sink = OutputSink(None, "script", repeats=2)
+        assert sink.feed("stderr", "KeyError: 'a'\n") is None
+        assert sink.feed("stdout", "row 1 done\n") is None
+        assert sink.feed("stderr", "KeyError: 'b'\n") is None
+        assert sink.feed("stderr", "KeyError: 'c'\n") == "KeyError repeated 2 times"
+
+    def test_disabled_by_default(self) -> None:
+        sink = OutputSink(None, "script")
+        assert all(sink.feed("stderr", "KeyError: 'id'\n") is None for _ in range(10))
+
+    def test_sink_splits_lines_across_chunks(self) -> None:
+        sink = OutputSink(None, "script", repeats=2)
+        assert sink.feed("stderr", "KeyErr") is None
+        assert sink.feed("stderr", "or: 'a'\nKeyError: 'b'") is None
+        assert sink.feed("stderr", "\n") == "KeyError repeated 2 times"
+        result = sink.to_result(None, "local_python")
+        assert not result.success and result.error.startswith("Stopped early after")
+
+
+class TestStreamProcess:
+    async def test_chunks_arrive_before_exit(self) -> None:
+        proc = await asyncio.create_subprocess_exec(
+            sys.executable, "-u", "-c",
+            "import time\nprint('first')\ntime.sleep(1)\nprint('second')",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        t0 = time.monotonic()
+        seen = ""
+        async for chunk in stream_process(proc, timeout=10):
+            assert chunk.stream == "stdout"
+            seen += chunk.text
+            if seen == "first\n":
+                break
+        assert seen == "first\n" and time.monotonic() - t0 < 0.9
+        proc.kill()
+        await proc.wait()
+
+    async def test_deadline(self) -> None:
+        proc = await asyncio.create_subprocess_exec(
+            sys.executable, "-c", "import time; time.sleep(30)",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        with pytest.raises(TimeoutError):
+            async for _ in stream_process(proc, timeout=0.2):
+                pass
+        proc.kill()
+        await proc.wait()
+
+
+class TestLocalExecution:
+    @pytest.fixture(autouse=True)
+    def _workspace(self, tmp_path, monkeypatch) -> None:
+        from lucy.config import settings
+
+        monkeypatch.setattr(settings, "workspace_root", tmp_path)
+        (tmp_path / "ws").mkdir()
+        monkeypatch.setattr(python_pool, "_pool", None)
+        monkeypatch.setattr(settings, "python_pool_enabled", False)
+
+    async def test_failing_loop_stops_early(self, monkeypatch) -> None:
+        from lucy.config import settings
+
+        monkeypatch.setattr(settings, "exec_early_stop_repeats", 3)
+        t0 = time.monotonic()
+        result = await executor._execute_local_python("ws", _LOOPING_FAILURE, timeout=30)
+        assert time.monotonic() - t0 < 10
+        assert not result.success and result.exit_code == 1
+        assert result.error.startswith("Stopped early after")
+        assert "KeyError repeated 3 times" in result.error
+
+    async def test_handled_exceptions_run_to_completion(self) -> None:
+        code = (
+            "import traceback\n"
+            "done = 0\n"
+            "for row in [{}, {}, {}] + [{'id': i} for i in range(7)]:\n"
+            "    try:\n"
+            "        row['id']\n"
+            "        done += 1\n"
+            "    except KeyError:\n"
+            "        traceback.print_exc()\n"
+            "print(f'processed {done}')\n"
+        )
+        result = await executor._execute_local_python("ws", code, timeout=30)
+        assert result.success and result.output == "processed 7\n"
+        assert result.error.count("KeyError") >= 3
+
+    async def test_timeout_keeps_partial_output(self) -> None:
+        code = "import time\nprint('loaded 10 rows')\ntime.sleep(30)"
+        result = await executor._execute_local_python("ws", code, timeout=1)
+        assert result.exit_code == 124
+        assert result.output == "loaded 10 rows\n"
+        assert result.error.startswith("Execution timed out after 1s")
+
+    async def test_bash_streams(self) -> None:
+        command = "echo one; echo two >&2"
+        result = await executor._execute_local_bash(command, 10, workspace_id="ws")
+        assert result.success and result.output == "one\n" and result.error == "two\n"
+
+    async def test_progress_while_running(self) -> None:
+        from lucy.slack.handlers import _build_progress_message
+
+        code = "import time\nprint('step 1 of 3')\ntime.sleep(30)"
+        task = asyncio.create_task(executor._execute_local_python("ws", code, timeout=30))
+        try:
+            for _ in range(100):
+                if latest_output("ws") is not None:
+                    break
+                await asyncio.sleep(0.05)
+            message = _build_progress_message("ws")
+            assert "Python script" in message and "`step 1 of 3`" in message
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        assert "ws" not in output_stream._live
+
+
+@pytest.mark.skipif(not hasattr(os, "fork") or sys.platform == "darwin", reason="needs fork()")
+class TestPooledStreaming:
+    @pytest.fixture
+    async def pool(self):
+        made = PythonWorkerPool(size=1, preload=["json"])
+        assert await made.wait_ready()
+        yield made
+        await made.close()
+
+    async def test_streamed_result_matches(self, pool, tmp_path) -> None:
+        sink = OutputSink(None, "Python script")
+        code = "import sys\nprint('out')\nprint('err', file=sys.stderr)\nsys.exit(3)"
+        result = await pool.run(code, cwd=str(tmp_path), timeout=10, sink=sink)
+        assert result.output == "out\n" and result.error == "err\n" and result.exit_code == 3
+
+    async def test_early_stop_retires_worker(self, pool, tmp_path) -> None:
+        sink = OutputSink(None, "Python script", repeats=3)
+        t0 = time.monotonic()
+        result = await pool.run(_LOOPING_FAILURE, cwd=str(tmp_path), timeout=30, sink=sink)
+        assert time.monotonic() - t0 < 10
+        assert "KeyError repeated 3 times" in result.error
+        assert pool.get_stats()["recycled"] == 1
+        assert await pool.wait_ready()
+        after = await pool.run("print(1)", cwd=str(tmp_path), timeout=10)
+        assert after.output == "1\n"
@@ -0,0 +1,84 @@
+"""Incremental request body encoder for OpenClawClient.
+
+Run: pytest tests/test_payload_encoder.py -v
+"""
+
+from __future__ import annotations
+
+import json
+
+from lucy.core.payload import PayloadEncoder, encode_json
+
+
+def _build(encoder: PayloadEncoder, messages, tools=None, **kw):
+    return encoder.build(
+        model="m",
+        system_prompt=kw.pop("system_prompt", "SOUL"),
+        messages=messages,
+        temperature=0.7,
+        max_tokens=100,
+        tools=tools,
+        **kw,
+    )
+
+
+class TestPayloadEncoder:
+    def test_body_is_valid_json_with_expected_fields(self) -> None:
+        msgs = [{"role": "user", "content": "héllo"}]
+        tools = [{"type": "function", "function": {"name": "t", "parameters": {}}}]
+        body = _build(PayloadEncoder(), msgs, tools, provider={"order": ["x"]}, stream=True)
+        data = json.loads(body)
+        assert data["messages"][0] == {"role": "system", "content": "SOUL"}
+        assert data["messages"][1]["content"] == "héllo"
+        assert data["tools"] == tools
+        assert data["tool_choice"] == "auto"
+        assert data["provider"] == {"order": ["x"]}
+        assert data["stream"] is True
+
+    def test_output_is_deterministic_regardless_of_key_order(self) -> None:
+        a = [{"role": "user", "content": "x", "name": "u"}]
+        b = [{"name": "u", "content": "x", "role": "user"}]
+        assert _build(PayloadEncoder(), a) == _build(PayloadEncoder(), b)
+
+    def test_prefix_is_byte_stable_across_turns(self) -> None:
+        enc = PayloadEncoder()
+        msgs = [{"role": "user", "content": "first"}]
+        first = _build(enc, msgs)
+        msgs.append({"role": "assistant", "content": "second"})
+        second = _build(enc, msgs)
+        prefix = first[: first.index(b"]")]
+        assert second.startswith(prefix)
+
+    def test_messages_are_encoded_once(self) -> None:
+        enc = PayloadEncoder()
+        msg = {"role": "user", "content": "x"}
+        assert enc.encode_message(msg) is enc.encode_message(msg)
+
+    def test_replaced_content_is_reencoded(self) -> None:
+        enc = PayloadEncoder()
+        msg = {"role": "tool", "content": "long output"}
+        enc.encode_message(msg)
+        msg["content"] = "short"
+        assert json.loads(enc.encode_message(msg))["content"] == "short"
+
+    def test_tools_serialized_once_until_list_changes(self) -> None:
+        enc = PayloadEncoder()
+        tools = [{"function": {"name": "a"}}]
+        first = enc.encode_tools(tools)
+        assert enc.encode_tools(list(tools)) is first
+        tools.append({"function": {"name": "b"}})
+        assert json.loads(enc.encode_tools(tools)) == tools
+
+    def test_forget_drops_trimmed_messages(self) -> None:
+        enc = PayloadEncoder()
+        keep = {"role": "user", "content": "keep"}
+        drop = {"role": "tool", "content": "drop"}
+        _build(enc, [keep, drop])
+        enc.forget([keep])
+        assert len(enc._messages) == 1
+
+    def test_encode_json_matches_sorted_compact_dumps(self) -> None:
+        value = {"b": 1, "a": [1.5, "ü"]}
+        assert encode_json(value) == json.dumps(
+            value, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+        ).encode()
@@ -0,0 +1,204 @@
+"""Progressive replies: incremental output pipeline and coalesced chat.update.
+
+Run: pytest tests/test_progressive_reply.py -v
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any
+
+import httpx
+import pytest
+
+from lucy.config import settings
+from lucy.core.openclaw import OpenClawClient
+from lucy.infra import rate_limiter
+from lucy.pipeline.output import IncrementalOutput, process_output_sync
+from lucy.slack.rich_output import ProgressiveReply
+
+
+def _feed_all(out: IncrementalOutput, text: str, step: int = 5) -> None:
+    for i in range(0, len(text), step):
+        out.feed(text[i:i + step])
+
+
+class _FakeSlack:
+    def __init__(self, fail_first_update: Exception | None = None) -> None:
+        self.calls: list[tuple[str, dict[str, Any]]] = []
+        self._fail = fail_first_update
+
+    async def chat_postMessage(self, **kwargs: Any) -> dict[str, Any]:
+        self.calls.append(("post", kwargs))
+        return {"ok": True, "ts": "111.222"}
+
+    async def chat_update(self, **kwargs: Any) -> dict[str, Any]:
+        if self._fail is not None:
+            exc, self._fail = self._fail, None
+            raise exc
+        self.calls.append(("update", kwargs))
+        return {"ok": True}
+
+    async def chat_delete(self, **kwargs: Any) -> dict[str, Any]:
+        self.calls.append(("delete", kwargs))
+        return {"ok": True}
+
+
+class _RateLimitedError(Exception):
+    def __init__(self, retry_after: str) -> None:
+        super().__init__("ratelimited")
+        self.response = type("R", (), {"status_code": 429, "headers": {"Retry-After": retry_after}})
+
+
+class TestIncrementalOutput:
+    def test_waits_for_paragraph_break(self) -> None:
+        out = IncrementalOutput()
+        assert not out.feed("The **numbers** are in.")
+        assert out.feed("\n\nMore")
+        assert out.text == "The *numbers* are in."
+
+    def test_code_block_is_kept_whole(self) -> None:
+        out = IncrementalOutput()
+        code = "```\nCOMPOSIO_SEARCH_TOOLS\n\nprint(1)\n```"
+        _feed_all(out, f"Intro.\n\n{code}\n\nAfter.\n\n")
+        assert out.text == f"Intro.\n\n{code}\n\nAfter."
+
+    def test_internal_block_is_held_back(self) -> None:
+        out = IncrementalOutput()
+        _feed_all(out, "<planning>\nStep one.\n\nStep two.\n")
+        assert out.text == ""
+        _feed_all(out, "</planning>\n\nHere you go.\n\n")
+        assert out.text == "Here you go."
+
+    def test_fully_internal_block_is_dropped(self) -> None:
+        out = IncrementalOutput()
+        _feed_all(out, "Answer.\n\nSelf-correction: recheck totals\n\nMore answer.\n\n")
+        assert out.text == "Answer.\n\nMore answer."
+
+    def test_matches_full_pipeline_per_paragraph(self) -> None:
+        text = "## Summary\n\n| a | b |\n|---|---|\n| 1 | 2 |\n\nSee https://example.com."
+        out = IncrementalOutput()
+        _feed_all(out, text)
+        out.flush()
+        assert out.text == process_output_sync(text)
+
+    def test_reset(self) -> None:
+        out = IncrementalOutput()
+        _feed_all(out, "Let me check that.\n\n")
+        out.reset()
+        assert out.text == ""
+
+
+class TestProgressiveReply:
+    @pytest.fixture(autouse=True)
+    def _fast(self, monkeypatch) -> None:
+        monkeypatch.setattr(settings, "slack_stream_update_interval_s", 0.05)
+        monkeypatch.setattr(settings, "slack_stream_min_chars", 20)
+        monkeypatch.setattr(rate_limiter, "_limiter", None)
+
+    async def test_coalesces_updates(self) -> None:
+        slack = _FakeSlack()
+        reply = ProgressiveReply(slack, "C1", "1.0", "W1")
+        for i in range(40):
+            reply.feed(f"Paragraph number {i} of the report.\n\n")
+        await asyncio.sleep(0.2)
+        remaining = await reply.finish("Final answer text that replaces the draft.")
+        assert remaining == []
+        kinds = [kind for kind, _ in slack.calls]
+        assert kinds[0] == "post" and kinds.count("post") == 1
+        assert len(slack.calls) < 10
+        assert slack.calls[-1] == ("update", {
+            "channel": "C1", "ts": "111.222", "blocks": [],
+            "text": "Final answer text that replaces the draft.",
+        })
+
+    async def test_short_answer_is_not_streamed(self) -> None:
+        slack = _FakeSlack()
+        reply = ProgressiveReply(slack, "C1", "1.0")
+        reply.feed("Sure.\n\n")
+        await asyncio.sleep(0.1)
+        assert await reply.finish("Sure.") == ["Sure."]
+        assert slack.calls == []
+
+    async def test_retry_after_on_429(self) -> None:
+        slack = _FakeSlack(fail_first_update=_RateLimitedError("0.2"))
+        reply = ProgressiveReply(slack, "C1", "1.0")
+        reply.feed("First paragraph of a long answer.\n\n")
+        await asyncio.sleep(0.1)
+        reply.feed("Second paragraph of a long answer.\n\n")
+        await asyncio.sleep(0.1)
+        assert [k for k, _ in slack.calls] == ["post"]
+        await asyncio.sleep(0.25)
+        assert [k for k, _ in slack.calls] == ["post", "update"]
+        await reply.discard()
+
+    async def test_discard_deletes_draft(self) -> None:
+        slack = _FakeSlack()
+        reply = ProgressiveReply(slack, "C1", "1.0")
+        reply.feed("A draft paragraph that is long enough.\n\n")
+        await asyncio.sleep(0.1)
+        await reply.discard()
+        await reply.discard()
+        assert [k for k, _ in slack.calls] == ["post", "delete"]
+
+    async def test_reset_with_pending_update_removes_narration(self) -> None:
+        slack = _FakeSlack()
+        reply = ProgressiveReply(slack, "C1", "1.0")
+        reply.feed("Let me look that up in the tracker.\n\n")
+        await asyncio.sleep(0.01)
+        reply.feed("Checking the open issues first.\n\n")  # Waits out the interval
+        reply.reset()
+        await asyncio.sleep(0.1)
+        assert [k for k, _ in slack.calls] == ["post", "delete"]
+
+        reply.feed("Here is the answer you asked for.\n\n")
+        await asyncio.sleep(0.1)
+        assert await reply.finish("Here is the answer you asked for.") == []
+        assert [k for k, _ in slack.calls] == ["post", "delete", "post", "update"]
+        assert all(kw.get("text") for k, kw in slack.calls if k != "delete")
+
+
+class _Sink:
+    def __init__(self) -> None:
+        self.events: list[str] = []
+
+    def feed(self, text: str) -> None:
+        self.events.append(text)
+
+    def reset(self) -> None:
+        self.events.append("<reset>")
+
+
+def _sse(*deltas: dict[str, Any]) -> bytes:
+    lines = [
+        "data: " + json.dumps({"choices": [{"delta": d}]}) for d in deltas
+    ]
+    return ("\n\n".join(lines) + "\n\ndata: [DONE]\n\n").encode()
+
+
+class TestStreamingSink:
+    async def _run(self, body: bytes) -> _Sink:
+        client = OpenClawClient.__new__(OpenClawClient)
+        client._client = httpx.AsyncClient(
+            base_url="https://llm.test",
+            transport=httpx.MockTransport(lambda request: httpx.Response(200, content=body)),
+        )
+        sink = _Sink()
+        try:
+            await client._stream_completion(b"{}", "test/model", content_sink=sink)
+        finally:
+            await client._client.aclose()
+        return sink
+
+    async def test_answer_deltas_are_forwarded(self) -> None:
+        sink = await self._run(_sse({"content": "Hel"}, {"content": "lo"}))
+        assert sink.events == ["<reset>", "Hel", "lo"]
+
+    async def test_tool_call_turn_resets(self) -> None:
+        sink = await self._run(_sse(
+            {"content": "Let me check."},
+            {"tool_calls": [{"index": 0, "id": "c1", "function": {"name": "x"}}]},
+            {"content": " more"},
+        ))
+        assert sink.events == ["<reset>", "Let me check.", "<reset>"]
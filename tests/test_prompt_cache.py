@@ -0,0 +1,169 @@
+"""Prompt prefix caching: breakpoints, drift detection, token accounting.
+
+Run: pytest tests/test_prompt_cache.py -v
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import json
+from typing import Any
+
+import pytest
+
+from lucy.core import prompt_cache
+from lucy.core.openclaw import ChatConfig, OpenClawClient, OpenClawResponse
+from lucy.core.payload import PayloadEncoder
+from lucy.core.prompt_cache import (
+    PromptCacheTracker,
+    bind_usage_owner,
+    breakpoint_offset,
+    cached_tokens,
+    prefix_hash,
+    system_content,
+)
+
+_KEY = ("ws-1", "anthropic/claude-sonnet-4", "tool_use")
+
+
+def _usage(prompt: int, cached: int) -> dict:
+    return {
+        "prompt_tokens": prompt,
+        "completion_tokens": 10,
+        "prompt_tokens_details": {"cached_tokens": cached},
+    }
+
+
+class TestBreakpoints:
+    def test_only_explicit_families_get_breakpoints(self) -> None:
+        assert breakpoint_offset("anthropic/claude-sonnet-4", 20_000) == 20_000
+        assert breakpoint_offset("google/gemini-2.5-flash", 20_000) == 20_000
+        assert breakpoint_offset("minimax/minimax-m2.5", 20_000) == 0
+        assert breakpoint_offset("openai/gpt-5", 20_000) == 0
+
+    def test_short_prefix_gets_no_breakpoint(self) -> None:
+        assert breakpoint_offset("anthropic/claude-sonnet-4", 500) == 0
+
+    def test_system_content_split(self) -> None:
+        assert system_content("static|dynamic") == "static|dynamic"
+        parts = system_content("static|dynamic", 7)
+        assert parts[0] == {
+            "type": "text", "text": "static|", "cache_control": {"type": "ephemeral"},
+        }
+        assert parts[1] == {"type": "text", "text": "dynamic"}
+
+    def test_encoder_emits_split_system_message(self) -> None:
+        body = PayloadEncoder().build(
+            model="anthropic/claude-sonnet-4",
+            system_prompt="static|dynamic",
+            messages=[{"role": "user", "content": "hi"}],
+            temperature=0.7,
+            max_tokens=100,
+            system_cache_split=7,
+        )
+        system = json.loads(body)["messages"][0]
+        assert system["content"][0]["cache_control"] == {"type": "ephemeral"}
+        assert "".join(p["text"] for p in system["content"]) == "static|dynamic"
+
+
+class TestPromptCacheTracker:
+    def test_first_request_is_cold(self) -> None:
+        obs = PromptCacheTracker().observe(_KEY, prefix_hash("p"), 40_000, now=0.0)
+        assert not obs.warm and not obs.changed
+
+    def test_same_prefix_within_ttl_is_warm(self) -> None:
+        tracker = PromptCacheTracker(ttl_s=300)
+        tracker.observe(_KEY, "h1", 40_000, now=0.0)
+        obs = tracker.observe(_KEY, "h1", 40_000, now=10.0)
+        assert obs.warm and not obs.changed
+
+    def test_changed_prefix_within_ttl_is_flagged(self) -> None:
+        tracker = PromptCacheTracker(ttl_s=300)
+        tracker.observe(_KEY, "h1", 40_000, now=0.0)
+        obs = tracker.observe(_KEY, "h2", 40_000, now=10.0)
+        assert obs.changed
+        assert tracker.stats()[_KEY].prefix_changes == 1
+
+    def test_changed_prefix_after_ttl_is_expected(self) -> None:
+        tracker = PromptCacheTracker(ttl_s=300)
+        tracker.observe(_KEY, "h1", 40_000, now=0.0)
+        obs = tracker.observe(_KEY, "h2", 40_000, now=1_000.0)
+        assert not obs.changed and not obs.warm
+
+    def test_record_splits_cached_and_uncached(self) -> None:
+        tracker = PromptCacheTracker()
+        assert tracker.record(_KEY, _usage(12_000, 10_000), None) == (10_000, 2_000)
+        stats = tracker.stats()[_KEY]
+        assert stats.requests == 1
+        assert stats.hit_ratio == 10_000 / 12_000
+
+    def test_warm_prefix_billed_uncached_counts_as_miss(self) -> None:
+        tracker = PromptCacheTracker()
+        tracker.observe(_KEY, "h1", 40_000, now=0.0)
+        obs = tracker.observe(_KEY, "h1", 40_000, now=1.0)
+        tracker.record(_KEY, _usage(12_000, 0), obs)
+        tracker.record(_KEY, _usage(12_000, 10_000), obs)
+        assert tracker.stats()[_KEY].misses == 1
+
+    def test_keys_are_bounded(self) -> None:
+        tracker = PromptCacheTracker(max_keys=2)
+        for i in range(5):
+            key = (f"ws-{i}", "m", "chat")
+            tracker.observe(key, "h", 10, now=0.0)
+            tracker.record(key, _usage(1, 0), None)
+        assert len(tracker.stats()) == 2
+
+    def test_cached_tokens_tolerates_missing_details(self) -> None:
+        assert cached_tokens(None) == 0
+        assert cached_tokens({"prompt_tokens": 5}) == 0
+        assert cached_tokens(_usage(5, 3)) == 3
+
+
+class _Recorder:
+    def __init__(self) -> None:
+        self.calls: list[dict[str, Any]] = []
+
+    def record_llm_call(self, **kwargs: Any) -> bool:
+        self.calls.append(kwargs)
+        return True
+
+
+class TestUsageRecording:
+    @pytest.fixture
+    def recorder(self, monkeypatch) -> _Recorder:
+        recorder = _Recorder()
+        monkeypatch.setattr(prompt_cache, "get_cost_recorder", lambda: recorder)
+        return recorder
+
+    @pytest.fixture
+    async def client(self, monkeypatch):
+        async def complete(self, body, model, cache_key, **kw) -> OpenClawResponse:
+            return OpenClawResponse(content="ok", usage=_usage(100, 0))
+
+        monkeypatch.setattr(prompt_cache.settings, "openrouter_api_key", "test")
+        monkeypatch.setattr(OpenClawClient, "_non_stream_completion", complete)
+        made = OpenClawClient()
+        yield made
+        await made.close()
+
+    async def _call(self, client: OpenClawClient, **config: Any) -> None:
+        await client.chat_completion(
+            [{"role": "user", "content": "hi"}],
+            ChatConfig(model="m", system_prompt="s", tools=[{}], **config),
+        )
+
+    async def test_internal_calls_bill_the_bound_owner(self, recorder, client) -> None:
+        async def run() -> None:
+            bind_usage_owner("ws-1", "U1")
+            # Sub-agents and supervisors run in tasks spawned from the agent run.
+            await asyncio.create_task(self._call(client, intent="subagent:research"))
+
+        await asyncio.create_task(run(), context=contextvars.Context())
+        [call] = recorder.calls
+        assert (call["workspace_id"], call["user_id"]) == ("ws-1", "U1")
+        assert call["intent"] == "subagent:research"
+
+    async def test_calls_without_an_owner_are_not_recorded(self, recorder, client) -> None:
+        await asyncio.create_task(self._call(client), context=contextvars.Context())
+        assert recorder.calls == []
@@ -0,0 +1,153 @@
+"""Warm Python worker pool: python3 -c parity, isolation, caps, recycling.
+
+These spawn real worker processes (preloading only stdlib modules).
+
+Run: pytest tests/test_python_pool.py -v
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+
+import pytest
+
+from lucy.workspace.python_pool import PythonWorkerPool
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(os, "fork") or sys.platform == "darwin", reason="needs fork()",
+)
+
+
+@pytest.fixture
+async def pool():
+    made = PythonWorkerPool(size=1, max_jobs=100, preload=["json", "csv"])
+    assert await made.wait_ready()
+    yield made
+    await made.close()
+
+
+async def _run(pool: PythonWorkerPool, code: str, cwd: str, timeout: float = 10):
+    await pool.wait_ready()
+    result = await pool.run(code, cwd=cwd, timeout=timeout)
+    assert result is not None
+    return result
+
+
+class TestExecution:
+    async def test_stdout_and_exit_code(self, pool, tmp_path) -> None:
+        result = await _run(pool, "print('hi'); print(__name__)", str(tmp_path))
+        assert result.success and result.output == "hi\n__main__\n"
+        assert result.method == "local_python"
+
+    async def test_exception_traceback_points_at_user_code(self, pool, tmp_path) -> None:
+        result = await _run(pool, "x = 1\nraise ValueError('boom')", str(tmp_path))
+        assert not result.success and result.exit_code == 1
+        assert 'File "<string>", line 2' in result.error
+        assert "ValueError: boom" in result.error
+        assert "_python_worker" not in result.error
+
+    async def test_system_exit_codes(self, pool, tmp_path) -> None:
+        assert (await _run(pool, "import sys; sys.exit(3)", str(tmp_path))).exit_code == 3
+        assert (await _run(pool, "import sys; sys.exit()", str(tmp_path))).success
+        result = await _run(pool, "import sys; sys.exit('bad')", str(tmp_path))
+        assert result.exit_code == 1 and "bad" in result.error
+
+    async def test_runs_in_workspace_dir(self, pool, tmp_path) -> None:
+        (tmp_path / "helper.py").write_text("VALUE = 42\n")
+        code = "import os, helper; print(os.getcwd(), helper.VALUE)"
+        result = await _run(pool, code, str(tmp_path))
+        assert result.output.split() == [str(tmp_path), "42"]
+
+    async def test_stdin_is_empty(self, pool, tmp_path) -> None:
+        result = await _run(pool, "import sys; print(repr(sys.stdin.read()))", str(tmp_path))
+        assert result.output == "''\n"
+
+
+class TestIsolation:
+    async def test_jobs_do_not_share_state(self, pool, tmp_path) -> None:
+        leak = "import json, os; json.leaked = 1; os.environ['X_LEAK'] = '1'"
+        await _run(pool, leak, str(tmp_path))
+        result = await _run(
+            pool, "import json, os; print(hasattr(json, 'leaked'), 'X_LEAK' in os.environ)",
+            str(tmp_path),
+        )
+        assert result.output == "False False\n"
+
+    async def test_random_state_differs_between_jobs(self, pool, tmp_path) -> None:
+        code = "import random; print(random.random())"
+        first = await _run(pool, code, str(tmp_path))
+        second = await _run(pool, code, str(tmp_path))
+        assert first.output != second.output
+
+    async def test_secrets_are_not_inherited(self, tmp_path, monkeypatch) -> None:
+        monkeypatch.setenv("LUCY_SECRET_TOKEN", "s3cret")
+        fresh = PythonWorkerPool(size=1)
+        try:
+            result = await _run(
+                fresh, "import os; print(os.environ.get('LUCY_SECRET_TOKEN'))", str(tmp_path),
+            )
+        finally:
+            await fresh.close()
+        assert result.output == "None\n"
+
+
+class TestLimits:
+    async def test_timeout_kills_job_and_worker_survives(self, pool, tmp_path) -> None:
+        result = await _run(pool, "import time; time.sleep(30)", str(tmp_path), timeout=0.3)
+        assert result.exit_code == 124
+        assert "timed out after 0.3s" in result.error
+        assert (await _run(pool, "print(1)", str(tmp_path))).output == "1\n"
+
+    async def test_background_child_does_not_hold_job_open(self, pool, tmp_path) -> None:
+        code = (
+            "import subprocess, sys\n"
+            "subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)'])\n"
+            "print('ok')"
+        )
+        result = await _run(pool, code, str(tmp_path), timeout=5)
+        assert result.success and result.output == "ok\n"
+
+    async def test_output_is_capped(self, pool, tmp_path, monkeypatch) -> None:
+        from lucy.workspace import python_pool
+
+        monkeypatch.setattr(python_pool, "MAX_OUTPUT_CHARS", 100)
+        result = await _run(pool, "print('x' * 10_000)", str(tmp_path))
+        assert result.output == "x" * 100
+
+
+class TestPool:
+    async def test_miss_when_no_idle_worker(self, tmp_path) -> None:
+        cold = PythonWorkerPool(size=1)
+        try:
+            assert await cold.run("print(1)", cwd=str(tmp_path), timeout=5) is None
+            assert cold.get_stats()["missed"] == 1
+        finally:
+            await cold.close()
+
+    async def test_worker_recycled_after_max_jobs(self, tmp_path) -> None:
+        small = PythonWorkerPool(size=1, max_jobs=2)
+        try:
+            pids = []
+            for _ in range(3):
+                result = await _run(small, "import os; print(os.getppid())", str(tmp_path))
+                pids.append(result.output)
+            assert pids[0] == pids[1] != pids[2]
+            assert small.get_stats()["recycled"] == 1
+        finally:
+            await small.close()
+
+    async def test_dead_worker_is_replaced(self, pool, tmp_path) -> None:
+        pool._idle[0].proc.kill()
+        await pool._idle[0].proc.wait()
+        assert await pool.run("print(1)", cwd=str(tmp_path), timeout=5) is None
+        assert (await _run(pool, "print(2)", str(tmp_path))).output == "2\n"
+
+    async def test_worker_failure_after_start_is_not_a_miss(self, pool, tmp_path) -> None:
+        code = "import os, signal; print('half done', flush=True); os.kill(os.getppid(), 9)"
+        await pool.wait_ready()
+        result = await pool.run(code, cwd=str(tmp_path), timeout=5)
+        assert result is not None
+        assert not result.success and "Not rerun" in result.error
+        assert pool.get_stats()["failed"] == 1
+        assert (await _run(pool, "print(2)", str(tmp_path))).output == "2\n"
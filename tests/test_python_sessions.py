@@ -0,0 +1,150 @@
+"""Persistent per-thread Python sessions and session-aware validation.
+
+Kernels are real worker processes (no preloads, to keep startup fast).
+
+Run: pytest tests/test_python_sessions.py -v
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from lucy.tools.code_validator import validate_python
+from lucy.workspace import python_sessions
+from lucy.workspace.python_sessions import PythonSessionManager
+
+
+@pytest.fixture
+async def manager():
+    made = PythonSessionManager(max_sessions=2, idle_s=60, memory_mb=0)
+    yield made
+    await made.close()
+
+
+async def _run(manager: PythonSessionManager, thread: str, code: str, cwd, timeout: float = 10):
+    result = await manager.run("ws", thread, code, cwd=str(cwd), timeout=timeout)
+    assert result is not None
+    return result
+
+
+class TestSessions:
+    async def test_state_survives_between_calls(self, manager, tmp_path) -> None:
+        await _run(manager, "t1", "import json\nrows = [1, 2, 3]", tmp_path)
+        result = await _run(manager, "t1", "print(sum(rows), json.dumps(rows))", tmp_path)
+        assert result.success and result.output == "6 [1, 2, 3]\n"
+        assert result.method == "local_python_session"
+        assert {"rows", "json"} <= manager.known_names("ws", "t1")
+
+    async def test_threads_are_isolated(self, manager, tmp_path) -> None:
+        await _run(manager, "t1", "x = 1", tmp_path)
+        result = await _run(manager, "t2", "print(x)", tmp_path)
+        assert not result.success and "NameError" in result.error
+        assert manager.known_names("ws", "t2").isdisjoint({"x"})
+
+    async def test_errors_and_exit_keep_the_session(self, manager, tmp_path) -> None:
+        await _run(manager, "t1", "x = 1", tmp_path)
+        failed = await _run(manager, "t1", "y = 2\nraise ValueError('boom')", tmp_path)
+        assert failed.exit_code == 1 and "ValueError: boom" in failed.error
+        exited = await _run(manager, "t1", "import sys; sys.exit(4)", tmp_path)
+        assert exited.exit_code == 4
+        result = await _run(manager, "t1", "print(x, y)", tmp_path)
+        assert result.output == "1 2\n"
+
+    async def test_output_is_per_call(self, manager, tmp_path) -> None:
+        await _run(manager, "t1", "print('first')", tmp_path)
+        result = await _run(manager, "t1", "import os; os.system('echo child')", tmp_path)
+        assert result.output == "child\n"
+
+    async def test_timeout_resets_session(self, manager, tmp_path) -> None:
+        await _run(manager, "t1", "x = 1", tmp_path)
+        result = await _run(manager, "t1", "import time; time.sleep(30)", tmp_path, timeout=0.3)
+        assert result.exit_code == 124 and "session was reset" in result.error
+        assert manager.known_names("ws", "t1") == frozenset()
+        after = await _run(manager, "t1", "print('x' in globals())", tmp_path)
+        assert after.output == "False\n"
+
+    async def test_memory_limit_raises_inside_session(self, tmp_path) -> None:
+        limited = PythonSessionManager(memory_mb=512)
+        try:
+            await _run(limited, "t1", "keep = 1", tmp_path)
+            result = await _run(limited, "t1", "big = bytearray(1024 ** 3)", tmp_path)
+            assert "MemoryError" in result.error
+            assert (await _run(limited, "t1", "print(keep)", tmp_path)).output == "1\n"
+        finally:
+            await limited.close()
+
+
+class TestLimits:
+    async def test_cap_evicts_least_recently_used(self, manager, tmp_path) -> None:
+        await _run(manager, "t1", "a = 1", tmp_path)
+        await _run(manager, "t2", "b = 2", tmp_path)
+        await _run(manager, "t1", "a += 1", tmp_path)
+        await _run(manager, "t3", "c = 3", tmp_path)
+        assert manager.known_names("ws", "t2") == frozenset()
+        assert (await _run(manager, "t1", "print(a)", tmp_path)).output == "2\n"
+        assert manager.get_stats()["evicted_lru"] == 1
+
+    async def test_idle_sessions_are_evicted(self, manager, tmp_path) -> None:
+        await _run(manager, "t1", "a = 1", tmp_path)
+        manager._sessions[("ws", "t1")].last_used -= 120
+        manager._evict_idle()
+        assert manager.get_stats()["live"] == 0
+        assert manager.get_stats()["evicted_idle"] == 1
+
+
+class TestSessionValidation:
+    def test_session_names_count_as_defined(self) -> None:
+        assert not validate_python("print(df.head())", auto_fix=False).valid
+        result = validate_python(
+            "print(df.head())", auto_fix=False, session_names=frozenset({"df"}),
+        )
+        assert result.valid and result.stateful
+
+    def test_stateful_messages(self) -> None:
+        result = validate_python("print(missing)", session_names=frozenset())
+        assert "earlier in the session" in result.issues[0].message
+        assert "persistent session" in result.format_for_llm()
+
+    def test_known_import_already_in_session_is_not_refixed(self) -> None:
+        result = validate_python("print(pd.__name__)", session_names=frozenset({"pd"}))
+        assert result.valid and result.fixed_code is None
+
+
+class TestCodeTool:
+    @pytest.fixture(autouse=True)
+    def _enabled(self, manager, tmp_path, monkeypatch) -> None:
+        from lucy.config import settings
+        from lucy.workspace import executor
+
+        async def no_gateway(command: str, timeout: int):
+            return None
+
+        monkeypatch.setattr(settings, "python_sessions_enabled", True)
+        monkeypatch.setattr(settings, "workspace_root", tmp_path)
+        (tmp_path / "ws").mkdir()
+        monkeypatch.setattr(python_sessions, "_manager", manager)
+        monkeypatch.setattr(executor, "_execute_via_gateway", no_gateway)
+
+    async def test_multi_step_analysis(self) -> None:
+        from lucy.tools.code_executor import execute_code_tool
+
+        load = {"code": "rows = [3, 1, 2]", "session": True}
+        first = await execute_code_tool("lucy_execute_python", load, "ws", thread_ts="1.0")
+        assert first["success"] and "rows" in first["session_names"]
+        use = {"code": "print(sorted(rows))", "session": True}
+        second = await execute_code_tool("lucy_execute_python", use, "ws", thread_ts="1.0")
+        assert second["output"] == "[1, 2, 3]"
+
+    async def test_unknown_name_rejected_before_execution(self) -> None:
+        from lucy.tools.code_executor import execute_code_tool
+
+        params = {"code": "print(rows)", "session": True}
+        result = await execute_code_tool("lucy_execute_python", params, "ws", thread_ts="2.0")
+        assert result["validation_failed"]
+
+    def test_schema_offers_session_flag(self) -> None:
+        from lucy.tools.code_executor import get_code_tool_definitions
+
+        python_tool = get_code_tool_definitions()[0]["function"]
+        assert "session" in python_tool["parameters"]["properties"]
+        assert "session=true" in python_tool["description"]
@@ -0,0 +1,189 @@
+"""Slack transport: pooled clients, coalescing, Retry-After and background reserve.
+
+Run: pytest tests/test_slack_transport.py -v
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any
+
+import pytest
+from slack_sdk.errors import SlackApiError
+from slack_sdk.web.async_slack_response import AsyncSlackResponse
+
+from lucy.config import settings
+from lucy.infra.admission import AdmissionController, Priority, current_priority
+from lucy.slack import transport as transport_mod
+from lucy.slack.middleware import pooled_client_middleware
+from lucy.slack.transport import PooledSlackClient, SlackTransport, get_slack_transport
+
+
+def _rate_limited(retry_after: str) -> SlackApiError:
+    response = AsyncSlackResponse(
+        client=None, http_verb="POST", api_url="https://slack.com/api/chat.update",
+        req_args={}, data={"ok": False, "error": "ratelimited"},
+        headers={"Retry-After": retry_after}, status_code=429,
+    )
+    return SlackApiError("ratelimited", response)
+
+
+class _FakeApi:
+    """Stands in for the HTTP call under PooledSlackClient."""
+
+    def __init__(self, delay: float = 0.0) -> None:
+        self.calls: list[tuple[str, dict[str, Any]]] = []
+        self.errors: list[Exception] = []
+        self.delay = delay
+
+    async def __call__(self, api_method: str, **kwargs: Any) -> Any:
+        self.calls.append((api_method, kwargs))
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.errors:
+            raise self.errors.pop(0)
+        return {"ok": True, "method": api_method, "n": len(self.calls)}
+
+
+@pytest.fixture
+def api(monkeypatch) -> _FakeApi:
+    fake = _FakeApi()
+
+    async def _raw_api_call(self: PooledSlackClient, api_method: str, **kwargs: Any) -> Any:
+        return await fake(api_method, **kwargs)
+
+    monkeypatch.setattr(PooledSlackClient, "_raw_api_call", _raw_api_call)
+    monkeypatch.setattr(transport_mod, "_transport", None)
+    return fake
+
+
+class TestPooledClients:
+    def test_one_client_per_token(self, api) -> None:
+        transport = get_slack_transport()
+        client = transport.client("xoxb-1")
+        assert transport.client("xoxb-1") is client
+        assert transport.client("xoxb-2") is not client
+        assert transport.client("xoxb-1", background=True).pool_key == client.pool_key
+
+    async def test_middleware_swaps_request_client(self, api) -> None:
+        from slack_sdk.web.async_client import AsyncWebClient
+
+        context: dict[str, Any] = {"client": AsyncWebClient(token="xoxb-1")}
+        called = []
+
+        async def _next() -> None:
+            called.append(True)
+
+        await pooled_client_middleware(context, _next)
+        assert context["client"] is get_slack_transport().client("xoxb-1")
+        assert called == [True]
+
+
+class TestCoalescing:
+    async def test_concurrent_identical_reads_share_one_request(self, api) -> None:
+        api.delay = 0.05
+        client = get_slack_transport().client("xoxb-1")
+        results = await asyncio.gather(
+            client.conversations_replies(channel="C1", ts="1.0"),
+            client.conversations_replies(channel="C1", ts="1.0"),
+            client.conversations_replies(channel="C1", ts="2.0"),
+        )
+        assert len(api.calls) == 2
+        assert results[0] is results[1]
+        # Only in-flight calls are shared; a later read goes out again.
+        await client.conversations_replies(channel="C1", ts="1.0")
+        assert len(api.calls) == 3
+        assert get_slack_transport().get_stats()["methods"]["conversations.replies"][
+            "coalesced"] == 1
+
+    async def test_writes_are_not_coalesced(self, api) -> None:
+        client = get_slack_transport().client("xoxb-1")
+        await asyncio.gather(*(client.chat_update(channel="C1", ts="1.0", text="x")
+                               for _ in range(2)))
+        assert len(api.calls) == 2
+
+    async def test_failed_read_reaches_every_waiter(self, api) -> None:
+        api.delay = 0.02
+        api.errors = [RuntimeError("boom")]
+        client = get_slack_transport().client("xoxb-1")
+        results = await asyncio.gather(
+            client.users_info(user="U1"), client.users_info(user="U1"),
+            return_exceptions=True,
+        )
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert len(api.calls) == 1
+
+    async def test_duplicate_reactions_are_dropped(self, api) -> None:
+        client = get_slack_transport().client("xoxb-1")
+        await client.reactions_add(channel="C1", timestamp="1.0", name="eyes")
+        await client.reactions_add(channel="C1", timestamp="1.0", name="eyes")
+        await client.reactions_add(channel="C1", timestamp="1.0", name="white_check_mark")
+        await client.reactions_remove(channel="C1", timestamp="1.0", name="eyes")
+        await client.reactions_remove(channel="C1", timestamp="1.0", name="eyes")
+        await client.reactions_add(channel="C1", timestamp="1.0", name="eyes")
+        assert [m for m, _ in api.calls] == [
+            "reactions.add", "reactions.add", "reactions.remove", "reactions.add",
+        ]
+
+
+class TestRetryAfter:
+    async def test_429_pauses_method_and_retries(self, api) -> None:
+        api.errors = [_rate_limited("0.1")]
+        client = get_slack_transport().client("xoxb-1")
+        started = time.monotonic()
+        response = await client.chat_update(channel="C1", ts="1.0", text="x")
+        assert response["ok"]
+        assert time.monotonic() - started >= 0.1
+        assert len(api.calls) == 2
+        assert get_slack_transport().get_stats()["methods"]["chat.update"]["rate_limited"] == 1
+
+    async def test_gives_up_after_max_retries(self, api, monkeypatch) -> None:
+        monkeypatch.setattr(settings, "slack_max_retries", 1)
+        api.errors = [_rate_limited("0"), _rate_limited("0")]
+        client = get_slack_transport().client("xoxb-1")
+        with pytest.raises(SlackApiError):
+            await client.chat_update(channel="C1", ts="1.0", text="x")
+        assert len(api.calls) == 2
+
+    async def test_other_errors_are_not_retried(self, api) -> None:
+        api.errors = [RuntimeError("channel_not_found")]
+        client = get_slack_transport().client("xoxb-1")
+        with pytest.raises(RuntimeError):
+            await client.chat_update(channel="C1", ts="1.0", text="x")
+        assert len(api.calls) == 1
+
+
+class TestBackgroundReserve:
+    @pytest.fixture(autouse=True)
+    def _no_wait(self, monkeypatch) -> None:
+        monkeypatch.setattr(settings, "slack_queue_timeout_s", 0.0)
+        monkeypatch.setattr(settings, "slack_background_queue_timeout_s", 0.0)
+        monkeypatch.setattr(settings, "slack_foreground_reserve", 0.3)
+
+    @staticmethod
+    def _timeouts(transport: SlackTransport) -> int:
+        return transport.get_stats()["methods"]["reactions.get"]["queue_timeouts"]
+
+    async def test_background_leaves_headroom(self, api) -> None:
+        transport = get_slack_transport()
+        background = transport.client("xoxb-1", background=True)
+        # Tier 3: a burst of ~8.3 tokens, of which 30% is held back.
+        for i in range(6):
+            await background.reactions_get(channel="C1", timestamp=str(i))
+        assert self._timeouts(transport) == 1
+        foreground = transport.client("xoxb-1")
+        await foreground.reactions_get(channel="C1", timestamp="x")
+        await foreground.reactions_get(channel="C1", timestamp="y")
+        assert self._timeouts(transport) == 1
+
+    async def test_cron_slot_counts_as_background(self, api) -> None:
+        transport = get_slack_transport()
+        client = transport.client("xoxb-1")
+        controller = AdmissionController(2)
+        async with controller.slot(Priority.CRON):
+            assert current_priority() is Priority.CRON
+            for i in range(6):
+                await client.reactions_get(channel="C1", timestamp=str(i))
+        assert current_priority() is None
+        assert self._timeouts(transport) == 1
@@ -0,0 +1,451 @@
+"""Durable task queue: worker lifecycle, retries, cancellation, resume.
+
+The database side is replaced by an in-memory ``TaskQueue`` subclass so
+the worker's leasing, heartbeat and settlement logic can run here.
+
+Run: pytest tests/test_task_queue.py -v
+"""
+
+from __future__ import annotations
+
+import asyncio
+import uuid
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from lucy.core import task_queue
+from lucy.core.task_manager import TaskManager, TaskState
+from lucy.core.task_queue import (
+    CANCELLED,
+    COMPLETED,
+    FAILED,
+    QUEUED,
+    RUNNING,
+    LeasedTask,
+    TaskQueue,
+    TaskWorker,
+)
+
+
+class _MemoryQueue(TaskQueue):
+    def __init__(self) -> None:
+        super().__init__(lease_s=60, max_attempts=2)
+        self.rows: dict[uuid.UUID, dict[str, Any]] = {}
+
+    async def enqueue(self, workspace_id, task_type, payload, *, channel_id=None,
+                      thread_ts=None, max_attempts=None):
+        task_id = uuid.uuid4()
+        self.rows[task_id] = {
+            "workspace_id": workspace_id, "task_type": task_type, "payload": payload,
+            "status": QUEUED, "attempts": 0, "max_attempts": max_attempts or 2,
+            "leased_by": None, "progress": {}, "cancel_requested": False,
+            "channel_id": channel_id, "thread_ts": thread_ts, "result": None,
+            "interrupted": False,
+        }
+        return task_id
+
+    async def lease(self, worker_id, limit, task_types):
+        leased = []
+        for task_id, row in self.rows.items():
+            if len(leased) >= limit:
+                break
+            if row["status"] != QUEUED or row["task_type"] not in task_types:
+                continue
+            interrupted = row["interrupted"]
+            row.update(
+                status=RUNNING, leased_by=worker_id, attempts=row["attempts"] + 1,
+                interrupted=False,
+            )
+            leased.append(LeasedTask(
+                id=task_id, workspace_id=row["workspace_id"], task_type=row["task_type"],
+                payload=row["payload"], progress=dict(row["progress"]),
+                attempt=row["attempts"], max_attempts=row["max_attempts"],
+                channel_id=row["channel_id"], thread_ts=row["thread_ts"],
+                worker_id=worker_id, queue=self, interrupted=interrupted,
+            ))
+        return leased
+
+    async def heartbeat(self, task):
+        row = self.rows[task.id]
+        if row["leased_by"] != task.worker_id or row["status"] != RUNNING:
+            return False, False
+        return True, row["cancel_requested"]
+
+    async def statuses(self, task_ids):
+        return {i: self.rows[i]["status"] for i in task_ids}
+
+    async def active_count(self, workspace_id):
+        return sum(
+            r["status"] in (QUEUED, RUNNING) and r["workspace_id"] == workspace_id
+            for r in self.rows.values()
+        )
+
+    async def request_cancel(self, task_id):
+        self.rows[task_id]["cancel_requested"] = True
+        return True
+
+    async def release(self, task):
+        if await self._settle(task, status=QUEUED, leased_by=None, interrupted=True):
+            self.rows[task.id]["attempts"] -= 1
+
+    async def _settle(self, task, **values):
+        row = self.rows[task.id]
+        if row["leased_by"] != task.worker_id or row["status"] != RUNNING:
+            return False
+        row.update({k: v for k, v in values.items() if k in row})
+        return True
+
+
+class _Slack:
+    def __init__(self) -> None:
+        self.posts: list[str] = []
+
+    async def chat_postMessage(self, **kwargs: Any) -> dict[str, Any]:
+        self.posts.append(kwargs["text"])
+        return {"ts": "1.0"}
+
+
+@pytest.fixture
+def queue() -> _MemoryQueue:
+    return _MemoryQueue()
+
+
+@pytest.fixture
+def slack() -> _Slack:
+    return _Slack()
+
+
+def _worker(queue, slack, **kw) -> TaskWorker:
+    return TaskWorker(queue, worker_id="w1", slack_client=slack, heartbeat_s=0.01, **kw)
+
+
+async def _drain(worker: TaskWorker) -> None:
+    for _ in range(200):
+        if not worker.get_stats()["running"]:
+            return
+        await asyncio.sleep(0.005)
+    raise AssertionError("worker did not finish")
+
+
+def _register(monkeypatch, handler) -> None:
+    monkeypatch.setitem(task_queue._handlers, "test", handler)
+
+
+class TestWorker:
+    async def test_completes_and_posts_result(self, queue, slack, monkeypatch) -> None:
+        async def handler(task, client):
+            return f"done: {task.payload['q']}"
+
+        _register(monkeypatch, handler)
+        task_id = await queue.enqueue("ws", "test", {"q": "x"}, channel_id="C1")
+        worker = _worker(queue, slack)
+        assert await worker.poll() == 1
+        await _drain(worker)
+        assert queue.rows[task_id]["status"] == COMPLETED
+        assert queue.rows[task_id]["result"] == "done: x"
+        assert slack.posts == ["done: x"]
+
+    async def test_respects_concurrency(self, queue, slack, monkeypatch) -> None:
+        gate = asyncio.Event()
+
+        async def handler(task, client):
+            await gate.wait()
+            return None
+
+        _register(monkeypatch, handler)
+        for _ in range(3):
+            await queue.enqueue("ws", "test", {})
+        worker = _worker(queue, slack, concurrency=2)
+        assert await worker.poll() == 2
+        assert await worker.poll() == 0
+        gate.set()
+        await _drain(worker)
+        assert await worker.poll() == 1
+        await _drain(worker)
+
+    async def test_only_leases_registered_types(self, queue, slack) -> None:
+        await queue.enqueue("ws", "unknown_type", {})
+        assert await _worker(queue, slack).poll() == 0
+
+    async def test_failure_retries_then_fails(self, queue, slack, monkeypatch) -> None:
+        async def handler(task, client):
+            raise ValueError("boom")
+
+        _register(monkeypatch, handler)
+        task_id = await queue.enqueue("ws", "test", {}, channel_id="C1")
+        worker = _worker(queue, slack)
+        await worker.poll()
+        await _drain(worker)
+        assert queue.rows[task_id]["status"] == QUEUED
+        assert slack.posts == []
+
+        await worker.poll()
+        await _drain(worker)
+        assert queue.rows[task_id]["status"] == FAILED
+        assert len(slack.posts) == 1
+
+    async def test_cancel_flag_stops_handler(self, queue, slack, monkeypatch) -> None:
+        async def handler(task, client):
+            await asyncio.sleep(10)
+
+        _register(monkeypatch, handler)
+        task_id = await queue.enqueue("ws", "test", {})
+        worker = _worker(queue, slack)
+        await worker.poll()
+        await queue.request_cancel(task_id)
+        await _drain(worker)
+        assert queue.rows[task_id]["status"] == CANCELLED
+
+    async def test_lost_lease_leaves_row_alone(self, queue, slack, monkeypatch) -> None:
+        async def handler(task, client):
+            await asyncio.sleep(10)
+
+        _register(monkeypatch, handler)
+        task_id = await queue.enqueue("ws", "test", {})
+        worker = _worker(queue, slack)
+        await worker.poll()
+        queue.rows[task_id]["leased_by"] = "w2"
+        await _drain(worker)
+        assert queue.rows[task_id]["status"] == RUNNING
+        assert queue.rows[task_id]["leased_by"] == "w2"
+
+    async def test_shutdown_releases_without_using_an_attempt(
+        self, queue, slack, monkeypatch,
+    ) -> None:
+        async def handler(task, client):
+            await task.checkpoint(step=3)
+            await asyncio.sleep(10)
+
+        _register(monkeypatch, handler)
+        task_id = await queue.enqueue("ws", "test", {})
+        worker = _worker(queue, slack)
+        worker.start()
+        for _ in range(100):
+            if queue.rows[task_id]["progress"]:
+                break
+            await asyncio.sleep(0.005)
+        await worker.stop(drain_timeout_s=0.01)
+        row = queue.rows[task_id]
+        assert row["status"] == QUEUED
+        assert row["attempts"] == 0
+        assert row["progress"] == {"step": 3}
+
+    async def test_resumed_task_sees_progress(self, queue, slack, monkeypatch) -> None:
+        seen: list[tuple[bool, dict[str, Any]]] = []
+
+        async def handler(task, client):
+            seen.append((task.resumed, dict(task.progress)))
+            return None
+
+        _register(monkeypatch, handler)
+        task_id = await queue.enqueue("ws", "test", {})
+        queue.rows[task_id]["progress"] = {"step": 3}
+        worker = _worker(queue, slack)
+        await worker.poll()
+        await _drain(worker)
+        assert seen == [(True, {"step": 3})]
+
+
+    async def test_only_a_cut_off_run_is_interrupted(self, queue, slack, monkeypatch) -> None:
+        seen: list[bool] = []
+
+        async def handler(task, client):
+            seen.append(task.interrupted)
+            await task.checkpoint(step=len(seen))
+            if len(seen) == 1:
+                raise ValueError("boom")
+            if len(seen) == 2:
+                await asyncio.sleep(10)
+
+        _register(monkeypatch, handler)
+        task_id = await queue.enqueue("ws", "test", {}, max_attempts=3)
+        worker = _worker(queue, slack)
+        await worker.poll()
+        await _drain(worker)
+        worker.start()
+        for _ in range(100):
+            if queue.rows[task_id]["progress"] == {"step": 2}:
+                break
+            await asyncio.sleep(0.005)
+        await worker.stop(drain_timeout_s=0.01)
+        worker = _worker(queue, slack)
+        await worker.poll()
+        await _drain(worker)
+        assert seen == [False, False, True]
+
+    async def test_expired_last_attempt_is_failed_and_reported(
+        self, slack, monkeypatch,
+    ) -> None:
+        import lucy.db.session
+
+        ran: list[LeasedTask] = []
+
+        async def handler(task, client):
+            ran.append(task)
+
+        row = SimpleNamespace(
+            id=uuid.uuid4(), workspace_id=uuid.uuid4(), task_type="test", payload={},
+            progress={"step": 2}, status=RUNNING, attempts=1, max_attempts=1, error=None,
+            leased_by="dead-worker", slack_channel_id="C1", slack_thread_ts="1.0",
+        )
+        monkeypatch.setattr(lucy.db.session, "db_session", lambda: _Rows([row]))
+        _register(monkeypatch, handler)
+        worker = _worker(TaskQueue(), slack)
+        assert await worker.poll() == 0
+        assert ran == []
+        assert row.status == FAILED and row.leased_by is None
+        assert slack.posts == [task_queue._ABANDONED_MESSAGE]
+        assert worker.get_stats()["failed"] == 1
+
+    async def test_notices_use_the_workspace_client(self, queue, slack, monkeypatch) -> None:
+        from lucy.core import token_store
+
+        team_slack = _Slack()
+        clients: list[Any] = []
+        teams: list[str] = []
+
+        async def get_slack_client(team_id, *, background=False):
+            teams.append(team_id)
+            return team_slack
+
+        async def handler(task, client):
+            clients.append(client)
+            raise ValueError("boom")
+
+        monkeypatch.setattr(token_store, "get_slack_client", get_slack_client)
+        _register(monkeypatch, handler)
+        await queue.enqueue("ws", "test", {"team_id": "T1"}, channel_id="C1", max_attempts=1)
+        worker = _worker(queue, slack)
+        await worker.poll()
+        await _drain(worker)
+        assert clients == [team_slack]
+        assert set(teams) == {"T1"}
+        assert len(team_slack.posts) == 1
+        assert slack.posts == []
+
+
+class TestAgentRunHandler:
+    """The ``agent_run`` handler, with the agent itself replaced."""
+
+    @pytest.fixture
+    def entities(self, monkeypatch) -> list[tuple[str, str]]:
+        from lucy.core import agent
+        from lucy.integrations import composio_client
+        from lucy.slack import handlers
+
+        entities: list[tuple[str, str]] = []
+
+        async def run(agent, text, ctx, client, workspace_id):
+            return "done"
+
+        monkeypatch.setattr(agent, "get_agent", lambda: None)
+        monkeypatch.setattr(handlers, "_run_with_recovery", run)
+        monkeypatch.setattr(
+            composio_client, "get_composio_client",
+            lambda: SimpleNamespace(set_entity_id=lambda ws, e: entities.append((ws, e))),
+        )
+        return entities
+
+    async def _run(self, queue, slack, *, interrupted: bool) -> str:
+        from lucy.slack.handlers import _run_queued_agent_task
+
+        await queue.enqueue(
+            "ws", "agent_run", {"text": "go", "team_id": "T1"}, channel_id="C1",
+        )
+        [task] = await queue.lease("w1", 1, {"agent_run"})
+        # An earlier attempt got far enough to checkpoint either way.
+        task.progress = {"attempt": 1}
+        task.interrupted = interrupted
+        queue.save_progress = lambda t: _record([], t)  # type: ignore[method-assign]
+        return await _run_queued_agent_task(task, slack)
+
+    async def test_sets_composio_entity(self, queue, slack, entities) -> None:
+        assert await self._run(queue, slack, interrupted=False) == "done"
+        assert entities == [("ws", "slack_T1")]
+
+    async def test_retry_after_failure_posts_nothing(self, queue, slack, entities) -> None:
+        await self._run(queue, slack, interrupted=False)
+        assert slack.posts == []
+
+    async def test_interrupted_run_says_so(self, queue, slack, entities) -> None:
+        await self._run(queue, slack, interrupted=True)
+        assert len(slack.posts) == 1
+        assert "interrupted" in slack.posts[0]
+
+
+class TestTaskManagerDurable:
+    @pytest.fixture(autouse=True)
+    def _queue(self, queue, monkeypatch) -> None:
+        monkeypatch.setattr(task_queue, "_queue", queue)
+
+    async def test_enqueue_acks_and_tracks(self, queue, slack) -> None:
+        manager = TaskManager()
+        task = await manager.enqueue_task(
+            "ws", "C1", "1.1", "Research", "agent_run", {"text": "go"}, slack_client=slack,
+        )
+        assert task.durable
+        assert task.state == TaskState.ACKNOWLEDGED
+        row = queue.rows[uuid.UUID(task.task_id)]
+        assert row["payload"] == {"text": "go", "description": "Research"}
+        assert manager.get_active_for_thread("1.1", workspace_id="ws") is task
+
+    async def test_max_attempts_reaches_the_row(self, queue) -> None:
+        task = await TaskManager().enqueue_task(
+            "ws", "C1", "1.1", "x", "agent_run", {}, max_attempts=1,
+        )
+        assert queue.rows[uuid.UUID(task.task_id)]["max_attempts"] == 1
+
+    async def test_limit_counts_queue_rows(self, queue) -> None:
+        for _ in range(5):
+            await queue.enqueue("ws", "agent_run", {})
+        with pytest.raises(RuntimeError):
+            await TaskManager().enqueue_task("ws", "C1", "1.1", "x", "agent_run", {})
+
+    async def test_refresh_pulls_final_state(self, queue) -> None:
+        manager = TaskManager()
+        task = await manager.enqueue_task("ws", "C1", "1.1", "x", "agent_run", {})
+        queue.rows[uuid.UUID(task.task_id)]["status"] = COMPLETED
+        await manager.refresh()
+        assert task.state == TaskState.COMPLETED
+        assert manager.get_active_for_thread("1.1") is None
+
+    async def test_cancel_goes_through_queue(self, queue) -> None:
+        manager = TaskManager()
+        task = await manager.enqueue_task("ws", "C1", "1.1", "x", "agent_run", {})
+        assert await manager.cancel_task(task.task_id)
+        assert queue.rows[uuid.UUID(task.task_id)]["cancel_requested"]
+        assert task.state == TaskState.CANCELLED
+
+
+async def test_leased_task_checkpoint_merges() -> None:
+    saved: list[dict[str, Any]] = []
+    queue = SimpleNamespace(save_progress=lambda t: _record(saved, t))
+    task = LeasedTask(
+        id=uuid.uuid4(), workspace_id="ws", task_type="t", payload={}, progress={"a": 1},
+        attempt=1, max_attempts=3, channel_id=None, thread_ts=None, worker_id="w",
+        queue=queue,  # type: ignore[arg-type]
+    )
+    await task.checkpoint(b=2)
+    assert saved == [{"a": 1, "b": 2}]
+
+
+class _Rows:
+    """Stands in for ``db_session()``: every query returns *rows*."""
+
+    def __init__(self, rows: list[Any]) -> None:
+        self.rows = rows
+
+    async def __aenter__(self) -> _Rows:
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        return None
+
+    async def execute(self, stmt: Any) -> Any:
+        return SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: self.rows))
+
+
+async def _record(saved: list[dict[str, Any]], task: LeasedTask) -> None:
+    saved.append(dict(task.progress))
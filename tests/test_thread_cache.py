@@ -0,0 +1,180 @@
+"""Thread history cache: one conversations.replies per thread, kept current by events.
+
+Run: pytest tests/test_thread_cache.py -v
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+
+from lucy.config import settings
+from lucy.core.agent import AgentContext, LucyAgent
+from lucy.slack import thread_cache as thread_cache_mod
+from lucy.slack import transport as transport_mod
+from lucy.slack.handlers import _is_lucy_in_thread
+from lucy.slack.thread_cache import FETCH_LIMIT, ThreadCache, get_thread_cache
+from lucy.slack.transport import PooledSlackClient, get_slack_transport
+
+
+def _msg(ts: str, text: str = "hi", thread_ts: str = "1.0", **extra: Any) -> dict[str, Any]:
+    return {"type": "message", "channel": "C1", "ts": ts, "thread_ts": thread_ts,
+            "text": text, "user": "U1", **extra}
+
+
+class _FakeSlack:
+    def __init__(self, messages: list[dict[str, Any]]) -> None:
+        self.messages = messages
+        self.calls: list[dict[str, Any]] = []
+
+    async def conversations_replies(self, **kwargs: Any) -> dict[str, Any]:
+        self.calls.append(kwargs)
+        return {"ok": True, "messages": list(self.messages[:kwargs["limit"]])}
+
+
+@pytest.fixture
+def cache() -> ThreadCache:
+    cache = ThreadCache(ttl_s=60)
+    cache.live = True
+    return cache
+
+
+class TestThreadCache:
+    async def test_one_fetch_serves_every_limit(self, cache) -> None:
+        slack = _FakeSlack([_msg(f"1.{i}") for i in range(60)])
+        assert len(await cache.messages(slack, "C1", "1.0", limit=50)) == 50
+        assert len(await cache.messages(slack, "C1", "1.0", limit=100)) == 60
+        assert [c["limit"] for c in slack.calls] == [FETCH_LIMIT]
+
+    async def test_without_events_every_read_goes_to_slack(self) -> None:
+        cache = ThreadCache(ttl_s=60)
+        slack = _FakeSlack([_msg("1.0")])
+        await cache.messages(slack, "C1", "1.0")
+        await cache.messages(slack, "C1", "1.0")
+        assert len(slack.calls) == 2
+
+    async def test_ttl_expiry_refetches(self, cache) -> None:
+        cache.ttl_s = 0
+        slack = _FakeSlack([_msg("1.0")])
+        await cache.messages(slack, "C1", "1.0")
+        await cache.messages(slack, "C1", "1.0")
+        assert len(slack.calls) == 2
+
+    async def test_events_update_cached_thread(self, cache) -> None:
+        slack = _FakeSlack([_msg("1.0"), _msg("1.1", "first")])
+        await cache.messages(slack, "C1", "1.0")
+
+        cache.observe(_msg("1.3", "third"))
+        cache.observe(_msg("1.2", "second", bot_id="B1"))
+        cache.observe(_msg("1.3", "third"))
+        cache.observe({"type": "message", "subtype": "message_changed", "channel": "C1",
+                       "message": _msg("1.1", "first (edited)")})
+        cache.observe({"type": "message", "subtype": "message_deleted", "channel": "C1",
+                       "deleted_ts": "1.2", "previous_message": _msg("1.2")})
+        cache.observe(_msg("9.1", thread_ts="9.0"))  # not cached, ignored
+
+        texts = [m["text"] for m in await cache.messages(slack, "C1", "1.0")]
+        assert texts == ["hi", "first (edited)", "third"]
+        assert len(slack.calls) == 1
+        assert cache.get_stats()["threads"] == 1
+
+    async def test_new_thread_is_seeded_from_event(self, cache) -> None:
+        slack = _FakeSlack([])
+        cache.observe({"type": "app_mention", "channel": "C1", "ts": "5.0", "text": "hey"},
+                      start_thread=True)
+        cache.observe(_msg("5.1", "reply", thread_ts="5.0"))
+        messages = await cache.messages(slack, "C1", "5.0")
+        assert [m["ts"] for m in messages] == ["5.0", "5.1"]
+        assert slack.calls == []
+
+    async def test_full_thread_ignores_later_replies(self, cache) -> None:
+        slack = _FakeSlack([_msg(f"1.{i:03d}") for i in range(FETCH_LIMIT + 5)])
+        await cache.messages(slack, "C1", "1.0")
+        cache.observe(_msg("2.0"))
+        messages = await cache.messages(slack, "C1", "1.0")
+        assert len(messages) == FETCH_LIMIT and messages[-1]["ts"] != "2.0"
+
+
+class TestSharedCoordination:
+    async def test_cache_is_bypassed(self, monkeypatch) -> None:
+        monkeypatch.setattr(settings, "coordination_backend", "postgres")
+        monkeypatch.setattr(thread_cache_mod, "_cache", None)
+        cache = get_thread_cache()
+        cache.observe({"type": "app_mention", "channel": "C1", "ts": "5.0", "text": "hey"},
+                      start_thread=True)
+        slack = _FakeSlack([_msg("5.0", thread_ts="5.0")])
+        await cache.messages(slack, "C1", "5.0")
+        await cache.messages(slack, "C1", "5.0")
+        assert len(slack.calls) == 2
+
+
+class TestLucyReplies:
+    """Bolt never delivers Lucy's own messages; the transport records them."""
+
+    @pytest.fixture(autouse=True)
+    def _fresh(self, monkeypatch) -> list[tuple[str, dict[str, Any]]]:
+        monkeypatch.setattr(thread_cache_mod, "_cache", None)
+        monkeypatch.setattr(transport_mod, "_transport", None)
+        calls: list[tuple[str, dict[str, Any]]] = []
+
+        async def _raw_api_call(self: PooledSlackClient, api_method: str, **kwargs: Any) -> Any:
+            calls.append((api_method, kwargs))
+            args = kwargs.get("json") or kwargs.get("data") or kwargs.get("params") or {}
+            ts = args.get("ts", "5.1")
+            return {"ok": True, "channel": args.get("channel"), "ts": ts,
+                    "message": {"ts": ts, "text": args.get("text", ""), "bot_id": "B1"}}
+
+        monkeypatch.setattr(PooledSlackClient, "_raw_api_call", _raw_api_call)
+        return calls
+
+    async def test_reply_edit_and_delete_reach_cached_thread(self) -> None:
+        cache = get_thread_cache()
+        cache.observe({"type": "app_mention", "channel": "C1", "ts": "5.0",
+                       "text": "<@LUCY> q"}, start_thread=True)
+        client = get_slack_transport().client("xoxb-1")
+        await client.chat_postMessage(channel="C1", thread_ts="5.0", text="Working on it")
+        cache.observe(_msg("5.2", "follow up", thread_ts="5.0"))
+
+        slack = _FakeSlack([])
+        messages = await cache.messages(slack, "C1", "5.0")
+        assert [m["text"] for m in messages] == ["<@LUCY> q", "Working on it", "follow up"]
+        assert await _is_lucy_in_thread(slack, "C1", "5.0")
+
+        await client.chat_update(channel="C1", ts="5.1", text="Here's the answer")
+        messages = await cache.messages(slack, "C1", "5.0")
+        assert messages[1]["text"] == "Here's the answer"
+        assert messages[1]["thread_ts"] == "5.0"
+
+        await client.chat_delete(channel="C1", ts="5.1")
+        messages = await cache.messages(slack, "C1", "5.0")
+        assert [m["ts"] for m in messages] == ["5.0", "5.2"]
+        assert slack.calls == []
+
+    async def test_top_level_posts_are_ignored(self) -> None:
+        cache = get_thread_cache()
+        cache.live = True
+        await get_slack_transport().client("xoxb-1").chat_postMessage(channel="C1", text="hi")
+        assert cache.get_stats()["threads"] == 0
+
+
+class TestConsumersShareCache:
+    @pytest.fixture(autouse=True)
+    def _fresh(self, monkeypatch) -> None:
+        monkeypatch.setattr(thread_cache_mod, "_cache", None)
+        get_thread_cache().live = True
+
+    async def test_handler_and_history_builder_share_one_fetch(self) -> None:
+        slack = _FakeSlack([_msg("1.0", "<@ULUCY> report?"), _msg("1.1", "Here", bot_id="B1"),
+                            _msg("1.2", "thanks, and Q3?")])
+        assert await _is_lucy_in_thread(slack, "C1", "1.0")
+
+        agent = LucyAgent.__new__(LucyAgent)
+        ctx = AgentContext(workspace_id="W1", channel_id="C1", thread_ts="1.0")
+        messages = await agent._build_thread_messages(ctx, "thanks, and Q3?", slack)
+        assert messages == [
+            {"role": "user", "content": "report?"},
+            {"role": "assistant", "content": "Here"},
+            {"role": "user", "content": "thanks, and Q3?"},
+        ]
+        assert len(slack.calls) == 1
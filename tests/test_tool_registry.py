@@ -0,0 +1,60 @@
+"""Tool registry: static schemas, per-intent subsets, dispatch table.
+
+Run: pytest tests/test_tool_registry.py -v
+"""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+
+class TestToolRegistry:
+    def setup_method(self) -> None:
+        from lucy.tools.registry import ToolRegistry
+
+        self.registry = ToolRegistry()
+
+    def test_static_tools_have_unique_names(self) -> None:
+        names = [t["function"]["name"] for t in self.registry.all_tools.tools]
+        assert len(names) == len(set(names))
+        assert "lucy_create_cron" in names
+        assert "lucy_list_heartbeats" in names
+        assert "lucy_connect_mcp" in names
+        assert "delegate_to_research_agent" in names
+
+    def test_serialization_is_deterministic(self) -> None:
+        from lucy.tools.registry import ToolRegistry, serialize_tools
+
+        again = ToolRegistry()
+        assert again.all_tools.json == self.registry.all_tools.json
+        assert json.loads(self.registry.all_tools.json) == list(self.registry.all_tools.tools)
+        assert serialize_tools(self.registry.all_tools.tools) == self.registry.all_tools.json
+
+    def test_intent_subsets_are_prefix_ordered_subsets(self) -> None:
+        full = self.registry.all_tools
+        for intent in ("chat", "lookup", "reasoning", "data", "monitoring"):
+            subset = self.registry.tool_set(intent)
+            assert subset.names <= full.names
+            order = [t["function"]["name"] for t in full.tools if t["function"]["name"] in subset.names]
+            assert [t["function"]["name"] for t in subset.tools] == order
+
+    def test_light_intents_drop_builder_tools(self) -> None:
+        chat = self.registry.tool_set("chat")
+        assert "lucy_list_crons" in chat.names
+        assert "lucy_execute_python" not in chat.names
+        assert not any(n.startswith("delegate_to_") for n in chat.names)
+
+    @pytest.mark.parametrize("intent", ["tool_use", "code", "confirmation", "followup", "unknown"])
+    def test_broad_intents_get_everything(self, intent: str) -> None:
+        assert self.registry.tool_set(intent) is self.registry.all_tools
+
+    def test_dispatch_table(self) -> None:
+        assert self.registry.handler_for("lucy_execute_python") is not None
+        assert self.registry.handler_for("lucy_search_slack_history") is not None
+        assert self.registry.handler_for("lucy_send_email") is not None
+        # Handled by the agent itself, not a tool module.
+        assert self.registry.handler_for("lucy_store_api_key") is None
+        assert self.registry.handler_for("lucy_create_cron") is None
+        assert self.registry.handler_for("COMPOSIO_SEARCH_TOOLS") is None